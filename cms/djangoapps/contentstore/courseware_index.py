@@ -2,14 +2,19 @@
 from __future__ import absolute_import
 from abc import ABCMeta, abstractmethod
 from datetime import timedelta
+import hashlib
+import json
 import logging
 import re
+import time
 from six import add_metaclass
 
 from django.conf import settings
+from django.core.cache import cache
 from django.utils.translation import ugettext_lazy, ugettext as _
 from django.core.urlresolvers import resolve
 
+import dogstats_wrapper as dog_stats_api
 from contentstore.course_group_config import GroupConfiguration
 from course_modes.models import CourseMode
 from eventtracking import tracker
@@ -26,6 +31,10 @@ from xmodule.library_tools import normalize_key_for_search
 # how far back from the trigger point to look back in order to index
 REINDEX_AGE = timedelta(0, 60)  # 60 seconds
 
+# The content hash of each indexed document is remembered for this long, so
+# that updating the index skips the documents which haven't changed since.
+CONTENT_HASH_TIMEOUT = 60 * 60 * 24 * 7  # 1 week
+
 log = logging.getLogger('edx.modulestore')
 
 
@@ -72,6 +81,9 @@ class SearchIndexerBase(object):
         'category': None
     }
 
+    # Maximum number of documents sent to the search engine at once
+    INDEX_CHUNK_SIZE = 100
+
     @classmethod
     def indexing_is_enabled(cls):
         """
@@ -112,6 +124,17 @@ class SearchIndexerBase(object):
         )
         result_ids = [result["data"]["id"] for result in response["results"]]
         searcher.remove(cls.DOCUMENT_TYPE, result_ids)
+        cache.delete_many([cls._content_hash_cache_key(result_id) for result_id in result_ids])
+
+    @classmethod
+    def _content_hash_cache_key(cls, item_id):
+        """ Cache key of the content hash of the indexed document of an item """
+        return u"contentstore.courseware_index.content_hash.{}.{}".format(cls.INDEX_NAME, item_id)
+
+    @classmethod
+    def _content_hash(cls, item_index):
+        """ Hash of the content of an index document """
+        return hashlib.md5(json.dumps(item_index, sort_keys=True, default=unicode)).hexdigest()
 
     @classmethod
     def index(cls, modulestore, structure_key, triggered_at=None, reindex_age=REINDEX_AGE):
@@ -129,6 +152,11 @@ class SearchIndexerBase(object):
             updating their index but are still walked through in order to identify
             which items may need to be removed from the index
             If None, then a full reindex takes place
+            Otherwise, items whose index document is the same as when they were
+            last indexed are not sent to the search engine again
+
+        Documents are sent to the search engine in chunks of INDEX_CHUNK_SIZE,
+        as they are prepared.
 
         Returns:
         Number of items that have been added to the index
@@ -141,10 +169,14 @@ class SearchIndexerBase(object):
         structure_key = cls.normalize_structure_key(structure_key)
         location_info = cls._get_location_info(structure_key)
 
-        # Wrap counter in dictionary - otherwise we seem to lose scope inside the embedded function `prepare_item_index`
+        # Wrap counters in dictionary - otherwise we seem to lose scope inside the embedded functions
         indexed_count = {
-            "count": 0
+            "count": 0,
+            "sent": 0,
+            "unchanged": 0,
         }
+        start_time = time.time()
+        metric_tags = [u"index:{}".format(cls.INDEX_NAME)]
 
         # indexed_items is a list of all the items that we wish to remain in the
         # index, whether or not we are planning to actually update their index.
@@ -152,11 +184,36 @@ class SearchIndexerBase(object):
         # list - those are ready to be destroyed
         indexed_items = set()
 
-        # items_index is a list of all the items index dictionaries.
-        # it is used to collect all indexes and index them using bulk API,
+        # items_index is a list of the items index dictionaries not yet sent.
+        # it is used to collect indexes and index them in chunks using bulk API,
         # instead of per item index API call.
         items_index = []
 
+        def index_items(final=False):
+            """
+            Send the documents in items_index to the search engine, skipping
+            those unchanged since they were last indexed when only recent
+            changes are indexed.
+
+            The final chunk is sent even if it is empty.
+            """
+            hash_keys = [cls._content_hash_cache_key(item_index['id']) for item_index in items_index]
+            content_hashes = dict(zip(hash_keys, [cls._content_hash(item_index) for item_index in items_index]))
+            chunk = list(items_index)
+            if triggered_at is not None and hash_keys:
+                indexed_hashes = cache.get_many(hash_keys)
+                chunk = [
+                    item_index for hash_key, item_index in zip(hash_keys, items_index)
+                    if indexed_hashes.get(hash_key) != content_hashes[hash_key]
+                ]
+                indexed_count["unchanged"] += len(items_index) - len(chunk)
+            if chunk or final:
+                with dog_stats_api.timer('contentstore.courseware_index.index_chunk', tags=metric_tags):
+                    searcher.index(cls.DOCUMENT_TYPE, chunk)
+                indexed_count["sent"] += len(chunk)
+            cache.set_many(content_hashes, CONTENT_HASH_TIMEOUT)
+            del items_index[:]
+
         def get_item_location(item):
             """
             Gets the version agnostic item location
@@ -240,11 +297,15 @@ class SearchIndexerBase(object):
                 item_index.update(cls.supplemental_fields(item))
                 items_index.append(item_index)
                 indexed_count["count"] += 1
-                return item_content_groups
             except Exception as err:  # pylint: disable=broad-except
                 # broad exception so that index operation does not fail on one item of many
                 log.warning('Could not index item: %s - %r', item.location, err)
                 error_list.append(_('Could not index item: {}').format(item.location))
+                return
+
+            if len(items_index) >= cls.INDEX_CHUNK_SIZE:
+                index_items()
+            return item_content_groups
 
         try:
             with modulestore.branch_setting(ModuleStoreEnum.RevisionOption.published_only):
@@ -257,7 +318,7 @@ class SearchIndexerBase(object):
                 # Now index the content
                 for item in structure.get_children():
                     prepare_item_index(item, groups_usage_info=groups_usage_info)
-                searcher.index(cls.DOCUMENT_TYPE, items_index)
+                index_items(final=True)
                 cls.remove_deleted_items(searcher, structure_key, indexed_items)
         except Exception as err:  # pylint: disable=broad-except
             # broad exception so that index operation does not prevent the rest of the application from working
@@ -268,6 +329,24 @@ class SearchIndexerBase(object):
             )
             error_list.append(_('General indexing error occurred'))
 
+        duration = time.time() - start_time
+        dog_stats_api.increment(
+            'contentstore.courseware_index.documents', indexed_count["sent"], tags=metric_tags + [u"status:sent"]
+        )
+        dog_stats_api.increment(
+            'contentstore.courseware_index.documents', indexed_count["unchanged"],
+            tags=metric_tags + [u"status:unchanged"]
+        )
+        dog_stats_api.histogram('contentstore.courseware_index.duration', duration, tags=metric_tags)
+        log.info(
+            "Indexed %s: %d documents sent, %d unchanged, in %.2f seconds (%.1f documents/second)",
+            structure_key,
+            indexed_count["sent"],
+            indexed_count["unchanged"],
+            duration,
+            indexed_count["count"] / duration if duration else 0,
+        )
+
         if error_list:
             raise SearchIndexingError('Error(s) present during indexing', error_list)
 
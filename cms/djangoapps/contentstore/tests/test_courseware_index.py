@@ -13,6 +13,7 @@ from uuid import uuid4
 from unittest import skip
 
 from django.conf import settings
+from django.core.cache import cache
 
 from course_modes.models import CourseMode
 from openedx.core.djangoapps.models.course_details import CourseDetails
@@ -133,6 +134,8 @@ class MixedWithOptionsTestCase(MixedSplitTestCase):
 
     def setUp(self):
         super(MixedWithOptionsTestCase, self).setUp()
+        # Forget the content hashes of the documents indexed by other tests
+        cache.clear()
 
     def setup_course_base(self, store):
         """ base version of setup_course_base is a no-op """
@@ -537,6 +540,40 @@ class TestCoursewareSearchIndexer(MixedWithOptionsTestCase):
         self.assertEqual(result["course_name"], "Search Index Test Course")
         self.assertEqual(result["location"], ["Week 1", CoursewareSearchIndexer.UNNAMED_MODULE_NAME, "Subsection 2"])
 
+    def _test_index_in_chunks(self, store):
+        """ Documents are sent to the search engine in chunks of INDEX_CHUNK_SIZE """
+        self.publish_item(store, self.vertical.location)
+        with patch.object(CoursewareSearchIndexer, 'INDEX_CHUNK_SIZE', 3):
+            with patch(settings.SEARCH_ENGINE + '.index') as mock_index:
+                indexed_count = self.reindex_course(store)
+        self.assertEqual(indexed_count, 4)
+        self.assertEqual([len(kall[0][1]) for kall in mock_index.call_args_list], [3, 1])
+
+    def _test_unchanged_items_not_reindexed(self, store):
+        """ Indexing recent changes only sends the documents which have changed """
+        self.publish_item(store, self.vertical.location)
+        # Old enough for all the items to be indexed again
+        since_time = datetime(2015, 1, 1, tzinfo=UTC)
+        self.reindex_course(store)
+
+        with patch(settings.SEARCH_ENGINE + '.index') as mock_index:
+            indexed_count = self.index_recent_changes(store, since_time)
+        self.assertEqual(indexed_count, 4)
+        mock_index.assert_called_once_with(self.DOCUMENT_TYPE, [])
+
+        self.html_unit.display_name = "Changed Html Content"
+        self.update_item(store, self.html_unit)
+        self.publish_item(store, self.vertical.location)
+        with patch(settings.SEARCH_ENGINE + '.index') as mock_index:
+            self.index_recent_changes(store, since_time)
+        indexed_content = mock_index.call_args[0][1]
+        self.assertEqual([item_index["id"] for item_index in indexed_content], [unicode(self.html_unit.location)])
+
+        # A complete reindex sends all documents
+        with patch(settings.SEARCH_ENGINE + '.index') as mock_index:
+            self.reindex_course(store)
+        self.assertEqual(len(mock_index.call_args[0][1]), 4)
+
     @patch('django.conf.settings.SEARCH_ENGINE', 'search.tests.utils.ErroringIndexEngine')
     def _test_exception(self, store):
         """ Test that exception within indexing yields a SearchIndexingError """
@@ -572,6 +609,14 @@ class TestCoursewareSearchIndexer(MixedWithOptionsTestCase):
     def test_time_based_index(self, store_type):
         self._perform_test_using_store(store_type, self._test_time_based_index)
 
+    @ddt.data(*WORKS_WITH_STORES)
+    def test_index_in_chunks(self, store_type):
+        self._perform_test_using_store(store_type, self._test_index_in_chunks)
+
+    @ddt.data(*WORKS_WITH_STORES)
+    def test_unchanged_items_not_reindexed(self, store_type):
+        self._perform_test_using_store(store_type, self._test_unchanged_items_not_reindexed)
+
     @ddt.data(*WORKS_WITH_STORES)
     def test_exception(self, store_type):
         self._perform_test_using_store(store_type, self._test_exception)
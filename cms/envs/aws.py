@@ -123,6 +123,9 @@ DEFAULT_COURSE_ABOUT_IMAGE_URL = ENV_TOKENS.get('DEFAULT_COURSE_ABOUT_IMAGE_URL'
 # for course data
 GITHUB_REPO_ROOT = ENV_TOKENS.get('GITHUB_REPO_ROOT', GITHUB_REPO_ROOT)
 
+# Number of threads importing the static files of a course concurrently
+COURSE_IMPORT_STATIC_WORKERS = ENV_TOKENS.get('COURSE_IMPORT_STATIC_WORKERS', COURSE_IMPORT_STATIC_WORKERS)
+
 # STATIC_ROOT specifies the directory where static files are
 # collected
 
@@ -219,6 +222,7 @@ if ENV_TOKENS.get('COMPREHENSIVE_THEME_DIR', None):
 COMPREHENSIVE_THEME_DIRS = ENV_TOKENS.get('COMPREHENSIVE_THEME_DIRS', COMPREHENSIVE_THEME_DIRS) or []
 DEFAULT_SITE_THEME = ENV_TOKENS.get('DEFAULT_SITE_THEME', DEFAULT_SITE_THEME)
 ENABLE_COMPREHENSIVE_THEMING = ENV_TOKENS.get('ENABLE_COMPREHENSIVE_THEMING', ENABLE_COMPREHENSIVE_THEMING)
+MAKO_PRELOAD_TEMPLATES = ENV_TOKENS.get('MAKO_PRELOAD_TEMPLATES', MAKO_PRELOAD_TEMPLATES)
 
 #Timezone overrides
 TIME_ZONE = ENV_TOKENS.get('TIME_ZONE', TIME_ZONE)
@@ -457,3 +461,11 @@ PARTNER_SUPPORT_EMAIL = ENV_TOKENS.get('PARTNER_SUPPORT_EMAIL', PARTNER_SUPPORT_
 
 # Affiliate cookie tracking
 AFFILIATE_COOKIE_NAME = ENV_TOKENS.get('AFFILIATE_COOKIE_NAME', AFFILIATE_COOKIE_NAME)
+
+##### Course Overviews #####
+COURSE_OVERVIEW_PROCESS_CACHE_TIMEOUT = ENV_TOKENS.get(
+    'COURSE_OVERVIEW_PROCESS_CACHE_TIMEOUT', COURSE_OVERVIEW_PROCESS_CACHE_TIMEOUT
+)
+COURSE_OVERVIEW_MODULESTORE_LOAD_WORKERS = ENV_TOKENS.get(
+    'COURSE_OVERVIEW_MODULESTORE_LOAD_WORKERS', COURSE_OVERVIEW_MODULESTORE_LOAD_WORKERS
+)
@@ -252,6 +252,22 @@ MAKO_TEMPLATES['main'] = [
 for namespace, template_dirs in lms.envs.common.MAKO_TEMPLATES.iteritems():
     MAKO_TEMPLATES['lms.' + namespace] = template_dirs
 
+# The most used templates, which are loaded by every worker at the end of the
+# startup instead of on its first requests.  Processes which don't render pages,
+# like celery workers, can set it to {} through the environment tokens.  Run the
+# compile_mako_templates management command on deployment to compile all the
+# templates ahead of time.
+MAKO_PRELOAD_TEMPLATES = {
+    'main': [
+        'static_content.html',
+        'base.html',
+        'index.html',
+        'course_outline.html',
+        'container.html',
+        'studio_xblock_wrapper.html',
+    ],
+}
+
 # Django templating
 TEMPLATES = [
     {
@@ -458,6 +474,16 @@ CODE_JAIL = {
         # How many CPU seconds can jailed code use?
         'CPU': 1,
     },
+
+    # Warm sandboxed workers that import the modules assumed by capa once,
+    # and fork a child for each execution.
+    'worker_pool': {
+        # Maximum number of workers per process.  0 starts a new sandboxed
+        # process for each execution.
+        'size': 0,
+        # Number of executions after which a worker is replaced.
+        'max_executions': 100,
+    },
 }
 
 ############################ DJANGO_BUILTINS ################################
@@ -1067,6 +1093,9 @@ UPLOAD_CHUNK_SIZE_IN_MB = 10
 ### Max size of asset uploads to GridFS
 MAX_ASSET_UPLOAD_FILE_SIZE_IN_MB = 10
 
+### Number of threads importing the static files of a course concurrently
+COURSE_IMPORT_STATIC_WORKERS = 4
+
 # FAQ url to direct users to if they upload
 # a file that exceeds the above size
 MAX_ASSET_UPLOAD_FILE_SIZE_URL = ""
@@ -1185,3 +1214,16 @@ PARTNER_SUPPORT_EMAIL = ''
 
 # Affiliate cookie tracking
 AFFILIATE_COOKIE_NAME = 'affiliate_id'
+
+############## Settings for Course Overviews ###############
+
+# Number of seconds each process keeps the course overviews loaded by
+# CourseOverview.get_from_ids in memory, or 0 to not keep them.  Publishing a
+# course only invalidates the overviews kept by the process handling the
+# course_published signal, so the other processes may serve a stale course
+# overview for up to this long after a course is published.
+COURSE_OVERVIEW_PROCESS_CACHE_TIMEOUT = 60
+
+# Maximum number of courses loaded from the modulestore at once by
+# CourseOverview.get_from_ids.
+COURSE_OVERVIEW_MODULESTORE_LOAD_WORKERS = 4
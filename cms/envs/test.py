@@ -213,6 +213,9 @@ PASSWORD_HASHERS = (
     'django.contrib.auth.hashers.MD5PasswordHasher',
 )
 
+# Don't preload mako templates on startup
+MAKO_PRELOAD_TEMPLATES = {}
+
 # No segment key
 CMS_SEGMENT_KEY = None
 
@@ -9,6 +9,7 @@ settings.INSTALLED_APPS  # pylint: disable=pointless-statement
 
 from openedx.core.lib.django_startup import autostartup
 import django
+import edxmako.startup
 from monkey_patch import (
     third_party_auth,
     django_db_models_options
@@ -40,6 +41,8 @@ def run():
 
     add_mimetypes()
 
+    configure_sandbox_worker_pool()
+
     if settings.FEATURES.get('USE_CUSTOM_THEME', False):
         enable_theme()
 
@@ -50,6 +53,21 @@ def run():
     xmodule.x_module.descriptor_global_handler_url = cms.lib.xblock.runtime.handler_url
     xmodule.x_module.descriptor_global_local_resource_url = xblock_local_resource_url
 
+    # Preload the templates last, once all the lookup directories are added.
+    edxmako.startup.preload()
+
+
+def configure_sandbox_worker_pool():
+    """
+    Configure the pool of warm sandboxed workers running capa problem code.
+
+    If you change this, be sure to also change it in lms/startup.py.
+    """
+    from capa.safe_exec import configure_worker_pool
+
+    worker_pool = settings.CODE_JAIL.get('worker_pool', {})
+    configure_worker_pool(worker_pool.get('size', 0), worker_pool.get('max_executions', 100))
+
 
 def add_mimetypes():
     """
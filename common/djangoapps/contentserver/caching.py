@@ -1,6 +1,14 @@
 """
 Helper functions for caching course assets.
+
+Small assets are cached in the shared cache, and the most recently used
+ones are also kept in the memory of each process for a short time.
 """
+from collections import OrderedDict
+import threading
+import time
+
+from django.conf import settings
 from django.core.cache import caches
 from django.core.cache.backends.base import InvalidCacheBackendError
 from opaque_keys import InvalidKeyError
@@ -14,6 +22,114 @@ except InvalidCacheBackendError:
     pass
 
 
+class LocalContentCache(object):
+    """
+    A least recently used cache of in-memory content, private to this process
+    and limited to a total number of bytes.
+
+    Entries expire after `ttl` seconds, since assets changed or locked by
+    another process are only invalidated in the shared cache.  An entry is
+    only used for a request for a specific version of an asset if its digest
+    matches that version.
+    """
+    def __init__(self, max_bytes, max_item_bytes, ttl):
+        self.max_bytes = max_bytes
+        self.max_item_bytes = max_item_bytes
+        self.ttl = ttl
+        self._lock = threading.Lock()
+        # Map of keys of locations to (content, expiration time) tuples,
+        # from least to most recently used.
+        self._entries = OrderedDict()
+        self._size = 0
+
+    def get(self, location, digest=None):
+        """
+        Returns the content of the given location if cached, and of the
+        version with the given digest if not None.
+        """
+        key = self.make_key(location)
+        with self._lock:
+            entry = self._entries.pop(key, None)
+            if entry is None:
+                return None
+            content, expires_at = entry
+            if expires_at < time.time():
+                self._size -= content.length
+                return None
+            # Mark the entry as most recently used.
+            self._entries[key] = entry
+        if digest is not None and digest != content.content_digest:
+            return None
+        return content
+
+    def set(self, content):
+        """
+        Caches the given in-memory content, if it isn't too large.
+        """
+        if content.length is None or content.length > self.max_item_bytes:
+            return
+        key = self.make_key(content.location)
+        with self._lock:
+            self._remove(key)
+            self._entries[key] = (content, time.time() + self.ttl)
+            self._size += content.length
+            while self._size > self.max_bytes:
+                self._remove(next(iter(self._entries)))
+
+    def delete(self, keys):
+        """
+        Removes the content cached with the given keys.
+        """
+        with self._lock:
+            for key in keys:
+                self._remove(key)
+
+    def clear(self):
+        """
+        Removes all content.
+        """
+        with self._lock:
+            self._entries.clear()
+            self._size = 0
+
+    @staticmethod
+    def make_key(location):
+        """
+        Returns the key of the given location, as in the shared cache.
+        """
+        return unicode(location).encode("utf-8")
+
+    def _remove(self, key):
+        """
+        Removes the entry with the given key, if any.  Must be called with the lock held.
+        """
+        entry = self._entries.pop(key, None)
+        if entry is not None:
+            self._size -= entry[0].length
+
+
+LOCAL_CONTENT_CACHE = LocalContentCache(
+    max_bytes=getattr(settings, 'CONTENTSERVER_LOCAL_CACHE_MAX_BYTES', 32 * 1024 * 1024),
+    max_item_bytes=getattr(settings, 'CONTENTSERVER_LOCAL_CACHE_MAX_ITEM_BYTES', 256 * 1024),
+    ttl=getattr(settings, 'CONTENTSERVER_LOCAL_CACHE_TTL', 60),
+)
+
+
+def get_local_content(location, digest=None):
+    """
+    Retrieves the given piece of content by its location if cached in this
+    process, and only if it has the given digest (if not None).
+    """
+    return LOCAL_CONTENT_CACHE.get(location, digest)
+
+
+def set_local_content(content):
+    """
+    Stores the given piece of in-memory content in the cache of this process.
+    """
+    LOCAL_CONTENT_CACHE.set(content)
+
+
 def set_cached_content(content):
     """
     Stores the given piece of content in the cache, using its location as the key.
@@ -47,3 +163,4 @@ def del_cached_content(location):
         pass
 
     CONTENT_CACHE.delete_many(locations, version=STATIC_CONTENT_VERSION)
+    LOCAL_CONTENT_CACHE.delete(locations)
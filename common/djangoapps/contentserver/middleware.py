@@ -2,22 +2,25 @@
 Middleware to serve assets.
 """
 
+import calendar
 import logging
 import datetime
 import newrelic.agent
 from django.http import (
     HttpResponse, HttpResponseNotModified, HttpResponseForbidden,
-    HttpResponseBadRequest, HttpResponseNotFound, HttpResponsePermanentRedirect)
+    HttpResponseBadRequest, HttpResponseNotFound, HttpResponsePermanentRedirect,
+    StreamingHttpResponse)
+from django.utils.http import parse_etags, parse_http_date_safe, quote_etag
 from student.models import CourseEnrollment
 from contentserver.models import CourseAssetCacheTtlConfig, CdnUserAgentsConfig
 
 from header_control import force_header_for_response
 from xmodule.assetstore.assetmgr import AssetManager
-from xmodule.contentstore.content import StaticContent, XASSET_LOCATION_TAG
+from xmodule.contentstore.content import StaticContent, StaticContentStream, XASSET_LOCATION_TAG
 from xmodule.modulestore import InvalidLocationError
 from opaque_keys import InvalidKeyError
 from opaque_keys.edx.locator import AssetLocator
-from .caching import get_cached_content, set_cached_content
+from .caching import get_cached_content, get_local_content, set_cached_content, set_local_content
 from xmodule.modulestore.exceptions import ItemNotFoundError
 from xmodule.exceptions import NotFoundError
 
@@ -66,7 +69,7 @@ class StaticContentServer(object):
             # if we're able to load it.
             actual_digest = None
             try:
-                content = self.load_asset_from_location(loc)
+                content = self.load_asset_from_location(loc, requested_digest)
                 actual_digest = getattr(content, "content_digest", None)
             except (ItemNotFoundError, NotFoundError):
                 return HttpResponseNotFound()
@@ -101,12 +104,14 @@ class StaticContentServer(object):
                 return HttpResponseForbidden('Unauthorized')
 
             # Figure out if the client sent us a conditional request, and let them know
-            # if this asset has changed since then.
-            last_modified_at_str = content.last_modified_at.strftime(HTTP_DATE_FORMAT)
-            if 'HTTP_IF_MODIFIED_SINCE' in request.META:
-                if_modified_since = request.META['HTTP_IF_MODIFIED_SINCE']
-                if if_modified_since == last_modified_at_str:
-                    return HttpResponseNotModified()
+            # if this asset has changed since then.  This is only done once the asset is
+            # known to exist and the user to be allowed to see it, and is cheap for
+            # versioned requests, whose asset is usually in the cache of this process.
+            if self.is_not_modified(request, content):
+                newrelic.agent.add_custom_parameter('contentserver.not_modified', True)
+                response = HttpResponseNotModified()
+                self.set_caching_headers(content, response)
+                return response
 
             # *** File streaming within a byte range ***
             # If a Range is provided, parse Range attribute of the request
@@ -116,10 +121,6 @@ class StaticContentServer(object):
             # http://www.w3.org/Protocols/rfc2616/rfc2616-sec14.html#sec14.35
             response = None
             if request.META.get('HTTP_RANGE'):
-                # If we have a StaticContent, get a StaticContentStream.  Can't manipulate the bytes otherwise.
-                if type(content) == StaticContent:
-                    content = AssetManager.find(loc, as_stream=True)
-
                 header_value = request.META['HTTP_RANGE']
                 try:
                     unit, ranges = parse_range_header(header_value, content.length)
@@ -144,7 +145,10 @@ class StaticContentServer(object):
 
                         if 0 <= first <= last < content.length:
                             # If the byte range is satisfiable
-                            response = HttpResponse(content.stream_data_in_range(first, last))
+                            if isinstance(content, StaticContentStream):
+                                response = StreamingHttpResponse(content.stream_data_in_range(first, last))
+                            else:
+                                response = HttpResponse(content.data[first:last + 1])
                             response['Content-Range'] = 'bytes {first}-{last}/{length}'.format(
                                 first=first, last=last, length=content.length
                             )
@@ -160,7 +164,11 @@ class StaticContentServer(object):
 
             # If Range header is absent or syntactically invalid return a full content response.
             if response is None:
-                response = HttpResponse(content.stream_data())
+                # Stream large assets in chunks, rather than reading them in memory.
+                if isinstance(content, StaticContentStream):
+                    response = StreamingHttpResponse(content.stream_data())
+                else:
+                    response = HttpResponse(content.data)
                 response['Content-Length'] = content.length
 
             newrelic.agent.add_custom_parameter('contentserver.content_len', content.length)
@@ -202,12 +210,32 @@ class StaticContentServer(object):
             response['Cache-Control'] = "private, no-cache, no-store"
 
         response['Last-Modified'] = content.last_modified_at.strftime(HTTP_DATE_FORMAT)
+        if getattr(content, "content_digest", None):
+            response['ETag'] = quote_etag(content.content_digest)
 
         # Force the Vary header to only vary responses on Origin, so that XHR and browser requests get cached
         # separately and don't screw over one another. i.e. a browser request that doesn't send Origin, and
         # caches a version of the response without CORS headers, in turn breaking XHR requests.
         force_header_for_response(response, 'Vary', 'Origin')
 
+    @staticmethod
+    def is_not_modified(request, content):
+        """
+        Determines whether the conditional headers of the request show that the client
+        already has the current version of the given content.
+        """
+        if 'HTTP_IF_NONE_MATCH' in request.META:
+            # If-None-Match takes precedence over If-Modified-Since.
+            content_digest = getattr(content, "content_digest", None)
+            return content_digest is not None and etag_matches(request, content_digest)
+
+        if 'HTTP_IF_MODIFIED_SINCE' in request.META:
+            if_modified_since = parse_http_date_safe(request.META['HTTP_IF_MODIFIED_SINCE'])
+            last_modified_at = calendar.timegm(content.last_modified_at.utctimetuple())
+            return if_modified_since is not None and if_modified_since >= last_modified_at
+
+        return False
+
     @staticmethod
     def is_cdn_request(request):
         """
@@ -255,15 +283,25 @@ class StaticContentServer(object):
 
         return True
 
-    def load_asset_from_location(self, location):
+    def load_asset_from_location(self, location, digest=None):
         """
         Loads an asset based on its location, either retrieving it from a cache
         or loading it directly from the contentstore.
+
+        If a digest is given, the asset is only retrieved from the cache of this
+        process if it has that digest.
         """
 
-        # See if we can load this item from cache.
+        # See if we can load this item from the cache of this process, or the shared cache.
+        content = get_local_content(location, digest)
+        if content is not None:
+            newrelic.agent.add_custom_parameter('contentserver.local_cache_hit', True)
+            return content
+
         content = get_cached_content(location)
-        if content is None:
+        if content is not None:
+            set_local_content(content)
+        else:
             # Not in cache, so just try and load it from the asset manager.
             try:
                 content = AssetManager.find(location, as_stream=True)
@@ -276,10 +314,19 @@ class StaticContentServer(object):
             if content.length is not None and content.length < 1048576:
                 content = content.copy_to_in_mem()
                 set_cached_content(content)
+                set_local_content(content)
 
         return content
 
 
+def etag_matches(request, content_digest):
+    """
+    Returns whether the If-None-Match header of the request matches the ETag of
+    the content with the given digest.
+    """
+    return content_digest in parse_etags(request.META.get('HTTP_IF_NONE_MATCH', ''))
+
+
 def parse_range_header(header_value, content_length):
     """
     Returns the unit and a list of (start, end) tuples of ranges.
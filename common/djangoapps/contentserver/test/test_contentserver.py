@@ -22,8 +22,10 @@ from xmodule.modulestore.tests.django_utils import SharedModuleStoreTestCase
 from xmodule.modulestore.xml_importer import import_course_from_xml
 from xmodule.assetstore.assetmgr import AssetManager
 from opaque_keys import InvalidKeyError
+from opaque_keys.edx.locator import CourseLocator
 from xmodule.modulestore.exceptions import ItemNotFoundError
 
+from contentserver.caching import LOCAL_CONTENT_CACHE, LocalContentCache
 from contentserver.middleware import parse_range_header, HTTP_DATE_FORMAT, StaticContentServer
 from student.models import CourseEnrollment
 from student.tests.factories import UserFactory, AdminFactory
@@ -110,6 +112,9 @@ class ContentStoreToyCourseTest(SharedModuleStoreTestCase):
 
         self.client = Client()
 
+        LOCAL_CONTENT_CACHE.clear()
+        self.addCleanup(LOCAL_CONTENT_CACHE.clear)
+
     def test_unlocked_asset(self):
         """
         Test that unlocked assets are being served.
@@ -284,6 +289,96 @@ class ContentStoreToyCourseTest(SharedModuleStoreTestCase):
             first=(self.length_unlocked), last=(self.length_unlocked)))
         self.assertEqual(resp.status_code, 416)
 
+    def test_if_none_match(self):
+        """
+        Test that a request with the ETag of the current version of an asset is
+        answered with 304 Not Modified, and that other ETags get the asset.
+        """
+        resp = self.client.get(self.url_unlocked)
+        self.assertEqual(resp.status_code, 200)
+        etag = resp['ETag']
+
+        resp = self.client.get(self.url_unlocked, HTTP_IF_NONE_MATCH=etag)
+        self.assertEqual(resp.status_code, 304)
+        self.assertEqual(resp['ETag'], etag)
+
+        resp = self.client.get(self.url_unlocked, HTTP_IF_NONE_MATCH='"{}"'.format(FAKE_MD5_HASH))
+        self.assertEqual(resp.status_code, 200)
+
+    def test_if_modified_since(self):
+        """
+        Test that a request for an asset not modified since the given date is
+        answered with 304 Not Modified.
+        """
+        resp = self.client.get(self.url_unlocked)
+        last_modified = datetime.datetime.strptime(resp['Last-Modified'], HTTP_DATE_FORMAT)
+
+        resp = self.client.get(self.url_unlocked, HTTP_IF_MODIFIED_SINCE=resp['Last-Modified'])
+        self.assertEqual(resp.status_code, 304)
+
+        later = (last_modified + datetime.timedelta(days=1)).strftime(HTTP_DATE_FORMAT)
+        resp = self.client.get(self.url_unlocked, HTTP_IF_MODIFIED_SINCE=later)
+        self.assertEqual(resp.status_code, 304)
+
+        earlier = (last_modified - datetime.timedelta(days=1)).strftime(HTTP_DATE_FORMAT)
+        resp = self.client.get(self.url_unlocked, HTTP_IF_MODIFIED_SINCE=earlier)
+        self.assertEqual(resp.status_code, 200)
+
+    def test_versioned_if_none_match(self):
+        """
+        Test that a request for a version of an asset that the client already has
+        is answered with 304 Not Modified, without reading the asset from the store.
+        """
+        resp = self.client.get(self.url_unlocked_versioned)
+        etag = resp['ETag']
+
+        with patch('contentserver.middleware.AssetManager.find') as mock_find:
+            resp = self.client.get(self.url_unlocked_versioned, HTTP_IF_NONE_MATCH=etag)
+        self.assertEqual(resp.status_code, 304)
+        self.assertEqual(resp['ETag'], etag)
+        self.assertFalse(mock_find.called)
+
+    def test_locked_versioned_if_none_match_unauthorized(self):
+        """
+        Test that a matching If-None-Match doesn't bypass the lock of an asset.
+        """
+        self.client.login(username=self.staff_usr, password='test')
+        etag = self.client.get(self.url_locked_versioned)['ETag']
+        self.client.logout()
+
+        self.client.login(username=self.non_staff_usr, password='test')
+        resp = self.client.get(self.url_locked_versioned, HTTP_IF_NONE_MATCH=etag)
+        self.assertEqual(resp.status_code, 403)
+
+    def test_local_cache(self):
+        """
+        Test that assets are served from the cache of the process once loaded.
+        """
+        resp = self.client.get(self.url_unlocked)
+        self.assertEqual(resp.status_code, 200)
+
+        with patch('contentserver.middleware.get_cached_content') as mock_get_cached_content:
+            resp = self.client.get(self.url_unlocked)
+            self.assertEqual(resp.status_code, 200)
+            self.assertEqual(resp['Content-Length'], str(self.length_unlocked))
+
+            # Requests for another version of the asset miss the cache.
+            mock_get_cached_content.return_value = None
+            resp = self.client.get(StaticContent.add_version_to_asset_path(self.url_unlocked, FAKE_MD5_HASH))
+            self.assertEqual(resp.status_code, 301)
+        self.assertEqual(mock_get_cached_content.call_count, 1)
+
+    def test_large_asset_streamed(self):
+        """
+        Test that assets too large to be cached are streamed.
+        """
+        with patch.object(StaticContentServer, 'load_asset_from_location') as mock_load:
+            mock_load.return_value = AssetManager.find(self.unlocked_asset, as_stream=True)
+            resp = self.client.get(self.url_unlocked)
+        self.assertEqual(resp.status_code, 200)
+        self.assertTrue(resp.streaming)
+        self.assertEqual(len(''.join(resp.streaming_content)), self.length_unlocked)
+
     def test_vary_header_sent(self):
         """
         Tests that we're properly setting the Vary header to ensure browser requests don't get
@@ -446,3 +541,55 @@ class ParseRangeHeaderTestCase(unittest.TestCase):
         self.assertRaisesRegexp(
             exception_class, exception_message_regex, parse_range_header, header_value, self.content_length
         )
+
+
+class LocalContentCacheTestCase(unittest.TestCase):
+    """
+    Tests for the LocalContentCache class.
+    """
+    def setUp(self):
+        super(LocalContentCacheTestCase, self).setUp()
+        self.cache = LocalContentCache(max_bytes=10, max_item_bytes=5, ttl=60)
+
+    def make_content(self, name, data, digest=None):
+        """
+        Returns an in-memory content with the given name and data.
+        """
+        location = StaticContent.compute_location(CourseLocator('edX', 'toy', '2012_Fall'), name)
+        return StaticContent(location, name, 'text/plain', data, length=len(data), content_digest=digest)
+
+    def test_get(self):
+        content = self.make_content('a', 'aaa', digest=FAKE_MD5_HASH)
+        self.cache.set(content)
+        self.assertIs(self.cache.get(content.location), content)
+        self.assertIs(self.cache.get(content.location, FAKE_MD5_HASH), content)
+        self.assertIsNone(self.cache.get(content.location, 'another digest'))
+
+    def test_byte_budget(self):
+        contents = [self.make_content(name, 'xxxx') for name in ('a', 'b', 'c')]
+        for content in contents[:2]:
+            self.cache.set(content)
+        # Use the first content, so that the second one is evicted.
+        self.cache.get(contents[0].location)
+        self.cache.set(contents[2])
+
+        self.assertIs(self.cache.get(contents[0].location), contents[0])
+        self.assertIsNone(self.cache.get(contents[1].location))
+        self.assertIs(self.cache.get(contents[2].location), contents[2])
+
+    def test_too_large(self):
+        content = self.make_content('a', 'x' * 6)
+        self.cache.set(content)
+        self.assertIsNone(self.cache.get(content.location))
+
+    def test_expiration(self):
+        self.cache.ttl = -1
+        content = self.make_content('a', 'aaa')
+        self.cache.set(content)
+        self.assertIsNone(self.cache.get(content.location))
+
+    def test_delete(self):
+        content = self.make_content('a', 'aaa')
+        self.cache.set(content)
+        self.cache.delete([LocalContentCache.make_key(content.location)])
+        self.assertIsNone(self.cache.get(content.location))
@@ -0,0 +1,44 @@
+"""
+Compile the Mako templates ahead of time, so that the workers load the
+compiled modules instead of compiling the templates on their first requests.
+
+The templates are compiled into the module directory of the template lookups,
+which depends on the lookup path, so this command has to be run with the same
+settings as the workers, e.g. on deployment:
+
+    ./manage.py lms compile_mako_templates --settings=aws
+"""
+
+from django.core.management.base import BaseCommand, CommandError
+
+from edxmako import LOOKUP, compile_templates
+
+
+class Command(BaseCommand):
+    """
+    Compile all the Mako templates, including the templates of every theme.
+    """
+
+    help = "Compile all the Mako templates, including the templates of every theme, into the module directory."
+
+    def add_arguments(self, parser):
+        parser.add_argument(
+            'namespaces', type=str, nargs='*',
+            help="Namespaces of the templates to compile, all of them by default.",
+        )
+
+    def handle(self, *args, **options):
+        namespaces = options['namespaces'] or sorted(LOOKUP)
+        unknown_namespaces = set(namespaces) - set(LOOKUP)
+        if unknown_namespaces:
+            raise CommandError(u"Unknown template namespaces: {}".format(u", ".join(sorted(unknown_namespaces))))
+
+        for namespace in namespaces:
+            failed_uris = compile_templates(namespace)
+            self.stdout.write(u"Compiled the templates of the namespace {} into {}".format(
+                namespace, LOOKUP[namespace].template_args['module_directory'],
+            ))
+            for uri in failed_uris:
+                self.stdout.write(
+                    self.style.WARNING(u"Skipped {}, which failed to compile".format(uri))  # pylint: disable=no-member
+                )
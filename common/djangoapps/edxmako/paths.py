@@ -4,6 +4,7 @@ Set up lookup paths for mako templates.
 
 import hashlib
 import contextlib
+import logging
 import os
 import pkg_resources
 
@@ -15,10 +16,19 @@ from . import LOOKUP
 from openedx.core.djangoapps.theming.helpers import (
     get_template as themed_template,
     get_template_path_with_theme,
+    get_themes,
     strip_site_theme_templates_path,
 )
 
 
+log = logging.getLogger(__name__)
+
+# The extensions of the files which are compiled as mako templates ahead of
+# time.  Javascript and Underscore files are left out, as some lookup
+# directories contain static assets.
+TEMPLATE_EXTENSIONS = ('.html', '.txt', '.xml')
+
+
 class DynamicTemplateLookup(TemplateLookup):
     """
     A specialization of the standard mako `TemplateLookup` class which allows
@@ -78,6 +88,39 @@ class DynamicTemplateLookup(TemplateLookup):
 
         return template
 
+    def get_template_uris(self):
+        """
+        Returns the uris of all the templates found in the lookup path,
+        including the templates of every theme.
+
+        For the directories containing themes, only the template
+        directories of the themes are searched, as done by `get_template`.
+        """
+        theme_template_dirs = {}
+        for theme in get_themes():
+            themes_base_dir = os.path.normpath(theme.themes_base_dir)
+            theme_template_dirs.setdefault(themes_base_dir, []).extend(theme.template_dirs)
+
+        uris = set()
+        for directory in self.directories:
+            for template_dir in theme_template_dirs.get(directory, [directory]):
+                for root, __, filenames in os.walk(template_dir):
+                    for filename in filenames:
+                        if filename.endswith(TEMPLATE_EXTENSIONS):
+                            path = os.path.relpath(os.path.join(root, filename), directory)
+                            uris.add(path.replace(os.sep, '/'))
+        return sorted(uris)
+
+    def load_template(self, uri):
+        """
+        Loads the template of the given uri, as found in the lookup path,
+        compiling it into the module directory if it hasn't been yet.
+
+        Unlike `get_template`, the uri is not resolved against the theme of
+        the current site.
+        """
+        return super(DynamicTemplateLookup, self).get_template(uri)
+
 
 def clear_lookups(namespace):
     """
@@ -116,6 +159,55 @@ def lookup_template(namespace, name):
     return LOOKUP[namespace].get_template(name)
 
 
+def compile_templates(namespace):
+    """
+    Compiles all the templates of the given namespace, including the templates
+    of every theme, into the module directory of its lookup.
+
+    The workers then load the compiled modules instead of compiling the
+    templates on their first requests.
+
+    Returns the uris of the templates which failed to compile, e.g. because
+    they aren't mako templates.
+    """
+    lookup = LOOKUP[namespace]
+    failed_uris = []
+    for uri in lookup.get_template_uris():
+        try:
+            lookup.load_template(uri)
+        except Exception:  # pylint: disable=broad-except
+            log.debug(u"Unable to compile the template %s of the namespace %s.", uri, namespace, exc_info=True)
+            failed_uris.append(uri)
+    return failed_uris
+
+
+def preload_templates(namespace, uris):
+    """
+    Loads the templates of the given uris, and their overrides in every theme,
+    into the lookup of the given namespace.
+
+    Templates which can't be found or loaded are logged and skipped, as they
+    would fail when requested anyway.
+    """
+    lookup = LOOKUP.get(namespace)
+    if lookup is None:
+        return
+
+    themes = get_themes()
+    for uri in uris:
+        themed_uris = [
+            str(theme.template_path / uri) for theme in themes
+            if (theme.path / 'templates' / uri).exists()
+        ]
+        for template_uri in [uri] + themed_uris:
+            try:
+                lookup.load_template(template_uri)
+            except Exception:  # pylint: disable=broad-except
+                log.warning(
+                    u"Unable to preload the template %s of the namespace %s.", template_uri, namespace, exc_info=True
+                )
+
+
 @contextlib.contextmanager
 def save_lookups():
     """
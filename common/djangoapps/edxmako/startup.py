@@ -2,7 +2,7 @@
 Initialize the mako template lookup
 """
 from django.conf import settings
-from . import add_lookup, clear_lookups
+from . import add_lookup, clear_lookups, preload_templates
 
 
 def run():
@@ -17,3 +17,16 @@ def run():
         clear_lookups(namespace)
         for directory in directories:
             add_lookup(namespace, directory)
+
+
+def preload():
+    """
+    Preload the most used templates, so that the first requests of a worker
+    don't have to load them.
+
+    This has to be called once all the lookup directories are added, at the
+    end of the application startup, since adding a directory to a lookup
+    discards the templates it has loaded.
+    """
+    for namespace, uris in settings.MAKO_PRELOAD_TEMPLATES.items():
+        preload_templates(namespace, uris)
@@ -1,5 +1,8 @@
 
 from mock import patch, Mock
+import os
+import shutil
+import tempfile
 import unittest
 import ddt
 
@@ -9,9 +12,10 @@ from django.http import HttpResponse
 from django.test import TestCase
 from django.test.utils import override_settings
 from django.test.client import RequestFactory
+from django.core.management import call_command
 from django.core.urlresolvers import reverse
 from edxmako.request_context import get_template_request_context
-from edxmako import add_lookup, LOOKUP
+from edxmako import add_lookup, compile_templates, preload_templates, LOOKUP
 from edxmako.shortcuts import (
     marketing_link,
     is_marketing_link_set,
@@ -81,6 +85,66 @@ class AddLookupTests(TestCase):
         self.assertTrue(dirs[0].endswith('management'))
 
 
+class TemplateCompilationTests(TestCase):
+    """
+    Test the ahead of time compilation and the preloading of templates.
+    """
+    def setUp(self):
+        super(TemplateCompilationTests, self).setUp()
+        lookup_patcher = patch.dict(LOOKUP)
+        lookup_patcher.start()
+        self.addCleanup(lookup_patcher.stop)
+
+        self.templates_dir = tempfile.mkdtemp()
+        self.module_dir = tempfile.mkdtemp()
+        self.addCleanup(shutil.rmtree, self.templates_dir)
+        self.addCleanup(shutil.rmtree, self.module_dir)
+
+        os.mkdir(os.path.join(self.templates_dir, 'courseware'))
+        for name, content in [
+                ('main.html', '<html>${body}</html>'),
+                ('courseware/courseware.html', '<%inherit file="/main.html"/>'),
+                ('broken.html', '<%def name="broken(">'),
+                ('view.underscore', '<%= view %>'),
+        ]:
+            with open(os.path.join(self.templates_dir, name), 'w') as template_file:
+                template_file.write(content)
+
+        with override_settings(MAKO_MODULE_DIR=self.module_dir):
+            add_lookup('test', self.templates_dir)
+
+    def compiled_modules(self):
+        """
+        Returns the paths of the compiled modules, relative to the module directory of the lookup.
+        """
+        module_directory = LOOKUP['test'].template_args['module_directory']
+        return sorted(
+            os.path.relpath(os.path.join(root, filename), module_directory)
+            for root, __, filenames in os.walk(module_directory)
+            for filename in filenames
+            if filename.endswith('.py')
+        )
+
+    def test_get_template_uris(self):
+        self.assertEqual(
+            LOOKUP['test'].get_template_uris(),
+            ['broken.html', 'courseware/courseware.html', 'main.html'],
+        )
+
+    def test_compile_templates(self):
+        self.assertEqual(compile_templates('test'), ['broken.html'])
+        self.assertEqual(self.compiled_modules(), ['courseware/courseware.html.py', 'main.html.py'])
+
+    def test_command(self):
+        call_command('compile_mako_templates', 'test')
+        self.assertEqual(self.compiled_modules(), ['courseware/courseware.html.py', 'main.html.py'])
+
+    def test_preload_templates(self):
+        preload_templates('test', ['main.html', 'missing.html', 'broken.html'])
+        self.assertEqual(LOOKUP['test']._collection.keys(), ['main.html'])  # pylint: disable=protected-access
+        self.assertEqual(self.compiled_modules(), ['main.html.py'])
+
+
 class MakoRequestContextTest(TestCase):
     """
     Test MakoMiddleware.
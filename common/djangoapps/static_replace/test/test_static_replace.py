@@ -10,9 +10,12 @@ from urlparse import urlparse, urlunparse, parse_qsl
 from PIL import Image
 from cStringIO import StringIO
 from nose.tools import assert_equals, assert_true, assert_false  # pylint: disable=no-name-in-module
+from request_cache.middleware import RequestCache
 from static_replace import (
     replace_static_urls,
     replace_course_urls,
+    replace_jump_to_id_urls,
+    replace_urls,
     _url_replace_regex,
     process_static_urls,
     make_static_urls_absolute
@@ -177,6 +180,48 @@ def test_static_url_with_query(mock_modulestore, mock_storage):
     assert_equals(post_text, replace_static_urls(pre_text, DATA_DIRECTORY, COURSE_KEY))
 
 
+@patch('static_replace.staticfiles_storage', autospec=True)
+def test_replace_urls(mock_storage):
+    """
+    Make sure replace_urls replaces the same urls as replace_static_urls,
+    replace_course_urls and replace_jump_to_id_urls
+    """
+    RequestCache.clear_request_cache()
+    mock_storage.exists.return_value = True
+    mock_storage.url.return_value = '/static/file.hashed.png'
+
+    text = STATIC_SOURCE + ' "/course/info" "/jump_to_id/block" "/static/foo.png?raw"'
+    expected = replace_jump_to_id_urls(
+        replace_course_urls(replace_static_urls(text, DATA_DIRECTORY, COURSE_KEY), COURSE_KEY),
+        COURSE_KEY,
+        '/jump_to_id_base/'
+    )
+    assert_equals(expected, replace_urls(text, COURSE_KEY, DATA_DIRECTORY, jump_to_id_base_url='/jump_to_id_base/'))
+    assert_equals(
+        '"/static/file.hashed.png" "/courses/org/course/run/info" "/jump_to_id/block" "/static/foo.png?raw"',
+        replace_urls(text, COURSE_KEY, DATA_DIRECTORY)
+    )
+
+
+@patch('static_replace.staticfiles_storage', autospec=True)
+def test_replace_urls_memoized(mock_storage):
+    """
+    Make sure replace_urls only looks up each url once per request
+    """
+    RequestCache.clear_request_cache()
+    mock_storage.exists.return_value = True
+    mock_storage.url.return_value = '/static/file.hashed.png'
+
+    assert_equals('"/static/file.hashed.png"', replace_urls(STATIC_SOURCE, COURSE_KEY))
+    assert_equals('<img src="/static/file.hashed.png">', replace_urls('<img src=' + STATIC_SOURCE + '>', COURSE_KEY))
+    assert_equals('"/static/file.hashed.png"', replace_urls(STATIC_SOURCE, COURSE_KEY))
+    mock_storage.exists.assert_called_once_with('file.png')
+
+    RequestCache.clear_request_cache()
+    replace_urls(STATIC_SOURCE, COURSE_KEY)
+    assert_equals(mock_storage.exists.call_count, 2)
+
+
 def test_regex():
     yes = ('"/static/foo.png"',
            '"/static/foo.png"',
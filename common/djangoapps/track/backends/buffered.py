@@ -0,0 +1,184 @@
+"""
+Event tracker backend that buffers events and sends them in batches.
+
+"""
+
+from __future__ import absolute_import
+
+import atexit
+import logging
+import os
+import threading
+import time
+from Queue import Queue, Empty, Full
+
+from dogapi import dog_stats_api
+
+from track.backends import BaseBackend
+
+
+log = logging.getLogger(__name__)
+
+
+class BufferedBackend(BaseBackend):
+    """
+    Event tracker backend that queues events in memory and sends them in
+    batches to another backend, from a background thread.
+
+    A batch is sent as soon as it holds `max_batch_size` events, or
+    `flush_interval` seconds after its first event was queued.  At most
+    `max_queue_size` events are queued: when the queue is full, `send`
+    blocks for up to `block_timeout` seconds, and then drops the event.
+    Queued events are sent when the process exits.
+
+    Example configuration::
+
+      TRACKING_BACKENDS = {
+          'mongo': {
+              'ENGINE': 'track.backends.buffered.BufferedBackend',
+              'OPTIONS': {
+                  'backend': {
+                      'ENGINE': 'track.backends.mongodb.MongoBackend',
+                      'OPTIONS': {'database': 'track'}
+                  },
+                  'max_batch_size': 100,
+                  'flush_interval': 1.0,
+              }
+          }
+      }
+
+    """
+
+    def __init__(self, backend, max_batch_size=100, flush_interval=1.0, max_queue_size=10000,
+                 block_timeout=0.1, **kwargs):
+        """
+        Configure the wrapped backend and its buffer.
+
+        :Parameters:
+
+          - `backend`: configuration of the backend the events are sent
+            to, with the same 'ENGINE' and 'OPTIONS' keys as in
+            TRACKING_BACKENDS, or a backend instance
+          - `max_batch_size`: maximum number of events sent at once
+          - `flush_interval`: maximum number of seconds an event is queued
+            before it is sent
+          - `max_queue_size`: maximum number of queued events
+          - `block_timeout`: maximum number of seconds `send` waits for
+            room in a full queue before dropping the event
+
+        """
+        super(BufferedBackend, self).__init__(**kwargs)
+
+        if isinstance(backend, dict):
+            # Imported here, as the tracker initializes its backends on import.
+            from track.tracker import _instantiate_backend_from_name
+            backend = _instantiate_backend_from_name(backend['ENGINE'], backend.get('OPTIONS', {}))
+        self.backend = backend
+
+        self.max_batch_size = max_batch_size
+        self.flush_interval = flush_interval
+        self.max_queue_size = max_queue_size
+        self.block_timeout = block_timeout
+
+        self._lock = threading.Lock()
+        self._queue = None
+        self._thread = None
+        self._pid = None
+        self._closed = False
+
+        atexit.register(self.close)
+
+    def send(self, event):
+        """Queue the event, to be sent by the background thread."""
+        if self._closed:
+            self.backend.send(event)
+            return
+        queue = self._get_queue()
+        try:
+            queue.put(event, timeout=self.block_timeout)
+        except Full:
+            dog_stats_api.increment('track.backends.buffered.dropped')
+            log.warning('Event tracking buffer is full, dropping event')
+
+    def flush(self):
+        """Wait until all queued events are sent."""
+        if self._queue is not None and self._pid == os.getpid():
+            self._queue.join()
+
+    def close(self):
+        """Stop the background thread, after sending all queued events."""
+        with self._lock:
+            if self._closed:
+                return
+            self._closed = True
+            if self._queue is None or self._pid != os.getpid():
+                return
+            queue, thread = self._queue, self._thread
+
+        # Wake up the background thread, which sends what is queued and stops.
+        queue.put(None)
+        thread.join()
+
+    def _get_queue(self):
+        """
+        Return the queue of events, starting the background thread if it
+        isn't running in this process.
+        """
+        if self._pid != os.getpid():
+            with self._lock:
+                if self._pid != os.getpid():
+                    # Any queue and thread were inherited from a parent
+                    # process, and belong to it.
+                    self._queue = Queue(self.max_queue_size)
+                    self._thread = threading.Thread(target=self._run, args=(self._queue,), name='BufferedBackend')
+                    self._thread.daemon = True
+                    self._thread.start()
+                    self._pid = os.getpid()
+        return self._queue
+
+    def _run(self, queue):
+        """Send the queued events in batches until the backend is closed."""
+        stopping = False
+        while not stopping:
+            event = queue.get()
+            if event is None:
+                queue.task_done()
+                break
+
+            batch = [event]
+            deadline = time.time() + self.flush_interval
+            while len(batch) < self.max_batch_size:
+                try:
+                    event = queue.get(timeout=max(deadline - time.time(), 0))
+                except Empty:
+                    break
+                if event is None:
+                    queue.task_done()
+                    stopping = True
+                    break
+                batch.append(event)
+
+            self._send_batch(batch)
+            for __ in batch:
+                queue.task_done()
+
+        # Send the events queued after the backend was closed.
+        batch = []
+        while True:
+            try:
+                batch.append(queue.get_nowait())
+            except Empty:
+                break
+            queue.task_done()
+        self._send_batch([event for event in batch if event is not None])
+
+    def _send_batch(self, batch):
+        """Send a batch of events to the wrapped backend."""
+        if not batch:
+            return
+        dog_stats_api.histogram('track.backends.buffered.batch_size', len(batch))
+        try:
+            with dog_stats_api.timer('track.backends.buffered.send_batch'):
+                self.backend.send_batch(batch)
+        except Exception:  # pylint: disable=broad-except
+            log.exception('Error sending a batch of %d events', len(batch))
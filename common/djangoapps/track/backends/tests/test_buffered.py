@@ -0,0 +1,73 @@
+from __future__ import absolute_import
+
+import threading
+
+from django.test import TestCase
+from mock import MagicMock
+
+from track.backends.buffered import BufferedBackend
+
+
+class TestBufferedBackend(TestCase):
+    def create_backend(self, **options):
+        backend = BufferedBackend(MagicMock(), **options)
+        self.addCleanup(backend.close)
+        return backend
+
+    def sent_batches(self, backend):
+        return [call[0][0] for call in backend.backend.send_batch.call_args_list]
+
+    def test_batch_size(self):
+        backend = self.create_backend(max_batch_size=2, flush_interval=60)
+        for index in range(5):
+            backend.send({'test': index})
+        backend.close()
+
+        self.assertEqual(
+            self.sent_batches(backend),
+            [[{'test': 0}, {'test': 1}], [{'test': 2}, {'test': 3}], [{'test': 4}]],
+        )
+        self.assertFalse(backend.backend.send.called)
+
+    def test_flush_interval(self):
+        backend = self.create_backend(max_batch_size=100, flush_interval=0.01)
+        backend.send({'test': 1})
+        backend.flush()
+
+        self.assertEqual(self.sent_batches(backend), [[{'test': 1}]])
+
+    def test_full_queue(self):
+        sending = threading.Event()
+        release = threading.Event()
+
+        def send_batch(batch):
+            sending.set()
+            release.wait()
+
+        backend = self.create_backend(max_batch_size=1, flush_interval=0, max_queue_size=1, block_timeout=0.01)
+        backend.backend.send_batch.side_effect = send_batch
+        backend.send({'test': 1})
+        sending.wait()
+        backend.send({'test': 2})
+        # The queue is full, so this event is dropped.
+        backend.send({'test': 3})
+        release.set()
+        backend.flush()
+
+        self.assertEqual(self.sent_batches(backend), [[{'test': 1}], [{'test': 2}]])
+
+    def test_backend_error(self):
+        backend = self.create_backend(max_batch_size=1)
+        backend.backend.send_batch.side_effect = [Exception, None]
+        backend.send({'test': 1})
+        backend.send({'test': 2})
+        backend.flush()
+
+        self.assertEqual(self.sent_batches(backend), [[{'test': 1}], [{'test': 2}]])
+
+    def test_send_after_close(self):
+        backend = self.create_backend()
+        backend.close()
+        backend.send({'test': 1})
+
+        backend.backend.send.assert_called_once_with({'test': 1})
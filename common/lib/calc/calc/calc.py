@@ -1,12 +1,15 @@
 """
 Parser and evaluator for FormulaResponse and NumericalResponse
 
-Uses pyparsing to parse. Main function as of now is evaluator().
+Uses pyparsing to parse. Main function as of now is evaluator(). To evaluate
+an expression many times (e.g. for many random samples of its variables), use
+compile_expression(), which parses each expression only once.
 """
 
+from collections import OrderedDict
 import math
 import operator
-import numbers
+import threading
 import numpy
 import scipy.constants
 import functions
@@ -73,6 +76,10 @@ SUFFIXES = {
 }
 
 
+# Maximum number of parsed expressions kept by compile_expression.
+COMPILED_EXPRESSION_CACHE_SIZE = 1024
+
+
 class UndefinedVariable(Exception):
     """
     Indicate when a student inputs a variable which was not expected.
@@ -121,8 +128,8 @@ def eval_atom(parse_result):
 
     In the case of parenthesis, ignore them.
     """
-    # Find first number in the list
-    result = next(k for k in parse_result if isinstance(k, numbers.Number))
+    # Find first number (or array of numbers) in the list
+    result = next(k for k in parse_result if not isinstance(k, basestring))
     return result
 
 
@@ -136,7 +143,7 @@ def eval_power(parse_result):
     # `reduce` will go from left to right; reverse the list.
     parse_result = reversed(
         [k for k in parse_result
-         if isinstance(k, numbers.Number)]  # Ignore the '^' marks.
+         if not isinstance(k, basestring)]  # Ignore the '^' marks.
     )
     # Having reversed it, raise `b` to the power of `a`.
     power = reduce(lambda a, b: b ** a, parse_result)
@@ -155,10 +162,16 @@ def eval_parallel(parse_result):
     """
     if len(parse_result) == 1:
         return parse_result[0]
-    if 0 in parse_result:
+    inputs = [e for e in parse_result if not isinstance(e, basestring)]
+    if any(isinstance(e, numpy.ndarray) for e in inputs):
+        # Vectorized evaluation: NaN wherever an input is zero.
+        with numpy.errstate(divide='ignore', invalid='ignore'):
+            result = 1. / sum(1. / e for e in inputs)
+        has_zero = reduce(numpy.logical_or, (numpy.equal(e, 0) for e in inputs))
+        return numpy.where(has_zero, float('nan'), result)
+    if 0 in inputs:
         return float('nan')
-    reciprocals = [1. / e for e in parse_result
-                   if isinstance(e, numbers.Number)]
+    reciprocals = [1. / e for e in inputs]
     return 1. / sum(reciprocals)
 
 
@@ -173,10 +186,8 @@ def eval_sum(parse_result):
     total = 0.0
     current_op = operator.add
     for token in parse_result:
-        if token == '+':
-            current_op = operator.add
-        elif token == '-':
-            current_op = operator.sub
+        if isinstance(token, basestring):
+            current_op = operator.sub if token == '-' else operator.add
         else:
             total = current_op(total, token)
     return total
@@ -191,10 +202,8 @@ def eval_product(parse_result):
     prod = 1.0
     current_op = operator.mul
     for token in parse_result:
-        if token == '*':
-            current_op = operator.mul
-        elif token == '/':
-            current_op = operator.truediv
+        if isinstance(token, basestring):
+            current_op = operator.truediv if token == '/' else operator.mul
         else:
             prod = current_op(prod, token)
     return prod
@@ -224,38 +233,149 @@ def evaluator(variables, functions, math_expr, case_sensitive=False):
      python numbers.
     -Unary functions are passed as a dictionary from string to function.
     """
-    # No need to go further.
-    if math_expr.strip() == "":
-        return float('nan')
+    return compile_expression(math_expr, case_sensitive).evaluate(variables, functions)
 
-    # Parse the tree.
-    math_interpreter = ParseAugmenter(math_expr, case_sensitive)
-    math_interpreter.parse_algebra()
 
-    # Get our variables together.
-    all_variables, all_functions = add_defaults(variables, functions, case_sensitive)
+class CompiledExpression(object):
+    """
+    A parsed math expression, which can be evaluated many times.
 
-    # ...and check them
-    math_interpreter.check_variables(all_variables, all_functions)
+    Use `compile_expression` rather than creating these directly, so that
+    parsed expressions are reused.
+    """
+    def __init__(self, math_expr, case_sensitive=False):
+        """
+        Parse the given math expression.
 
-    # Create a recursion to evaluate the tree.
-    if case_sensitive:
-        casify = lambda x: x
-    else:
-        casify = lambda x: x.lower()  # Lowercase for case insens.
-
-    evaluate_actions = {
-        'number': eval_number,
-        'variable': lambda x: all_variables[casify(x[0])],
-        'function': lambda x: all_functions[casify(x[0])](x[1]),
-        'atom': eval_atom,
-        'power': eval_power,
-        'parallel': eval_parallel,
-        'product': eval_product,
-        'sum': eval_sum
-    }
-
-    return math_interpreter.reduce_tree(evaluate_actions)
+        Raise a `pyparsing.ParseException` if it cannot be parsed.
+        """
+        self.math_expr = math_expr
+        self.case_sensitive = case_sensitive
+
+        if math_expr.strip() == "":
+            # There is nothing to parse; evaluating gives NaN.
+            self.math_interpreter = None
+        else:
+            self.math_interpreter = ParseAugmenter(math_expr, case_sensitive)
+            self.math_interpreter.parse_algebra()
+
+    def evaluate(self, variables, functions):
+        """
+        Evaluate the expression with the given variables and functions.
+
+        Take the same arguments as `evaluator`.
+        """
+        # No need to go further.
+        if self.math_interpreter is None:
+            return float('nan')
+        return self._reduce(variables, functions)
+
+    def evaluate_many(self, variables_list, functions):
+        """
+        Evaluate the expression for each of the given dictionaries of
+        variables; return the list of results.
+
+        All the dictionaries are evaluated in a single pass, with NumPy arrays
+        as the values of the variables. If that fails, or gives any results
+        that are not finite (where evaluating one dictionary at a time might
+        raise an error instead, e.g. on division by zero), each dictionary is
+        evaluated separately.
+        """
+        variables_list = list(variables_list)
+        if self.math_interpreter is None:
+            return [float('nan')] * len(variables_list)
+
+        if len(variables_list) > 1:
+            try:
+                results = self._evaluate_vectorized(variables_list, functions)
+            except Exception:  # pylint: disable=broad-except
+                results = None
+            if results is not None:
+                return results
+
+        return [self._reduce(variables, functions) for variables in variables_list]
+
+    def _evaluate_vectorized(self, variables_list, functions):
+        """
+        Evaluate the expression for all the given dictionaries of variables
+        at once.
+
+        Return None if the dictionaries do not all define the same variables,
+        or if the results are not a finite number for each of them.
+        """
+        names = set(variables_list[0])
+        if any(set(variables) != names for variables in variables_list):
+            return None
+        columns = {
+            name: numpy.array([variables[name] for variables in variables_list])
+            for name in names
+        }
+
+        with numpy.errstate(all='ignore'):
+            results = numpy.asarray(self._reduce(columns, functions))
+        if results.ndim == 0:
+            # The expression does not depend on the variables.
+            results = numpy.array([results[()]] * len(variables_list))
+        if results.shape != (len(variables_list),) or not numpy.all(numpy.isfinite(results)):
+            return None
+        return results.tolist()
+
+    def _reduce(self, variables, functions):
+        """
+        Check the variables and functions used, and evaluate the parse tree.
+        """
+        math_interpreter = self.math_interpreter
+
+        # Get our variables together.
+        all_variables, all_functions = add_defaults(variables, functions, self.case_sensitive)
+
+        # ...and check them
+        math_interpreter.check_variables(all_variables, all_functions)
+
+        # Create a recursion to evaluate the tree.
+        if self.case_sensitive:
+            casify = lambda x: x
+        else:
+            casify = lambda x: x.lower()  # Lowercase for case insens.
+
+        evaluate_actions = {
+            'number': eval_number,
+            'variable': lambda x: all_variables[casify(x[0])],
+            'function': lambda x: all_functions[casify(x[0])](x[1]),
+            'atom': eval_atom,
+            'power': eval_power,
+            'parallel': eval_parallel,
+            'product': eval_product,
+            'sum': eval_sum
+        }
+
+        return math_interpreter.reduce_tree(evaluate_actions)
+
+
+_compiled_expressions = OrderedDict()
+_compiled_expressions_lock = threading.Lock()
+
+
+def compile_expression(math_expr, case_sensitive=False):
+    """
+    Return a `CompiledExpression` for the given math expression.
+
+    The most recently used expressions are kept (see
+    COMPILED_EXPRESSION_CACHE_SIZE), so that each one is only parsed once.
+    """
+    key = (math_expr, case_sensitive)
+    with _compiled_expressions_lock:
+        compiled = _compiled_expressions.pop(key, None)
+        if compiled is not None:
+            _compiled_expressions[key] = compiled
+            return compiled
+
+    compiled = CompiledExpression(math_expr, case_sensitive)
+    with _compiled_expressions_lock:
+        _compiled_expressions[key] = compiled
+        while len(_compiled_expressions) > COMPILED_EXPRESSION_CACHE_SIZE:
+            _compiled_expressions.popitem(last=False)
+    return compiled
 
 
 class ParseAugmenter(object):
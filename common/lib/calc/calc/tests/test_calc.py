@@ -559,3 +559,72 @@ class EvaluatorTest(unittest.TestCase):
             calc.evaluator({'r1': 5}, {}, "r1+r2")
         with self.assertRaisesRegexp(calc.UndefinedVariable, 'r1 r3'):
             calc.evaluator(variables, {}, "r1*r3", case_sensitive=True)
+
+
+class CompiledExpressionTest(unittest.TestCase):
+    """
+    Run tests for calc.compile_expression and calc.CompiledExpression
+    """
+
+    def test_compiled_once(self):
+        """
+        Expressions are parsed once per expression and case sensitivity
+        """
+        compiled = calc.compile_expression('x^2 + 1')
+        self.assertIs(calc.compile_expression('x^2 + 1'), compiled)
+        self.assertIsNot(calc.compile_expression('x^2 + 1', case_sensitive=True), compiled)
+        self.assertEqual(compiled.evaluate({'x': 3.0}, {}), 10.0)
+
+    def test_cache_size(self):
+        """
+        Only the most recently used expressions are kept
+        """
+        compiled = calc.compile_expression('2*x')
+        for index in range(calc.COMPILED_EXPRESSION_CACHE_SIZE):
+            calc.compile_expression(str(index))
+        self.assertIsNot(calc.compile_expression('2*x'), compiled)
+
+    def test_parse_error(self):
+        """
+        Expressions that cannot be parsed raise each time
+        """
+        for _ in range(2):
+            with self.assertRaises(ParseException):
+                calc.compile_expression('5+')
+
+    def test_evaluate_many(self):
+        """
+        Evaluating many samples gives the same results as one at a time
+        """
+        samples = [{'x': x, 'y': y} for x, y in [(1.0, 2.0), (-3.5, 0.25), (10.0, 7.0)]]
+        for expression in [
+                'x^2 + y', '-x*y/2', 'sin(x) + sqrt(y)', 'x||y', '(x*x+y)^-1.5', 'x*i + y',
+                '3', '', 'fact(3)*x', 'e^x - 2.5k',
+        ]:
+            compiled = calc.compile_expression(expression)
+            expected = [calc.evaluator(sample, {}, expression) for sample in samples]
+            results = compiled.evaluate_many(samples, {})
+            self.assertEqual(len(results), len(samples))
+            for result, expected_result in zip(results, expected):
+                if numpy.isnan(expected_result):
+                    self.assertTrue(numpy.isnan(result))
+                else:
+                    self.assertAlmostEqual(result, expected_result)
+
+    def test_evaluate_many_not_finite(self):
+        """
+        Samples are evaluated one at a time if any result is not finite
+        """
+        samples = [{'x': 1.0}, {'x': 0.0}]
+        with self.assertRaises(ZeroDivisionError):
+            calc.compile_expression('1/x').evaluate_many(samples, {})
+        results = calc.compile_expression('x||1').evaluate_many(samples, {})
+        self.assertAlmostEqual(results[0], 0.5)
+        self.assertTrue(numpy.isnan(results[1]))
+
+    def test_evaluate_many_undefined_vars(self):
+        """
+        Undefined variables are reported as when evaluating one at a time
+        """
+        with self.assertRaisesRegexp(calc.UndefinedVariable, 'z'):
+            calc.compile_expression('x+z').evaluate_many([{'x': 1.0}, {'x': 2.0}], {})
@@ -3,7 +3,9 @@
 from codejail.safe_exec import safe_exec as codejail_safe_exec
 from codejail.safe_exec import not_safe_exec as codejail_not_safe_exec
 from codejail.safe_exec import json_safe, SafeExecException
+from codejail import jail_code
 from . import lazymod
+from .worker_pool import DEFAULT_MAX_EXECUTIONS, SandboxWorkerPool
 from dogapi import dog_stats_api
 
 import hashlib
@@ -46,6 +48,28 @@ for name, modname in ASSUMED_IMPORTS:
 
 LAZY_IMPORTS = "".join(LAZY_IMPORTS)
 
+# The pool of warm sandboxed workers running the code, if configured.
+_worker_pool = None
+
+
+def configure_worker_pool(size, max_executions=DEFAULT_MAX_EXECUTIONS):
+    """
+    Run sandboxed code in a pool of at most `size` warm workers, each
+    replaced after `max_executions` executions.  A `size` of 0 disables
+    the pool, so that each execution starts a new sandboxed process.
+
+    The workers import the modules in ASSUMED_IMPORTS once, when they start.
+
+    """
+    global _worker_pool  # pylint: disable=global-statement
+    if _worker_pool is not None:
+        _worker_pool.close()
+    _worker_pool = None
+    if size:
+        _worker_pool = SandboxWorkerPool(
+            size, max_executions, preload_modules=[modname for _, modname in ASSUMED_IMPORTS],
+        )
+
 
 def update_hash(hasher, obj):
     """
@@ -130,6 +154,8 @@ def safe_exec(
     # Decide which code executor to use.
     if unsafely:
         exec_fn = codejail_not_safe_exec
+    elif _worker_pool is not None and jail_code.is_configured("python"):
+        exec_fn = _worker_pool.safe_exec
     else:
         exec_fn = codejail_safe_exec
 
@@ -0,0 +1,257 @@
+"""
+The main loop of a warm sandboxed Python worker (see worker_pool.py).
+
+This module is not imported: worker_pool.py copies its source into the
+sandbox, where it is run with the sandboxed Python executable:
+
+    python jailed_worker.py <limits as JSON> <modules to import as JSON>
+
+The worker imports the given modules once, then reads executions from stdin,
+one JSON-encoded [nonce, code, globals] list per line.  Each execution runs in
+a new child process forked from the worker, with the given resource limits, in
+its own temporary directory, without any of the worker's files.  The worker
+writes one JSON-encoded reply per line to stdout, with the nonce of the
+execution: {"nonce": <nonce>, "globals": <resulting globals>} or
+{"nonce": <nonce>, "error": <error message>}.
+
+Everything an execution writes in the temporary directories is removed once
+it ends.  If that fails, or the execution doesn't end normally, the reply
+also has "recycle": true, and the worker exits.
+"""
+import ctypes
+import json
+import os
+import resource
+import select
+import signal
+import sys
+import tempfile
+import time
+import traceback
+
+
+# Directory in which a temporary directory is created for each execution.
+TMP_ROOT = os.path.abspath('tmp')
+
+# prctl option making the worker's /proc files inaccessible to its children.
+PR_SET_DUMPABLE = 4
+
+# Types of the globals that are sent back, as with codejail.
+OK_TYPES = (type(None), int, long, float, str, unicode, list, tuple, dict)
+BAD_KEYS = ("__builtins__",)
+
+
+class DevNull(object):
+    """
+    A file-like object that ignores everything written to it.
+    """
+    def write(self, *args, **kwargs):
+        pass
+
+
+def jsonable(value):
+    """
+    Returns whether the given value can be sent back as JSON.
+    """
+    if not isinstance(value, OK_TYPES):
+        return False
+    try:
+        json.dumps(value)
+    except Exception:  # pylint: disable=broad-except
+        return False
+    return True
+
+
+def set_execution_limits(limits):
+    """
+    Limits the resources of the process running a single execution.
+    """
+    if limits.get('CPU'):
+        resource.setrlimit(resource.RLIMIT_CPU, (limits['CPU'], limits['CPU']))
+    if limits.get('VMEM'):
+        resource.setrlimit(resource.RLIMIT_AS, (limits['VMEM'], limits['VMEM']))
+    if limits.get('FSIZE'):
+        resource.setrlimit(resource.RLIMIT_FSIZE, (limits['FSIZE'], limits['FSIZE']))
+    # No subprocesses.
+    resource.setrlimit(resource.RLIMIT_NPROC, (0, 0))
+
+
+def close_inherited_fds(keep_fd):
+    """
+    Closes all the file descriptors inherited from the worker, other than
+    the standard ones and keep_fd, so that the executed code can't write to
+    the worker's replies.
+    """
+    try:
+        fds = [int(fd) for fd in os.listdir('/proc/self/fd')]
+    except OSError:
+        fds = range(resource.getrlimit(resource.RLIMIT_NOFILE)[0])
+    for fd in fds:
+        if fd > 2 and fd != keep_fd:
+            try:
+                os.close(fd)
+            except OSError:
+                pass
+
+
+def make_undumpable():
+    """
+    Prevents the children of the worker, which run as the same user, from
+    reopening its files through /proc or tracing it.
+    """
+    try:
+        ctypes.CDLL(None).prctl(PR_SET_DUMPABLE, 0, 0, 0, 0)
+    except Exception:  # pylint: disable=broad-except
+        pass
+
+
+def run_execution(code, g_dict, limits, workdir, reply_fd):
+    """
+    Runs a single execution in the current (child) process, writes the reply
+    to reply_fd and exits.
+    """
+    status = 1
+    try:
+        try:
+            # Keep the executed code away from the worker's protocol.
+            devnull = os.open(os.devnull, os.O_RDWR)
+            os.dup2(devnull, 0)
+            os.dup2(devnull, 1)
+            os.dup2(devnull, 2)
+            close_inherited_fds(reply_fd)
+            sys.stdout = DevNull()
+
+            os.chdir(workdir)
+            os.environ['TMPDIR'] = tempfile.tempdir = workdir
+            set_execution_limits(limits)
+
+            exec code in g_dict
+            reply = {'globals': {k: v for k, v in g_dict.iteritems() if jsonable(v) and k not in BAD_KEYS}}
+            status = 0
+        except BaseException:  # pylint: disable=broad-except
+            reply = {'error': traceback.format_exc()}
+
+        data = json.dumps(reply)
+        while data:
+            data = data[os.write(reply_fd, data):]
+    finally:
+        os._exit(status)  # pylint: disable=protected-access
+
+
+def read_reply(reply_fd, timeout):
+    """
+    Reads everything from reply_fd until it is closed, for at most timeout
+    seconds (if not None).  Returns the data read, or None on timeout.
+    """
+    chunks = []
+    remaining = timeout
+    while True:
+        start = time.time()
+        ready, __, __ = select.select([reply_fd], [], [], remaining)
+        if not ready:
+            return None
+        data = os.read(reply_fd, 65536)
+        if not data:
+            return ''.join(chunks)
+        chunks.append(data)
+        if remaining is not None:
+            remaining = max(remaining - (time.time() - start), 0)
+
+
+def remove_path(path):
+    """
+    Removes the file or directory tree at `path`, whatever the permissions
+    the executed code gave it.
+    """
+    try:
+        if os.path.isdir(path) and not os.path.islink(path):
+            os.chmod(path, 0700)
+            for name in os.listdir(path):
+                remove_path(os.path.join(path, name))
+            os.rmdir(path)
+        else:
+            os.remove(path)
+    except OSError:
+        pass
+
+
+def wipe_tmp_root():
+    """
+    Removes everything in TMP_ROOT, where the executed code may have written
+    outside of its own temporary directory.  Returns whether TMP_ROOT is left
+    empty.
+    """
+    try:
+        for name in os.listdir(TMP_ROOT):
+            remove_path(os.path.join(TMP_ROOT, name))
+        return not os.listdir(TMP_ROOT)
+    except Exception:  # pylint: disable=broad-except
+        return False
+
+
+def execute(code, g_dict, limits):
+    """
+    Runs a single execution in a forked child process.  Returns the reply,
+    and whether the worker has to be recycled.
+    """
+    workdir = tempfile.mkdtemp(dir=TMP_ROOT)
+    read_fd, write_fd = os.pipe()
+    pid = os.fork()
+    if pid == 0:
+        os.close(read_fd)
+        run_execution(code, g_dict, limits, workdir, write_fd)
+
+    os.close(write_fd)
+    try:
+        data = read_reply(read_fd, limits.get('REALTIME') or None)
+        if data is None:
+            os.kill(pid, signal.SIGKILL)
+        __, status = os.waitpid(pid, 0)
+    finally:
+        os.close(read_fd)
+        # Nothing the execution wrote is left for the next ones to read.
+        wiped = wipe_tmp_root()
+
+    if data is None:
+        return {'error': 'Execution timed out.'}, True
+    try:
+        reply = json.loads(data)
+        # Only the expected fields of the reply sent by the executed code are
+        # passed on.
+        if 'globals' in reply:
+            reply = {'globals': dict(reply['globals'])}
+        else:
+            reply = {'error': unicode(reply['error'])}
+    except (ValueError, TypeError, KeyError):
+        return {'error': 'Execution ended with status {}.'.format(status)}, True
+    return reply, not wiped or os.WIFSIGNALED(status)
+
+
+def main():
+    """
+    Imports the requested modules and runs executions until stdin is closed.
+    """
+    limits = json.loads(sys.argv[1])
+    for module_name in json.loads(sys.argv[2]):
+        try:
+            __import__(module_name)
+        except Exception:  # pylint: disable=broad-except
+            pass
+
+    make_undumpable()
+    replies = os.fdopen(os.dup(1), 'w')
+    sys.stdout = DevNull()
+    for line in iter(sys.stdin.readline, ''):
+        nonce, code, g_dict = json.loads(line)
+        reply, recycle = execute(code, g_dict, limits)
+        reply['nonce'] = nonce
+        if recycle:
+            reply['recycle'] = True
+        replies.write(json.dumps(reply) + '\n')
+        replies.flush()
+        if recycle:
+            break
+
+
+if __name__ == '__main__':
+    main()
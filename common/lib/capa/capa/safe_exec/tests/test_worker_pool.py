@@ -0,0 +1,136 @@
+"""Test worker_pool.py"""
+
+import sys
+import unittest
+
+from codejail import jail_code
+from codejail.safe_exec import SafeExecException
+from mock import patch
+
+from capa.safe_exec import worker_pool
+from capa.safe_exec.worker_pool import SandboxWorker, SandboxWorkerPool
+
+
+class TestSandboxWorkerPool(unittest.TestCase):
+    """
+    The workers run the Python running the tests, without a sandbox.
+    """
+    def setUp(self):
+        super(TestSandboxWorkerPool, self).setUp()
+        self.pool = self.create_pool()
+        self.addCleanup(self.pool.close)
+
+    def create_pool(self, size=1, max_executions=3):
+        """
+        Returns a pool of workers running this Python.
+        """
+        return SandboxWorkerPool(
+            size, max_executions, preload_modules=['math', 'no_such_module'], cmdline_start=[sys.executable],
+        )
+
+    def test_set_values(self):
+        g = {'b': 2}
+        self.pool.safe_exec("import math\na = b * int(math.pi)", g)
+        self.assertEqual(g['a'], 6)
+        self.assertNotIn('math', g)
+
+    def test_raising_exceptions(self):
+        g = {}
+        with self.assertRaises(SafeExecException) as cm:
+            self.pool.safe_exec("1/0", g)
+        self.assertIn("ZeroDivisionError", cm.exception.message)
+        # The worker survives failing code.
+        self.pool.safe_exec("a = 1", g)
+        self.assertEqual(g['a'], 1)
+
+    def test_executions_are_isolated(self):
+        g = {}
+        self.pool.safe_exec("import math\nmath.leaked = True", g)
+        self.pool.safe_exec("import math\nleaked = hasattr(math, 'leaked')", g)
+        self.assertFalse(g['leaked'])
+
+    def test_written_files_are_removed(self):
+        g = {}
+        self.pool.safe_exec("open('../leaked', 'w').write('secret')", g)
+        self.pool.safe_exec("import os\nleaked = os.path.exists('../leaked')", g)
+        self.assertFalse(g['leaked'])
+
+    def test_worker_files_are_closed(self):
+        g = {}
+        code = (
+            "import os\n"
+            "open_fds = []\n"
+            "for fd in range(3, 1024):\n"
+            "    try:\n"
+            "        os.fstat(fd)\n"
+            "        open_fds.append(fd)\n"
+            "    except OSError:\n"
+            "        pass\n"
+        )
+        self.pool.safe_exec(code, g)
+        # Only the pipe of the execution's own reply is left open.
+        self.assertEqual(len(g['open_fds']), 1)
+
+    @patch.object(worker_pool, 'codejail_safe_exec')
+    def test_reply_with_wrong_nonce_is_rejected(self, mock_safe_exec):
+        g = {}
+        with patch.object(SandboxWorker, '_read_line', return_value='{"nonce": "forged", "globals": {"a": 1}}\n'):
+            self.pool.safe_exec("a = 2", g)
+        self.assertNotIn('a', g)
+        self.assertEqual(mock_safe_exec.call_count, 1)
+
+    def test_worker_is_recycled_after_abnormal_exit(self):
+        g = {}
+        self.pool.safe_exec("import os\npid = os.getppid()", g)
+        with self.assertRaises(SafeExecException) as cm:
+            self.pool.safe_exec("import os, signal\nos.kill(os.getpid(), signal.SIGKILL)", {})
+        self.assertIn("Execution ended with status", cm.exception.message)
+
+        pid = g['pid']
+        self.pool.safe_exec("import os\npid = os.getppid()", g)
+        self.assertNotEqual(g['pid'], pid)
+
+    def test_workers_are_reused_and_recycled(self):
+        pids = []
+        for __ in xrange(4):
+            g = {}
+            self.pool.safe_exec("import os\npid = os.getppid()", g)
+            pids.append(g['pid'])
+        # The same worker runs max_executions executions, then is replaced.
+        self.assertEqual(len(set(pids[:3])), 1)
+        self.assertNotEqual(pids[3], pids[0])
+
+    @patch.dict(jail_code.LIMITS, {'REALTIME': 1})
+    def test_timeout(self):
+        pool = self.create_pool()
+        self.addCleanup(pool.close)
+        with self.assertRaises(SafeExecException) as cm:
+            pool.safe_exec("import time\ntime.sleep(10)", {})
+        self.assertIn("timed out", cm.exception.message)
+
+    @patch.object(worker_pool, 'codejail_safe_exec')
+    def test_files_fall_back(self, mock_safe_exec):
+        g = {}
+        self.pool.safe_exec("a = 1", g, python_path=['pylib'], slug='slug')
+        mock_safe_exec.assert_called_once_with("a = 1", g, python_path=['pylib'], extra_files=None, slug='slug')
+        self.assertNotIn('a', g)
+
+    @patch.object(worker_pool, 'codejail_safe_exec')
+    def test_busy_falls_back(self, mock_safe_exec):
+        pool = self.create_pool(size=0)
+        pool.safe_exec("a = 1", {})
+        self.assertEqual(mock_safe_exec.call_count, 1)
+
+    @patch.object(worker_pool, 'codejail_safe_exec')
+    def test_failed_worker_is_replaced(self, mock_safe_exec):
+        g = {}
+        self.pool.safe_exec("import os\npid = os.getppid()", g)
+        worker = self.pool._idle_workers[0]  # pylint: disable=protected-access
+        worker.process.kill()
+        worker.process.wait()
+
+        self.pool.safe_exec("a = 1", g)
+        self.assertEqual(mock_safe_exec.call_count, 1)
+
+        self.pool.safe_exec("import os\npid = os.getppid()", g)
+        self.assertNotEqual(g['pid'], worker.process.pid)
@@ -0,0 +1,321 @@
+"""
+A pool of warm sandboxed Python workers.
+
+Starting a sandboxed Python process and importing numpy, scipy and the
+other modules assumed by capa takes much longer than running most problem
+code.  Each worker is a sandboxed Python process, started like the ones
+codejail runs, that imports those modules once and then forks a child for
+every execution.  Each child runs a single execution with codejail's
+resource limits, so executions never share state, while only paying for
+a fork.
+
+Workers are replaced after a number of executions, and whenever they fail.
+Anything an execution writes in the temporary directory of its worker is
+removed once it ends, and workers are also replaced after any execution that
+doesn't end normally.
+Code needing extra files or Python path entries, or arriving while all
+workers are busy, is run by codejail as usual.
+"""
+import json
+import logging
+import os
+import select
+import shutil
+import subprocess
+import tempfile
+import threading
+import time
+import uuid
+
+from codejail import jail_code
+from codejail.safe_exec import safe_exec as codejail_safe_exec
+from codejail.safe_exec import json_safe, SafeExecException
+from dogapi import dog_stats_api
+
+from . import sandbox_worker
+
+
+log = logging.getLogger(__name__)
+
+# Number of executions after which a worker is replaced by default.
+DEFAULT_MAX_EXECUTIONS = 100
+
+# Seconds a worker is given to reply on top of the real time limit of an
+# execution, to account for its start up.
+REPLY_GRACE_PERIOD = 30
+
+# We'll need the code from sandbox_worker.py for use in the sandbox, so read it now.
+sandbox_worker_py_file = sandbox_worker.__file__
+if sandbox_worker_py_file.endswith("c"):
+    sandbox_worker_py_file = sandbox_worker_py_file[:-1]
+
+sandbox_worker_py = open(sandbox_worker_py_file).read()
+
+
+class SandboxWorkerError(Exception):
+    """
+    Raised when a worker fails, as opposed to the code it executes.
+    """
+    pass
+
+
+class SandboxWorker(object):
+    """
+    A sandboxed Python process that runs executions in forked children.
+    """
+    def __init__(self, cmdline_start, user, limits, preload_modules):
+        """
+        Starts the worker.
+
+        `cmdline_start` is the command line starting the sandboxed Python
+        executable, run as `user` if not None.  `limits` are the codejail
+        resource limits of each execution.  The modules named in
+        `preload_modules` are imported when the worker starts.
+        """
+        self.executions = 0
+        self.recycle = False
+        self.realtime_limit = limits.get('REALTIME')
+        self.tmpdir = tempfile.mkdtemp(prefix='codejail-worker-')
+        try:
+            # Make the directories readable, and the tmp directory writable,
+            # by the sandbox user.  The worker empties the tmp directory after
+            # each execution.
+            os.chmod(self.tmpdir, 0775)
+            tmptmp = os.path.join(self.tmpdir, "tmp")
+            os.mkdir(tmptmp)
+            os.chmod(tmptmp, 0777)
+            with open(os.path.join(self.tmpdir, "jailed_worker.py"), "w") as worker_file:
+                worker_file.write(sandbox_worker_py)
+
+            cmd = []
+            if user:
+                cmd.extend(['sudo', '-u', user])
+            cmd.extend(cmdline_start)
+            cmd.extend(['jailed_worker.py', json.dumps(limits), json.dumps(list(preload_modules))])
+
+            with open(os.devnull, 'w') as devnull:
+                self.process = subprocess.Popen(
+                    cmd,
+                    cwd=self.tmpdir,
+                    env={},
+                    stdin=subprocess.PIPE,
+                    stdout=subprocess.PIPE,
+                    stderr=devnull,
+                    preexec_fn=os.setsid,
+                )
+        except Exception:
+            shutil.rmtree(self.tmpdir, ignore_errors=True)
+            raise
+
+    def execute(self, code, globals_dict):
+        """
+        Executes `code` with the globals in `globals_dict`, which is updated
+        with the resulting globals.
+
+        Raises SafeExecException if the code fails, and SandboxWorkerError
+        if the worker does.
+        """
+        # The reply has to carry the nonce of the request, so that a reply
+        # forged by the executed code can't pass for the reply to another one.
+        nonce = uuid.uuid4().hex
+        request = json.dumps([nonce, code, json_safe(globals_dict)]) + "\n"
+        timeout = self.realtime_limit + REPLY_GRACE_PERIOD if self.realtime_limit else None
+        try:
+            self.process.stdin.write(request)
+            self.process.stdin.flush()
+            reply = json.loads(self._read_line(timeout))
+        except (IOError, OSError, ValueError) as error:
+            raise SandboxWorkerError(error)
+        if not isinstance(reply, dict) or reply.get('nonce') != nonce:
+            raise SandboxWorkerError("The worker replied with the wrong nonce.")
+        self.executions += 1
+        # The worker exits after an execution which didn't end normally.
+        self.recycle = reply.get('recycle', False)
+
+        if 'error' in reply:
+            raise SafeExecException("Couldn't execute jailed code: %s" % reply['error'])
+        globals_dict.update(reply['globals'])
+
+    def _read_line(self, timeout):
+        """
+        Reads a line from the worker, waiting for at most `timeout` seconds
+        (if not None).
+        """
+        reply_fd = self.process.stdout.fileno()
+        deadline = time.time() + timeout if timeout is not None else None
+        chunks = []
+        while True:
+            remaining = max(deadline - time.time(), 0) if deadline is not None else None
+            ready, __, __ = select.select([reply_fd], [], [], remaining)
+            if not ready:
+                raise SandboxWorkerError("Timed out waiting for the worker.")
+            data = os.read(reply_fd, 65536)
+            if not data:
+                raise SandboxWorkerError("The worker exited.")
+            chunks.append(data)
+            # Only one execution is running at a time, so its reply ends the data.
+            if data.endswith("\n"):
+                return "".join(chunks)
+
+    def close(self):
+        """
+        Stops the worker and removes its files.
+        """
+        try:
+            self.process.stdin.close()
+        except IOError:
+            pass
+        if self.process.poll() is None:
+            try:
+                self.process.kill()
+            except OSError:
+                pass
+            self.process.wait()
+        shutil.rmtree(self.tmpdir, ignore_errors=True)
+
+
+class SandboxWorkerPool(object):
+    """
+    A pool of warm sandboxed workers with the same interface as codejail's
+    safe_exec.
+    """
+    def __init__(self, size, max_executions=DEFAULT_MAX_EXECUTIONS, preload_modules=(), cmdline_start=None, user=None):
+        """
+        `size` is the maximum number of workers, and `max_executions` the
+        number of executions after which a worker is replaced.  Workers
+        import the modules named in `preload_modules` when they start.
+
+        Workers run the sandboxed Python command configured in codejail,
+        unless `cmdline_start` (and `user`) are given.
+        """
+        self.size = size
+        self.max_executions = max_executions
+        self.preload_modules = list(preload_modules)
+        self.cmdline_start = cmdline_start
+        self.user = user
+        self._lock = threading.Lock()
+        self._idle_workers = []
+        self._num_workers = 0
+        self._pid = os.getpid()
+
+    def safe_exec(self, code, globals_dict, python_path=None, extra_files=None, slug=None):
+        """
+        Executes `code` in a worker, as codejail's safe_exec would in a new
+        sandbox.
+        """
+        if python_path or extra_files:
+            # Workers can't be given files.
+            return self._fallback('files', code, globals_dict, python_path, extra_files, slug)
+
+        worker = self._acquire()
+        if worker is None:
+            return self._fallback('busy', code, globals_dict, python_path, extra_files, slug)
+
+        try:
+            worker.execute(code, globals_dict)
+        except SandboxWorkerError:
+            log.exception("Sandbox worker failed while executing %s", slug)
+            self._discard(worker)
+            self._replace()
+            return self._fallback('failure', code, globals_dict, python_path, extra_files, slug)
+        except SafeExecException:
+            self._release(worker)
+            raise
+        self._release(worker)
+
+    def close(self):
+        """
+        Stops all idle workers.  Busy workers are stopped when released.
+        """
+        with self._lock:
+            workers, self._idle_workers = self._idle_workers, []
+            self._num_workers -= len(workers)
+            self.size = 0
+        for worker in workers:
+            worker.close()
+
+    def _fallback(self, reason, code, globals_dict, python_path, extra_files, slug):
+        """
+        Executes `code` in a new sandbox, rather than in a worker.
+        """
+        dog_stats_api.increment('capa.safe_exec.worker_pool.fallback', tags=[u'reason:{}'.format(reason)])
+        codejail_safe_exec(code, globals_dict, python_path=python_path, extra_files=extra_files, slug=slug)
+
+    def _acquire(self):
+        """
+        Returns an idle worker, starting one if the pool isn't full, or None
+        if all workers are busy.
+        """
+        with self._lock:
+            if self._pid != os.getpid():
+                # The pool was inherited from a parent process, whose workers
+                # can't be shared.
+                self._idle_workers = []
+                self._num_workers = 0
+                self._pid = os.getpid()
+            if self._idle_workers:
+                return self._idle_workers.pop()
+            if self._num_workers >= self.size:
+                return None
+            self._num_workers += 1
+
+        try:
+            return self._start_worker()
+        except Exception:  # pylint: disable=broad-except
+            log.exception("Couldn't start a sandbox worker")
+            with self._lock:
+                self._num_workers -= 1
+            return None
+
+    def _release(self, worker):
+        """
+        Returns a worker to the pool, replacing it by a warm one if it has
+        run its maximum number of executions, or has to be recycled.
+        """
+        if worker.executions < self.max_executions and not worker.recycle:
+            with self._lock:
+                if self._pid == os.getpid() and self._num_workers <= self.size:
+                    self._idle_workers.append(worker)
+                    return
+        self._discard(worker)
+        if self._pid == os.getpid():
+            self._replace()
+
+    def _discard(self, worker):
+        """
+        Stops a worker, and removes it from the pool.
+        """
+        worker.close()
+        with self._lock:
+            if self._pid == os.getpid():
+                self._num_workers -= 1
+
+    def _replace(self):
+        """
+        Starts a worker in place of a discarded one, so that it is warm
+        when it is next needed.
+        """
+        with self._lock:
+            if self._num_workers >= self.size:
+                return
+            self._num_workers += 1
+        try:
+            worker = self._start_worker()
+        except Exception:  # pylint: disable=broad-except
+            log.exception("Couldn't start a sandbox worker")
+            with self._lock:
+                self._num_workers -= 1
+            return
+        with self._lock:
+            self._idle_workers.append(worker)
+
+    def _start_worker(self):
+        """
+        Starts a new worker.
+        """
+        cmdline_start, user = self.cmdline_start, self.user
+        if cmdline_start is None:
+            command = jail_code.COMMANDS['python']
+            cmdline_start, user = command['cmdline_start'], command['user']
+        dog_stats_api.increment('capa.safe_exec.worker_pool.start')
+        return SandboxWorker(cmdline_start, user, dict(jail_code.LIMITS), self.preload_modules)
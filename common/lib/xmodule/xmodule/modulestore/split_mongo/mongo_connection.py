@@ -4,10 +4,12 @@ Segregation of pymongo functions from the data modeling mechanisms for split mod
 import datetime
 import cPickle as pickle
 import math
+import threading
 import zlib
 import pymongo
 import pytz
 import re
+from collections import OrderedDict
 from contextlib import contextmanager
 from time import time
 
@@ -15,7 +17,9 @@ from time import time
 from pymongo.errors import DuplicateKeyError  # pylint: disable=unused-import
 
 try:
+    from django.conf import settings
     from django.core.cache import caches, InvalidCacheBackendError
+    from django.core.exceptions import ImproperlyConfigured
     DJANGO_AVAILABLE = True
 except ImportError:
     DJANGO_AVAILABLE = False
@@ -223,11 +227,99 @@ def structure_to_mongo(structure, course_context=None):
         return new_structure
 
 
+class StructureLRUCache(object):
+    """
+    A bounded, in-process, least-recently-used cache of deserialized course
+    structures, keyed by structure id.
+
+    Structures are immutable once saved, so entries never need to be
+    invalidated; they are only evicted to keep the estimated total size of
+    the cached structures (the size of their pickled representation) under
+    max_size bytes. Callers must not modify the structures they get.
+    """
+    def __init__(self, max_size):
+        self.max_size = max_size
+        self.size = 0
+        self._entries = OrderedDict()
+        self._lock = threading.Lock()
+
+    def __len__(self):
+        return len(self._entries)
+
+    def get(self, key):
+        """
+        Return the structure cached for key, or None.
+        """
+        with self._lock:
+            entry = self._entries.pop(key, None)
+            if entry is None:
+                return None
+            # Re-insert the entry to mark it as the most recently used.
+            self._entries[key] = entry
+            return entry[0]
+
+    def set(self, key, structure, size):
+        """
+        Cache structure under key, with an estimated size of size bytes.
+        Structures larger than the whole cache are not cached.
+
+        Returns the number of entries that were evicted to make room.
+        """
+        if size > self.max_size:
+            return 0
+
+        evicted = 0
+        with self._lock:
+            previous = self._entries.pop(key, None)
+            if previous is not None:
+                self.size -= previous[1]
+            self._entries[key] = (structure, size)
+            self.size += size
+            while self.size > self.max_size:
+                __, (__, evicted_size) = self._entries.popitem(last=False)
+                self.size -= evicted_size
+                evicted += 1
+        return evicted
+
+    def clear(self):
+        """
+        Remove all cached structures.
+        """
+        with self._lock:
+            self._entries.clear()
+            self.size = 0
+
+
+_LOCAL_STRUCTURE_CACHE = {}
+
+
+def get_local_structure_cache():
+    """
+    Return the process-wide StructureLRUCache, or None if it is disabled.
+
+    The size of the cache, in bytes, is configured by the
+    COURSE_STRUCTURE_LOCAL_CACHE_SIZE Django setting; the cache is disabled
+    if the setting is 0 or missing.
+    """
+    if 'cache' not in _LOCAL_STRUCTURE_CACHE:
+        max_size = 0
+        if DJANGO_AVAILABLE:
+            try:
+                max_size = getattr(settings, 'COURSE_STRUCTURE_LOCAL_CACHE_SIZE', 0)
+            except ImproperlyConfigured:
+                pass
+        _LOCAL_STRUCTURE_CACHE['cache'] = StructureLRUCache(max_size) if max_size else None
+    return _LOCAL_STRUCTURE_CACHE['cache']
+
+
 class CourseStructureCache(object):
     """
     Wrapper around django cache object to cache course structure objects.
     The course structures are pickled and compressed when cached.
 
+    Deserialized structures are additionally kept in the process-wide
+    StructureLRUCache, if it is enabled.
+
     If the 'course_structure_cache' doesn't exist, then don't do anything for
     for set and get.
     """
@@ -238,13 +330,24 @@ class CourseStructureCache(object):
                 self.cache = get_cache('course_structure_cache')
             except InvalidCacheBackendError:
                 pass
+        self.local_cache = get_local_structure_cache()
 
     def get(self, key, course_context=None):
         """Pull the compressed, pickled struct data from cache and deserialize."""
-        if self.cache is None:
+        if self.cache is None and self.local_cache is None:
             return None
 
         with TIMER.timer("CourseStructureCache.get", course_context) as tagger:
+            if self.local_cache is not None:
+                structure = self.local_cache.get(key)
+                tagger.tag(from_local_cache=str(structure is not None).lower())
+                if structure is not None:
+                    tagger.tag(from_cache='true')
+                    return structure
+
+            if self.cache is None:
+                return None
+
             compressed_pickled_data = self.cache.get(key)
             tagger.tag(from_cache=str(compressed_pickled_data is not None).lower())
 
@@ -258,16 +361,22 @@ class CourseStructureCache(object):
             pickled_data = zlib.decompress(compressed_pickled_data)
             tagger.measure('uncompressed_size', len(pickled_data))
 
-            return pickle.loads(pickled_data)
+            structure = pickle.loads(pickled_data)
+            self._set_local(key, structure, len(pickled_data), tagger)
+            return structure
 
     def set(self, key, structure, course_context=None):
         """Given a structure, will pickle, compress, and write to cache."""
-        if self.cache is None:
+        if self.cache is None and self.local_cache is None:
             return None
 
         with TIMER.timer("CourseStructureCache.set", course_context) as tagger:
             pickled_data = pickle.dumps(structure, pickle.HIGHEST_PROTOCOL)
             tagger.measure('uncompressed_size', len(pickled_data))
+            self._set_local(key, structure, len(pickled_data), tagger)
+
+            if self.cache is None:
+                return None
 
             # 1 = Fastest (slightly larger results)
             compressed_pickled_data = zlib.compress(pickled_data, 1)
@@ -276,6 +385,17 @@ class CourseStructureCache(object):
             # Stuctures are immutable, so we set a timeout of "never"
             self.cache.set(key, compressed_pickled_data, None)
 
+    def _set_local(self, key, structure, size, tagger):
+        """
+        Add the structure to the local cache, if it is enabled, recording any
+        evictions with the tagger.
+        """
+        if self.local_cache is None:
+            return
+        evicted = self.local_cache.set(key, structure, size)
+        tagger.measure('local_cache_evictions', evicted)
+        tagger.measure('local_cache_size', self.local_cache.size)
+
 
 class MongoConnection(object):
     """
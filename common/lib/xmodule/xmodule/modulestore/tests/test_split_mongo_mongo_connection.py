@@ -1,7 +1,11 @@
 """ Test the behavior of split_mongo/MongoConnection """
 import unittest
 from mock import patch
-from xmodule.modulestore.split_mongo.mongo_connection import MongoConnection
+from xmodule.modulestore.split_mongo.mongo_connection import (
+    CourseStructureCache,
+    MongoConnection,
+    StructureLRUCache,
+)
 from xmodule.exceptions import HeartbeatFailure
 
 
@@ -17,3 +21,78 @@ class TestHeartbeatFailureException(unittest.TestCase):
 
             with self.assertRaises(HeartbeatFailure):
                 useless_conn.heartbeat()
+
+
+class TestStructureLRUCache(unittest.TestCase):
+    """ Test the in-process structure cache """
+    def setUp(self):
+        super(TestStructureLRUCache, self).setUp()
+        self.cache = StructureLRUCache(100)
+
+    def test_get_set(self):
+        self.assertIsNone(self.cache.get('a'))
+        structure = {'_id': 'a'}
+        self.assertEqual(self.cache.set('a', structure, 10), 0)
+        self.assertIs(self.cache.get('a'), structure)
+        self.assertEqual(self.cache.size, 10)
+
+    def test_replace(self):
+        self.cache.set('a', {'_id': 'a'}, 10)
+        self.cache.set('a', {'_id': 'a'}, 20)
+        self.assertEqual(len(self.cache), 1)
+        self.assertEqual(self.cache.size, 20)
+
+    def test_evicts_least_recently_used(self):
+        self.cache.set('a', {'_id': 'a'}, 40)
+        self.cache.set('b', {'_id': 'b'}, 40)
+        # Using 'a' makes 'b' the least recently used entry.
+        self.cache.get('a')
+        self.assertEqual(self.cache.set('c', {'_id': 'c'}, 40), 1)
+        self.assertIsNone(self.cache.get('b'))
+        self.assertIsNotNone(self.cache.get('a'))
+        self.assertIsNotNone(self.cache.get('c'))
+        self.assertEqual(self.cache.size, 80)
+
+    def test_too_large(self):
+        self.assertEqual(self.cache.set('a', {'_id': 'a'}, 101), 0)
+        self.assertIsNone(self.cache.get('a'))
+        self.assertEqual(self.cache.size, 0)
+
+    def test_clear(self):
+        self.cache.set('a', {'_id': 'a'}, 10)
+        self.cache.clear()
+        self.assertIsNone(self.cache.get('a'))
+        self.assertEqual(self.cache.size, 0)
+
+
+class TestCourseStructureCacheLocalLayer(unittest.TestCase):
+    """ Test that CourseStructureCache uses the in-process structure cache """
+    def setUp(self):
+        super(TestCourseStructureCacheLocalLayer, self).setUp()
+        self.local_cache = StructureLRUCache(1024 * 1024)
+        patcher = patch(
+            'xmodule.modulestore.split_mongo.mongo_connection.get_local_structure_cache',
+            return_value=self.local_cache,
+        )
+        patcher.start()
+        self.addCleanup(patcher.stop)
+
+    @patch('xmodule.modulestore.split_mongo.mongo_connection.get_cache')
+    def test_local_hit_skips_django_cache(self, mock_get_cache):
+        structure = {'_id': 'a', 'blocks': {}}
+        CourseStructureCache().set('a', structure)
+        self.assertTrue(mock_get_cache.return_value.set.called)
+
+        self.assertIs(CourseStructureCache().get('a'), structure)
+        self.assertFalse(mock_get_cache.return_value.get.called)
+
+    @patch('xmodule.modulestore.split_mongo.mongo_connection.get_cache')
+    def test_django_cache_hit_fills_local_cache(self, mock_get_cache):
+        structure = {'_id': 'a', 'blocks': {}}
+        CourseStructureCache().set('a', structure)
+        compressed_pickled_data = mock_get_cache.return_value.set.call_args[0][1]
+        self.local_cache.clear()
+
+        mock_get_cache.return_value.get.return_value = compressed_pickled_data
+        self.assertEqual(CourseStructureCache().get('a'), structure)
+        self.assertEqual(self.local_cache.get('a'), structure)
@@ -20,8 +20,10 @@ Modulestore virtual   |          XML physical (draft, published)
              (a, a)   |  (a, a) | (x, a) | (x, x) | (x, y) | (a, x)
              (a, b)   |  (a, b) | (x, b) | (x, x) | (x, y) | (a, x)
 """
+import hashlib
 import logging
 from abc import abstractmethod
+from multiprocessing.dummy import Pool as ThreadPool
 from opaque_keys.edx.locator import LibraryLocator
 import os
 import mimetypes
@@ -38,6 +40,7 @@ from xblock.fields import Scope, Reference, ReferenceList, ReferenceValueDict
 from xmodule.contentstore.content import StaticContent
 from .inheritance import own_metadata
 from xmodule.errortracker import make_error_tracker
+from xmodule.exceptions import NotFoundError
 from .store_utilities import rewrite_nonportable_content_links
 import xblock
 from xmodule.tabs import CourseTabList
@@ -53,11 +56,25 @@ from xmodule.util.misc import escape_invalid_characters
 
 log = logging.getLogger(__name__)
 
+# Static files are read in chunks of this size, and those larger than
+# STATIC_CONTENT_MAX_IN_MEMORY_SIZE are streamed to the contentstore rather
+# than held in memory.
+STATIC_CONTENT_CHUNK_SIZE = 1024 * 1024
+STATIC_CONTENT_MAX_IN_MEMORY_SIZE = 10 * 1024 * 1024
+
 
 def import_static_content(
         course_data_path, static_content_store,
-        target_id, subpath='static', verbose=False):
+        target_id, subpath='static', verbose=False, workers=1):
+    """
+    Import the files of the `subpath` directory of the course into
+    `static_content_store`, as assets of `target_id`.
 
+    The files are imported by `workers` threads, and those whose content and
+    attributes are the same as the asset already stored are skipped.
+
+    Returns a dict mapping the path of each file to its asset key.
+    """
     remap_dict = {}
 
     # now import all static assets
@@ -76,6 +93,7 @@ def import_static_content(
     mimetypes.add_type('application/octet-stream', '.srt')
     mimetypes_list = mimetypes.types_map.values()
 
+    content_paths = []
     for dirname, _, filenames in os.walk(static_dir):
         for filename in filenames:
 
@@ -86,63 +104,156 @@ def import_static_content(
                     log.debug('skipping static content %s...', content_path)
                 continue
 
-            if verbose:
-                log.debug('importing static content %s...', content_path)
+            content_paths.append(content_path)
 
-            try:
-                with open(content_path, 'rb') as f:
-                    data = f.read()
-            except IOError:
-                if filename.startswith('._'):
-                    # OS X "companion files". See
-                    # http://www.diigo.com/annotated/0c936fda5da4aa1159c189cea227e174
-                    continue
-                # Not a 'hidden file', then re-raise exception
-                raise
+    def import_file(content_path):
+        """
+        Import a single file, returning its path and asset key, or None if
+        it is to be ignored.
+        """
+        if verbose:
+            log.debug('importing static content %s...', content_path)
+        return _import_static_file(
+            static_content_store, target_id, static_dir, content_path, policy, mimetypes_list
+        )
 
-            # strip away leading path from the name
-            fullname_with_subpath = content_path.replace(static_dir, '')
-            if fullname_with_subpath.startswith('/'):
-                fullname_with_subpath = fullname_with_subpath[1:]
-            asset_key = StaticContent.compute_location(target_id, fullname_with_subpath)
+    if workers > 1 and len(content_paths) > 1:
+        pool = ThreadPool(min(workers, len(content_paths)))
+        try:
+            imported = pool.map(import_file, content_paths)
+        finally:
+            pool.close()
+            pool.join()
+    else:
+        imported = [import_file(content_path) for content_path in content_paths]
 
-            policy_ele = policy.get(asset_key.path, {})
+    for result in imported:
+        if result is not None:
+            fullname_with_subpath, asset_key = result
+            # store the remapping information which will be needed
+            # to subsitute in the module data
+            remap_dict[fullname_with_subpath] = asset_key
 
-            # During export display name is used to create files, strip away slashes from name
-            displayname = escape_invalid_characters(
-                name=policy_ele.get('displayname', filename),
-                invalid_char_list=['/', '\\']
-            )
-            locked = policy_ele.get('locked', False)
-            mime_type = policy_ele.get('contentType')
-
-            # Check extracted contentType in list of all valid mimetypes
-            if not mime_type or mime_type not in mimetypes_list:
-                mime_type = mimetypes.guess_type(filename)[0]   # Assign guessed mimetype
-            content = StaticContent(
-                asset_key, displayname, mime_type, data,
-                import_path=fullname_with_subpath, locked=locked
-            )
+    return remap_dict
 
-            # first let's save a thumbnail so we can get back a thumbnail location
-            thumbnail_content, thumbnail_location = static_content_store.generate_thumbnail(content)
 
-            if thumbnail_content is not None:
-                content.thumbnail_location = thumbnail_location
+def _read_static_file(content_path):
+    """
+    Read the file at `content_path` in chunks, returning its md5 digest, and
+    its data if it is small enough to be kept in memory, or else None.
+    """
+    digest = hashlib.md5()
+    chunks = []
+    size = 0
+    with open(content_path, 'rb') as f:
+        for chunk in iter(lambda: f.read(STATIC_CONTENT_CHUNK_SIZE), ''):
+            digest.update(chunk)
+            size += len(chunk)
+            if size <= STATIC_CONTENT_MAX_IN_MEMORY_SIZE:
+                chunks.append(chunk)
+            else:
+                chunks = None
+    return digest.hexdigest(), ''.join(chunks) if chunks is not None else None
 
-            # then commit the content
-            try:
-                static_content_store.save(content)
-            except Exception as err:
-                log.exception(u'Error importing {0}, error={1}'.format(
-                    fullname_with_subpath, err
-                ))
 
-            # store the remapping information which will be needed
-            # to subsitute in the module data
-            remap_dict[fullname_with_subpath] = asset_key
+def _stream_static_file(content_path):
+    """
+    Generator of the data of the file at `content_path`, in chunks.
+    """
+    with open(content_path, 'rb') as f:
+        for chunk in iter(lambda: f.read(STATIC_CONTENT_CHUNK_SIZE), ''):
+            yield chunk
 
-    return remap_dict
+
+def _import_static_file(static_content_store, target_id, static_dir, content_path, policy, mimetypes_list):
+    """
+    Import the file at `content_path` as an asset of `target_id`, unless the
+    asset already has the same content and attributes.
+
+    Returns the path of the file relative to `static_dir` and the asset key,
+    or None if the file is to be ignored.
+    """
+    filename = os.path.basename(content_path)
+    try:
+        content_digest, data = _read_static_file(content_path)
+    except IOError:
+        if filename.startswith('._'):
+            # OS X "companion files". See
+            # http://www.diigo.com/annotated/0c936fda5da4aa1159c189cea227e174
+            return None
+        # Not a 'hidden file', then re-raise exception
+        raise
+
+    # strip away leading path from the name
+    fullname_with_subpath = content_path.replace(static_dir, '')
+    if fullname_with_subpath.startswith('/'):
+        fullname_with_subpath = fullname_with_subpath[1:]
+    asset_key = StaticContent.compute_location(target_id, fullname_with_subpath)
+
+    policy_ele = policy.get(asset_key.path, {})
+
+    # During export display name is used to create files, strip away slashes from name
+    displayname = escape_invalid_characters(
+        name=policy_ele.get('displayname', filename),
+        invalid_char_list=['/', '\\']
+    )
+    locked = policy_ele.get('locked', False)
+    mime_type = policy_ele.get('contentType')
+
+    # Check extracted contentType in list of all valid mimetypes
+    if not mime_type or mime_type not in mimetypes_list:
+        mime_type = mimetypes.guess_type(filename)[0]   # Assign guessed mimetype
+
+    if _is_static_content_unchanged(
+            static_content_store, asset_key, content_digest, displayname, mime_type, fullname_with_subpath, locked
+    ):
+        log.debug('static content %s is unchanged', content_path)
+        return fullname_with_subpath, asset_key
+
+    content = StaticContent(
+        asset_key, displayname, mime_type, data if data is not None else _stream_static_file(content_path),
+        import_path=fullname_with_subpath, locked=locked
+    )
+
+    # first let's save a thumbnail so we can get back a thumbnail location
+    thumbnail_content, thumbnail_location = static_content_store.generate_thumbnail(
+        content, tempfile_path=content_path if data is None else None
+    )
+
+    if thumbnail_content is not None:
+        content.thumbnail_location = thumbnail_location
+
+    # then commit the content
+    try:
+        static_content_store.save(content)
+    except Exception as err:
+        log.exception(u'Error importing {0}, error={1}'.format(
+            fullname_with_subpath, err
+        ))
+
+    return fullname_with_subpath, asset_key
+
+
+def _is_static_content_unchanged(
+        static_content_store, asset_key, content_digest, displayname, mime_type, import_path, locked
+):
+    """
+    Return whether the asset stored at `asset_key` has the given content
+    digest and attributes, so that importing it again can be skipped.
+    """
+    if not hasattr(static_content_store, 'get_attrs'):
+        return False
+    try:
+        attrs = static_content_store.get_attrs(asset_key)
+    except NotFoundError:
+        return False
+    return (
+        attrs.get('md5') == content_digest and
+        attrs.get('displayname') == displayname and
+        attrs.get('contentType') == mime_type and
+        attrs.get('import_path') == import_path and
+        attrs.get('locked', False) == locked
+    )
 
 
 class ImportManager(object):
@@ -177,6 +288,8 @@ class ImportManager(object):
             Otherwise, it throws an InvalidLocationError if the courselike does not exist.
 
         default_class, load_error_modules: are arguments for constructing the XMLModuleStore (see its doc)
+
+        static_import_workers: the number of threads importing the static files concurrently
     """
     store_class = XMLModuleStore
 
@@ -186,7 +299,7 @@ class ImportManager(object):
             load_error_modules=True, static_content_store=None,
             target_id=None, verbose=False,
             do_import_static=True, create_if_not_present=False,
-            raise_on_failure=False
+            raise_on_failure=False, static_import_workers=1
     ):
         self.store = store
         self.user_id = user_id
@@ -199,6 +312,7 @@ class ImportManager(object):
         self.do_import_static = do_import_static
         self.create_if_not_present = create_if_not_present
         self.raise_on_failure = raise_on_failure
+        self.static_import_workers = static_import_workers
         self.xml_module_store = self.store_class(
             data_dir,
             default_class=default_class,
@@ -227,7 +341,8 @@ class ImportManager(object):
             # first pass to find everything in /static/
             import_static_content(
                 data_path, self.static_content_store,
-                dest_id, subpath='static', verbose=self.verbose
+                dest_id, subpath='static', verbose=self.verbose,
+                workers=self.static_import_workers
             )
 
         elif self.verbose and not self.do_import_static:
@@ -250,7 +365,8 @@ class ImportManager(object):
         if os.path.exists(data_path / simport):
             import_static_content(
                 data_path, self.static_content_store,
-                dest_id, subpath=simport, verbose=self.verbose
+                dest_id, subpath=simport, verbose=self.verbose,
+                workers=self.static_import_workers
             )
 
     def import_asset_metadata(self, data_dir, course_id):
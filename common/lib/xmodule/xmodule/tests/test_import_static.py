@@ -1,8 +1,10 @@
 """
 Tests that check that we ignore the appropriate files when importing courses.
 """
+import hashlib
 import unittest
-from mock import Mock
+from mock import Mock, patch
+from xmodule.exceptions import NotFoundError
 from xmodule.modulestore.xml_importer import import_static_content
 from opaque_keys.edx.locations import SlashSeparatedCourseKey
 from xmodule.tests import DATA_DIR
@@ -39,3 +41,67 @@ class IgnoredFilesTestCase(unittest.TestCase):
         self.assertNotIn(".DS_Store", name_val)
         self.assertIn("GREEN", name_val["example.txt"])
         self.assertIn("BLUE", name_val[".example.txt"])
+
+
+class ImportStaticContentTestCase(unittest.TestCase):
+    "Tests for the import of static files"
+    course_dir = DATA_DIR / "dot-underscore"
+    course_id = SlashSeparatedCourseKey("edX", "dot-underscore", "2014_Fall")
+
+    def setUp(self):
+        super(ImportStaticContentTestCase, self).setUp()
+        self.content_store = Mock()
+        self.content_store.generate_thumbnail.return_value = (None, None)
+        self.content_store.get_attrs.side_effect = NotFoundError
+
+    def saved_data(self):
+        "Returns the data of the saved static content by name"
+        saved_static_content = [call[0][0] for call in self.content_store.save.call_args_list]
+        return {
+            sc.name: sc.data if isinstance(sc.data, str) else ''.join(sc.data)
+            for sc in saved_static_content
+        }
+
+    def test_import_with_workers(self):
+        remap_dict = import_static_content(self.course_dir, self.content_store, self.course_id, workers=4)
+        self.assertEqual(set(remap_dict), {"example.txt", ".example.txt"})
+        name_val = self.saved_data()
+        self.assertEqual(set(name_val), {"example.txt", ".example.txt"})
+        self.assertIn("GREEN", name_val["example.txt"])
+        self.assertIn("BLUE", name_val[".example.txt"])
+
+    def test_unchanged_files_skipped(self):
+        with open(self.course_dir / "static" / "example.txt", 'rb') as example_file:
+            digest = hashlib.md5(example_file.read()).hexdigest()
+        attrs = {
+            'md5': digest,
+            'displayname': 'example.txt',
+            'contentType': 'text/plain',
+            'import_path': 'example.txt',
+        }
+
+        def get_attrs(asset_key):
+            "Returns the attributes of the stored example.txt"
+            if asset_key.name != 'example.txt':
+                raise NotFoundError(asset_key)
+            return attrs
+
+        self.content_store.get_attrs.side_effect = get_attrs
+        remap_dict = import_static_content(self.course_dir, self.content_store, self.course_id)
+        self.assertIn("example.txt", remap_dict)
+        self.assertEqual(set(self.saved_data()), {".example.txt"})
+
+        # The file is imported again if its attributes have changed
+        self.content_store.save.reset_mock()
+        attrs['locked'] = True
+        import_static_content(self.course_dir, self.content_store, self.course_id)
+        self.assertEqual(set(self.saved_data()), {"example.txt", ".example.txt"})
+
+    @patch('xmodule.modulestore.xml_importer.STATIC_CONTENT_MAX_IN_MEMORY_SIZE', 1)
+    def test_large_files_streamed(self):
+        import_static_content(self.course_dir, self.content_store, self.course_id)
+        name_val = self.saved_data()
+        self.assertIn("GREEN", name_val["example.txt"])
+        self.assertIn("BLUE", name_val[".example.txt"])
+        for call in self.content_store.generate_thumbnail.call_args_list:
+            self.assertIsNotNone(call[1]['tempfile_path'])
@@ -2,6 +2,8 @@
 Models for bulk email
 """
 import logging
+import re
+
 import markupsafe
 
 from django.conf import settings
@@ -332,6 +334,137 @@ class CourseEmailTemplate(models.Model):
                 context[key] = markupsafe.escape(value)
         return CourseEmailTemplate._render(self.html_template, htmltext, context)
 
+    def compile_plaintext(self, plaintext, context):
+        """
+        Compile the plain template with the plain text body (`plaintext`) and
+        the `context` dict shared by all the recipients of an email.
+
+        Returns a CompiledCourseEmailTemplate rendering the same message as
+        `render_plaintext` for each recipient.
+        """
+        return CompiledCourseEmailTemplate(self.plain_template, plaintext, context)
+
+    def compile_htmltext(self, htmltext, context):
+        """
+        Compile the HTML template with the HTML text body (`htmltext`) and
+        the `context` dict shared by all the recipients of an email.
+
+        Returns a CompiledCourseEmailTemplate rendering the same message as
+        `render_htmltext` for each recipient.
+        """
+        return CompiledCourseEmailTemplate(self.html_template, htmltext, context, escape_context=True)
+
+
+# Keys of the email context whose values differ between the recipients of
+# an email.
+RECIPIENT_CONTEXT_KEYS = ('name', 'email', 'user_id')
+
+
+class _RecipientValue(object):
+    """
+    Formats as a marker of the recipient value it stands for.
+    """
+    def __init__(self, key):
+        self.marker = u'\x00{}\x00'.format(key)
+
+    def __format__(self, format_spec):
+        return self.marker
+
+    def __unicode__(self):
+        return self.marker
+
+    __str__ = __repr__ = __unicode__
+
+
+class CompiledCourseEmailTemplate(object):
+    """
+    A course email template and message body, compiled with the context
+    shared by all the recipients of an email.
+
+    The template is formatted once, and split into lines which are wrapped
+    once, and lines which show the message body or a recipient value, which
+    are substituted and wrapped for each recipient.  Recipient values are
+    formatted without their format spec and conversion, if any.
+    """
+    RECIPIENT_VALUE_RE = re.compile(u'\x00(\\w+)\x00')
+
+    def __init__(self, format_string, message_body, context, escape_context=False):
+        """
+        Compile the template (`format_string`) with the `message_body`, and
+        the `context` dict of the values shared by all recipients.  String
+        values of the context are HTML-escaped if `escape_context` is True.
+        """
+        self.message_body = message_body
+        self.escape_context = escape_context
+        self.context = self._escape(context) if escape_context else dict(context)
+
+        marked_context = dict(self.context)
+        for key in RECIPIENT_CONTEXT_KEYS:
+            marked_context[key] = _RecipientValue(key)
+        result = format_string.format(**marked_context)
+
+        # The message is made of segments of wrapped text, as (True, text), and
+        # of lines to render for each recipient, as (False, parts of the line
+        # around the message body).
+        self.segments = []
+        static_lines = []
+        message_body_tag = COURSE_EMAIL_MESSAGE_BODY_TAG.format()
+        has_message_body = False
+        for line in result.split('\n'):
+            shows_message_body = not has_message_body and message_body_tag in line
+            if shows_message_body or self.RECIPIENT_VALUE_RE.search(line):
+                if static_lines:
+                    self.segments.append((True, wrap_message('\n'.join(static_lines))))
+                    static_lines = []
+                if shows_message_body:
+                    has_message_body = True
+                    self.segments.append((False, line.split(message_body_tag, 1)))
+                else:
+                    self.segments.append((False, [line]))
+            else:
+                static_lines.append(line)
+        if static_lines:
+            self.segments.append((True, wrap_message('\n'.join(static_lines))))
+
+    @staticmethod
+    def _escape(context):
+        """
+        Returns a copy of `context` with its string values HTML-escaped.
+        """
+        return {
+            key: markupsafe.escape(value) if isinstance(value, basestring) else value
+            for key, value in context.iteritems()
+        }
+
+    def render(self, recipient_context):
+        """
+        Create the message of a recipient, whose values are given in the
+        `recipient_context` dict.
+
+        Output is returned as a unicode string, as by CourseEmailTemplate.
+        """
+        context = dict(self.context)
+        context.update(self._escape(recipient_context) if self.escape_context else recipient_context)
+
+        # Substitute all %%-encoded keywords in the message body
+        message_body = self.message_body
+        if 'user_id' in context and 'course_id' in context:
+            message_body = substitute_keywords_with_data(message_body, context)
+
+        def substitute_recipient_values(text):
+            """Replace the markers of recipient values in `text` by the values."""
+            return self.RECIPIENT_VALUE_RE.sub(lambda match: unicode(context[match.group(1)]), text)
+
+        segments = []
+        for is_static, value in self.segments:
+            if is_static:
+                segments.append(value)
+            else:
+                segments.append(wrap_message(message_body.join(
+                    substitute_recipient_values(part) for part in value
+                )))
+        return u'\n'.join(segments)
+
 
 class CourseAuthorization(models.Model):
     """
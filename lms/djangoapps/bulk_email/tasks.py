@@ -6,9 +6,11 @@ to a course.
 from collections import Counter
 import json
 import logging
+from multiprocessing.pool import ThreadPool
 import random
 import re
-from time import sleep
+import threading
+from time import sleep, time
 
 import dogstats_wrapper as dog_stats_api
 from smtplib import SMTPServerDisconnected, SMTPDataError, SMTPConnectError, SMTPException
@@ -484,51 +486,60 @@ def _send_course_email(entry_id, email_id, to_list, global_email_context, subtas
 
     # use the CourseEmailTemplate that was associated with the CourseEmail
     course_email_template = course_email.get_template()
+    connections = []
+    pool = None
     try:
-        connection = get_connection()
-        connection.open()
-
-        # Define context values to use in all course emails:
+        # Messages are sent over several connections in parallel, if so configured.
+        for __ in xrange(max(settings.BULK_EMAIL_SMTP_CONNECTIONS, 1)):
+            connection = get_connection()
+            connections.append(connection)
+            connection.open()
+        if len(connections) > 1:
+            pool = ThreadPool(len(connections))
+        rate_limiter = _RateLimiter(settings.BULK_EMAIL_MAX_SENDS_PER_SECOND)
+
+        # Define context values to use in all course emails, and compile the
+        # templates with them, so that only the values specific to each
+        # recipient are rendered for each message.
         email_context = {'name': '', 'email': ''}
         email_context.update(global_email_context)
+        email_context['course_id'] = course_email.course_id
+        plaintext_template = course_email_template.compile_plaintext(course_email.text_message, email_context)
+        html_template = course_email_template.compile_htmltext(course_email.html_message, email_context)
 
+        batch_size = len(connections) * max(settings.BULK_EMAIL_MESSAGES_PER_CONNECTION_BATCH, 1)
         while to_list:
-            # Update context with user-specific values from the user at the end of the list.
-            # At the end of processing this user, they will be popped off of the to_list.
-            # That way, the to_list will always contain the recipients remaining to be emailed.
-            # This is convenient for retries, which will need to send to those who haven't
-            # yet been emailed, but not send to those who have already been sent to.
-            recipient_num += 1
-            current_recipient = to_list[-1]
-            email = current_recipient['email']
-            email_context['email'] = email
-            email_context['name'] = current_recipient['profile__name']
-            email_context['user_id'] = current_recipient['pk']
-            email_context['course_id'] = course_email.course_id
-
-            # Construct message content using templates and context:
-            plaintext_msg = course_email_template.render_plaintext(course_email.text_message, email_context)
-            html_msg = course_email_template.render_htmltext(course_email.html_message, email_context)
-
-            # Create email:
-            email_msg = EmailMultiAlternatives(
-                course_email.subject,
-                plaintext_msg,
-                from_addr,
-                [email],
-                connection=connection
-            )
-            email_msg.attach_alternative(html_msg, 'text/html')
-
-            # Throttle if we have gotten the rate limiter.  This is not very high-tech,
-            # but if a task has been retried for rate-limiting reasons, then we sleep
-            # for a period of time between all emails within this task.  Choice of
-            # the value depends on the number of workers that might be sending email in
-            # parallel, and what the SES throttle rate is.
-            if subtask_status.retried_nomax > 0:
-                sleep(settings.BULK_EMAIL_RETRY_DELAY_BETWEEN_SENDS)
+            # Messages are sent to the users at the end of the list, in batches.
+            # At the end of processing a batch, the users who were processed are
+            # removed from the to_list.  That way, the to_list will always contain
+            # the recipients remaining to be emailed.  This is convenient for
+            # retries, which will need to send to those who haven't yet been
+            # emailed, but not send to those who have already been sent to.
+            batch = to_list[-batch_size:]
+            recipients = list(reversed(batch))
+            email_msgs = []
+            for current_recipient in recipients:
+                recipient_num += 1
+                email = current_recipient['email']
+                # Construct message content using the compiled templates and user-specific values:
+                recipient_context = {
+                    'email': email,
+                    'name': current_recipient['profile__name'],
+                    'user_id': current_recipient['pk'],
+                }
+                plaintext_msg = plaintext_template.render(recipient_context)
+                html_msg = html_template.render(recipient_context)
+
+                # Create email:
+                email_msg = EmailMultiAlternatives(
+                    course_email.subject,
+                    plaintext_msg,
+                    from_addr,
+                    [email],
+                )
+                email_msg.attach_alternative(html_msg, 'text/html')
+                email_msgs.append(email_msg)
 
-            try:
                 log.info(
                     "BulkEmail ==> Task: %s, SubTask: %s, EmailId: %s, Recipient num: %s/%s, \
                     Recipient name: %s, Email address: %s",
@@ -540,26 +551,36 @@ def _send_course_email(entry_id, email_id, to_list, global_email_context, subtas
                     current_recipient['profile__name'],
                     email
                 )
-                with dog_stats_api.timer('course_email.single_send.time.overall', tags=[_statsd_tag(course_title)]):
-                    connection.send_messages([email_msg])
 
-            except SMTPDataError as exc:
-                # According to SMTP spec, we'll retry error codes in the 4xx range.  5xx range indicates hard failure.
-                total_recipients_failed += 1
-                log.error(
-                    "BulkEmail ==> Status: Failed(SMTPDataError), Task: %s, SubTask: %s, EmailId: %s, \
-                    Recipient num: %s/%s, Email address: %s",
-                    parent_task_id,
-                    task_id,
-                    email_id,
-                    recipient_num,
-                    total_recipients,
-                    email
-                )
-                if exc.smtp_code >= 400 and exc.smtp_code < 500:
-                    # This will cause the outer handler to catch the exception and retry the entire task.
-                    raise exc
-                else:
+            # Throttle if we have gotten the rate limiter.  This is not very high-tech,
+            # but if a task has been retried for rate-limiting reasons, then we sleep
+            # for a period of time between all emails within this task.  Choice of
+            # the value depends on the number of workers that might be sending email in
+            # parallel, and what the SES throttle rate is.
+            throttle = subtask_status.retried_nomax > 0
+            results, send_error = _send_email_msgs(
+                pool, connections, email_msgs, throttle, rate_limiter, _statsd_tag(course_title)
+            )
+
+            for index, current_recipient in enumerate(recipients):
+                if index not in results:
+                    continue
+                email = current_recipient['email']
+                recipient_index = recipient_num - len(recipients) + index + 1
+                exc = results[index]
+                if isinstance(exc, SMTPDataError):
+                    # According to SMTP spec, 5xx range indicates hard failure.
+                    total_recipients_failed += 1
+                    log.error(
+                        "BulkEmail ==> Status: Failed(SMTPDataError), Task: %s, SubTask: %s, EmailId: %s, \
+                        Recipient num: %s/%s, Email address: %s",
+                        parent_task_id,
+                        task_id,
+                        email_id,
+                        recipient_index,
+                        total_recipients,
+                        email
+                    )
                     # This will fall through and not retry the message.
                     log.warning(
                         'BulkEmail ==> Task: %s, SubTask: %s, EmailId: %s, Recipient num: %s/%s, \
@@ -567,7 +588,7 @@ def _send_course_email(entry_id, email_id, to_list, global_email_context, subtas
                         parent_task_id,
                         task_id,
                         email_id,
-                        recipient_num,
+                        recipient_index,
                         total_recipients,
                         email,
                         exc.smtp_error
@@ -575,47 +596,69 @@ def _send_course_email(entry_id, email_id, to_list, global_email_context, subtas
                     dog_stats_api.increment('course_email.error', tags=[_statsd_tag(course_title)])
                     subtask_status.increment(failed=1)
 
-            except SINGLE_EMAIL_FAILURE_ERRORS as exc:
-                # This will fall through and not retry the message.
-                total_recipients_failed += 1
-                log.error(
-                    "BulkEmail ==> Status: Failed(SINGLE_EMAIL_FAILURE_ERRORS), Task: %s, SubTask: %s, \
-                    EmailId: %s, Recipient num: %s/%s, Email address: %s, Exception: %s",
-                    parent_task_id,
-                    task_id,
-                    email_id,
-                    recipient_num,
-                    total_recipients,
-                    email,
-                    exc
-                )
-                dog_stats_api.increment('course_email.error', tags=[_statsd_tag(course_title)])
-                subtask_status.increment(failed=1)
+                elif exc is not None:
+                    # This will fall through and not retry the message.
+                    total_recipients_failed += 1
+                    log.error(
+                        "BulkEmail ==> Status: Failed(SINGLE_EMAIL_FAILURE_ERRORS), Task: %s, SubTask: %s, \
+                        EmailId: %s, Recipient num: %s/%s, Email address: %s, Exception: %s",
+                        parent_task_id,
+                        task_id,
+                        email_id,
+                        recipient_index,
+                        total_recipients,
+                        email,
+                        exc
+                    )
+                    dog_stats_api.increment('course_email.error', tags=[_statsd_tag(course_title)])
+                    subtask_status.increment(failed=1)
 
-            else:
-                total_recipients_successful += 1
-                log.info(
-                    "BulkEmail ==> Status: Success, Task: %s, SubTask: %s, EmailId: %s, \
-                    Recipient num: %s/%s, Email address: %s,",
-                    parent_task_id,
-                    task_id,
-                    email_id,
-                    recipient_num,
-                    total_recipients,
-                    email
-                )
-                dog_stats_api.increment('course_email.sent', tags=[_statsd_tag(course_title)])
-                if settings.BULK_EMAIL_LOG_SENT_EMAILS:
-                    log.info('Email with id %s sent to %s', email_id, email)
                 else:
-                    log.debug('Email with id %s sent to %s', email_id, email)
-                subtask_status.increment(succeeded=1)
-
-            # Pop the user that was emailed off the end of the list only once they have
-            # successfully been processed.  (That way, if there were a failure that
-            # needed to be retried, the user is still on the list.)
-            recipients_info[email] += 1
-            to_list.pop()
+                    total_recipients_successful += 1
+                    log.info(
+                        "BulkEmail ==> Status: Success, Task: %s, SubTask: %s, EmailId: %s, \
+                        Recipient num: %s/%s, Email address: %s,",
+                        parent_task_id,
+                        task_id,
+                        email_id,
+                        recipient_index,
+                        total_recipients,
+                        email
+                    )
+                    dog_stats_api.increment('course_email.sent', tags=[_statsd_tag(course_title)])
+                    if settings.BULK_EMAIL_LOG_SENT_EMAILS:
+                        log.info('Email with id %s sent to %s', email_id, email)
+                    else:
+                        log.debug('Email with id %s sent to %s', email_id, email)
+                    subtask_status.increment(succeeded=1)
+
+                recipients_info[email] += 1
+
+            # Remove the users that were emailed from the list only once they have
+            # been processed.  (That way, if there were a failure that needed to be
+            # retried, the users not yet processed are still on the list.)
+            to_list[-len(batch):] = [
+                current_recipient for index, current_recipient in reversed(list(enumerate(recipients)))
+                if index not in results
+            ]
+
+            if send_error is not None:
+                index, exc = send_error
+                if isinstance(exc, SMTPDataError):
+                    # According to SMTP spec, we'll retry error codes in the 4xx range.
+                    total_recipients_failed += 1
+                    log.error(
+                        "BulkEmail ==> Status: Failed(SMTPDataError), Task: %s, SubTask: %s, EmailId: %s, \
+                        Recipient num: %s/%s, Email address: %s",
+                        parent_task_id,
+                        task_id,
+                        email_id,
+                        recipient_num - len(recipients) + index + 1,
+                        total_recipients,
+                        recipients[index]['email']
+                    )
+                # This will cause the outer handler to catch the exception and retry the entire task.
+                raise exc
 
         log.info(
             "BulkEmail ==> Task: %s, SubTask: %s, EmailId: %s, Total Successful Recipients: %s/%s, \
@@ -696,7 +739,95 @@ def _send_course_email(entry_id, email_id, to_list, global_email_context, subtas
         return subtask_status, None
     finally:
         # Clean up at the end.
-        connection.close()
+        if pool is not None:
+            pool.close()
+            pool.join()
+        for connection in connections:
+            connection.close()
+
+
+class _RateLimiter(object):
+    """
+    Spaces out sends, over all the threads of a task, so that at most
+    `max_per_second` messages are sent per second, or doesn't limit them if
+    `max_per_second` is None.
+    """
+    def __init__(self, max_per_second):
+        self.interval = 1.0 / max_per_second if max_per_second else 0
+        self.next_send_time = 0
+        self.lock = threading.Lock()
+
+    def wait(self):
+        """
+        Sleeps until the next message can be sent.
+        """
+        if not self.interval:
+            return
+        with self.lock:
+            now = time()
+            delay = self.next_send_time - now
+            self.next_send_time = max(now, self.next_send_time) + self.interval
+        if delay > 0:
+            sleep(delay)
+
+
+def _send_email_msgs(pool, connections, email_msgs, throttle, rate_limiter, statsd_tag):
+    """
+    Sends `email_msgs`, spread over `connections`, in parallel in the threads
+    of `pool` if there are several connections.
+
+    Returns a tuple of two values:
+      * First value is a dict with an entry for the index of each message that
+        was processed, whose value is None if the message was sent, or the
+        exception with which it failed (a SMTPDataError outside of the 4xx
+        range, or one of SINGLE_EMAIL_FAILURE_ERRORS).
+
+      * Second value is None, or the (index, exception) of the first message
+        which failed with another exception.  A connection stops sending
+        messages when this happens.
+    """
+    batches = [
+        (connection, range(offset, len(email_msgs), len(connections)))
+        for offset, connection in enumerate(connections)
+    ]
+
+    def send_batch(batch):
+        """
+        Sends the messages of a batch over its connection.
+        """
+        connection, indices = batch
+        batch_results = {}
+        for index in indices:
+            if throttle:
+                sleep(settings.BULK_EMAIL_RETRY_DELAY_BETWEEN_SENDS)
+            rate_limiter.wait()
+            try:
+                with dog_stats_api.timer('course_email.single_send.time.overall', tags=[statsd_tag]):
+                    connection.send_messages([email_msgs[index]])
+            except SMTPDataError as exc:
+                if exc.smtp_code >= 400 and exc.smtp_code < 500:
+                    return batch_results, (index, exc)
+                batch_results[index] = exc
+            except SINGLE_EMAIL_FAILURE_ERRORS as exc:
+                batch_results[index] = exc
+            except Exception as exc:  # pylint: disable=broad-except
+                return batch_results, (index, exc)
+            else:
+                batch_results[index] = None
+        return batch_results, None
+
+    if pool is None:
+        outcomes = [send_batch(batch) for batch in batches]
+    else:
+        outcomes = pool.map(send_batch, batches)
+
+    results = {}
+    send_error = None
+    for batch_results, batch_error in outcomes:
+        results.update(batch_results)
+        if batch_error is not None and (send_error is None or batch_error[0] < send_error[0]):
+            send_error = batch_error
+    return results, send_error
 
 
 def _get_current_task():
@@ -190,6 +190,23 @@ class CourseEmailTemplateTest(TestCase):
         self.assertIn(context['course_title'], message)
         self.assertIn(context['name'], message)
 
+    def test_compiled_templates(self):
+        template = CourseEmailTemplate.get_template()
+        message_body = "Dear %%USER_FULLNAME%%, thanks for enrolling in %%COURSE_DISPLAY_NAME%%.\n" + "Long line. " * 100
+        context = self._add_xss_fields(self._get_sample_html_context())
+        recipient_context = {key: context.pop(key) for key in ('name', 'email', 'user_id')}
+        plaintext_template = template.compile_plaintext(message_body, context)
+        html_template = template.compile_htmltext(message_body, context)
+
+        self.assertEqual(
+            plaintext_template.render(recipient_context),
+            template.render_plaintext(message_body, dict(context, **recipient_context)),
+        )
+        self.assertEqual(
+            html_template.render(recipient_context),
+            template.render_htmltext(message_body, dict(context, **recipient_context)),
+        )
+
 
 @attr('shard_1')
 class CourseAuthorizationTest(TestCase):
@@ -29,6 +29,7 @@ from celery.states import SUCCESS, FAILURE  # pylint: disable=no-name-in-module,
 
 from django.conf import settings
 from django.core.management import call_command
+from django.test.utils import override_settings
 
 from xmodule.modulestore.tests.factories import CourseFactory
 
@@ -216,6 +217,18 @@ class TestBulkEmailInstructorTask(InstructorTaskCourseTestCase):
         self.assertEquals(parent_status.get('succeeded'), num_emails)
         self.assertEquals(parent_status.get('failed'), 0)
 
+    @override_settings(BULK_EMAIL_SMTP_CONNECTIONS=3, BULK_EMAIL_MESSAGES_PER_CONNECTION_BATCH=7)
+    def test_successful_over_parallel_connections(self):
+        # Select number of emails to fit into a single subtask.
+        num_emails = settings.BULK_EMAIL_EMAILS_PER_TASK
+        # We also send email to the instructor:
+        self._create_students(num_emails - 1)
+        with patch('bulk_email.tasks.get_connection', autospec=True) as get_conn:
+            get_conn.return_value.send_messages.side_effect = cycle([None])
+            self._test_run_with_task(send_bulk_course_email, 'emailed', num_emails, num_emails)
+        self.assertEquals(get_conn.call_count, 3)
+        self.assertEquals(get_conn.return_value.send_messages.call_count, num_emails)
+
     def test_unactivated_user(self):
         # Select number of emails to fit into a single subtask.
         num_emails = settings.BULK_EMAIL_EMAILS_PER_TASK
@@ -265,6 +278,10 @@ class TestBulkEmailInstructorTask(InstructorTaskCourseTestCase):
         # Test that celery handles permanent SMTPDataErrors by failing and not retrying.
         self._test_email_address_failures(SMTPDataError(554, "Email address is blacklisted"))
 
+    @override_settings(BULK_EMAIL_SMTP_CONNECTIONS=3, BULK_EMAIL_MESSAGES_PER_CONNECTION_BATCH=7)
+    def test_smtp_blacklisted_user_over_parallel_connections(self):
+        self._test_email_address_failures(SMTPDataError(554, "Email address is blacklisted"))
+
     def test_ses_blacklisted_user(self):
         # Test that celery handles permanent SMTPDataErrors by failing and not retrying.
         self._test_email_address_failures(SESAddressBlacklistedError(554, "Email address is blacklisted"))
@@ -8,6 +8,7 @@ import pytz
 from django.contrib.auth.models import User
 from django.db import transaction
 from django.http import Http404
+from django.utils.decorators import method_decorator
 from rest_framework import status
 from rest_framework.authentication import SessionAuthentication
 from rest_framework.generics import GenericAPIView
@@ -32,6 +33,7 @@ from student.roles import CourseCcxCoachRole
 
 from lms.djangoapps.ccx.models import CcxFieldOverride, CustomCourseForEdX
 from lms.djangoapps.ccx.overrides import (
+    clear_cached_overrides_for_ccx,
     override_field_for_ccx,
 )
 from lms.djangoapps.ccx.utils import (
@@ -604,6 +606,12 @@ class CCXDetailView(GenericAPIView):
     permission_classes = (IsAuthenticated, permissions.IsCourseStaffInstructor)
     serializer_class = CCXCourseSerializer
 
+    # The cached overrides of the CCX are cleared once the changes are
+    # committed, so the changes cannot be made in the request transaction.
+    @method_decorator(transaction.non_atomic_requests)
+    def dispatch(self, *args, **kwargs):    # pylint: disable=missing-docstring
+        return super(CCXDetailView, self).dispatch(*args, **kwargs)
+
     def get_object(self, course_id, is_ccx=False):  # pylint: disable=arguments-differ
         """
         Override the default get_object to allow a custom getter for the CCX
@@ -651,6 +659,7 @@ class CCXDetailView(GenericAPIView):
                 }
             )
         ccx_course_overview = CourseOverview.get_from_id(ccx_course_key)
+        ccx_id = ccx_course_object.id
         # clean everything up with a single transaction
         with transaction.atomic():
             CcxFieldOverride.objects.filter(ccx=ccx_course_object).delete()
@@ -658,6 +667,9 @@ class CCXDetailView(GenericAPIView):
             CourseEnrollment.objects.filter(course_id=ccx_course_key).delete()
             ccx_course_overview.delete()
             ccx_course_object.delete()
+        # the deletion unsets the id of the CCX, which keys its cached overrides
+        ccx_course_object.id = ccx_id
+        clear_cached_overrides_for_ccx(ccx_course_object)
         return Response(
             status=status.HTTP_204_NO_CONTENT,
         )
@@ -759,6 +771,8 @@ class CCXDetailView(GenericAPIView):
                 )
                 # enroll the coach to the newly created ccx
                 assign_coach_role_to_ccx(ccx_course_key, coach, master_course_object.id)
+        if 'max_students_allowed' in valid_input:
+            clear_cached_overrides_for_ccx(ccx_course_object)
 
         return Response(
             status=status.HTTP_204_NO_CONTENT,
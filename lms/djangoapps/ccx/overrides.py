@@ -5,11 +5,12 @@ by the individual custom courses feature.
 import json
 import logging
 
+from django.core.cache import cache
 from django.db import transaction
 
 import request_cache
 
-from courseware.field_overrides import FieldOverrideProvider
+from courseware.field_overrides import FieldOverrideProvider, clear_resolved_overrides
 from opaque_keys.edx.keys import CourseKey, UsageKey
 from ccx_keys.locator import CCXLocator, CCXBlockUsageLocator
 
@@ -18,6 +19,14 @@ from lms.djangoapps.ccx.models import CcxFieldOverride, CustomCourseForEdX
 
 log = logging.getLogger(__name__)
 
+# The decoded overrides of a CCX are shared between processes in the cache.
+# The version is part of the key, and is to be bumped whenever the format of
+# the cached overrides changes.  The timeout bounds how long stale overrides
+# can be served if an invalidation is ever missed.
+OVERRIDES_CACHE_VERSION = 1
+OVERRIDES_CACHE_KEY = u'ccx.overrides.v{version}.{ccx_id}'
+OVERRIDES_CACHE_TIMEOUT = 60 * 5
+
 
 class CustomCoursesForEdxOverrideProvider(FieldOverrideProvider):
     """
@@ -116,33 +125,71 @@ def _get_overrides_for_ccx(ccx):
     """
     Returns a dictionary mapping field name to overriden value for any
     overrides set on this block for this CCX.
+
+    The overrides are cached for the request, and are shared with other
+    requests through the cache, without the `CcxFieldOverride` instances
+    themselves.
     """
     overrides_cache = request_cache.get_cache('ccx-overrides')
 
     if ccx not in overrides_cache:
-        overrides = {}
-        query = CcxFieldOverride.objects.filter(
-            ccx=ccx,
-        )
+        cache_key = _overrides_cache_key(ccx)
+        overrides = cache.get(cache_key)
+        if overrides is None:
+            overrides = {}
+            query = CcxFieldOverride.objects.filter(
+                ccx=ccx,
+            )
+
+            for override in query:
+                block_overrides = overrides.setdefault(override.location, {})
+                block_overrides[override.field] = json.loads(override.value)
+                block_overrides[override.field + "_id"] = override.id
 
-        for override in query:
-            block_overrides = overrides.setdefault(override.location, {})
-            block_overrides[override.field] = json.loads(override.value)
-            block_overrides[override.field + "_id"] = override.id
-            block_overrides[override.field + "_instance"] = override
+            cache.set(cache_key, overrides, OVERRIDES_CACHE_TIMEOUT)
 
         overrides_cache[ccx] = overrides
 
     return overrides_cache[ccx]
 
 
-@transaction.atomic
+def _overrides_cache_key(ccx):
+    """
+    Returns the key of the overrides of `ccx` in the shared cache.
+    """
+    return OVERRIDES_CACHE_KEY.format(version=OVERRIDES_CACHE_VERSION, ccx_id=ccx.id)
+
+
+def clear_cached_overrides_for_ccx(ccx):
+    """
+    Removes the overrides of `ccx` from the shared cache, so that the next
+    request reloads them from the database.
+
+    This has to be called once the changes to the overrides are committed,
+    otherwise a concurrent request could cache the overrides it read from the
+    database in the meantime.  The functions below call it after their own
+    changes, which is enough in autocommit mode; the views changing overrides
+    in a transaction call it again once the transaction is committed.
+    """
+    cache.delete(_overrides_cache_key(ccx))
+
+
 def override_field_for_ccx(ccx, block, name, value):
     """
     Overrides a field for the `ccx`.  `block` and `name` specify the block
     and the name of the field on that block to override.  `value` is the
     value to set for the given field.
     """
+    _override_field_for_ccx(ccx, block, name, value)
+    clear_cached_overrides_for_ccx(ccx)
+    clear_resolved_overrides()
+
+
+@transaction.atomic
+def _override_field_for_ccx(ccx, block, name, value):
+    """
+    Stores the override of a field for the `ccx`, see `override_field_for_ccx`.
+    """
     field = block.fields[name]
     value_json = field.to_json(value)
     serialized_value = json.dumps(value_json)
@@ -201,9 +248,11 @@ def clear_ccx_field_info_from_ccx_map(ccx, block, name):  # pylint: disable=inva
         ccx_override_map = _get_overrides_for_ccx(ccx).setdefault(clean_ccx_key, {})
         ccx_override_map.pop(name)
         ccx_override_map.pop(name + "_id")
-        ccx_override_map.pop(name + "_instance")
+        ccx_override_map.pop(name + "_instance", None)
     except KeyError:
         pass
+    clear_cached_overrides_for_ccx(ccx)
+    clear_resolved_overrides()
 
 
 def bulk_delete_ccx_override_fields(ccx, ids):
@@ -214,3 +263,5 @@ def bulk_delete_ccx_override_fields(ccx, ids):
     ids = list(set(ids))
     if ids:
         CcxFieldOverride.objects.filter(ccx=ccx, id__in=ids).delete()
+        clear_cached_overrides_for_ccx(ccx)
+    clear_resolved_overrides()
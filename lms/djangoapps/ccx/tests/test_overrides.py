@@ -21,7 +21,12 @@ from xmodule.modulestore.tests.django_utils import (
 from xmodule.modulestore.tests.factories import CourseFactory, ItemFactory
 
 from lms.djangoapps.ccx.models import CustomCourseForEdX
-from lms.djangoapps.ccx.overrides import override_field_for_ccx
+from lms.djangoapps.ccx.overrides import (
+    bulk_delete_ccx_override_fields,
+    clear_override_for_ccx,
+    get_override_for_ccx,
+    override_field_for_ccx,
+)
 
 from lms.djangoapps.ccx.tests.utils import flatten, iter_blocks
 
@@ -36,6 +41,7 @@ class TestFieldOverrides(FieldOverrideTestMixin, SharedModuleStoreTestCase):
     Make sure field overrides behave in the expected manner.
     """
     MODULESTORE = TEST_DATA_SPLIT_MODULESTORE
+    ENABLED_CACHES = ['default']
 
     @classmethod
     def setUpClass(cls):
@@ -173,3 +179,55 @@ class TestFieldOverrides(FieldOverrideTestMixin, SharedModuleStoreTestCase):
         override_field_for_ccx(self.ccx, chapter, 'due', ccx_due)
         vertical = chapter.get_children()[0].get_children()[0]
         self.assertEqual(vertical.due, ccx_due)
+
+    def test_overrides_are_shared_between_requests(self):
+        """
+        Test that the overrides of a ccx are loaded from the cache, rather
+        than the database, in later requests.
+        """
+        ccx_start = datetime.datetime(2014, 12, 25, 00, 00, tzinfo=pytz.UTC)
+        chapter = self.ccx_course.get_children()[0]
+        override_field_for_ccx(self.ccx, chapter, 'start', ccx_start)
+
+        RequestCache.clear_request_cache()
+        self.assertEqual(get_override_for_ccx(self.ccx, chapter, 'start'), ccx_start)
+
+        RequestCache.clear_request_cache()
+        with self.assertNumQueries(0):
+            self.assertEqual(get_override_for_ccx(self.ccx, chapter, 'start'), ccx_start)
+
+    def test_cached_overrides_are_invalidated(self):
+        """
+        Test that changing the overrides of a ccx invalidates its cached
+        overrides.
+        """
+        ccx_start = datetime.datetime(2014, 12, 25, 00, 00, tzinfo=pytz.UTC)
+        new_ccx_start = datetime.datetime(2015, 12, 25, 00, 00, tzinfo=pytz.UTC)
+        ccx_due = datetime.datetime(2015, 1, 1, 00, 00, tzinfo=pytz.UTC)
+        chapter = self.ccx_course.get_children()[0]
+        override_field_for_ccx(self.ccx, chapter, 'start', ccx_start)
+        override_field_for_ccx(self.ccx, chapter, 'due', ccx_due)
+
+        def get_overrides():
+            """
+            Returns the overridden start and due dates of the chapter, as
+            read by a new request.
+            """
+            RequestCache.clear_request_cache()
+            return (
+                get_override_for_ccx(self.ccx, chapter, 'start'),
+                get_override_for_ccx(self.ccx, chapter, 'due'),
+            )
+
+        self.assertEqual(get_overrides(), (ccx_start, ccx_due))
+
+        # The override is updated by a later request.
+        RequestCache.clear_request_cache()
+        override_field_for_ccx(self.ccx, chapter, 'start', new_ccx_start)
+        self.assertEqual(get_overrides(), (new_ccx_start, ccx_due))
+
+        clear_override_for_ccx(self.ccx, chapter, 'start')
+        self.assertEqual(get_overrides(), (None, ccx_due))
+
+        bulk_delete_ccx_override_fields(self.ccx, [get_override_for_ccx(self.ccx, chapter, 'due_id')])
+        self.assertEqual(get_overrides(), (None, None))
@@ -489,6 +489,24 @@ class TestCoachDashboard(CcxTestCase, LoginEnrollmentTestCase):
         )
         self.assertEqual(response.status_code, 200)
 
+    @patch('ccx.views.clear_cached_overrides_for_ccx')
+    def test_set_grading_policy_clears_cached_overrides(self, mock_clear):
+        """
+        The cached overrides of the CCX are cleared once the grading policy
+        is saved.
+        """
+        self.make_coach()
+        ccx = self.make_ccx()
+
+        course_id = CCXLocator.from_course_locator(self.course.id, ccx.id)
+        save_policy_url = reverse(
+            'ccx_set_grading_policy', kwargs={'course_id': course_id})
+        response = self.client.post(
+            save_policy_url, {"policy": json.dumps(self.course.grading_policy)}
+        )
+        self.assertEqual(response.status_code, 302)
+        mock_clear.assert_called_once_with(ccx)
+
     @ddt.data(
         ('ccx_invite', True, 1, 'student-ids', ('enrollment-button', 'Enroll')),
         ('ccx_invite', False, 0, 'student-ids', ('enrollment-button', 'Enroll')),
@@ -31,7 +31,7 @@ from courseware.courses import get_course_by_id
 
 from courseware.field_overrides import disable_overrides
 from edxmako.shortcuts import render_to_response
-from grades.course_grades import iterate_grades_for
+from lms.djangoapps.grades.course_grades import iterate_grades_for
 from opaque_keys.edx.keys import CourseKey
 from ccx_keys.locator import CCXLocator
 from student.roles import CourseCcxCoachRole
@@ -48,6 +48,7 @@ from lms.djangoapps.ccx.models import CustomCourseForEdX
 from lms.djangoapps.ccx.overrides import (
     get_override_for_ccx,
     override_field_for_ccx,
+    clear_cached_overrides_for_ccx,
     clear_ccx_field_info_from_ccx_map,
     bulk_delete_ccx_override_fields,
 )
@@ -118,6 +119,25 @@ def coach_dashboard(view):
     return wrapper
 
 
+def clears_cached_overrides(view):
+    """
+    View decorator for the views changing the overrides of a CCX: the view is
+    run in a transaction, after which the overrides of the CCX are removed
+    from the cache.  Removing them before the commit would let a concurrent
+    request cache the previous overrides.  The decorated view has to be
+    excluded from the request transaction with
+    `transaction.non_atomic_requests`.
+    """
+    @functools.wraps(view)
+    def wrapper(request, course, ccx=None):  # pylint: disable=missing-docstring
+        with transaction.atomic():
+            response = view(request, course, ccx)
+        if ccx is not None:
+            clear_cached_overrides_for_ccx(ccx)
+        return response
+    return wrapper
+
+
 @ensure_csrf_cookie
 @cache_control(no_cache=True, no_store=True, must_revalidate=True)
 @coach_dashboard
@@ -236,9 +256,11 @@ def create_ccx(request, course, ccx=None):
     return redirect(url)
 
 
+@transaction.non_atomic_requests
 @ensure_csrf_cookie
 @cache_control(no_cache=True, no_store=True, must_revalidate=True)
 @coach_dashboard
+@clears_cached_overrides
 def save_ccx(request, course, ccx=None):
     """
     Save changes to CCX.
@@ -332,9 +354,11 @@ def save_ccx(request, course, ccx=None):
     )
 
 
+@transaction.non_atomic_requests
 @ensure_csrf_cookie
 @cache_control(no_cache=True, no_store=True, must_revalidate=True)
 @coach_dashboard
+@clears_cached_overrides
 def set_grading_policy(request, course, ccx=None):
     """
     Set grading policy for the CCX.
@@ -0,0 +1,177 @@
+"""
+Command to benchmark the course block transformers.
+"""
+from datetime import datetime
+import logging
+from uuid import uuid4
+
+from django.contrib.auth.models import User
+from django.core.management.base import BaseCommand, CommandError
+from opaque_keys import InvalidKeyError
+from opaque_keys.edx.keys import CourseKey
+from pytz import UTC
+from xmodule.modulestore import ModuleStoreEnum
+from xmodule.modulestore.django import modulestore
+
+from lms.djangoapps.course_blocks.api import get_course_blocks
+from openedx.core.djangoapps.content.block_structure.api import clear_course_from_cache, update_course_in_cache
+from openedx.core.lib.block_structure.benchmark import DEFAULT_SHAPE, SYNTHETIC_BLOCK_TYPES, parse_shape
+from openedx.core.lib.block_structure.profiling import profile_transformers
+
+
+log = logging.getLogger(__name__)
+
+
+class Command(BaseCommand):
+    """
+    Reports the time spent (and optionally the objects allocated) by each
+    course block transformer while collecting and transforming the blocks
+    of the given courses.  If no course is given, a synthetic course of
+    the given shape is created, benchmarked and then deleted.
+
+    Example usage:
+        $ ./manage.py lms benchmark_course_blocks --username=staff --shape=20,10,5,4 --settings=devstack
+        $ ./manage.py lms benchmark_course_blocks 'edX/DemoX/Demo_Course' --username=staff --settings=devstack
+    """
+    args = '<course_id course_id ...>'
+    help = 'Reports the cost of each course block transformer for one or more courses.'
+
+    def add_arguments(self, parser):
+        """
+        Entry point for subclassed commands to add custom arguments.
+        """
+        parser.add_argument(
+            '--username',
+            help='Username of the user for whom the course blocks are transformed.',
+        )
+        parser.add_argument(
+            '--shape',
+            help='Number of children of each block at every level of the synthetic course, below the course.',
+            type=parse_shape,
+            default=DEFAULT_SHAPE,
+        )
+        parser.add_argument(
+            '--repeat',
+            help='Number of times the course blocks are collected and transformed.',
+            type=int,
+            default=5,
+        )
+        parser.add_argument(
+            '--allocations',
+            help='Also count the objects allocated by each transformer.',
+            action='store_true',
+            default=False,
+        )
+
+    def handle(self, *args, **options):
+        if not options.get('username'):
+            raise CommandError('A username must be specified.')
+        try:
+            user = User.objects.get(username=options['username'])
+        except User.DoesNotExist:
+            raise CommandError('Unknown user {}.'.format(options['username']))
+
+        try:
+            course_keys = [CourseKey.from_string(arg) for arg in args]
+        except InvalidKeyError:
+            raise CommandError('Invalid key specified.')
+
+        repeat = options.get('repeat') or 5
+        if course_keys:
+            for course_key in course_keys:
+                self._benchmark(course_key, user, repeat, options.get('allocations'))
+        else:
+            course_key = create_synthetic_course(options.get('shape') or DEFAULT_SHAPE)
+            try:
+                self._benchmark(course_key, user, repeat, options.get('allocations'))
+            finally:
+                clear_course_from_cache(course_key)
+                modulestore().delete_course(course_key, ModuleStoreEnum.UserID.mgmt_command)
+
+    def _benchmark(self, course_key, user, repeat, track_allocations):
+        """
+        Collects and transforms the blocks of the given course repeat
+        times and writes a report of the cost of each transformer.
+        """
+        course_usage_key = modulestore().make_course_usage_key(course_key)
+        with profile_transformers(track_allocations) as profile:
+            for __ in xrange(repeat):
+                update_course_in_cache(course_key)
+                block_structure = get_course_blocks(user, course_usage_key)
+
+        self.stdout.write(u'{} ({} blocks after transform, {} runs)'.format(
+            unicode(course_key), len(block_structure), repeat,
+        ))
+        self.stdout.write(u'{:<40}{:<10}{:>10}{:>14}{:>14}'.format(
+            'transformer', 'phase', 'calls', 'mean (ms)', 'allocated',
+        ))
+        for name, phase, stats in profile.summary():
+            self.stdout.write(u'{:<40}{:<10}{:>10}{:>14.3f}{:>14}'.format(
+                name,
+                phase,
+                stats['calls'],
+                stats['time'] * 1000 / repeat,
+                stats['allocated'] / repeat if stats['allocated'] is not None else '-',
+            ))
+
+
+def create_synthetic_course(shape):
+    """
+    Creates and publishes a synthetic course of the given shape and
+    returns its key.
+
+    Sequentials are graded, and a tenth of the verticals are only visible
+    to staff and a tenth of the chapters start in the future, so that all
+    the course block transformers have blocks to act on.
+
+    Arguments:
+        shape (sequence(int)) - The number of children of each block at
+            every level below the course.
+    """
+    store = modulestore()
+    user_id = ModuleStoreEnum.UserID.mgmt_command
+    with store.default_store(ModuleStoreEnum.Type.split):
+        course = store.create_course(
+            'benchmark',
+            'synthetic',
+            uuid4().hex,
+            user_id,
+            fields={'display_name': u'Synthetic course {}'.format(','.join(str(num) for num in shape))},
+        )
+        log.info('Creating synthetic course %s.', unicode(course.id))
+
+        with store.branch_setting(ModuleStoreEnum.Branch.draft_preferred, course.id):
+            with store.bulk_operations(course.id):
+                parents = [course.location]
+                for depth, num_children in enumerate(shape):
+                    block_type = SYNTHETIC_BLOCK_TYPES[min(depth, len(SYNTHETIC_BLOCK_TYPES) - 1)]
+                    children = []
+                    for parent in parents:
+                        for __ in xrange(num_children):
+                            index = len(children)
+                            child = store.create_child(
+                                user_id,
+                                parent,
+                                block_type,
+                                block_id=u'{}_{}'.format(block_type, index),
+                                fields=_synthetic_fields(block_type, index),
+                            )
+                            children.append(child.location)
+                    parents = children
+            store.publish(course.location, user_id)
+    return course.id
+
+
+def _synthetic_fields(block_type, index):
+    """
+    Returns the fields of the index'th block of the given type in a
+    synthetic course.
+    """
+    fields = {'display_name': u'{} {}'.format(block_type, index)}
+    if block_type == 'chapter' and index % 10 == 9:
+        fields['start'] = datetime(2100, 1, 1, tzinfo=UTC)
+    elif block_type == 'sequential':
+        fields.update({'graded': True, 'format': u'Homework'})
+    elif block_type == 'vertical' and index % 10 == 9:
+        fields['visible_to_staff_only'] = True
+    return fields
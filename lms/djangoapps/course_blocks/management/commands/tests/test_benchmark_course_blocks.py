@@ -0,0 +1,49 @@
+"""
+Tests for benchmark_course_blocks management command.
+"""
+from StringIO import StringIO
+
+from django.core.management.base import CommandError
+
+from student.tests.factories import UserFactory
+from xmodule.modulestore.tests.django_utils import ModuleStoreTestCase
+from xmodule.modulestore.tests.factories import CourseFactory, ItemFactory
+from .. import benchmark_course_blocks
+
+
+class TestBenchmarkCourseBlocks(ModuleStoreTestCase):
+    """
+    Tests benchmark course blocks management command.
+    """
+    def setUp(self):
+        super(TestBenchmarkCourseBlocks, self).setUp()
+        self.user = UserFactory.create()
+        self.command = benchmark_course_blocks.Command()
+        self.command.stdout = StringIO()
+
+    def test_course(self):
+        course = CourseFactory.create()
+        ItemFactory.create(parent=course, category='chapter')
+        self.command.handle(unicode(course.id), username=self.user.username, repeat=2)
+
+        output = self.command.stdout.getvalue()
+        self.assertIn(unicode(course.id), output)
+        self.assertIn('visibility', output)
+        self.assertIn('filter_traversal', output)
+
+    def test_synthetic_course(self):
+        course_keys_before = {course.id for course in self.store.get_courses()}
+        self.command.handle(username=self.user.username, shape=(2, 1, 1, 1), repeat=1, allocations=True)
+
+        self.assertIn('benchmark', self.command.stdout.getvalue())
+        self.assertEqual({course.id for course in self.store.get_courses()}, course_keys_before)
+
+    def test_no_user(self):
+        with self.assertRaises(CommandError):
+            self.command.handle()
+        with self.assertRaises(CommandError):
+            self.command.handle(username='unknown')
+
+    def test_invalid_key(self):
+        with self.assertRaises(CommandError):
+            self.command.handle('fake/course/id', 'not a key', username=self.user.username)
@@ -75,7 +75,7 @@ class UserPartitionTransformer(FilteringTransformerMixin, BlockStructureTransfor
         if not user_partitions:
             return [block_structure.create_universal_filter()]
 
-        user_groups = _get_user_partition_groups(
+        user_groups = get_user_partition_groups(
             usage_info.course_key, user_partitions, usage_info.user
         )
         group_access_filter = block_structure.create_removal_filter(
@@ -236,7 +236,7 @@ class _MergedGroupAccess(object):
         return True
 
 
-def _get_user_partition_groups(course_key, user_partitions, user):
+def get_user_partition_groups(course_key, user_partitions, user):
     """
     Collect group ID for each partition in this course for this user.
 
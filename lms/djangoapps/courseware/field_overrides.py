@@ -19,6 +19,7 @@ from contextlib import contextmanager
 import threading
 
 from django.conf import settings
+import dogstats_wrapper as dog_stats_api
 from xblock.field_data import FieldData
 
 from request_cache.middleware import RequestCache
@@ -29,6 +30,16 @@ NOTSET = object()
 ENABLED_OVERRIDE_PROVIDERS_KEY = u'courseware.field_overrides.enabled_providers.{course_id}'
 ENABLED_MODULESTORE_OVERRIDE_PROVIDERS_KEY = u'courseware.modulestore_field_overrides.enabled_providers.{course_id}'
 
+# Name of the request cache holding the overrides resolved by providers.
+RESOLVED_OVERRIDES_CACHE = 'courseware.field_overrides.resolved'
+
+# Metric counting the lookups of resolved overrides, tagged as hits or misses.
+# Lookups are very frequent, so only a sample of them is reported.
+RESOLVED_OVERRIDES_METRIC = 'courseware.field_overrides.resolved'
+RESOLVED_OVERRIDES_METRIC_SAMPLE_RATE = 0.01
+
+INHERITABLE_FIELDS = frozenset(InheritanceMixin.fields)
+
 
 def resolve_dotted(name):
     """
@@ -49,17 +60,6 @@ def resolve_dotted(name):
     return target
 
 
-def _lineage(block):
-    """
-    Returns an iterator over all ancestors of the given block, starting with
-    its immediate parent and ending at the root of the block tree.
-    """
-    parent = block.get_parent()
-    while parent:
-        yield parent
-        parent = parent.get_parent()
-
-
 class _OverridesDisabled(threading.local):
     """
     A thread local used to manage state of overrides being disabled or not.
@@ -90,6 +90,14 @@ def overrides_disabled():
     return bool(_OVERRIDES_DISABLED.disabled)
 
 
+def clear_resolved_overrides():
+    """
+    Forgets the overrides resolved so far in the current request.  Must be
+    called by the APIs of providers when they change overrides.
+    """
+    RequestCache.get_request_cache().data.pop(RESOLVED_OVERRIDES_CACHE, None)
+
+
 class FieldOverrideProvider(object):
     """
     Abstract class which defines the interface that a `FieldOverrideProvider`
@@ -198,19 +206,89 @@ class OverrideFieldData(FieldData):
     def __init__(self, user, fallback, providers):
         self.fallback = fallback
         self.providers = tuple(provider(user) for provider in providers)
+        # The overrides resolved by the same providers for the same user are
+        # shared by the field data of all blocks during a request.
+        self._user_id = getattr(user, 'id', None)
+        self._providers_key = tuple(providers)
 
     def get_override(self, block, name):
         """
         Checks for an override for the field identified by `name` in `block`.
         Returns the overridden value or `NOTSET` if no override is found.
         """
-        if not overrides_disabled():
-            for provider in self.providers:
-                value = provider.get(block, name, NOTSET)
-                if value is not NOTSET:
-                    return value
+        if overrides_disabled():
+            return NOTSET
+        return self._resolve(('own', block.location, name), self._get_override, block, name)
+
+    def _get_override(self, block, name):
+        """
+        Asks each provider for an override for the field identified by `name`
+        in `block`.  Returns the overridden value or `NOTSET`.
+        """
+        for provider in self.providers:
+            value = provider.get(block, name, NOTSET)
+            if value is not NOTSET:
+                return value
         return NOTSET
 
+    def get_inherited_override(self, block, name):
+        """
+        Checks for an override for the inheritable field identified by `name`
+        in the closest ancestor of `block` which has one.  Returns the
+        overridden value or `NOTSET` if no ancestor has an override.
+        """
+        if overrides_disabled():
+            return NOTSET
+        return self._resolve(('inherited', block.location, name), self._get_inherited_override, block, name)
+
+    def _get_inherited_override(self, block, name):
+        """
+        Resolves the override inherited by `block` from its parent, which is
+        resolved in turn only once per request.
+        """
+        parent = block.get_parent()
+        if parent is None:
+            return NOTSET
+        value = self.get_override(parent, name)
+        if value is NOTSET:
+            value = self.get_inherited_override(parent, name)
+        return value
+
+    def _resolve(self, key, resolve, block, name):
+        """
+        Returns the override cached with the given key in the current request,
+        resolving it with `resolve(block, name)` if it isn't cached.  Missing
+        overrides are cached as `NOTSET`, and the overrides of the previous
+        user are dropped when the user changes.
+        """
+        resolved_overrides_cache = RequestCache.get_request_cache(RESOLVED_OVERRIDES_CACHE)
+        user_overrides = resolved_overrides_cache.get(self._user_id)
+        if user_overrides is None:
+            # The user changed: only the overrides of the current user, and
+            # the user-independent ones, are kept, so that tasks going through
+            # the blocks of many users in turn don't accumulate the overrides
+            # of all of them.
+            for user_id in resolved_overrides_cache.keys():
+                if user_id is not None:
+                    del resolved_overrides_cache[user_id]
+            user_overrides = resolved_overrides_cache[self._user_id] = {}
+        resolved_overrides = user_overrides.get(self._providers_key)
+        if resolved_overrides is None:
+            resolved_overrides = user_overrides[self._providers_key] = {}
+        try:
+            value = resolved_overrides[key]
+        except KeyError:
+            value = resolved_overrides[key] = resolve(block, name)
+            result = 'miss'
+        else:
+            result = 'hit'
+        dog_stats_api.increment(
+            RESOLVED_OVERRIDES_METRIC,
+            tags=[u'result:{}'.format(result)],
+            sample_rate=RESOLVED_OVERRIDES_METRIC_SAMPLE_RATE,
+        )
+        return value
+
     def get(self, block, name):
         value = self.get_override(block, name)
         if value is not NOTSET:
@@ -232,11 +310,8 @@ class OverrideFieldData(FieldData):
             # If this is an inheritable field and an override is set above,
             # then we want to return False here, so the field_data uses the
             # override and not the original value for this block.
-            inheritable = InheritanceMixin.fields.keys()
-            if name in inheritable:
-                for ancestor in _lineage(block):
-                    if self.get_override(ancestor, name) is not NOTSET:
-                        return False
+            if name in INHERITABLE_FIELDS and self.get_inherited_override(block, name) is not NOTSET:
+                return False
 
         return has is not NOTSET or self.fallback.has(block, name)
 
@@ -246,13 +321,10 @@ class OverrideFieldData(FieldData):
     def default(self, block, name):
         # The `default` method is overloaded by the field storage system to
         # also handle inheritance.
-        if self.providers and not overrides_disabled():
-            inheritable = InheritanceMixin.fields.keys()
-            if name in inheritable:
-                for ancestor in _lineage(block):
-                    value = self.get_override(ancestor, name)
-                    if value is not NOTSET:
-                        return value
+        if self.providers and name in INHERITABLE_FIELDS:
+            value = self.get_inherited_override(block, name)
+            if value is not NOTSET:
+                return value
         return self.fallback.default(block, name)
 
 
@@ -956,15 +956,17 @@ class ScoresClient(object):
             course_id=self.course_key,
             module_state_key__in=set(locations),
         )
+        for location, correct, total in scores_qset.values_list('module_state_key', 'grade', 'max_grade'):
+            self._add_score(location, correct, total)
+        self._has_fetched = True
+
+    def _add_score(self, location, correct, total):
+        """Add a fetched score to our lookup."""
         # Locations in StudentModule don't necessarily have course key info
         # attached to them (since old mongo identifiers don't include runs).
         # So we have to add that info back in before we put it into our lookup.
-        self._locations_to_scores.update({
-            UsageKey.from_string(location).map_into_course(self.course_key): self.Score(correct, total)
-            for location, correct, total
-            in scores_qset.values_list('module_state_key', 'grade', 'max_grade')
-        })
-        self._has_fetched = True
+        location = UsageKey.from_string(location).map_into_course(self.course_key)
+        self._locations_to_scores[location] = self.Score(correct, total)
 
     def get(self, location):
         """
@@ -988,6 +990,26 @@ class ScoresClient(object):
         client.fetch_scores(scorable_locations)
         return client
 
+    @classmethod
+    def create_for_users(cls, course_id, user_ids, scorable_locations):
+        """
+        Create a dict of user ids to ScoresClients with pre-fetched data for
+        the given locations, fetching the scores of all users in one query.
+        """
+        clients = {user_id: cls(course_id, user_id) for user_id in user_ids}
+        scores_qset = StudentModule.objects.filter(
+            student_id__in=clients.keys(),
+            course_id=course_id,
+            module_state_key__in=set(scorable_locations),
+        )
+        for user_id, location, correct, total in scores_qset.values_list(
+                'student_id', 'module_state_key', 'grade', 'max_grade'
+        ):
+            clients[user_id]._add_score(location, correct, total)  # pylint: disable=protected-access
+        for client in clients.itervalues():
+            client._has_fetched = True  # pylint: disable=protected-access
+        return clients
+
 
 # @contract(user_id=int, usage_key=UsageKey, score="number|None", max_score="number|None")
 def set_score(user_id, usage_key, score, max_score):
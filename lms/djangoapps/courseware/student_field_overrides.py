@@ -4,10 +4,24 @@ by the individual due dates feature.
 """
 import json
 
-from .field_overrides import FieldOverrideProvider
+from django.core.cache import cache
+from django.db.models.signals import post_save
+from django.dispatch import receiver
+
+import request_cache
+
+from .field_overrides import FieldOverrideProvider, clear_resolved_overrides
 from .models import StudentFieldOverride
 
 
+# Whether a course has any individual student overrides is cached for this
+# many seconds.  Courses without overrides are only cached briefly, in case a
+# concurrent save of their first override isn't seen by the cache.
+HAS_OVERRIDES_CACHE_KEY = u'courseware.student_field_overrides.has_overrides.{}'
+HAS_OVERRIDES_CACHE_TIMEOUT = 24 * 60 * 60
+NO_OVERRIDES_CACHE_TIMEOUT = 5 * 60
+
+
 class IndividualStudentOverrideProvider(FieldOverrideProvider):
     """
     A concrete implementation of
@@ -29,13 +43,7 @@ def get_override_for_user(user, block, name, default=None):
     specify the block and the name of the field.  If the field is not
     overridden for the given user, returns `default`.
     """
-    if not hasattr(block, '_student_overrides'):
-        block._student_overrides = {}  # pylint: disable=protected-access
-    overrides = block._student_overrides.get(user.id)  # pylint: disable=protected-access
-    if overrides is None:
-        overrides = _get_overrides_for_user(user, block)
-        block._student_overrides[user.id] = overrides  # pylint: disable=protected-access
-    return overrides.get(name, default)
+    return _get_overrides_for_user(user, block).get(name, default)
 
 
 def _get_overrides_for_user(user, block):
@@ -43,17 +51,86 @@ def _get_overrides_for_user(user, block):
     Gets all of the individual student overrides for given user and block.
     Returns a dictionary of field override values keyed by field name.
     """
-    query = StudentFieldOverride.objects.filter(
-        course_id=block.runtime.course_id,
-        location=block.location,
-        student_id=user.id,
-    )
-    overrides = {}
-    for override in query:
-        field = block.fields[override.field]
-        value = field.from_json(json.loads(override.value))
-        overrides[override.field] = value
-    return overrides
+    serialized_overrides, overrides = _get_course_overrides_for_user(user, block.runtime.course_id)
+    block_key = _block_key(block.location)
+    if block_key not in overrides:
+        overrides[block_key] = {
+            name: block.fields[name].from_json(value)
+            for name, value in serialized_overrides.get(block_key, {}).iteritems()
+        }
+    return overrides[block_key]
+
+
+def _get_course_overrides_for_user(user, course_key):
+    """
+    Gets all of the individual student overrides for given user in the given
+    course, with a single query, cached for the rest of the request.
+
+    Returns a pair of dictionaries keyed by the block keys of the overridden
+    blocks (see `_block_key`): the first one maps to dictionaries of
+    serialized field override values keyed by field name, and the second one
+    is filled with the deserialized values of each block as it is accessed.
+    """
+    overrides_cache = request_cache.get_cache('student-field-overrides')
+    cache_key = (user.id, course_key)
+    if cache_key not in overrides_cache:
+        serialized_overrides = {}
+        if _course_has_overrides(course_key):
+            query = StudentFieldOverride.objects.filter(
+                course_id=course_key,
+                student_id=user.id,
+            )
+            for override in query:
+                block_overrides = serialized_overrides.setdefault(_block_key(override.location), {})
+                block_overrides[override.field] = json.loads(override.value)
+        overrides_cache[cache_key] = (serialized_overrides, {})
+    return overrides_cache[cache_key]
+
+
+def _course_has_overrides(course_key):
+    """
+    Returns whether any individual student override was ever made in the
+    given course.  Most courses have none, so the answer is cached.
+
+    The answer is only added to the cache, so that it never replaces the one
+    cached when an override is saved, which may be more recent than the query.
+    """
+    cache_key = HAS_OVERRIDES_CACHE_KEY.format(course_key)
+    has_overrides = cache.get(cache_key)
+    if has_overrides is None:
+        has_overrides = StudentFieldOverride.objects.filter(course_id=course_key).exists()
+        cache.add(
+            cache_key,
+            has_overrides,
+            HAS_OVERRIDES_CACHE_TIMEOUT if has_overrides else NO_OVERRIDES_CACHE_TIMEOUT,
+        )
+    return has_overrides
+
+
+def _block_key(location):
+    """
+    Returns the key of the block with the given location in the overrides of
+    its course, which doesn't depend on how the course run, branch or version
+    are represented in the location.
+    """
+    return location.block_type, location.block_id
+
+
+def _clear_cached_overrides(user, course_key):
+    """
+    Clears the individual student overrides of the user in the given course,
+    and the overrides resolved from them, from the request cache.
+    """
+    request_cache.get_cache('student-field-overrides').pop((user.id, course_key), None)
+    clear_resolved_overrides()
+
+
+@receiver(post_save, sender=StudentFieldOverride)
+def _course_has_overrides_changed(sender, instance, **kwargs):  # pylint: disable=unused-argument
+    """
+    Records that the course of a saved override has overrides.
+    """
+    cache.set(HAS_OVERRIDES_CACHE_KEY.format(instance.course_id), True, HAS_OVERRIDES_CACHE_TIMEOUT)
 
 
 def override_field_for_user(user, block, name, value):
@@ -70,6 +147,7 @@ def override_field_for_user(user, block, name, value):
     field = block.fields[name]
     override.value = json.dumps(field.to_json(value))
     override.save()
+    _clear_cached_overrides(user, block.runtime.course_id)
 
 
 def clear_override_for_user(user, block, name):
@@ -87,3 +165,4 @@ def clear_override_for_user(user, block, name):
             field=name).delete()
     except StudentFieldOverride.DoesNotExist:
         pass
+    _clear_cached_overrides(user, block.runtime.course_id)
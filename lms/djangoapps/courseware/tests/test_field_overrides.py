@@ -3,14 +3,18 @@ Tests for `field_overrides` module.
 """
 # pylint: disable=missing-docstring
 import unittest
+from mock import Mock
 from nose.plugins.attrib import attr
 
 from django.test.utils import override_settings
+from request_cache.middleware import RequestCache
 from xblock.field_data import DictFieldData
 from xmodule.modulestore.tests.factories import CourseFactory
 from xmodule.modulestore.tests.django_utils import SharedModuleStoreTestCase
 
 from ..field_overrides import (
+    RESOLVED_OVERRIDES_CACHE,
+    clear_resolved_overrides,
     resolve_dotted,
     disable_overrides,
     FieldOverrideProvider,
@@ -23,6 +27,21 @@ from ..testutils import FieldOverrideTestMixin
 TESTUSER = "testuser"
 
 
+class TestBlock(object):
+    """
+    A block with a location and a parent, for testing.
+    """
+    def __init__(self, location, parent=None):
+        self.location = location
+        self.parent = parent
+
+    def get_parent(self):
+        return self.parent
+
+
+BLOCK = TestBlock('block')
+
+
 class TestOverrideProvider(FieldOverrideProvider):
     """
     A concrete implementation of `FieldOverrideProvider` for testing.
@@ -31,7 +50,7 @@ class TestOverrideProvider(FieldOverrideProvider):
         if self.user:
             assert self.user is TESTUSER
 
-        assert block == 'block'
+        assert block is BLOCK
 
         if name == 'foo':
             return 'fu'
@@ -80,44 +99,44 @@ class OverrideFieldDataTests(SharedModuleStoreTestCase):
 
     def test_get(self):
         data = self.make_one()
-        self.assertEqual(data.get('block', 'foo'), 'fu')
-        self.assertEqual(data.get('block', 'bees'), 'knees')
+        self.assertEqual(data.get(BLOCK, 'foo'), 'fu')
+        self.assertEqual(data.get(BLOCK, 'bees'), 'knees')
         with disable_overrides():
-            self.assertEqual(data.get('block', 'foo'), 'bar')
+            self.assertEqual(data.get(BLOCK, 'foo'), 'bar')
 
     def test_set(self):
         data = self.make_one()
-        data.set('block', 'foo', 'yowza')
-        self.assertEqual(data.get('block', 'foo'), 'fu')
+        data.set(BLOCK, 'foo', 'yowza')
+        self.assertEqual(data.get(BLOCK, 'foo'), 'fu')
         with disable_overrides():
-            self.assertEqual(data.get('block', 'foo'), 'yowza')
+            self.assertEqual(data.get(BLOCK, 'foo'), 'yowza')
 
     def test_delete(self):
         data = self.make_one()
-        data.delete('block', 'foo')
-        self.assertEqual(data.get('block', 'foo'), 'fu')
+        data.delete(BLOCK, 'foo')
+        self.assertEqual(data.get(BLOCK, 'foo'), 'fu')
         with disable_overrides():
             # Since field_data is responsible for attribute access, you'd
             # expect it to raise AttributeError. In fact, it raises KeyError,
             # so we check for that.
             with self.assertRaises(KeyError):
-                data.get('block', 'foo')
+                data.get(BLOCK, 'foo')
 
     def test_has(self):
         data = self.make_one()
-        self.assertTrue(data.has('block', 'foo'))
-        self.assertTrue(data.has('block', 'bees'))
-        self.assertTrue(data.has('block', 'oh'))
+        self.assertTrue(data.has(BLOCK, 'foo'))
+        self.assertTrue(data.has(BLOCK, 'bees'))
+        self.assertTrue(data.has(BLOCK, 'oh'))
         with disable_overrides():
-            self.assertFalse(data.has('block', 'oh'))
+            self.assertFalse(data.has(BLOCK, 'oh'))
 
     def test_many(self):
         data = self.make_one()
-        data.set_many('block', {'foo': 'baz', 'ah': 'ic'})
-        self.assertEqual(data.get('block', 'foo'), 'fu')
-        self.assertEqual(data.get('block', 'ah'), 'ic')
+        data.set_many(BLOCK, {'foo': 'baz', 'ah': 'ic'})
+        self.assertEqual(data.get(BLOCK, 'foo'), 'fu')
+        self.assertEqual(data.get(BLOCK, 'ah'), 'ic')
         with disable_overrides():
-            self.assertEqual(data.get('block', 'foo'), 'baz')
+            self.assertEqual(data.get(BLOCK, 'foo'), 'baz')
 
     @override_settings(FIELD_OVERRIDE_PROVIDERS=())
     def test_no_overrides_configured(self):
@@ -125,6 +144,99 @@ class OverrideFieldDataTests(SharedModuleStoreTestCase):
         self.assertIsInstance(data, DictFieldData)
 
 
+class TestInheritedOverrideProvider(FieldOverrideProvider):
+    """
+    A concrete implementation of `FieldOverrideProvider` which overrides the
+    due date of the block named 'parent', and records all its lookups.
+    """
+    lookups = []
+
+    def get(self, block, name, default):
+        self.lookups.append((block.location, name))
+        if block.location == 'parent' and name == 'due':
+            return 'tomorrow'
+        return default
+
+    @classmethod
+    def enabled_for(cls, course):
+        return True
+
+
+@attr('shard_1')
+@override_settings(FIELD_OVERRIDE_PROVIDERS=(
+    'courseware.tests.test_field_overrides.TestInheritedOverrideProvider',))
+class ResolvedOverridesTests(SharedModuleStoreTestCase):
+    """
+    Tests for the resolution of overrides by `OverrideFieldData`.
+    """
+
+    @classmethod
+    def setUpClass(cls):
+        super(ResolvedOverridesTests, cls).setUpClass()
+        cls.course = CourseFactory.create(enable_ccx=True)
+
+    def setUp(self):
+        super(ResolvedOverridesTests, self).setUp()
+        OverrideFieldData.provider_classes = None
+        TestInheritedOverrideProvider.lookups = []
+
+        root = TestBlock('root')
+        parent = TestBlock('parent', root)
+        self.children = [TestBlock('child{}'.format(index), parent) for index in range(3)]
+        self.data = OverrideFieldData.wrap(TESTUSER, self.course, DictFieldData({}))
+
+    def tearDown(self):
+        super(ResolvedOverridesTests, self).tearDown()
+        OverrideFieldData.provider_classes = None
+
+    def test_inherited_override(self):
+        for child in self.children:
+            self.assertEqual(self.data.default(child, 'due'), 'tomorrow')
+            self.assertFalse(self.data.has(child, 'due'))
+        with disable_overrides():
+            self.assertFalse(self.data.has(self.children[0], 'start'))
+
+    def test_each_override_resolved_once(self):
+        for __ in range(2):
+            for child in self.children:
+                self.data.default(child, 'due')
+                self.data.has(child, 'due')
+                self.data.has(child, 'start')
+        lookups = TestInheritedOverrideProvider.lookups
+        self.assertEqual(len(lookups), len(set(lookups)))
+        self.assertIn(('root', 'start'), lookups)
+        self.assertNotIn(('root', 'due'), lookups)
+
+        # Another field data for the same user shares the resolved overrides.
+        data = OverrideFieldData.wrap(TESTUSER, self.course, DictFieldData({}))
+        self.assertEqual(data.default(self.children[0], 'due'), 'tomorrow')
+        self.assertEqual(len(TestInheritedOverrideProvider.lookups), len(lookups))
+
+    def test_clear_resolved_overrides(self):
+        self.data.default(self.children[0], 'due')
+        num_lookups = len(TestInheritedOverrideProvider.lookups)
+        clear_resolved_overrides()
+        self.data.default(self.children[0], 'due')
+        self.assertEqual(len(TestInheritedOverrideProvider.lookups), 2 * num_lookups)
+
+    def test_only_current_user_overrides_kept(self):
+        for user_id in (1, 2):
+            data = OverrideFieldData.wrap(Mock(id=user_id), self.course, DictFieldData({}))
+            self.assertEqual(data.default(self.children[0], 'due'), 'tomorrow')
+        resolved_overrides_cache = RequestCache.get_request_cache(RESOLVED_OVERRIDES_CACHE)
+        self.assertEqual(resolved_overrides_cache.keys(), [2])
+
+    def test_user_independent_overrides_kept(self):
+        user_data = OverrideFieldData.wrap(Mock(id=1), self.course, DictFieldData({}))
+        data = OverrideFieldData.wrap(None, self.course, DictFieldData({}))
+        for __ in range(2):
+            user_data.default(self.children[0], 'due')
+            data.default(self.children[0], 'due')
+        # The overrides are resolved once for the user and once without one.
+        lookups = TestInheritedOverrideProvider.lookups
+        self.assertEqual(len(lookups), 2 * len(set(lookups)))
+
+
 @attr('shard_1')
 @override_settings(
     MODULESTORE_FIELD_OVERRIDE_PROVIDERS=['courseware.tests.test_field_overrides.TestOverrideProvider']
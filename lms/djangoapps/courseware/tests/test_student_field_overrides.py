@@ -0,0 +1,113 @@
+"""
+Tests for `student_field_overrides` module.
+"""
+# pylint: disable=missing-docstring
+import datetime
+
+from django.core.cache import cache
+from mock import patch
+from nose.plugins.attrib import attr
+from pytz import UTC
+from request_cache.middleware import RequestCache
+
+from student.tests.factories import UserFactory
+from xmodule.modulestore.tests.django_utils import SharedModuleStoreTestCase
+from xmodule.modulestore.tests.factories import CourseFactory, ItemFactory
+
+from ..student_field_overrides import (
+    HAS_OVERRIDES_CACHE_KEY,
+    IndividualStudentOverrideProvider,
+    _course_has_overrides,
+    clear_override_for_user,
+    override_field_for_user,
+)
+
+
+DUE = datetime.datetime(2010, 5, 12, 2, 42, tzinfo=UTC)
+EXTENDED = datetime.datetime(2013, 12, 25, 0, 0, tzinfo=UTC)
+
+
+@attr('shard_1')
+class IndividualStudentOverrideProviderTests(SharedModuleStoreTestCase):
+    """
+    Tests for `IndividualStudentOverrideProvider`.
+    """
+    ENABLED_CACHES = ['default']
+
+    @classmethod
+    def setUpClass(cls):
+        """
+        A course with 4 chapters of 5 sequentials of 5 verticals is shared by
+        all the class's tests.
+        """
+        super(IndividualStudentOverrideProviderTests, cls).setUpClass()
+        cls.course = CourseFactory.create()
+        with cls.store.bulk_operations(cls.course.id):
+            for __ in xrange(4):
+                chapter = ItemFactory.create(parent=cls.course, category='chapter')
+                for __ in xrange(5):
+                    sequential = ItemFactory.create(parent=chapter, category='sequential', due=DUE)
+                    for __ in xrange(5):
+                        ItemFactory.create(parent=sequential, category='vertical')
+        cls.blocks = cls.store.get_items(cls.course.id)
+        cls.sequentials = [block for block in cls.blocks if block.category == 'sequential']
+
+    def setUp(self):
+        super(IndividualStudentOverrideProviderTests, self).setUp()
+        self.user = UserFactory.create()
+        self.provider = IndividualStudentOverrideProvider(self.user)
+
+    def get_all_due_dates(self):
+        """
+        Returns the overridden due date of every block of the course, as
+        done at the start of a request.
+        """
+        RequestCache.clear_request_cache()
+        return [self.provider.get(block, 'due', None) for block in self.blocks]
+
+    def test_get(self):
+        override_field_for_user(self.user, self.sequentials[0], 'due', EXTENDED)
+        self.assertEqual(self.provider.get(self.sequentials[0], 'due', DUE), EXTENDED)
+        self.assertEqual(self.provider.get(self.sequentials[1], 'due', DUE), DUE)
+
+        clear_override_for_user(self.user, self.sequentials[0], 'due')
+        self.assertEqual(self.provider.get(self.sequentials[0], 'due', DUE), DUE)
+
+    def test_other_users(self):
+        override_field_for_user(UserFactory.create(), self.sequentials[0], 'due', EXTENDED)
+        self.assertIsNone(self.provider.get(self.sequentials[0], 'due', None))
+
+    def test_num_queries(self):
+        for sequential in self.sequentials[:10]:
+            override_field_for_user(self.user, sequential, 'due', EXTENDED)
+        cache.delete(HAS_OVERRIDES_CACHE_KEY.format(self.course.id))
+
+        # Whether the course has overrides, and the overrides of the user.
+        with self.assertNumQueries(2):
+            due_dates = self.get_all_due_dates()
+        self.assertEqual(due_dates.count(EXTENDED), 10)
+        self.assertEqual(len(due_dates) - due_dates.count(None), 10)
+
+        with self.assertNumQueries(1):
+            self.get_all_due_dates()
+
+    def test_num_queries_without_overrides(self):
+        cache.delete(HAS_OVERRIDES_CACHE_KEY.format(self.course.id))
+
+        with self.assertNumQueries(1):
+            self.assertEqual(set(self.get_all_due_dates()), {None})
+
+        with self.assertNumQueries(0):
+            self.get_all_due_dates()
+
+    def test_saved_override_not_hidden_by_concurrent_read(self):
+        cache_key = HAS_OVERRIDES_CACHE_KEY.format(self.course.id)
+        cache.delete(cache_key)
+        # The override is saved while another request is reading that the
+        # course has none, and then caches its answer.
+        with patch.object(cache, 'get', return_value=None):
+            override_field_for_user(self.user, self.sequentials[0], 'due', EXTENDED)
+            with patch('courseware.student_field_overrides.StudentFieldOverride.objects.filter') as mock_filter:
+                mock_filter.return_value.exists.return_value = False
+                self.assertFalse(_course_has_overrides(self.course.id))
+        self.assertTrue(cache.get(cache_key))
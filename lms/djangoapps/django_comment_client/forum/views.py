@@ -2,7 +2,7 @@
 Views handling read (GET) requests for the Discussion tab and inline discussions.
 """
 
-from functools import wraps
+from functools import partial, wraps
 import json
 import logging
 
@@ -86,8 +86,14 @@ def make_course_settings(course, user):
 
 
 @newrelic.agent.function_trace()
-def get_threads(request, course, discussion_id=None, per_page=THREADS_PER_PAGE):
+def get_threads(request, course, discussion_id=None, per_page=THREADS_PER_PAGE, user_info=None):
     """
+    Returns the threads and the query params of the search, along with the
+    info of the requesting user in the comments service, which is retrieved
+    unless given as `user_info`.
+
+    The independent requests to the comments service are sent concurrently.
+
     This may raise an appropriate subclass of cc.utils.CommentClientError
     if something goes wrong, or ValueError if the group_id is invalid.
     """
@@ -111,17 +117,14 @@ def get_threads(request, course, discussion_id=None, per_page=THREADS_PER_PAGE):
         if get_team(discussion_id) is not None:
             default_query_params['context'] = ThreadContext.STANDALONE
 
-    if not request.GET.get('sort_key'):
+    cc_user = cc.User.from_django_user(request.user)
+    sort_key = request.GET.get('sort_key')
+    if not sort_key:
         # If the user did not select a sort key, use their last used sort key
-        cc_user = cc.User.from_django_user(request.user)
-        cc_user.retrieve()
+        if user_info is None:
+            user_info = cc_user.to_dict()
         # TODO: After the comment service is updated this can just be user.default_sort_key because the service returns the default value
-        default_query_params['sort_key'] = cc_user.get('default_sort_key') or default_query_params['sort_key']
-    else:
-        # If the user clicked a sort key, update their default sort key
-        cc_user = cc.User.from_django_user(request.user)
-        cc_user.default_sort_key = request.GET.get('sort_key')
-        cc_user.save()
+        default_query_params['sort_key'] = user_info.get('default_sort_key') or default_query_params['sort_key']
 
     #there are 2 dimensions to consider when executing a search with respect to group id
     #is user a moderator
@@ -146,7 +149,19 @@ def get_threads(request, course, discussion_id=None, per_page=THREADS_PER_PAGE):
         )
     )
 
-    paginated_results = cc.Thread.search(query_params)
+    # The threads are searched while the user is retrieved and updated.
+    calls = [partial(cc.Thread.search, query_params)]
+    if user_info is None:
+        calls.append(cc_user.to_dict)
+    if sort_key:
+        # If the user clicked a sort key, update their default sort key
+        updated_cc_user = cc.User.from_django_user(request.user)
+        updated_cc_user.default_sort_key = sort_key
+        calls.append(updated_cc_user.save)
+    results = cc.utils.perform_concurrently(*calls)
+    paginated_results = results[0]
+    if user_info is None:
+        user_info = results[1]
     threads = paginated_results.collection
 
     # If not provided with a discussion id, filter threads by commentable ids
@@ -167,7 +182,7 @@ def get_threads(request, course, discussion_id=None, per_page=THREADS_PER_PAGE):
     query_params['num_pages'] = paginated_results.num_pages
     query_params['corrected_text'] = paginated_results.corrected_text
 
-    return threads, query_params
+    return threads, query_params, user_info
 
 
 def use_bulk_ops(view_func):
@@ -193,11 +208,11 @@ def inline_discussion(request, course_key, discussion_id):
     nr_transaction = newrelic.agent.current_transaction()
 
     course = get_course_with_access(request.user, 'load', course_key, check_if_enrolled=True)
-    cc_user = cc.User.from_django_user(request.user)
-    user_info = cc_user.to_dict()
 
     try:
-        threads, query_params = get_threads(request, course, discussion_id, per_page=INLINE_THREADS_PER_PAGE)
+        threads, query_params, user_info = get_threads(
+            request, course, discussion_id, per_page=INLINE_THREADS_PER_PAGE
+        )
     except ValueError:
         return HttpResponseBadRequest("Invalid group_id")
 
@@ -230,11 +245,9 @@ def forum_form_discussion(request, course_key):
     course = get_course_with_access(request.user, 'load', course_key, check_if_enrolled=True)
     course_settings = make_course_settings(course, request.user)
 
-    user = cc.User.from_django_user(request.user)
-    user_info = user.to_dict()
-
     try:
-        unsafethreads, query_params = get_threads(request, course)   # This might process a search query
+        # This might process a search query
+        unsafethreads, query_params, user_info = get_threads(request, course)
         is_staff = has_permission(request.user, 'openclose_thread', course.id)
         threads = [utils.prepare_content(thread, course_key, is_staff) for thread in unsafethreads]
     except cc.utils.CommentClientMaintenanceError:
@@ -283,7 +296,7 @@ def forum_form_discussion(request, course_key):
             'cohorts': course_settings["cohorts"],  # still needed to render _thread_list_template
             'user_cohort': user_cohort_id,  # read from container in NewPostView
             'is_course_cohorted': is_course_cohorted(course_key),  # still needed to render _thread_list_template
-            'sort_preference': user.default_sort_key,
+            'sort_preference': user_info.get('default_sort_key'),
             'category_map': course_settings["category_map"],
             'course_settings': json.dumps(course_settings),
             'disable_courseware_js': True,
@@ -305,19 +318,22 @@ def single_thread(request, course_key, discussion_id, thread_id):
     course = get_course_with_access(request.user, 'load', course_key, check_if_enrolled=True)
     course_settings = make_course_settings(course, request.user)
     cc_user = cc.User.from_django_user(request.user)
-    user_info = cc_user.to_dict()
     is_moderator = has_permission(request.user, "see_all_cohorts", course_key)
 
     # Currently, the front end always loads responses via AJAX, even for this
     # page; it would be a nice optimization to avoid that extra round trip to
     # the comments service.
-    try:
-        thread = cc.Thread.find(thread_id).retrieve(
+    def retrieve_thread():  # pylint: disable=missing-docstring
+        return cc.Thread.find(thread_id).retrieve(
             recursive=request.is_ajax(),
             user_id=request.user.id,
             response_skip=request.GET.get("resp_skip"),
             response_limit=request.GET.get("resp_limit")
         )
+
+    try:
+        # The user and the thread are fetched from the comments service at once.
+        user_info, thread = cc.utils.perform_concurrently(cc_user.to_dict, retrieve_thread)
     except cc.utils.CommentClientRequestError as e:
         if e.status_code == 404:
             raise Http404
@@ -353,7 +369,7 @@ def single_thread(request, course_key, discussion_id, thread_id):
 
     else:
         try:
-            threads, query_params = get_threads(request, course)
+            threads, query_params, __ = get_threads(request, course, user_info=user_info)
         except ValueError:
             return HttpResponseBadRequest("Invalid group_id")
         threads.append(thread.to_dict())
@@ -436,10 +452,13 @@ def user_profile(request, course_key, user_id):
         else:
             profiled_user = cc.User(id=user_id, course_id=course_key)
 
-        threads, page, num_pages = profiled_user.active_threads(query_params)
+        # The threads of the profiled user and the requesting user are fetched at once.
+        (threads, page, num_pages), user_info = cc.utils.perform_concurrently(
+            partial(profiled_user.active_threads, query_params),
+            cc.User.from_django_user(request.user).to_dict,
+        )
         query_params['page'] = page
         query_params['num_pages'] = num_pages
-        user_info = cc.User.from_django_user(request.user).to_dict()
 
         with newrelic.agent.FunctionTrace(nr_transaction, "get_metadata_for_threads"):
             annotated_content_info = utils.get_metadata_for_threads(course_key, threads, request.user, user_info)
@@ -517,12 +536,15 @@ def followed_threads(request, course_key, user_id):
         if group_id is not None:
             query_params['group_id'] = group_id
 
-        paginated_results = profiled_user.subscribed_threads(query_params)
+        # The subscriptions of the profiled user and the requesting user are fetched at once.
+        paginated_results, user_info = cc.utils.perform_concurrently(
+            partial(profiled_user.subscribed_threads, query_params),
+            cc.User.from_django_user(request.user).to_dict,
+        )
         print "\n \n \n paginated results \n \n \n "
         print paginated_results
         query_params['page'] = paginated_results.page
         query_params['num_pages'] = paginated_results.num_pages
-        user_info = cc.User.from_django_user(request.user).to_dict()
 
         with newrelic.agent.FunctionTrace(nr_transaction, "get_metadata_for_threads"):
             annotated_content_info = utils.get_metadata_for_threads(
@@ -0,0 +1,68 @@
+"""
+Test the behavior of the DiscussionTopicsTransformer
+"""
+import datetime
+
+from nose.plugins.attrib import attr
+import pytz
+
+from lms.djangoapps.course_blocks.api import get_course_blocks
+from lms.djangoapps.course_blocks.transformers.tests.helpers import CourseStructureTestCase
+from ..transformer import DiscussionTopicsTransformer
+
+
+CHAPTER_START = datetime.datetime(2030, 1, 1, tzinfo=pytz.utc)
+DISCUSSION_START = datetime.datetime(2015, 1, 1, tzinfo=pytz.utc)
+
+
+@attr('shard_1')
+class DiscussionTopicsTransformerTestCase(CourseStructureTestCase):
+    """
+    Verify behavior of the DiscussionTopicsTransformer
+    """
+    TRANSFORMER_CLASS_TO_TEST = DiscussionTopicsTransformer
+
+    def setUp(self):
+        super(DiscussionTopicsTransformerTestCase, self).setUp()
+        self.blocks = self.build_course([
+            {
+                u'org': u'DiscussionTestOrg',
+                u'course': u'DT101',
+                u'run': u'test_run',
+                u'#type': u'course',
+                u'#ref': u'course',
+                u'#children': [
+                    {
+                        u'start': CHAPTER_START,
+                        u'#type': u'chapter',
+                        u'#ref': u'chapter',
+                        u'#children': [
+                            {
+                                u'discussion_id': u'test_discussion_id',
+                                u'discussion_category': u'Chapter',
+                                u'discussion_target': u'Discussion',
+                                u'start': DISCUSSION_START,
+                                u'#type': u'discussion',
+                                u'#ref': u'discussion',
+                            }
+                        ]
+                    }
+                ]
+            }
+        ])
+
+    def test_topics_collected(self):
+        block_structure = get_course_blocks(self.user, self.blocks[u'course'].location, self.transformers)
+        discussion_key = self.blocks[u'discussion'].location
+
+        self.assertEqual(block_structure.get_xblock_field(discussion_key, u'discussion_id'), u'test_discussion_id')
+        self.assertEqual(block_structure.get_xblock_field(discussion_key, u'discussion_category'), u'Chapter')
+        self.assertEqual(block_structure.get_xblock_field(discussion_key, u'discussion_target'), u'Discussion')
+        self.assertIsNone(block_structure.get_xblock_field(discussion_key, u'sort_key'))
+        self.assertEqual(block_structure.get_xblock_field(discussion_key, u'start'), DISCUSSION_START)
+
+    def test_start_dates_collected(self):
+        block_structure = get_course_blocks(self.user, self.blocks[u'course'].location, self.transformers)
+
+        # The discussion isn't accessible before its chapter starts.
+        self.assertEqual(DiscussionTopicsTransformer.get_start_dates(block_structure), [(CHAPTER_START, None)])
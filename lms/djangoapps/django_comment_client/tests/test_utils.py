@@ -6,14 +6,17 @@ import mock
 from nose.plugins.attrib import attr
 from pytz import UTC
 from django.utils.timezone import UTC as django_utc
+from django.utils.translation import get_language, override
 
 from django.core.urlresolvers import reverse
 from django.test import TestCase, RequestFactory
 from edxmako import add_lookup
+from request_cache.middleware import RequestCache
 
 from django_comment_client.tests.factories import RoleFactory
 from django_comment_client.tests.unicode import UnicodeTestMixin
 import django_comment_client.utils as utils
+import lms.lib.comment_client as cc
 
 from courseware.tests.factories import InstructorFactory
 from courseware.tabs import get_course_tab_list
@@ -262,6 +265,13 @@ class CachedDiscussionIdMapTestCase(ModuleStoreTestCase):
         with self.assertRaises(utils.DiscussionIdMapIsNotCached):
             utils.get_cached_discussion_key(self.course, 'test_discussion_id')
 
+    def test_cache_is_shared_between_requests(self):
+        utils.get_cached_discussion_key(self.course, 'test_discussion_id')
+        RequestCache.clear_request_cache()
+        with self.assertNumQueries(0):
+            usage_key = utils.get_cached_discussion_key(self.course, 'test_discussion_id')
+        self.assertEqual(usage_key, self.discussion.location)
+
     def test_xblock_does_not_have_required_keys(self):
         self.assertTrue(utils.has_required_keys(self.discussion))
         self.assertFalse(utils.has_required_keys(self.bad_discussion))
@@ -638,6 +648,19 @@ class CategoryMapTestCase(CategoryMapTestMixin, ModuleStoreTestCase):
         set_course_cohort_settings(course_key=self.course.id, is_cohorted=True)
         check_cohorted(True)
 
+    def test_topics_shared_by_users_with_same_access(self):
+        self.create_discussion("Chapter 1", "Discussion 1")
+        utils.get_discussion_category_map(self.course, self.instructor)
+        RequestCache.clear_request_cache()
+
+        # Another instructor has the same access to the discussion xblocks, so
+        # gets the topics from the cache.
+        with mock.patch('django_comment_client.utils.get_course_blocks') as mock_get_course_blocks:
+            category_map = utils.get_discussion_category_map(self.course, InstructorFactory(course_key=self.course.id))
+        self.assertFalse(mock_get_course_blocks.called)
+        self.assertEqual(category_map["children"], ["Chapter 1"])
+        self.assertEqual(category_map["subcategories"]["Chapter 1"]["children"], ["Discussion 1"])
+
     def test_tree_with_duplicate_targets(self):
         self.create_discussion("Chapter 1", "Discussion A")
         self.create_discussion("Chapter 1", "Discussion B")
@@ -1418,3 +1441,42 @@ class PermissionsTestCase(ModuleStoreTestCase):
         # content has no known author
         del content['user_id']
         self.assertFalse(utils.is_content_authored_by(content, user))
+
+
+@attr('shard_1')
+class CommentClientRequestTestCase(TestCase):
+    """
+    Tests the pooled session and the concurrent requests of the comments
+    service client.
+    """
+    def setUp(self):
+        super(CommentClientRequestTestCase, self).setUp()
+        RequestCache.clear_request_cache()
+
+    def test_session(self):
+        session = cc.utils.get_session()
+        self.assertIs(cc.utils.get_session(), session)
+        with mock.patch('lms.lib.comment_client.utils._session_pid', None):
+            self.assertIsNot(cc.utils.get_session(), session)
+
+    @mock.patch('lms.lib.comment_client.utils.request', autospec=True)
+    def test_forums_config(self, mock_request):
+        mock_request.return_value = mock.Mock(status_code=200, text='{}', json=lambda: {})
+        cc.utils.perform_request('get', 'dummy_url')
+        with self.assertNumQueries(0):
+            cc.utils.perform_request('get', 'dummy_url')
+        mock_request.assert_called_with(
+            'get', 'dummy_url', data=None, params=mock.ANY, headers=mock.ANY, timeout=5.0
+        )
+
+    def test_perform_concurrently(self):
+        with override('eo'):
+            results = cc.utils.perform_concurrently(lambda: 1, get_language, lambda: 3)
+        self.assertEqual(results, [1, 'eo', 3])
+
+    def test_perform_concurrently_error(self):
+        def fail():  # pylint: disable=missing-docstring
+            raise cc.utils.CommentClientRequestError('Not found', 404)
+
+        with self.assertRaises(cc.utils.CommentClientRequestError):
+            cc.utils.perform_concurrently(lambda: 1, fail)
@@ -0,0 +1,83 @@
+"""
+Discussion Topics Transformer
+"""
+from openedx.core.lib.block_structure.transformer import BlockStructureTransformer
+from lms.djangoapps.course_blocks.transformers.utils import collect_merged_date_field
+from xmodule.course_metadata_utils import DEFAULT_START_DATE
+
+
+class DiscussionTopicsTransformer(BlockStructureTransformer):
+    """
+    The DiscussionTopicsTransformer collects the discussion topics of a
+    course, from its discussion xblocks, so that the discussion category
+    map is built without loading them.
+
+    No runtime transformations are performed.
+
+    The following values are stored as xblock_fields on their respective
+    blocks in the block structure:
+
+        discussion_id: (string)
+        discussion_category: (string)
+        discussion_target: (string)
+        sort_key: (string)
+        start: (datetime) when the discussion starts.
+
+    Additionally, the dates at which the discussion xblocks become
+    accessible are stored as transformer data, as a list of
+    (merged start date, days_early_for_beta) tuples.
+    """
+    VERSION = 1
+    FIELDS_TO_COLLECT = [u'discussion_id', u'discussion_category', u'discussion_target', u'sort_key', u'start']
+    MERGED_START_DATE = u'merged_start_date'
+    START_DATES = u'start_dates'
+
+    @classmethod
+    def name(cls):
+        """
+        Unique identifier for the transformer's class;
+        same identifier used in setup.py.
+        """
+        return u'discussion_topics'
+
+    @classmethod
+    def collect(cls, block_structure):
+        """
+        Collects any information that's necessary to execute this
+        transformer's transform method.
+        """
+        block_structure.request_xblock_fields(*cls.FIELDS_TO_COLLECT)
+
+        # Merged as by the StartDateTransformer, which checks access.
+        collect_merged_date_field(
+            block_structure,
+            transformer=cls,
+            xblock_field_name='start',
+            merged_field_name=cls.MERGED_START_DATE,
+            default_date=DEFAULT_START_DATE,
+            func_merge_parents=min,
+            func_merge_ancestors=max,
+        )
+        start_dates = [
+            (
+                block_structure.get_transformer_block_field(block_key, cls, cls.MERGED_START_DATE),
+                getattr(block_structure.get_xblock(block_key), 'days_early_for_beta', None),
+            )
+            for block_key in block_structure.topological_traversal()
+            if block_key.block_type == 'discussion'
+        ]
+        block_structure.set_transformer_data(cls, cls.START_DATES, start_dates)
+
+    def transform(self, usage_info, block_structure):
+        """
+        Perform no transformations.
+        """
+        pass
+
+    @classmethod
+    def get_start_dates(cls, block_structure):
+        """
+        Returns the (merged start date, days_early_for_beta) tuples of the
+        discussion xblocks collected in the given block_structure.
+        """
+        return block_structure.get_transformer_data(cls, cls.START_DATES, [])
@@ -5,7 +5,9 @@ import logging
 from django.conf import settings
 
 import pytz
+from ccx_keys.locator import CCXLocator
 from django.contrib.auth.models import User
+from django.core.cache import cache
 from django.core.urlresolvers import reverse
 from django.db import connection
 from django.http import HttpResponse
@@ -14,7 +16,16 @@ import pystache_custom as pystache
 from opaque_keys.edx.locations import i4xEncoder
 from opaque_keys.edx.keys import CourseKey
 from xmodule.modulestore.django import modulestore
+import request_cache
 from lms.djangoapps.ccx.overrides import get_current_ccx
+from lms.djangoapps.course_blocks.api import get_course_blocks
+from lms.djangoapps.course_blocks.transformers.start_date import StartDateTransformer
+from lms.djangoapps.course_blocks.transformers.user_partitions import (
+    UserPartitionTransformer, get_user_partition_groups
+)
+from lms.djangoapps.course_blocks.transformers.visibility import VisibilityTransformer
+from lms.djangoapps.django_comment_client.transformer import DiscussionTopicsTransformer
+from openedx.core.lib.block_structure.transformers import BlockStructureTransformers
 
 from django_comment_common.models import Role, FORUM_ROLE_STUDENT
 from django_comment_client.permissions import check_permissions_by_view, has_permission, get_team
@@ -23,15 +34,37 @@ from edxmako import lookup_template
 
 from courseware import courses
 from courseware.access import has_access
+from courseware.access_utils import adjust_start_date, in_preview_mode
+from courseware.masquerade import is_masquerading_as_student
 from openedx.core.djangoapps.content.course_structures.models import CourseStructure
 from openedx.core.djangoapps.course_groups.cohorts import (
     get_course_cohort_settings, get_cohort_by_id, get_cohort_id, is_course_cohorted
 )
 from openedx.core.djangoapps.course_groups.models import CourseUserGroup
+from student.roles import CourseBetaTesterRole
 
 
 log = logging.getLogger(__name__)
 
+# The transformers checking access to discussion xblocks, as has_access does,
+# and collecting their topics.
+DISCUSSION_BLOCK_TRANSFORMERS = [
+    StartDateTransformer(),
+    UserPartitionTransformer(),
+    VisibilityTransformer(),
+    DiscussionTopicsTransformer(),
+]
+
+# The discussion topics accessible to a user are shared in the cache with the
+# users having the same access to the discussion xblocks of the course, until
+# the course changes or one of them starts.  The version is part of the key,
+# and is to be bumped whenever the format of the cached topics changes.
+DISCUSSION_TOPICS_CACHE_VERSION = 1
+DISCUSSION_TOPICS_CACHE_KEY = (
+    u'django_comment_client.discussion_topics.v{version}.{course_id}.{content_version}.{access}'
+)
+DISCUSSION_TOPICS_CACHE_TIMEOUT = 60 * 60
+
 
 def extract(dic, keys):
     """
@@ -155,19 +188,124 @@ class DiscussionIdMapIsNotCached(Exception):
     pass
 
 
+def get_cached_discussion_keys(course, discussion_ids):
+    """
+    Returns a dict mapping each of the discussion_ids found in the cached discussion id map to the usage key of the
+    associated discussion xblock. If the discussion id map is not cached for course, raises a
+    DiscussionIdMapIsNotCached exception.
+    """
+    cached_mapping = CourseStructure.get_discussion_id_map(course.id)
+    if not cached_mapping:
+        raise DiscussionIdMapIsNotCached()
+    return {
+        discussion_id: cached_mapping[discussion_id]
+        for discussion_id in discussion_ids if discussion_id in cached_mapping
+    }
+
+
 def get_cached_discussion_key(course, discussion_id):
     """
     Returns the usage key of the discussion xblock associated with discussion_id if it is cached. If the discussion id
     map is cached but does not contain discussion_id, returns None. If the discussion id map is not cached for course,
     raises a DiscussionIdMapIsNotCached exception.
     """
-    try:
-        cached_mapping = CourseStructure.objects.get(course_id=course.id).discussion_id_map
-        if not cached_mapping:
-            raise DiscussionIdMapIsNotCached()
-        return cached_mapping.get(discussion_id)
-    except CourseStructure.DoesNotExist:
-        raise DiscussionIdMapIsNotCached()
+    return get_cached_discussion_keys(course, [discussion_id]).get(discussion_id)
+
+
+def get_accessible_course_blocks(course, user):
+    """
+    Returns the block structure of the course blocks accessible to the user, which is transformed once per request.
+    """
+    blocks_cache = request_cache.get_cache('django_comment_client.accessible_course_blocks')
+    cache_key = (user.id, course.id)
+    if cache_key not in blocks_cache:
+        blocks_cache[cache_key] = get_course_blocks(
+            user, course.location, BlockStructureTransformers(DISCUSSION_BLOCK_TRANSFORMERS)
+        )
+    return blocks_cache[cache_key]
+
+
+def get_accessible_discussion_topics(course, user):
+    """
+    Returns the topics of the valid discussion xblocks in this course that are accessible to the given user, as dicts
+    of the fields collected by the DiscussionTopicsTransformer.
+
+    The topics are shared through the cache with the users having the same access to the discussion xblocks.
+    """
+    access_key = _get_discussion_topics_access_key(course, user)
+    content_version = course.subtree_edited_on
+    if access_key is None or content_version is None:
+        return _get_discussion_topics(get_accessible_course_blocks(course, user))
+
+    cache_key = DISCUSSION_TOPICS_CACHE_KEY.format(
+        version=DISCUSSION_TOPICS_CACHE_VERSION,
+        course_id=course.id,
+        content_version=content_version.isoformat(),
+        access=access_key,
+    )
+    topics = cache.get(cache_key)
+    if topics is None:
+        blocks = get_accessible_course_blocks(course, user)
+        topics = _get_discussion_topics(blocks)
+        cache.set(cache_key, topics, _get_discussion_topics_timeout(course, user, blocks))
+    return topics
+
+
+def _get_discussion_topics(blocks):
+    """
+    Returns the topics of the discussion xblocks in the block structure which have the keys required by the
+    category map.
+    """
+    topics = []
+    for block_key in blocks.get_block_keys():
+        if block_key.block_type != 'discussion':
+            continue
+        topic = {
+            field_name: blocks.get_xblock_field(block_key, field_name)
+            for field_name in DiscussionTopicsTransformer.FIELDS_TO_COLLECT
+        }
+        if any(topic[key] is None for key in ('discussion_id', 'discussion_category', 'discussion_target')):
+            log.debug("Required keys not in discussion %s, leaving out of category map", block_key)
+            continue
+        topics.append(topic)
+    return topics
+
+
+def _get_discussion_topics_access_key(course, user):
+    """
+    Returns a key identifying the users having the same access to the discussion xblocks of the course as the given
+    user, or None if the access of the user can't be shared.
+    """
+    if isinstance(course.id, CCXLocator) or in_preview_mode() or is_masquerading_as_student(user, course.id):
+        return None
+    if has_access(user, 'staff', course):
+        return u'staff'
+    user_partitions = [partition for partition in course.user_partitions if partition.active]
+    user_groups = get_user_partition_groups(course.id, user_partitions, user)
+    return u'{beta}groups:{groups}'.format(
+        beta=u'beta.' if CourseBetaTesterRole(course.id).has_user(user) else u'',
+        groups=u','.join(
+            u'{}-{}'.format(partition_id, group.id) for partition_id, group in sorted(user_groups.items())
+        ),
+    )
+
+
+def _get_discussion_topics_timeout(course, user, blocks):
+    """
+    Returns the number of seconds the discussion topics accessible to the user can be cached: until the next of the
+    discussion xblocks starts for the user.
+    """
+    now = datetime.now(UTC())
+    upcoming_starts = [
+        start for start in (
+            adjust_start_date(user, days_early_for_beta, start, course.id)
+            for start, days_early_for_beta in DiscussionTopicsTransformer.get_start_dates(blocks)
+        )
+        if start > now
+    ]
+    if not upcoming_starts:
+        return DISCUSSION_TOPICS_CACHE_TIMEOUT
+    return min(DISCUSSION_TOPICS_CACHE_TIMEOUT, int((min(upcoming_starts) - now).total_seconds()) + 1)
 
 
 def get_cached_discussion_id_map(course, discussion_ids, user):
@@ -176,19 +314,22 @@ def get_cached_discussion_id_map(course, discussion_ids, user):
     user. If not, returns the result of get_discussion_id_map
     """
     try:
-        entries = []
-        for discussion_id in discussion_ids:
-            key = get_cached_discussion_key(course, discussion_id)
-            if not key:
-                continue
-            xblock = modulestore().get_item(key)
-            if not (has_required_keys(xblock) and has_access(user, 'load', xblock, course.id)):
-                continue
-            entries.append(get_discussion_id_map_entry(xblock))
-        return dict(entries)
+        keys = get_cached_discussion_keys(course, discussion_ids)
     except DiscussionIdMapIsNotCached:
         return get_discussion_id_map(course, user)
 
+    if not keys:
+        return {}
+    accessible_blocks = get_accessible_course_blocks(course, user)
+    entries = []
+    for key in keys.itervalues():
+        if key not in accessible_blocks:
+            continue
+        xblock = modulestore().get_item(key)
+        if has_required_keys(xblock):
+            entries.append(get_discussion_id_map_entry(xblock))
+    return dict(entries)
+
 
 def get_discussion_id_map(course, user):
     """
@@ -256,8 +397,8 @@ def _sort_map_entries(category_map, sort_alpha):
 
 def get_discussion_category_map(course, user, cohorted_if_in_list=False, exclude_unstarted=True):
     """
-    Transform the list of this course's discussion xblocks into a recursive dictionary structure.  This is used
-    to render the discussion category map in the discussion tab sidebar for a given user.
+    Transform the topics of this course's discussion xblocks accessible to a given user into a recursive dictionary
+    structure.  This is used to render the discussion category map in the discussion tab sidebar for a given user.
 
     Args:
         course: Course for which to get the ids.
@@ -301,17 +442,17 @@ def get_discussion_category_map(course, user, cohorted_if_in_list=False, exclude
     """
     unexpanded_category_map = defaultdict(list)
 
-    xblocks = get_accessible_discussion_xblocks(course, user)
+    topics = get_accessible_discussion_topics(course, user)
 
     course_cohort_settings = get_course_cohort_settings(course.id)
 
-    for xblock in xblocks:
-        discussion_id = xblock.discussion_id
-        title = xblock.discussion_target
-        sort_key = xblock.sort_key
-        category = " / ".join([x.strip() for x in xblock.discussion_category.split("/")])
-        # Handle case where xblock.start is None
-        entry_start_date = xblock.start if xblock.start else datetime.max.replace(tzinfo=pytz.UTC)
+    for topic in topics:
+        discussion_id = topic['discussion_id']
+        title = topic['discussion_target']
+        sort_key = topic['sort_key']
+        category = " / ".join([x.strip() for x in topic['discussion_category'].split("/")])
+        # Handle case where the start date is None
+        entry_start_date = topic['start'] if topic['start'] else datetime.max.replace(tzinfo=pytz.UTC)
         unexpanded_category_map[category].append({"title": title,
                                                   "id": discussion_id,
                                                   "sort_key": sort_key,
@@ -398,12 +539,12 @@ def discussion_category_id_access(course, user, discussion_id, xblock=None):
     if discussion_id in course.top_level_discussion_topic_ids:
         return True
     try:
-        if not xblock:
-            key = get_cached_discussion_key(course, discussion_id)
-            if not key:
-                return False
-            xblock = modulestore().get_item(key)
-        return has_required_keys(xblock) and has_access(user, 'load', xblock, course.id)
+        if xblock:
+            return has_required_keys(xblock) and has_access(user, 'load', xblock, course.id)
+        key = get_cached_discussion_key(course, discussion_id)
+        if not key or key not in get_accessible_course_blocks(course, user):
+            return False
+        return has_required_keys(modulestore().get_item(key))
     except DiscussionIdMapIsNotCached:
         return discussion_id in get_discussion_categories_ids(course, user)
 
@@ -419,9 +560,12 @@ def get_discussion_categories_ids(course, user, include_all=False):
         include_all (bool): If True, return all ids. Used by configuration views.
 
     """
-    accessible_discussion_ids = [
-        xblock.discussion_id for xblock in get_accessible_discussion_xblocks(course, user, include_all=include_all)
-    ]
+    if include_all:
+        accessible_discussion_ids = [
+            xblock.discussion_id for xblock in get_accessible_discussion_xblocks(course, user, include_all=True)
+        ]
+    else:
+        accessible_discussion_ids = [topic['discussion_id'] for topic in get_accessible_discussion_topics(course, user)]
     return course.top_level_discussion_topic_ids + accessible_discussion_ids
 
 
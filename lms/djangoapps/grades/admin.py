@@ -0,0 +1,10 @@
+"""
+Admin site bindings for grades.
+"""
+
+from django.contrib import admin
+
+from config_models.admin import ConfigurationModelAdmin
+from .models import PersistentGradesEnabledFlag
+
+admin.site.register(PersistentGradesEnabledFlag, ConfigurationModelAdmin)
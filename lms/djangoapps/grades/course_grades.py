@@ -4,6 +4,8 @@ Functionality for course-level grades.
 from logging import getLogger
 from django.conf import settings
 import dogstats_wrapper as dog_stats_api
+from itertools import islice
+from lazy import lazy
 import random
 
 from opaque_keys.edx.keys import CourseKey
@@ -16,15 +18,29 @@ from student.models import anonymous_id_for_user
 from util.db import outer_atomic
 from xmodule import graders, block_metadata_utils
 from xmodule.graders import Score
+from xmodule.modulestore.django import modulestore
+from xmodule.modulestore.exceptions import ItemNotFoundError
 
-from .context import grading_context
+from .context import grading_context, grading_context_for_course
+from .models import PersistentCourseGrade, PersistentGradesEnabledFlag, PersistentSubsectionGrade
 from .scores import get_score
+from .transformer import GradesTransformer
 
 
 log = getLogger(__name__)
 
 
-def iterate_grades_for(course_or_id, students, keep_raw_scores=False):
+# Number of students whose scores are fetched together by iterate_grades_for.
+GRADING_BATCH_SIZE = 100
+
+
+def iterate_grades_for(
+        course_or_id,
+        students,
+        keep_raw_scores=False,
+        batch_size=GRADING_BATCH_SIZE,
+        course_grading_context=None,
+):
     """Given a course_id and an iterable of students (User), yield a tuple of:
 
     (student, gradeset, err_msg) for every student enrolled in the course.
@@ -41,37 +57,86 @@ def iterate_grades_for(course_or_id, students, keep_raw_scores=False):
     - grade_breakdown : A breakdown of the major components that
         make up the final grade. (For display)
     - raw_scores: contains scores for every graded module
+
+    Students are graded in batches of batch_size: the courseware scores and
+    the submissions scores of every student in a batch are fetched with a
+    single query each.
+
+    Callers grading the students of a course with several calls may pass the
+    result of grading_context_for_course(course) as course_grading_context,
+    so that it is only computed once.
     """
     if isinstance(course_or_id, (basestring, CourseKey)):
         course = get_course_by_id(course_or_id)
     else:
         course = course_or_id
 
-    for student in students:
-        with dog_stats_api.timer('lms.grades.iterate_grades_for', tags=[u'action:{}'.format(course.id)]):
-            try:
-                gradeset = summary(student, course, keep_raw_scores)
-                yield student, gradeset, ""
-            except Exception as exc:  # pylint: disable=broad-except
-                # Keep marching on even if this student couldn't be graded for
-                # some reason, but log it for future reference.
-                log.exception(
-                    'Cannot grade student %s (%s) in course %s because of exception: %s',
-                    student.username,
-                    student.id,
-                    course.id,
-                    exc.message
-                )
-                yield student, {}, exc.message
+    if course_grading_context is None:
+        course_grading_context = grading_context_for_course(course)
+    # Every block that could be scored for any student in the course.
+    scorable_locations = [block.location for block in course_grading_context['all_graded_blocks']]
+
+    students = iter(students)
+    while True:
+        student_batch = list(islice(students, batch_size))
+        if not student_batch:
+            break
 
+        with outer_atomic():
+            scores_clients = ScoresClient.create_for_users(
+                course.id, [student.id for student in student_batch], scorable_locations
+            )
+            submissions_scores = _bulk_submissions_scores(course.id, student_batch)
+
+        for student in student_batch:
+            with dog_stats_api.timer('lms.grades.iterate_grades_for', tags=[u'action:{}'.format(course.id)]):
+                try:
+                    gradeset = summary(
+                        student,
+                        course,
+                        keep_raw_scores,
+                        scores_client=scores_clients[student.id],
+                        submissions_scores=submissions_scores[student.id],
+                    )
+                    yield student, gradeset, ""
+                except Exception as exc:  # pylint: disable=broad-except
+                    # Keep marching on even if this student couldn't be graded for
+                    # some reason, but log it for future reference.
+                    log.exception(
+                        'Cannot grade student %s (%s) in course %s because of exception: %s',
+                        student.username,
+                        student.id,
+                        course.id,
+                        exc.message
+                    )
+                    yield student, {}, exc.message
 
-def summary(student, course, keep_raw_scores=False, course_structure=None):
+
+def summary(
+        student,
+        course,
+        keep_raw_scores=False,
+        course_structure=None,
+        scores_client=None,
+        submissions_scores=None,
+):
     """
     Returns the grade summary of the student for the given course.
 
     Also sends a signal to update the minimum grade requirement status.
+
+    If given, scores_client must be a ScoresClient that has already fetched
+    the student's scores for every scorable block in the course, and
+    submissions_scores the student's scores from the submissions API.
     """
-    grade_summary = _summary(student, course, keep_raw_scores, course_structure)
+    grade_summary = _summary(
+        student,
+        course,
+        keep_raw_scores,
+        course_structure,
+        scores_client=scores_client,
+        submissions_scores=submissions_scores,
+    )
     responses = GRADES_UPDATED.send_robust(
         sender=None,
         username=student.username,
@@ -86,7 +151,14 @@ def summary(student, course, keep_raw_scores=False, course_structure=None):
     return grade_summary
 
 
-def _summary(student, course, keep_raw_scores, course_structure=None):
+def _summary(
+        student,
+        course,
+        keep_raw_scores,
+        course_structure=None,
+        scores_client=None,
+        submissions_scores=None,
+):
     """
     This grades a student as quickly as possible. It returns the
     output from the course grader, augmented with the final letter
@@ -95,33 +167,34 @@ def _summary(student, course, keep_raw_scores, course_structure=None):
     - course: a CourseDescriptor
     - keep_raw_scores : if True, then value for key 'raw_scores' contains scores
       for every graded module
+    - scores_client : an optional ScoresClient with pre-fetched scores for
+      the student
+    - submissions_scores : optional pre-fetched scores of the student from
+      the submissions API
 
     More information on the format is in the docstring for CourseGrader.
     """
     if course_structure is None:
         course_structure = get_course_blocks(student, course.location)
     grading_context_result = grading_context(course_structure)
-    scorable_locations = [block.location for block in grading_context_result['all_graded_blocks']]
 
-    with outer_atomic():
-        scores_client = ScoresClient.create_for_locations(course.id, student.id, scorable_locations)
-
-    # Dict of item_ids -> (earned, possible) point tuples. This *only* grabs
-    # scores that were registered with the submissions API, which for the moment
-    # means only openassessment (edx-ora2)
-    # We need to import this here to avoid a circular dependency of the form:
-    # XBlock --> submissions --> Django Rest Framework error strings -->
-    # Django translation --> ... --> courseware --> submissions
-    from submissions import api as sub_api  # installed from the edx-submissions repository
+    # Raw scores are not persisted, so every section has to be regraded when
+    # they are kept, and the grades are then neither read nor written.
+    persist_grades = PersistentGradesEnabledFlag.feature_enabled() and not keep_raw_scores
+    if persist_grades:
+        with outer_atomic():
+            persisted_grades = PersistentSubsectionGrade.read_grades(student.id, course.id)
+    else:
+        persisted_grades = None
 
-    with outer_atomic():
-        submissions_scores = sub_api.get_scores(
-            course.id.to_deprecated_string(),
-            anonymous_id_for_user(student, course.id)
-        )
+    score_sources = _ScoreSources(student, course, grading_context_result, scores_client, submissions_scores)
 
-    totaled_scores, raw_scores = _calculate_totaled_scores(
-        student, grading_context_result, submissions_scores, scores_client, keep_raw_scores
+    totaled_scores, raw_scores, regraded = _calculate_totaled_scores(
+        student,
+        grading_context_result,
+        score_sources,
+        keep_raw_scores,
+        persisted_grades=persisted_grades,
     )
 
     with outer_atomic():
@@ -141,39 +214,202 @@ def _summary(student, course, keep_raw_scores, course_structure=None):
             # so grader can be double-checked
             grade_summary['raw_scores'] = raw_scores
 
+        # The course grade only changes when a subsection is regraded, so it
+        # is otherwise only written if it isn't persisted yet or is stale.
+        if persist_grades and (regraded or PersistentCourseGrade.read_course_grade(student.id, course) is None):
+            PersistentCourseGrade.update_or_create_course_grade(
+                student.id, course, grade_summary['percent'], letter_grade
+            )
+
     return grade_summary
 
 
+def invalidate_persisted_grades(user_id, course_key, usage_key):
+    """
+    Deletes the persisted grade of the given user for the subsection
+    containing the block identified by usage_key, and their course grade,
+    after a change to their score on that block.  All their subsection grades
+    in the course are deleted if the subsection can't be found.
+
+    This is called in the transaction changing the score, so that the stale
+    grades are never read once it is committed.
+    """
+    store = modulestore()
+    location = usage_key.map_into_course(course_key)
+    try:
+        while location is not None and location.block_type != 'sequential':
+            location = store.get_parent_location(location)
+    except ItemNotFoundError:
+        location = None
+
+    if location is not None:
+        PersistentSubsectionGrade.delete_grade(user_id, location.replace(version=None, branch=None))
+    else:
+        PersistentSubsectionGrade.delete_grades(user_id, course_key)
+    PersistentCourseGrade.delete_course_grade(user_id, course_key)
+
+
+def update_persisted_grades(student, course_key):
+    """
+    Recomputes and stores the grades of the student invalidated by
+    invalidate_persisted_grades, along with their course grade.
+
+    Only the subsections whose grades are missing are regraded; all other
+    subsection grades are read from storage.  Does nothing if persistent
+    grades are disabled, or if the course grade is still stored, which means
+    that the invalidation isn't committed yet: the grades are then recomputed
+    by the first read following it.
+    """
+    if not PersistentGradesEnabledFlag.feature_enabled():
+        return
+
+    with outer_atomic():
+        if PersistentCourseGrade.objects.filter(user_id=student.id, course_id=course_key).exists():
+            return
+
+    course = get_course_by_id(course_key)
+    _summary(student, course, False)
+
+
+class _ScoreSources(object):
+    """
+    Lazily fetches the scores needed to grade a student.
+
+    When every subsection grade can be read from storage, no score queries
+    are issued at all.
+    """
+    def __init__(self, student, course, grading_context_result, scores_client=None, submissions_scores=None):
+        self.student = student
+        self.course = course
+        self.scorable_locations = [block.location for block in grading_context_result['all_graded_blocks']]
+        self._prefetched_scores_client = scores_client
+        self._prefetched_submissions_scores = submissions_scores
+
+    @lazy
+    def scores_client(self):
+        """
+        A ScoresClient holding the student's scores from courseware state.
+        """
+        if self._prefetched_scores_client is not None:
+            return self._prefetched_scores_client
+        with outer_atomic():
+            return ScoresClient.create_for_locations(self.course.id, self.student.id, self.scorable_locations)
+
+    @lazy
+    def submissions_scores(self):
+        """
+        Dict of item_ids -> (earned, possible) point tuples. This *only* grabs
+        scores that were registered with the submissions API, which for the moment
+        means only openassessment (edx-ora2)
+        """
+        if self._prefetched_submissions_scores is not None:
+            return self._prefetched_submissions_scores
+
+        # We need to import this here to avoid a circular dependency of the form:
+        # XBlock --> submissions --> Django Rest Framework error strings -->
+        # Django translation --> ... --> courseware --> submissions
+        from submissions import api as sub_api  # installed from the edx-submissions repository
+
+        with outer_atomic():
+            return sub_api.get_scores(
+                self.course.id.to_deprecated_string(),
+                anonymous_id_for_user(self.student, self.course.id)
+            )
+
+
+def _bulk_submissions_scores(course_key, students):
+    """
+    Returns the scores registered with the submissions API of each of the
+    given students, as a dict of user ids to dicts of item_ids -> (earned,
+    possible) point tuples, like `submissions.api.get_scores` returns for a
+    single student.  The scores of all the students are fetched with a single
+    query, which the submissions API doesn't provide.
+    """
+    # Imported here for the same reason as in _ScoreSources.submissions_scores.
+    from submissions.models import ScoreSummary  # installed from the edx-submissions repository
+
+    user_ids_by_anonymous_id = {
+        anonymous_id_for_user(student, course_key, save=False): student.id for student in students
+    }
+    scores = {student.id: {} for student in students}
+    score_summaries = ScoreSummary.objects.filter(
+        student_item__course_id=course_key.to_deprecated_string(),
+        student_item__student_id__in=user_ids_by_anonymous_id.keys(),
+    ).select_related('latest', 'student_item')
+    for score_summary in score_summaries:
+        if not score_summary.latest.is_hidden():
+            user_id = user_ids_by_anonymous_id[score_summary.student_item.student_id]
+            scores[user_id][score_summary.student_item.item_id] = (
+                score_summary.latest.points_earned, score_summary.latest.points_possible
+            )
+    return scores
+
+
+def _visible_blocks_hash(section_info):
+    """
+    Returns the hash of the scored blocks of the given section, as used to
+    validate persisted subsection grades.
+    """
+    return PersistentSubsectionGrade.compute_visible_blocks_hash([
+        (
+            descendant.location.replace(version=None, branch=None),
+            getattr(descendant, 'weight', None),
+            getattr(descendant.transformer_data[GradesTransformer], 'max_score', None),
+        )
+        for descendant in section_info['scored_descendants']
+    ])
+
+
 def _calculate_totaled_scores(
         student,
         grading_context_result,
-        submissions_scores,
-        scores_client,
+        score_sources,
         keep_raw_scores,
+        persisted_grades=None,
 ):
     """
-    Returns a tuple of totaled scores and raw scores, which can be passed to the grader.
+    Returns a tuple of totaled scores and raw scores, which can be passed to the grader,
+    and of whether any persisted subsection grade was recomputed.
+
+    If persisted_grades (a dict of subsection usage keys to
+    PersistentSubsectionGrades) is given, valid persisted grades are used in
+    place of regrading their subsections, and the grades of all regraded
+    subsections are persisted.  If it is None, grades are not persisted.
     """
     raw_scores = []
     totaled_scores = {}
+    regraded = False
     for section_format, sections in grading_context_result['all_graded_sections'].iteritems():
         format_scores = []
         for section_info in sections:
             section = section_info['section_block']
             section_name = block_metadata_utils.display_name_with_default(section)
 
+            if persisted_grades is not None:
+                blocks_hash = _visible_blocks_hash(section_info)
+                persisted_grade = persisted_grades.get(section.location.replace(version=None, branch=None))
+                if persisted_grade is not None and persisted_grade.visible_blocks_hash == blocks_hash:
+                    if persisted_grade.attempted:
+                        graded_total = Score(
+                            persisted_grade.earned_graded, persisted_grade.possible_graded, True, section_name, None
+                        )
+                    else:
+                        graded_total = Score(0.0, 1.0, True, section_name, None)
+                    _add_graded_total(format_scores, graded_total, section)
+                    continue
+
             with outer_atomic():
                 # Check to
                 # see if any of our locations are in the scores from the submissions
                 # API. If scores exist, we have to calculate grades for this section.
                 should_grade_section = any(
-                    unicode(descendant.location) in submissions_scores
+                    unicode(descendant.location) in score_sources.submissions_scores
                     for descendant in section_info['scored_descendants']
                 )
 
                 if not should_grade_section:
                     should_grade_section = any(
-                        descendant.location in scores_client
+                        descendant.location in score_sources.scores_client
                         for descendant in section_info['scored_descendants']
                     )
 
@@ -187,8 +423,8 @@ def _calculate_totaled_scores(
                         (correct, total) = get_score(
                             student,
                             descendant,
-                            scores_client,
-                            submissions_scores,
+                            score_sources.scores_client,
+                            score_sources.submissions_scores,
                         )
                         if correct is None and total is None:
                             continue
@@ -214,24 +450,45 @@ def _calculate_totaled_scores(
                             )
                         )
 
-                    __, graded_total = graders.aggregate_scores(scores, section_name)
+                    all_total, graded_total = graders.aggregate_scores(scores, section_name)
                     if keep_raw_scores:
                         raw_scores += scores
                 else:
+                    all_total = Score(0.0, 0.0, False, section_name, None)
                     graded_total = Score(0.0, 1.0, True, section_name, None)
 
-                # Add the graded total to totaled_scores
-                if graded_total.possible > 0:
-                    format_scores.append(graded_total)
-                else:
-                    log.info(
-                        "Unable to grade a section with a total possible score of zero. " +
-                        str(section.location)
+                if persisted_grades is not None:
+                    regraded = True
+                    PersistentSubsectionGrade.update_or_create_grade(
+                        student.id,
+                        section.location.replace(version=None, branch=None),
+                        visible_blocks_hash=blocks_hash,
+                        attempted=should_grade_section,
+                        earned_all=all_total.earned,
+                        possible_all=all_total.possible,
+                        earned_graded=graded_total.earned,
+                        possible_graded=graded_total.possible,
                     )
 
+            _add_graded_total(format_scores, graded_total, section)
+
         totaled_scores[section_format] = format_scores
 
-    return totaled_scores, raw_scores
+    return totaled_scores, raw_scores, regraded
+
+
+def _add_graded_total(format_scores, graded_total, section):
+    """
+    Add the graded total of the given section to format_scores, unless the
+    section has no possible points.
+    """
+    if graded_total.possible > 0:
+        format_scores.append(graded_total)
+    else:
+        log.info(
+            "Unable to grade a section with a total possible score of zero. " +
+            str(section.location)
+        )
 
 
 def _letter_grade(grade_cutoffs, percentage):
@@ -0,0 +1,235 @@
+"""
+Models used to persist computed grades.
+
+Persistent grades store each learner's grade for every graded subsection and
+for the course as a whole, so that reading a grade does not require
+re-fetching and re-aggregating every score in the course.  Stored grades are
+invalidated whenever a score changes and recomputed by a task (see
+grades/signals.py and grades/tasks.py), and are validated against the blocks
+that were visible to the learner when the grade was computed.
+"""
+from hashlib import sha1
+import json
+import logging
+
+from django.db import models
+from model_utils.models import TimeStampedModel
+
+from config_models.models import ConfigurationModel
+from xmodule_django.models import CourseKeyField, UsageKeyField
+
+
+log = logging.getLogger(__name__)
+
+
+def _normalize_usage_key(usage_key, course_key):
+    """
+    Return the given usage key with full course run information and without
+    any version or branch information, so that keys read from the database
+    compare equal to keys read from the modulestore.
+    """
+    return usage_key.map_into_course(course_key).replace(version=None, branch=None)
+
+
+class PersistentGradesEnabledFlag(ConfigurationModel):
+    """
+    Enables persistent grades across the platform.
+
+    When enabled, computed subsection and course grades are stored and
+    reused, and are updated incrementally as scores change.
+    """
+    class Meta(object):
+        app_label = "grades"
+
+    @classmethod
+    def feature_enabled(cls):
+        """
+        Returns whether persistent grades are enabled.
+        """
+        return cls.is_enabled()
+
+
+class PersistentSubsectionGrade(TimeStampedModel):
+    """
+    A learner's grade for a single subsection (sequential) of a course.
+    """
+    class Meta(object):
+        app_label = "grades"
+        unique_together = [
+            # Also serves as the index for reading all of a learner's
+            # subsection grades in a course.
+            ('course_id', 'user_id', 'usage_key'),
+        ]
+
+    user_id = models.IntegerField(blank=False)
+    course_id = CourseKeyField(blank=False, max_length=255)
+    usage_key = UsageKeyField(blank=False, max_length=255)
+
+    # Hash of the scored blocks (and their weights and max scores) that were
+    # visible to the learner when this grade was computed.  If the learner's
+    # view of the subsection changes, the stored grade is no longer valid.
+    visible_blocks_hash = models.CharField(blank=False, max_length=40)
+
+    # Whether the learner has a score for any block in this subsection.
+    attempted = models.BooleanField(default=False)
+
+    earned_all = models.FloatField(blank=False)
+    possible_all = models.FloatField(blank=False)
+    earned_graded = models.FloatField(blank=False)
+    possible_graded = models.FloatField(blank=False)
+
+    def __unicode__(self):
+        return u"{} user: {}, course: {}, subsection: {}, grade: {}/{}".format(
+            type(self).__name__,
+            self.user_id,
+            self.course_id,
+            self.usage_key,
+            self.earned_graded,
+            self.possible_graded,
+        )
+
+    @staticmethod
+    def compute_visible_blocks_hash(scored_blocks):
+        """
+        Returns a hash identifying the given list of scored blocks, taking
+        into account each block's weight and maximum score.
+
+        Arguments:
+            scored_blocks: a list of (usage_key, weight, max_score) tuples.
+        """
+        serialized = json.dumps(
+            [
+                (unicode(usage_key), weight, max_score)
+                for usage_key, weight, max_score in scored_blocks
+            ],
+            sort_keys=True,
+        )
+        return sha1(serialized).hexdigest()
+
+    @classmethod
+    def read_grades(cls, user_id, course_key):
+        """
+        Returns a dict mapping subsection usage keys to the stored grades of
+        the given learner in the given course, using a single query.
+        """
+        return {
+            _normalize_usage_key(grade.usage_key, course_key): grade
+            for grade in cls.objects.filter(user_id=user_id, course_id=course_key)
+        }
+
+    @classmethod
+    def update_or_create_grade(cls, user_id, usage_key, **kwargs):
+        """
+        Creates or updates the stored grade of the given learner for the
+        subsection identified by usage_key.
+
+        Keyword arguments are the values of the grade fields
+        (visible_blocks_hash, attempted, earned_all, possible_all,
+        earned_graded and possible_graded).
+        """
+        grade, _ = cls.objects.update_or_create(
+            user_id=user_id,
+            course_id=usage_key.course_key,
+            usage_key=usage_key,
+            defaults=kwargs,
+        )
+        return grade
+
+    @classmethod
+    def delete_grade(cls, user_id, usage_key):
+        """
+        Deletes the stored grade of the given learner for the subsection
+        identified by usage_key, forcing it to be recomputed on the next read.
+        """
+        cls.objects.filter(user_id=user_id, course_id=usage_key.course_key, usage_key=usage_key).delete()
+
+    @classmethod
+    def delete_grades(cls, user_id, course_key):
+        """
+        Deletes all stored subsection grades of the given learner in the given
+        course, forcing them to be recomputed on the next read.
+        """
+        cls.objects.filter(user_id=user_id, course_id=course_key).delete()
+
+
+class PersistentCourseGrade(TimeStampedModel):
+    """
+    A learner's overall grade in a course.
+    """
+    class Meta(object):
+        app_label = "grades"
+        unique_together = [
+            ('course_id', 'user_id'),
+        ]
+
+    user_id = models.IntegerField(blank=False, db_index=True)
+    course_id = CourseKeyField(blank=False, max_length=255)
+
+    # Hash of the grading policy the grade was computed with.
+    grading_policy_hash = models.CharField(blank=False, max_length=40)
+
+    percent_grade = models.FloatField(blank=False)
+    # Empty if the learner has not reached any of the grade cutoffs.
+    letter_grade = models.CharField(blank=True, max_length=255)
+
+    def __unicode__(self):
+        return u"{} user: {}, course: {}, grade: {} ({})".format(
+            type(self).__name__,
+            self.user_id,
+            self.course_id,
+            self.percent_grade,
+            self.letter_grade,
+        )
+
+    @staticmethod
+    def compute_grading_policy_hash(course):
+        """
+        Returns a hash identifying the grading policy (including the grade
+        cutoffs) of the given course.
+        """
+        serialized = json.dumps(course.grading_policy, sort_keys=True)
+        return sha1(serialized).hexdigest()
+
+    @classmethod
+    def read_course_grade(cls, user_id, course):
+        """
+        Returns the stored course grade of the given learner, or None if
+        there is none, or it was computed with a different grading policy or
+        before the content of the course last changed.
+        """
+        try:
+            grade = cls.objects.get(user_id=user_id, course_id=course.id)
+        except cls.DoesNotExist:
+            return None
+        content_edited_on = course.subtree_edited_on
+        if (
+                grade.grading_policy_hash != cls.compute_grading_policy_hash(course) or
+                (content_edited_on is not None and grade.modified < content_edited_on)
+        ):
+            log.info(u"Ignoring stale persisted course grade: %s", grade)
+            return None
+        return grade
+
+    @classmethod
+    def update_or_create_course_grade(cls, user_id, course, percent_grade, letter_grade):
+        """
+        Creates or updates the stored course grade of the given learner.
+        """
+        grade, _ = cls.objects.update_or_create(
+            user_id=user_id,
+            course_id=course.id,
+            defaults={
+                'grading_policy_hash': cls.compute_grading_policy_hash(course),
+                'percent_grade': percent_grade,
+                'letter_grade': letter_grade or u'',
+            },
+        )
+        return grade
+
+    @classmethod
+    def delete_course_grade(cls, user_id, course_key):
+        """
+        Deletes the stored course grade of the given learner, forcing it to
+        be recomputed on the next read.
+        """
+        cls.objects.filter(user_id=user_id, course_id=course_key).delete()
@@ -1,11 +1,18 @@
 """
 Grades related signals.
 """
+from django.conf import settings
+from django.db.models.signals import post_delete
 from django.dispatch import receiver, Signal
 from logging import getLogger
+from opaque_keys.edx.keys import CourseKey, UsageKey
+
+from courseware.models import StudentModule
 from student.models import user_by_anonymous_id
 from submissions.models import score_set, score_reset
 
+from .models import PersistentCourseGrade, PersistentGradesEnabledFlag, PersistentSubsectionGrade
+
 
 log = getLogger(__name__)
 
@@ -106,3 +113,68 @@ def submissions_score_reset_handler(sender, **kwargs):  # pylint: disable=unused
             u"Failed to process score_reset signal from Submissions API. "
             "user: %s, course_id: %s, usage_id: %s", user, course_id, usage_id
         )
+
+
+@receiver(SCORE_CHANGED)
+def recalculate_persistent_grades_handler(sender, **kwargs):  # pylint: disable=unused-argument
+    """
+    Consume the SCORE_CHANGED signal, invalidate the persisted grades of the
+    affected user for the subsection containing the changed block and for the
+    course, and schedule their recalculation.
+
+    The invalidation happens in the transaction changing the score, so stale
+    grades are never read once it is committed.  The recalculation is delayed
+    by PERSISTENT_GRADES_RECALCULATION_DELAY only to make it likely that this
+    transaction is committed by the time it runs; if it isn't, the grades are
+    recomputed by the next read instead.
+
+    This method expects that the kwargs dictionary will contain the following
+    entries (See the definition of SCORE_CHANGED):
+      - 'user_id': integer,
+      - 'course_id': unicode,
+      - 'usage_id': unicode
+    """
+    if not PersistentGradesEnabledFlag.feature_enabled():
+        return
+
+    # We need to import these here to avoid a circular dependency of the form:
+    # tasks --> course_grades --> courseware --> module_render --> signals
+    from .course_grades import invalidate_persisted_grades
+    from .tasks import recalculate_persisted_grades
+
+    user_id = kwargs['user_id']
+    course_key = CourseKey.from_string(kwargs['course_id'])
+    invalidate_persisted_grades(user_id, course_key, UsageKey.from_string(kwargs['usage_id']))
+
+    try:
+        recalculate_persisted_grades.apply_async(
+            (user_id, kwargs['course_id']),
+            countdown=settings.PERSISTENT_GRADES_RECALCULATION_DELAY,
+        )
+    except Exception:  # pylint: disable=broad-except
+        # The grades were invalidated above, so they are recomputed by the next
+        # read; a failure to schedule the recalculation must not break scoring.
+        log.exception(
+            u"Failed to schedule the update of persisted grades. user_id: %s, course_id: %s",
+            user_id, kwargs['course_id']
+        )
+
+
+@receiver(post_delete, sender=StudentModule)
+def student_module_deleted_handler(sender, instance, **kwargs):  # pylint: disable=unused-argument
+    """
+    Invalidate the persisted subsection grades of a student whose courseware
+    state was deleted (e.g. when an instructor resets a problem), since no
+    SCORE_CHANGED signal is sent in that case.
+    """
+    if PersistentGradesEnabledFlag.feature_enabled():
+        _invalidate_persisted_grades(instance.student_id, instance.course_id)
+
+
+def _invalidate_persisted_grades(user_id, course_id):
+    """
+    Delete the persisted grades of the given user in the given course, so
+    that they are recomputed the next time they are read.
+    """
+    PersistentSubsectionGrade.delete_grades(user_id, course_id)
+    PersistentCourseGrade.delete_course_grade(user_id, course_id)
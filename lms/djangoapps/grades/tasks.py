@@ -0,0 +1,47 @@
+"""
+Asynchronous tasks for the grades app.
+"""
+from celery import task
+from celery.utils.log import get_task_logger
+from django.conf import settings
+from django.contrib.auth.models import User
+from opaque_keys.edx.keys import CourseKey
+
+from .course_grades import update_persisted_grades
+from .models import PersistentCourseGrade, PersistentSubsectionGrade
+
+LOGGER = get_task_logger(__name__)
+
+
+# pylint: disable=not-callable
+@task(
+    bind=True,
+    default_retry_delay=settings.PERSISTENT_GRADES_RETRY_DELAY,
+    max_retries=settings.PERSISTENT_GRADES_MAX_RETRIES,
+)
+def recalculate_persisted_grades(self, user_id, course_id):
+    """
+    Recomputes the persisted grades of the given user that were invalidated
+    by a score change in the course.
+
+    Failures are retried.  Once the retries are exhausted, all the persisted
+    grades of the user in the course are deleted, so that they are recomputed
+    the next time they are read instead of being left stale.
+
+    Args:
+        user_id (int): The id of the user whose score changed.
+        course_id (unicode): A string representation of the course key.
+    """
+    course_key = CourseKey.from_string(course_id)
+    try:
+        user = User.objects.get(id=user_id)
+        update_persisted_grades(user, course_key)
+    except Exception as exc:  # pylint: disable=broad-except
+        if self.request.retries < self.max_retries:
+            raise self.retry(exc=exc)
+        LOGGER.exception(
+            u"Failed to update persisted grades, deleting them. user_id: %s, course_id: %s",
+            user_id, course_id
+        )
+        PersistentSubsectionGrade.delete_grades(user_id, course_key)
+        PersistentCourseGrade.delete_course_grade(user_id, course_key)
@@ -10,24 +10,27 @@ from opaque_keys.edx.locations import SlashSeparatedCourseKey
 from opaque_keys.edx.locator import CourseLocator, BlockUsageLocator
 
 from courseware.module_render import get_module
-from courseware.model_data import FieldDataCache, set_score
+from courseware.model_data import FieldDataCache, ScoresClient, set_score
+from courseware.models import StudentModule
 from courseware.tests.helpers import (
     LoginEnrollmentTestCase,
     get_request_for_user
 )
 from capa.tests.response_xml_factory import MultipleChoiceResponseXMLFactory
 from student.tests.factories import UserFactory
-from student.models import CourseEnrollment
+from student.models import CourseEnrollment, anonymous_id_for_user
+from submissions import api as sub_api
 from xmodule.modulestore.tests.factories import CourseFactory, ItemFactory
 from xmodule.modulestore.tests.django_utils import SharedModuleStoreTestCase
 
 from .. import course_grades
 from ..course_grades import summary as grades_summary
+from ..models import PersistentCourseGrade, PersistentGradesEnabledFlag, PersistentSubsectionGrade
 from ..module_grades import get_module_score
 from ..progress import ProgressSummary
 
 
-def _grade_with_errors(student, course, keep_raw_scores=False):
+def _grade_with_errors(student, course, keep_raw_scores=False, **kwargs):
     """This fake grade method will throw exceptions for student3 and
     student4, but allow any other students to go through normal grading.
 
@@ -38,7 +41,7 @@ def _grade_with_errors(student, course, keep_raw_scores=False):
     if student.username in ['student3', 'student4']:
         raise Exception("I don't like {}".format(student.username))
 
-    return grades_summary(student, course, keep_raw_scores=keep_raw_scores)
+    return grades_summary(student, course, keep_raw_scores=keep_raw_scores, **kwargs)
 
 
 @attr('shard_1')
@@ -125,6 +128,42 @@ class TestGradeIteration(SharedModuleStoreTestCase):
         self.assertTrue(all_gradesets[student2])
         self.assertTrue(all_gradesets[student5])
 
+    def test_batched_score_queries(self):
+        """Scores should be fetched once per batch of students, rather than
+        once per student."""
+        with patch.object(ScoresClient, 'create_for_users', wraps=ScoresClient.create_for_users) as mock_create:
+            with patch.object(ScoresClient, 'create_for_locations') as mock_create_for_locations:
+                with patch('submissions.api.get_scores') as mock_get_scores:
+                    gradeset_results = list(
+                        course_grades.iterate_grades_for(self.course.id, self.students, batch_size=2)
+                    )
+        self.assertEqual(len(gradeset_results), 5)
+        self.assertEqual(
+            [len(call_args[0][1]) for call_args in mock_create.call_args_list],
+            [2, 2, 1],
+        )
+        self.assertFalse(mock_create_for_locations.called)
+        self.assertFalse(mock_get_scores.called)
+
+    def test_bulk_submissions_scores(self):
+        """The submissions scores of a batch of students are the ones the
+        submissions API returns for each of them."""
+        student_item = {
+            'student_id': anonymous_id_for_user(self.students[0], self.course.id),
+            'course_id': self.course.id.to_deprecated_string(),
+            'item_id': self.course.id.make_usage_key('openassessment', 'ora').to_deprecated_string(),
+            'item_type': 'openassessment',
+        }
+        submission = sub_api.create_submission(student_item, 'test answer')
+        sub_api.set_score(submission['uuid'], 1, 2)
+
+        scores = course_grades._bulk_submissions_scores(self.course.id, self.students[:2])  # pylint: disable=protected-access
+        self.assertEqual(scores, {
+            self.students[0].id: sub_api.get_scores(student_item['course_id'], student_item['student_id']),
+            self.students[1].id: {},
+        })
+        self.assertTrue(scores[self.students[0].id])
+
     ################################# Helpers #################################
     def _gradesets_and_errors_for(self, course_id, students):
         """Simple helper method to iterate through student grades and give us
@@ -444,6 +483,111 @@ class TestGetModuleScore(LoginEnrollmentTestCase, SharedModuleStoreTestCase):
         self.assertEqual(score, 1.0)
 
 
+class TestPersistentGrades(LoginEnrollmentTestCase, SharedModuleStoreTestCase):
+    """
+    Test that grades are persisted and incrementally updated when
+    persistent grades are enabled.
+    """
+    @classmethod
+    def setUpClass(cls):
+        super(TestPersistentGrades, cls).setUpClass()
+        cls.course = CourseFactory.create()
+        cls.chapter = ItemFactory.create(parent=cls.course, category="chapter", display_name="Test Chapter")
+        cls.sequences = []
+        cls.problems = []
+        problem_xml = MultipleChoiceResponseXMLFactory().build_xml(
+            question_text='The correct answer is Choice 3',
+            choices=[False, False, True, False],
+            choice_names=['choice_0', 'choice_1', 'choice_2', 'choice_3']
+        )
+        for index in range(2):
+            sequence = ItemFactory.create(
+                parent=cls.chapter,
+                category='sequential',
+                display_name="Test Sequential {}".format(index),
+                graded=True,
+                format="Homework",
+            )
+            vertical = ItemFactory.create(parent=sequence, category='vertical')
+            cls.sequences.append(sequence)
+            cls.problems.extend(
+                ItemFactory.create(parent=vertical, category="problem", data=problem_xml)
+                for __ in range(2)
+            )
+
+    def setUp(self):
+        super(TestPersistentGrades, self).setUp()
+        PersistentGradesEnabledFlag.objects.create(enabled=True)
+        self.request = get_request_for_user(UserFactory())
+        CourseEnrollment.enroll(self.request.user, self.course.id)
+
+    def _persisted_subsection_grades(self):
+        """
+        Returns the persisted subsection grades of the test user, as a dict
+        of subsection usage keys to (earned_graded, possible_graded) tuples.
+        """
+        return {
+            usage_key: (grade.earned_graded, grade.possible_graded)
+            for usage_key, grade
+            in PersistentSubsectionGrade.read_grades(self.request.user.id, self.course.id).iteritems()
+        }
+
+    def test_grades_persisted(self):
+        grade_summary = grades_summary(self.request.user, self.course)
+        self.assertEqual(grade_summary['percent'], 0.0)
+        self.assertEqual(len(self._persisted_subsection_grades()), 2)
+        course_grade = PersistentCourseGrade.read_course_grade(self.request.user.id, self.course)
+        self.assertEqual(course_grade.percent_grade, 0.0)
+        self.assertEqual(course_grade.letter_grade, u'')
+
+    def test_score_change_updates_persisted_grades(self):
+        grades_summary(self.request.user, self.course)
+        answer_problem(self.course, self.request, self.problems[0])
+
+        persisted_grades = self._persisted_subsection_grades()
+        self.assertEqual(persisted_grades[self.sequences[0].location], (1.0, 2.0))
+        course_grade = PersistentCourseGrade.read_course_grade(self.request.user.id, self.course)
+        self.assertEqual(
+            course_grade.percent_grade,
+            grades_summary(self.request.user, self.course)['percent'],
+        )
+
+    def test_persisted_grades_skip_score_queries(self):
+        answer_problem(self.course, self.request, self.problems[0])
+        grade_summary = grades_summary(self.request.user, self.course)
+
+        with patch('lms.djangoapps.grades.course_grades.ScoresClient') as mock_scores_client:
+            self.assertEqual(grades_summary(self.request.user, self.course)['percent'], grade_summary['percent'])
+            self.assertFalse(mock_scores_client.create_for_locations.called)
+
+    def test_unchanged_grades_not_written(self):
+        grades_summary(self.request.user, self.course)
+        with patch.object(PersistentCourseGrade, 'update_or_create_course_grade') as mock_update_course_grade:
+            with patch.object(PersistentSubsectionGrade, 'update_or_create_grade') as mock_update_grade:
+                grades_summary(self.request.user, self.course)
+        self.assertFalse(mock_update_course_grade.called)
+        self.assertFalse(mock_update_grade.called)
+
+    def test_score_change_invalidates_persisted_grades(self):
+        grades_summary(self.request.user, self.course)
+        with patch('lms.djangoapps.grades.tasks.recalculate_persisted_grades.apply_async'):
+            answer_problem(self.course, self.request, self.problems[0])
+
+        self.assertEqual(self._persisted_subsection_grades().keys(), [self.sequences[1].location])
+        self.assertIsNone(PersistentCourseGrade.read_course_grade(self.request.user.id, self.course))
+
+        grades_summary(self.request.user, self.course)
+        self.assertEqual(self._persisted_subsection_grades()[self.sequences[0].location], (1.0, 2.0))
+
+    def test_deleted_state_invalidates_persisted_grades(self):
+        answer_problem(self.course, self.request, self.problems[0])
+        self.assertTrue(self._persisted_subsection_grades())
+
+        StudentModule.objects.filter(student=self.request.user).delete()
+        self.assertEqual(self._persisted_subsection_grades(), {})
+        self.assertEqual(grades_summary(self.request.user, self.course)['percent'], 0.0)
+
+
 def answer_problem(course, request, problem, score=1):
     """
     Records a correct answer for the given problem.
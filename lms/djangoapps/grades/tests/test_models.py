@@ -0,0 +1,89 @@
+"""
+Unit tests for grades models.
+"""
+from datetime import timedelta
+
+from django.test import TestCase
+from mock import MagicMock
+from opaque_keys.edx.locator import CourseLocator, BlockUsageLocator
+
+from ..models import PersistentCourseGrade, PersistentSubsectionGrade
+
+
+class PersistentSubsectionGradeTest(TestCase):
+    """
+    Tests for the PersistentSubsectionGrade model.
+    """
+    def setUp(self):
+        super(PersistentSubsectionGradeTest, self).setUp()
+        self.course_key = CourseLocator(org='some_org', course='some_course', run='some_run')
+        self.usage_key = BlockUsageLocator(course_key=self.course_key, block_type='sequential', block_id='seq')
+        self.params = {
+            'visible_blocks_hash': PersistentSubsectionGrade.compute_visible_blocks_hash([]),
+            'attempted': True,
+            'earned_all': 6.0,
+            'possible_all': 12.0,
+            'earned_graded': 6.0,
+            'possible_graded': 8.0,
+        }
+
+    def test_create_and_read(self):
+        PersistentSubsectionGrade.update_or_create_grade(42, self.usage_key, **self.params)
+        with self.assertNumQueries(1):
+            grades = PersistentSubsectionGrade.read_grades(42, self.course_key)
+        self.assertEqual(grades.keys(), [self.usage_key])
+        self.assertEqual(grades[self.usage_key].earned_graded, 6.0)
+        self.assertEqual(PersistentSubsectionGrade.read_grades(43, self.course_key), {})
+
+    def test_update(self):
+        PersistentSubsectionGrade.update_or_create_grade(42, self.usage_key, **self.params)
+        self.params['earned_graded'] = 8.0
+        PersistentSubsectionGrade.update_or_create_grade(42, self.usage_key, **self.params)
+        grades = PersistentSubsectionGrade.read_grades(42, self.course_key)
+        self.assertEqual(len(grades), 1)
+        self.assertEqual(grades[self.usage_key].earned_graded, 8.0)
+
+    def test_delete(self):
+        PersistentSubsectionGrade.update_or_create_grade(42, self.usage_key, **self.params)
+        PersistentSubsectionGrade.delete_grades(42, self.course_key)
+        self.assertEqual(PersistentSubsectionGrade.read_grades(42, self.course_key), {})
+
+    def test_visible_blocks_hash(self):
+        problem_key = self.usage_key.replace(block_type='problem', block_id='p1')
+        blocks_hash = PersistentSubsectionGrade.compute_visible_blocks_hash([(problem_key, 1, 2)])
+        self.assertEqual(blocks_hash, PersistentSubsectionGrade.compute_visible_blocks_hash([(problem_key, 1, 2)]))
+        self.assertNotEqual(blocks_hash, PersistentSubsectionGrade.compute_visible_blocks_hash([(problem_key, 2, 2)]))
+        self.assertNotEqual(blocks_hash, PersistentSubsectionGrade.compute_visible_blocks_hash([]))
+
+
+class PersistentCourseGradeTest(TestCase):
+    """
+    Tests for the PersistentCourseGrade model.
+    """
+    def setUp(self):
+        super(PersistentCourseGradeTest, self).setUp()
+        self.course = MagicMock()
+        self.course.id = CourseLocator(org='some_org', course='some_course', run='some_run')
+        self.course.grading_policy = {'GRADER': [], 'GRADE_CUTOFFS': {'Pass': 0.5}}
+        self.course.subtree_edited_on = None
+
+    def test_create_and_read(self):
+        self.assertIsNone(PersistentCourseGrade.read_course_grade(42, self.course))
+        PersistentCourseGrade.update_or_create_course_grade(42, self.course, 0.75, 'Pass')
+        PersistentCourseGrade.update_or_create_course_grade(42, self.course, 0.25, None)
+        with self.assertNumQueries(1):
+            grade = PersistentCourseGrade.read_course_grade(42, self.course)
+        self.assertEqual(grade.percent_grade, 0.25)
+        self.assertEqual(grade.letter_grade, u'')
+
+    def test_grading_policy_changed(self):
+        PersistentCourseGrade.update_or_create_course_grade(42, self.course, 0.75, 'Pass')
+        self.course.grading_policy = {'GRADER': [], 'GRADE_CUTOFFS': {'Pass': 0.8}}
+        self.assertIsNone(PersistentCourseGrade.read_course_grade(42, self.course))
+
+    def test_course_content_changed(self):
+        grade = PersistentCourseGrade.update_or_create_course_grade(42, self.course, 0.75, 'Pass')
+        self.course.subtree_edited_on = grade.modified - timedelta(seconds=1)
+        self.assertIsNotNone(PersistentCourseGrade.read_course_grade(42, self.course))
+        self.course.subtree_edited_on = grade.modified + timedelta(seconds=1)
+        self.assertIsNone(PersistentCourseGrade.read_course_grade(42, self.course))
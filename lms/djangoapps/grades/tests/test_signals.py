@@ -3,9 +3,16 @@ Tests for the score change signals defined in the courseware models module.
 """
 
 from django.test import TestCase
+from django.test.utils import override_settings
 from mock import patch, MagicMock
+from opaque_keys.edx.keys import CourseKey, UsageKey
 
-from ..signals import submissions_score_set_handler, submissions_score_reset_handler
+from ..models import PersistentGradesEnabledFlag
+from ..signals import (
+    recalculate_persistent_grades_handler,
+    submissions_score_set_handler,
+    submissions_score_reset_handler,
+)
 
 
 SUBMISSION_SET_KWARGS = {
@@ -148,3 +155,46 @@ class SubmissionSignalRelayTest(TestCase):
         self.get_user_mock = self.setup_patch('lms.djangoapps.grades.signals.user_by_anonymous_id', None)
         submissions_score_reset_handler(None, **SUBMISSION_RESET_KWARGS)
         self.signal_mock.assert_not_called()
+
+
+class RecalculatePersistentGradesTest(TestCase):
+    """
+    Tests for the handler that schedules the update of persisted grades on
+    SCORE_CHANGED.
+    """
+    SCORE_CHANGED_KWARGS = {
+        'points_possible': 10,
+        'points_earned': 5,
+        'user_id': 42,
+        'course_id': 'org/course/run',
+        'usage_id': 'i4x://org/course/problem/123456',
+    }
+
+    @patch('lms.djangoapps.grades.course_grades.invalidate_persisted_grades')
+    @patch('lms.djangoapps.grades.tasks.recalculate_persisted_grades.apply_async')
+    def test_disabled(self, mock_apply_async, mock_invalidate):
+        recalculate_persistent_grades_handler(None, **self.SCORE_CHANGED_KWARGS)
+        self.assertFalse(mock_invalidate.called)
+        self.assertFalse(mock_apply_async.called)
+
+    @override_settings(PERSISTENT_GRADES_RECALCULATION_DELAY=5)
+    @patch('lms.djangoapps.grades.course_grades.invalidate_persisted_grades')
+    @patch('lms.djangoapps.grades.tasks.recalculate_persisted_grades.apply_async')
+    def test_enabled(self, mock_apply_async, mock_invalidate):
+        PersistentGradesEnabledFlag.objects.create(enabled=True)
+        recalculate_persistent_grades_handler(None, **self.SCORE_CHANGED_KWARGS)
+        mock_invalidate.assert_called_once_with(
+            42,
+            CourseKey.from_string('org/course/run'),
+            UsageKey.from_string('i4x://org/course/problem/123456'),
+        )
+        mock_apply_async.assert_called_once_with((42, 'org/course/run'), countdown=5)
+
+    @patch('lms.djangoapps.grades.course_grades.invalidate_persisted_grades')
+    @patch('lms.djangoapps.grades.tasks.recalculate_persisted_grades.apply_async', side_effect=Exception)
+    def test_scheduling_failure(self, mock_apply_async, mock_invalidate):  # pylint: disable=unused-argument
+        PersistentGradesEnabledFlag.objects.create(enabled=True)
+        with patch('lms.djangoapps.grades.signals.log') as mock_log:
+            recalculate_persistent_grades_handler(None, **self.SCORE_CHANGED_KWARGS)
+        self.assertTrue(mock_invalidate.called)
+        self.assertTrue(mock_log.exception.called)
@@ -0,0 +1,37 @@
+"""
+Tests for the grades tasks.
+"""
+
+from django.test import TestCase
+from mock import patch
+from opaque_keys.edx.keys import CourseKey
+
+from student.tests.factories import UserFactory
+
+from ..tasks import recalculate_persisted_grades
+
+
+class RecalculatePersistedGradesTest(TestCase):
+    """
+    Tests for the task updating persisted grades after a score change.
+    """
+    COURSE_ID = 'org/course/run'
+
+    def setUp(self):
+        super(RecalculatePersistedGradesTest, self).setUp()
+        self.user = UserFactory()
+
+    @patch('lms.djangoapps.grades.tasks.update_persisted_grades')
+    def test_recalculate(self, mock_update):
+        recalculate_persisted_grades.apply(args=(self.user.id, self.COURSE_ID))
+        mock_update.assert_called_once_with(self.user, CourseKey.from_string(self.COURSE_ID))
+
+    @patch('lms.djangoapps.grades.tasks.PersistentCourseGrade.delete_course_grade')
+    @patch('lms.djangoapps.grades.tasks.PersistentSubsectionGrade.delete_grades')
+    @patch('lms.djangoapps.grades.tasks.update_persisted_grades', side_effect=Exception)
+    def test_failure_retried_then_invalidated(self, mock_update, mock_delete_grades, mock_delete_course_grade):
+        recalculate_persisted_grades.apply(args=(self.user.id, self.COURSE_ID))
+        self.assertEqual(mock_update.call_count, recalculate_persisted_grades.max_retries + 1)
+        course_key = CourseKey.from_string(self.COURSE_ID)
+        mock_delete_grades.assert_called_once_with(self.user.id, course_key)
+        mock_delete_course_grade.assert_called_once_with(self.user.id, course_key)
@@ -17,10 +17,11 @@ import csv
 import json
 import hashlib
 import os.path
+import tempfile
 
 from django.conf import settings
 from django.contrib.auth.models import User
-from django.core.files.base import ContentFile
+from django.core.files.base import File
 from django.db import models, transaction
 
 from openedx.core.storage import get_storage
@@ -31,6 +32,10 @@ from xmodule_django.models import CourseKeyField
 QUEUING = 'QUEUING'
 PROGRESS = 'PROGRESS'
 
+# Reports are written to a temporary file, which is kept in memory until it
+# grows larger than this number of bytes.
+REPORT_SPOOL_MAX_SIZE = 1024 * 1024
+
 
 class InstructorTask(models.Model):
     """
@@ -178,9 +183,8 @@ class InstructorTask(models.Model):
 class ReportStore(object):
     """
     Simple abstraction layer that can fetch and store CSV files for reports
-    download. Should probably refactor later to create a ReportFile object that
-    can simply be appended to for the sake of memory efficiency, rather than
-    passing in the whole dataset. Doing that for now just because it's simpler.
+    download. Large reports can be written row by row with a ReportRowsWriter,
+    rather than passing in the whole dataset.
     """
     @classmethod
     def from_config(cls, config_name):
@@ -211,15 +215,6 @@ class ReportStore(object):
             )
         return DjangoStorageReportStore.from_config(config_name)
 
-    def _get_utf8_encoded_rows(self, rows):
-        """
-        Given a list of `rows` containing unicode strings, return a
-        new list of rows with those strings encoded as utf-8 for CSV
-        compatibility.
-        """
-        for row in rows:
-            yield [unicode(item).encode('utf-8') for item in row]
-
 
 class DjangoStorageReportStore(ReportStore):
     """
@@ -263,12 +258,17 @@ class DjangoStorageReportStore(ReportStore):
         """
         Given a course_id, filename, and rows (each row is an iterable of
         strings), write the rows to the storage backend in csv format.
+        `rows` can be any iterable, and is consumed as it is written.
         """
-        output_buffer = ContentFile('')
-        csvwriter = csv.writer(output_buffer)
-        csvwriter.writerows(self._get_utf8_encoded_rows(rows))
-        output_buffer.seek(0)
-        self.store(course_id, filename, output_buffer)
+        with self.rows_writer(course_id, filename) as writer:
+            writer.writerows(rows)
+
+    def rows_writer(self, course_id, filename):
+        """
+        Return a ReportRowsWriter which stores the rows written to it as the
+        csv file `filename` of the course `course_id`.
+        """
+        return ReportRowsWriter(self, course_id, filename)
 
     def links_for(self, course_id):
         """
@@ -296,3 +296,63 @@ class DjangoStorageReportStore(ReportStore):
         """
         hashed_course_id = hashlib.sha1(course_id.to_deprecated_string()).hexdigest()
         return os.path.join(hashed_course_id, filename)
+
+
+class ReportRowsWriter(object):
+    """
+    Writes the rows of a csv report to a temporary file, so that they don't
+    need to be held in memory, and stores the file to the ReportStore once
+    all of them are written, so that a partially written report is never
+    listed.
+
+    Used as a context manager, the file is stored on exit, unless `discard`
+    was called or an exception was raised.
+    """
+    def __init__(self, report_store, course_id, filename):
+        self.report_store = report_store
+        self.course_id = course_id
+        self.filename = filename
+        self.num_rows = 0
+        self.stored = False
+        self._file = tempfile.SpooledTemporaryFile(max_size=REPORT_SPOOL_MAX_SIZE)
+        self._csvwriter = csv.writer(self._file)
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, exc_type, exc_value, traceback):
+        if exc_type is None and not self._file.closed:
+            self.store()
+        else:
+            self.discard()
+
+    def writerow(self, row):
+        """
+        Write a row (an iterable of strings) to the report, with its strings
+        encoded as utf-8 for CSV compatibility.
+        """
+        self._csvwriter.writerow([unicode(item).encode('utf-8') for item in row])
+        self.num_rows += 1
+
+    def writerows(self, rows):
+        """
+        Write the rows of the iterable `rows` to the report.
+        """
+        for row in rows:
+            self.writerow(row)
+
+    def store(self):
+        """
+        Store the rows written so far to the ReportStore, and close the
+        writer.
+        """
+        self._file.seek(0)
+        self.report_store.store(self.course_id, self.filename, File(self._file))
+        self.stored = True
+        self._file.close()
+
+    def discard(self):
+        """
+        Close the writer without storing the rows written.
+        """
+        self._file.close()
@@ -31,6 +31,7 @@ from instructor_task.tasks_helper import (
     run_main_task,
     BaseInstructorTask,
     perform_module_state_update,
+    perform_module_state_update_subtask,
     rescore_problem_module_state,
     reset_attempts_module_state,
     delete_problem_module_state,
@@ -51,6 +52,27 @@ from instructor_task.tasks_helper import (
 
 TASK_LOG = logging.getLogger('edx.celery.task')
 
+# The update functions of the tasks updating StudentModules, by InstructorTask task_type.
+MODULE_STATE_UPDATE_FUNCTIONS = {
+    'rescore_problem': rescore_problem_module_state,
+    'reset_problem_attempts': reset_attempts_module_state,
+    'delete_problem_state': delete_problem_module_state,
+}
+
+
+def _create_module_state_update_subtask_fcn(task_type, entry_id, xmodule_instance_args):
+    """
+    Returns a function creating the update_problem_module_states subtask updating the
+    StudentModules of a shard of an InstructorTask of type `task_type`.
+    """
+    def create_subtask_fcn(module_ids, subtask_status):
+        """Creates the subtask updating the StudentModules with ids `module_ids`."""
+        return update_problem_module_states.subtask(
+            (entry_id, task_type, module_ids, xmodule_instance_args, subtask_status.to_dict()),
+            task_id=subtask_status.task_id,
+        )
+    return create_subtask_fcn
+
 
 @task(base=BaseInstructorTask)  # pylint: disable=not-callable
 def rescore_problem(entry_id, xmodule_instance_args):
@@ -79,7 +101,8 @@ def rescore_problem(entry_id, xmodule_instance_args):
         """Filter that matches problems which are marked as being done"""
         return modules_to_update.filter(state__contains='"done": true')
 
-    visit_fcn = partial(perform_module_state_update, update_fcn, filter_fcn)
+    create_subtask_fcn = _create_module_state_update_subtask_fcn('rescore_problem', entry_id, xmodule_instance_args)
+    visit_fcn = partial(perform_module_state_update, update_fcn, filter_fcn, create_subtask_fcn=create_subtask_fcn)
     return run_main_task(entry_id, visit_fcn, action_name)
 
 
@@ -101,7 +124,8 @@ def reset_problem_attempts(entry_id, xmodule_instance_args):
     # Translators: This is a past-tense verb that is inserted into task progress messages as {action}.
     action_name = ugettext_noop('reset')
     update_fcn = partial(reset_attempts_module_state, xmodule_instance_args)
-    visit_fcn = partial(perform_module_state_update, update_fcn, None)
+    create_subtask_fcn = _create_module_state_update_subtask_fcn('reset_problem_attempts', entry_id, xmodule_instance_args)
+    visit_fcn = partial(perform_module_state_update, update_fcn, None, create_subtask_fcn=create_subtask_fcn)
     return run_main_task(entry_id, visit_fcn, action_name)
 
 
@@ -123,10 +147,42 @@ def delete_problem_state(entry_id, xmodule_instance_args):
     # Translators: This is a past-tense verb that is inserted into task progress messages as {action}.
     action_name = ugettext_noop('deleted')
     update_fcn = partial(delete_problem_module_state, xmodule_instance_args)
-    visit_fcn = partial(perform_module_state_update, update_fcn, None)
+    create_subtask_fcn = _create_module_state_update_subtask_fcn('delete_problem_state', entry_id, xmodule_instance_args)
+    visit_fcn = partial(perform_module_state_update, update_fcn, None, create_subtask_fcn=create_subtask_fcn)
     return run_main_task(entry_id, visit_fcn, action_name)
 
 
+@task(  # pylint: disable=not-callable
+    default_retry_delay=settings.INSTRUCTOR_TASK_MODULE_STATE_RETRY_DELAY,
+    max_retries=settings.INSTRUCTOR_TASK_MODULE_STATE_MAX_RETRIES,
+)
+def update_problem_module_states(entry_id, task_type, module_ids, xmodule_instance_args, subtask_status_dict):
+    """
+    Updates the StudentModules with ids `module_ids`, as a subtask of the rescore_problem,
+    reset_problem_attempts or delete_problem_state task of the InstructorTask `entry_id`.
+
+    `task_type` is the type of the InstructorTask, which selects the update function.
+    `subtask_status_dict` is the dict representation of the SubtaskStatus of this subtask.
+
+    On unexpected errors, the subtask is retried for the StudentModules it hasn't updated
+    yet, with an exponential backoff.
+    """
+    update_fcn = partial(MODULE_STATE_UPDATE_FUNCTIONS[task_type], xmodule_instance_args)
+
+    def retry_fcn(remaining_module_ids, subtask_status, exc):
+        """Retries the subtask for the StudentModules with ids `remaining_module_ids`."""
+        countdown = (2 ** (subtask_status.retried_withmax - 1)) * update_problem_module_states.default_retry_delay
+        # When run eagerly, retry() returns the RetryTaskError rather than raising it.
+        raise update_problem_module_states.retry(
+            args=[entry_id, task_type, remaining_module_ids, xmodule_instance_args, subtask_status.to_dict()],
+            exc=exc,
+            countdown=countdown,
+            throw=True,
+        )
+
+    return perform_module_state_update_subtask(update_fcn, entry_id, module_ids, subtask_status_dict, retry_fcn)
+
+
 @task(base=BaseInstructorTask)  # pylint: disable=not-callable
 def send_bulk_course_email(entry_id, _xmodule_instance_args):
     """Sends emails to recipients enrolled in a course.
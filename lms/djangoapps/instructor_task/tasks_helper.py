@@ -6,20 +6,23 @@ running state of a course.
 import json
 import re
 from collections import OrderedDict
+from contextlib import contextmanager
 from datetime import datetime
 from django.conf import settings
 from eventtracking import tracker
-from itertools import chain
+from itertools import chain, islice
 from time import time
 import unicodecsv
 import logging
 
 from celery import Task, current_task
-from celery.states import SUCCESS, FAILURE
+from celery.exceptions import RetryTaskError  # pylint: disable=no-name-in-module, import-error
+from celery.states import SUCCESS, FAILURE, RETRY
 from django.contrib.auth.models import User
+from django.core.cache import cache
 from django.core.files.storage import DefaultStorage
 from django.db import reset_queries
-from django.db.models import Q
+from django.db.models import Max, Q
 import dogstats_wrapper as dog_stats_api
 from pytz import UTC
 from StringIO import StringIO
@@ -29,6 +32,7 @@ from shoppingcart.models import (
     PaidCourseRegistration, CourseRegCodeItem, InvoiceTransaction,
     Invoice, CouponRedemption, RegistrationCodeRedemption, CourseRegistrationCode
 )
+from submissions.models import Score as SubmissionScore
 from survey.models import SurveyAnswer
 
 from track.views import task_track
@@ -46,7 +50,8 @@ from certificates.models import (
 )
 from certificates.api import generate_user_certificates
 from courseware.courses import get_course_by_id, get_problems_in_section
-from grades.course_grades import iterate_grades_for
+from lms.djangoapps.grades.context import grading_context_for_course
+from lms.djangoapps.grades.course_grades import GRADING_BATCH_SIZE, iterate_grades_for
 from courseware.models import StudentModule
 from courseware.model_data import DjangoKeyValueStore, FieldDataCache
 from courseware.module_render import get_module_for_descriptor_internal
@@ -59,13 +64,19 @@ from instructor_analytics.basic import (
 from instructor_analytics.csvs import format_dictlist
 from openassessment.data import OraAggregateData
 from instructor_task.models import ReportStore, InstructorTask, PROGRESS
+from instructor_task.subtasks import (
+    SubtaskStatus,
+    check_subtask_is_valid,
+    queue_subtasks_for_query,
+    update_subtask_status,
+)
 from lms.djangoapps.lms_xblock.runtime import LmsPartitionService
 from openedx.core.djangoapps.course_groups.cohorts import get_cohort
 from openedx.core.djangoapps.course_groups.models import CourseUserGroup
 from openedx.core.djangoapps.content.course_structures.models import CourseStructure
 from opaque_keys.edx.keys import UsageKey
 from openedx.core.djangoapps.course_groups.cohorts import add_user_to_cohort, is_course_cohorted
-from student.models import CourseEnrollment, CourseAccessRole
+from student.models import AnonymousUserId, CourseEnrollment, CourseAccessRole
 from lms.djangoapps.teams.models import CourseTeamMembership
 from lms.djangoapps.verify_student.models import SoftwareSecurePhotoVerification
 
@@ -83,6 +94,15 @@ UPDATE_STATUS_SKIPPED = 'skipped'
 # The setting name used for events when "settings" (account settings, preferences, profile information) change.
 REPORT_REQUESTED_EVENT_NAME = u'edx.instructor.report.requested'
 
+# The grades used by grade reports are cached for this number of seconds when
+# incremental grade reports are enabled.  The version is part of the key, and
+# is to be bumped whenever the format of the cached grades changes.
+REPORT_GRADES_CACHE_TIMEOUT = 60 * 60 * 24 * 7
+REPORT_GRADES_CACHE_VERSION = 1
+REPORT_GRADES_CACHE_KEY = (
+    u'instructor_task.report_grades.v{version}.{report_name}.{course_id}.{content_version}.{user_id}.{scores_modified}'
+)
+
 
 class BaseInstructorTask(Task):
     """
@@ -298,7 +318,8 @@ def run_main_task(entry_id, task_fcn, action_name):
     return task_progress
 
 
-def perform_module_state_update(update_fcn, filter_fcn, _entry_id, course_id, task_input, action_name):
+def perform_module_state_update(update_fcn, filter_fcn, entry_id, course_id, task_input, action_name,
+                                create_subtask_fcn=None):
     """
     Performs generic update by visiting StudentModule instances with the update_fcn provided.
 
@@ -316,6 +337,11 @@ def perform_module_state_update(update_fcn, filter_fcn, _entry_id, course_id, ta
     the update is successful; False indicates the update on the particular student module failed.
     A raised exception indicates a fatal condition -- that no other student modules should be considered.
 
+    If a `create_subtask_fcn` is not None, and there are more than INSTRUCTOR_TASK_MODULE_STATE_SHARD_SIZE
+    StudentModules to update for all students, they are split in shards of consecutive students,
+    which are updated by subtasks in parallel.  `create_subtask_fcn` is passed the ids of the
+    StudentModules of a shard and the SubtaskStatus of its subtask, and returns the subtask to queue.
+
     The return value is a dict containing the task's results, with the following keys:
 
           'attempted': number of attempts made
@@ -333,25 +359,8 @@ def perform_module_state_update(update_fcn, filter_fcn, _entry_id, course_id, ta
 
     """
     start_time = time()
-    usage_keys = []
-    problem_url = task_input.get('problem_url')
-    entrance_exam_url = task_input.get('entrance_exam_url')
     student_identifier = task_input.get('student')
-    problems = {}
-
-    # if problem_url is present make a usage key from it
-    if problem_url:
-        usage_key = course_id.make_usage_key_from_deprecated_string(problem_url)
-        usage_keys.append(usage_key)
-
-        # find the problem descriptor:
-        problem_descriptor = modulestore().get_item(usage_key)
-        problems[unicode(usage_key)] = problem_descriptor
-
-    # if entrance_exam is present grab all problems in it
-    if entrance_exam_url:
-        problems = get_problems_in_section(entrance_exam_url)
-        usage_keys = [UsageKey.from_string(location) for location in problems.keys()]
+    usage_keys, problems = _get_problems_to_update(course_id, task_input)
 
     # find the modules in question
     modules_to_update = StudentModule.objects.filter(course_id=course_id, module_state_key__in=usage_keys)
@@ -373,30 +382,160 @@ def perform_module_state_update(update_fcn, filter_fcn, _entry_id, course_id, ta
     if filter_fcn is not None:
         modules_to_update = filter_fcn(modules_to_update)
 
-    task_progress = TaskProgress(action_name, modules_to_update.count(), start_time)
+    total_num_modules = modules_to_update.count()
+    shard_size = settings.INSTRUCTOR_TASK_MODULE_STATE_SHARD_SIZE
+    if create_subtask_fcn is not None and student is None and total_num_modules > shard_size:
+        def create_shard_subtask_fcn(item_list, subtask_status):
+            """Creates the subtask updating the StudentModules in `item_list`."""
+            return create_subtask_fcn([item['pk'] for item in item_list], subtask_status)
+
+        return queue_subtasks_for_query(
+            InstructorTask.objects.get(pk=entry_id),
+            action_name,
+            create_shard_subtask_fcn,
+            [modules_to_update.order_by('student_id')],
+            ['student_id'],
+            shard_size,
+            total_num_modules,
+        )
+
+    task_progress = TaskProgress(action_name, total_num_modules, start_time)
     task_progress.update_task_state()
 
     for module_to_update in modules_to_update:
         task_progress.attempted += 1
-        module_descriptor = problems[unicode(module_to_update.module_state_key)]
-        # There is no try here:  if there's an error, we let it throw, and the task will
-        # be marked as FAILED, with a stack trace.
-        with dog_stats_api.timer('instructor_tasks.module.time.step', tags=[u'action:{name}'.format(name=action_name)]):
-            update_status = update_fcn(module_descriptor, module_to_update)
-            if update_status == UPDATE_STATUS_SUCCEEDED:
-                # If the update_fcn returns true, then it performed some kind of work.
-                # Logging of failures is left to the update_fcn itself.
-                task_progress.succeeded += 1
-            elif update_status == UPDATE_STATUS_FAILED:
-                task_progress.failed += 1
-            elif update_status == UPDATE_STATUS_SKIPPED:
-                task_progress.skipped += 1
-            else:
-                raise UpdateProblemModuleStateError("Unexpected update_status returned: {}".format(update_status))
+        update_status = _update_module_state(update_fcn, problems, module_to_update, action_name)
+        if update_status == UPDATE_STATUS_SUCCEEDED:
+            task_progress.succeeded += 1
+        elif update_status == UPDATE_STATUS_FAILED:
+            task_progress.failed += 1
+        else:
+            task_progress.skipped += 1
 
     return task_progress.update_task_state()
 
 
+def perform_module_state_update_subtask(update_fcn, entry_id, module_ids, subtask_status_dict, retry_fcn):
+    """
+    Performs the update of the StudentModule instances with ids `module_ids` with the `update_fcn`
+    provided, as a subtask of the InstructorTask `entry_id` queued by perform_module_state_update.
+
+    The problem descriptors are loaded once for all the StudentModules, and the course is cached
+    while they are updated.
+
+    If the update of a StudentModule raises an exception other than UpdateProblemModuleStateError,
+    `retry_fcn` is called to retry the subtask.  It is passed the ids of the StudentModules not
+    updated yet, the SubtaskStatus of the subtask, and the exception, and is expected to raise
+    the RetryTaskError of the retry, or the exception once there are no retries left.  The
+    StudentModules which couldn't be updated are then counted as failed.
+
+    Returns the dict representation of the SubtaskStatus of the subtask.
+    """
+    subtask_status = SubtaskStatus.from_dict(subtask_status_dict)
+    current_task_id = subtask_status.task_id
+
+    # Check that the requested subtask is actually known to the current InstructorTask entry,
+    # and hasn't already been completed or started by another worker.
+    check_subtask_is_valid(entry_id, current_task_id, subtask_status)
+
+    entry = InstructorTask.objects.get(pk=entry_id)
+    course_id = entry.course_id
+    action_name = json.loads(entry.task_output)['action_name']
+    TASK_LOG.info(
+        u'Task: %s, InstructorTask ID: %s, Course: %s, Starting update of %d modules (subtask %s)',
+        entry.task_id, entry_id, course_id, len(module_ids), current_task_id
+    )
+
+    update_counts = {UPDATE_STATUS_SUCCEEDED: 0, UPDATE_STATUS_FAILED: 0, UPDATE_STATUS_SKIPPED: 0}
+    remaining_module_ids = set(module_ids)
+    update_exception = None
+    try:
+        with modulestore().bulk_operations(course_id):
+            __, problems = _get_problems_to_update(course_id, json.loads(entry.task_input))
+            modules_to_update = StudentModule.objects.filter(pk__in=module_ids).order_by('student_id')
+            for module_to_update in modules_to_update:
+                update_status = _update_module_state(update_fcn, problems, module_to_update, action_name)
+                update_counts[update_status] += 1
+                remaining_module_ids.discard(module_to_update.id)
+    except Exception as exc:  # pylint: disable=broad-except
+        TASK_LOG.warning(
+            u'Task: %s, InstructorTask ID: %s, subtask %s failed with %d modules left to update',
+            entry.task_id, entry_id, current_task_id, len(remaining_module_ids), exc_info=True
+        )
+        update_exception = exc
+
+    subtask_status.increment(
+        succeeded=update_counts[UPDATE_STATUS_SUCCEEDED],
+        failed=update_counts[UPDATE_STATUS_FAILED],
+        skipped=update_counts[UPDATE_STATUS_SKIPPED],
+    )
+    # Unlike emails, skipped modules have been attempted.
+    subtask_status.attempted += update_counts[UPDATE_STATUS_SKIPPED]
+
+    if update_exception is None:
+        subtask_status.increment(state=SUCCESS)
+        update_subtask_status(entry_id, current_task_id, subtask_status)
+        return subtask_status.to_dict()
+
+    if not isinstance(update_exception, UpdateProblemModuleStateError):
+        # Update the status before retrying, so that it can't race with the retried subtask's.
+        subtask_status.increment(retried_withmax=1, state=RETRY)
+        update_subtask_status(entry_id, current_task_id, subtask_status)
+        try:
+            retry_fcn(sorted(remaining_module_ids), subtask_status, update_exception)
+        except RetryTaskError:
+            raise
+        except Exception:  # pylint: disable=broad-except
+            # There are no retries left.
+            pass
+
+    # The StudentModules left are counted as failed.
+    subtask_status.increment(failed=len(remaining_module_ids), state=FAILURE)
+    update_subtask_status(entry_id, current_task_id, subtask_status)
+    raise update_exception
+
+
+def _get_problems_to_update(course_id, task_input):
+    """
+    Returns the usage keys of the problems whose StudentModules are to be updated for
+    `task_input`, and a dict of their descriptors by usage key.
+    """
+    usage_keys = []
+    problem_url = task_input.get('problem_url')
+    entrance_exam_url = task_input.get('entrance_exam_url')
+    problems = {}
+
+    # if problem_url is present make a usage key from it
+    if problem_url:
+        usage_key = course_id.make_usage_key_from_deprecated_string(problem_url)
+        usage_keys.append(usage_key)
+
+        # find the problem descriptor:
+        problem_descriptor = modulestore().get_item(usage_key)
+        problems[unicode(usage_key)] = problem_descriptor
+
+    # if entrance_exam is present grab all problems in it
+    if entrance_exam_url:
+        problems = get_problems_in_section(entrance_exam_url)
+        usage_keys = [UsageKey.from_string(location) for location in problems.keys()]
+
+    return usage_keys, problems
+
+
+def _update_module_state(update_fcn, problems, module_to_update, action_name):
+    """
+    Updates a single StudentModule with the `update_fcn`, returning the update status.
+    """
+    module_descriptor = problems[unicode(module_to_update.module_state_key)]
+    # There is no try here:  if there's an error, we let it throw, and the task will
+    # be marked as FAILED, with a stack trace.
+    with dog_stats_api.timer('instructor_tasks.module.time.step', tags=[u'action:{name}'.format(name=action_name)]):
+        update_status = update_fcn(module_descriptor, module_to_update)
+        if update_status not in (UPDATE_STATUS_SUCCEEDED, UPDATE_STATUS_FAILED, UPDATE_STATUS_SKIPPED):
+            raise UpdateProblemModuleStateError("Unexpected update_status returned: {}".format(update_status))
+    return update_status
+
+
 def _get_task_id_from_xmodule_args(xmodule_instance_args):
     """Gets task_id from `xmodule_instance_args` dict, or returns default value if missing."""
     return xmodule_instance_args.get('task_id', UNKNOWN_TASK_ID) if xmodule_instance_args is not None else UNKNOWN_TASK_ID
@@ -611,22 +750,46 @@ def upload_csv_to_report_store(rows, csv_name, course_id, timestamp, config_name
                 [row1_colum1, row1_colum2, ...],
                 ...
             ]
+            Any iterable of rows can be passed, such as a generator, and
+            is written as it is consumed.
         csv_name: Name of the resulting CSV
         course_id: ID of the course
     """
     report_store = ReportStore.from_config(config_name)
-    report_store.store_rows(
-        course_id,
-        u"{course_prefix}_{csv_name}_{timestamp_str}.csv".format(
-            course_prefix=course_filename_prefix_generator(course_id),
-            csv_name=csv_name,
-            timestamp_str=timestamp.strftime("%Y-%m-%d-%H%M")
-        ),
-        rows
-    )
+    report_store.store_rows(course_id, _get_report_filename(csv_name, course_id, timestamp), rows)
     tracker.emit(REPORT_REQUESTED_EVENT_NAME, {"report_type": csv_name, })
 
 
+@contextmanager
+def report_rows_writer(csv_name, course_id, timestamp, config_name='GRADES_DOWNLOAD'):
+    """
+    Context manager returning a ReportRowsWriter, which uploads the rows
+    written to it as a CSV using ReportStore on exit, for reports too large
+    to be built in memory.  Nothing is uploaded if an exception is raised,
+    or if the writer's `discard` method is called.
+
+    Arguments:
+        csv_name: Name of the resulting CSV
+        course_id: ID of the course
+    """
+    report_store = ReportStore.from_config(config_name)
+    with report_store.rows_writer(course_id, _get_report_filename(csv_name, course_id, timestamp)) as writer:
+        yield writer
+    if writer.stored:
+        tracker.emit(REPORT_REQUESTED_EVENT_NAME, {"report_type": csv_name, })
+
+
+def _get_report_filename(csv_name, course_id, timestamp):
+    """
+    Returns the name of the CSV `csv_name` of the course `course_id` generated at `timestamp`.
+    """
+    return u"{course_prefix}_{csv_name}_{timestamp_str}.csv".format(
+        course_prefix=course_filename_prefix_generator(course_id),
+        csv_name=csv_name,
+        timestamp_str=timestamp.strftime("%Y-%m-%d-%H%M")
+    )
+
+
 def upload_exec_summary_to_store(data_dict, report_name, course_id, generated_at, config_name='FINANCIAL_REPORTS'):
     """
     Upload Executive Summary Html file using ReportStore.
@@ -658,9 +821,10 @@ def upload_grades_csv(_xmodule_instance_args, _entry_id, course_id, _task_input,
     For a given `course_id`, generate a grades CSV file for all students that
     are enrolled, and store using a `ReportStore`. Once created, the files can
     be accessed by instantiating another `ReportStore` (via
-    `ReportStore.from_config()`) and calling `link_for()` on it. Writes are
-    buffered, so we'll never write part of a CSV file to S3 -- i.e. any files
-    that are visible in ReportStore will be complete ones.
+    `ReportStore.from_config()`) and calling `link_for()` on it. Rows are
+    written to a temporary file as students are graded, and the file is
+    uploaded once complete, so we'll never write part of a CSV file to S3 --
+    i.e. any files that are visible in ReportStore will be complete ones.
 
     As we start to add more CSV downloads, it will probably be worthwhile to
     make a more general CSVDoc class instead of building out the rows like we
@@ -694,9 +858,8 @@ def upload_grades_csv(_xmodule_instance_args, _entry_id, course_id, _task_input,
     certificate_whitelist = CertificateWhitelist.objects.filter(course_id=course_id, whitelist=True)
     whitelisted_user_ids = [entry.user_id for entry in certificate_whitelist]
 
-    # Loop over all our students and build our CSV lists in memory
+    # Loop over all our students and write the grades to our CSV as we go
     header = None
-    rows = []
     err_rows = [["id", "username", "error_msg"]]
     current_step = {'step': 'Calculating Grades'}
 
@@ -710,17 +873,94 @@ def upload_grades_csv(_xmodule_instance_args, _entry_id, course_id, _task_input,
 
         total_enrolled_students
     )
-    for student, gradeset, err_msg in iterate_grades_for(course_id, enrolled_students):
-        # Periodically update task status (this is a cache write)
-        if task_progress.attempted % status_interval == 0:
-            task_progress.update_task_state(extra_meta=current_step)
-        task_progress.attempted += 1
+    with report_rows_writer('grade_report', course_id, start_date) as grades_writer:
+        for student, gradeset, err_msg in _iterate_grades_for_report(
+                'grade_report', course_id, enrolled_students, _grade_report_gradeset
+        ):
+            # Periodically update task status (this is a cache write)
+            if task_progress.attempted % status_interval == 0:
+                task_progress.update_task_state(extra_meta=current_step)
+            task_progress.attempted += 1
+
+            # Now add a log entry after each student is graded to get a sense
+            # of the task's progress
+            student_counter += 1
+            TASK_LOG.info(
+                u'%s, Task type: %s, Current step: %s, Grade calculation in-progress for students: %s/%s',
+                task_info_string,
+                action_name,
+                current_step,
+                student_counter,
+                total_enrolled_students
+            )
+
+            if gradeset:
+                # We were able to successfully grade this student for this course.
+                task_progress.succeeded += 1
+                if not header:
+                    header = [section['label'] for section in gradeset[u'section_breakdown']]
+                    grades_writer.writerow(
+                        ["id", "email", "username", "grade"] + header + cohorts_header +
+                        group_configs_header + teams_header +
+                        ['Enrollment Track', 'Verification Status'] + certificate_info_header
+                    )
+
+                percents = {
+                    section['label']: section.get('percent', 0.0)
+                    for section in gradeset[u'section_breakdown']
+                    if 'label' in section
+                }
+
+                cohorts_group_name = []
+                if course_is_cohorted:
+                    group = get_cohort(student, course_id, assign=False)
+                    cohorts_group_name.append(group.name if group else '')
+
+                group_configs_group_names = []
+                for partition in experiment_partitions:
+                    group = LmsPartitionService(student, course_id).get_group(partition, assign=False)
+                    group_configs_group_names.append(group.name if group else '')
+
+                team_name = []
+                if teams_enabled:
+                    try:
+                        membership = CourseTeamMembership.objects.get(user=student, team__course_id=course_id)
+                        team_name.append(membership.team.name)
+                    except CourseTeamMembership.DoesNotExist:
+                        team_name.append('')
+
+                enrollment_mode = CourseEnrollment.enrollment_mode_for_user(student, course_id)[0]
+                verification_status = SoftwareSecurePhotoVerification.verification_status_for_user(
+                    student,
+                    course_id,
+                    enrollment_mode
+                )
+                certificate_info = certificate_info_for_user(
+                    student,
+                    course_id,
+                    gradeset['grade'],
+                    student.id in whitelisted_user_ids
+                )
+
+                # Not everybody has the same gradable items. If the item is not
+                # found in the user's gradeset, just assume it's a 0. The aggregated
+                # grades for their sections and overall course will be calculated
+                # without regard for the item they didn't have access to, so it's
+                # possible for a student to have a 0.0 show up in their row but
+                # still have 100% for the course.
+                row_percents = [percents.get(label, 0.0) for label in header]
+                grades_writer.writerow(
+                    [student.id, student.email, student.username, gradeset['percent']] +
+                    row_percents + cohorts_group_name + group_configs_group_names + team_name +
+                    [enrollment_mode] + [verification_status] + certificate_info
+                )
+            else:
+                # An empty gradeset means we failed to grade a student.
+                task_progress.failed += 1
+                err_rows.append([student.id, student.username, err_msg])
 
-        # Now add a log entry after each student is graded to get a sense
-        # of the task's progress
-        student_counter += 1
         TASK_LOG.info(
-            u'%s, Task type: %s, Current step: %s, Grade calculation in-progress for students: %s/%s',
+            u'%s, Task type: %s, Current step: %s, Grade calculation completed for students: %s/%s',
             task_info_string,
             action_name,
             current_step,
@@ -728,95 +968,138 @@ def upload_grades_csv(_xmodule_instance_args, _entry_id, course_id, _task_input,
             total_enrolled_students
         )
 
-        if gradeset:
-            # We were able to successfully grade this student for this course.
-            task_progress.succeeded += 1
-            if not header:
-                header = [section['label'] for section in gradeset[u'section_breakdown']]
-                rows.append(
-                    ["id", "email", "username", "grade"] + header + cohorts_header +
-                    group_configs_header + teams_header +
-                    ['Enrollment Track', 'Verification Status'] + certificate_info_header
-                )
+        # By this point, we've written all the rows of our grades CSV, which
+        # is uploaded when the writer is closed.
+        current_step = {'step': 'Uploading CSVs'}
+        task_progress.update_task_state(extra_meta=current_step)
+        TASK_LOG.info(u'%s, Task type: %s, Current step: %s', task_info_string, action_name, current_step)
 
-            percents = {
-                section['label']: section.get('percent', 0.0)
-                for section in gradeset[u'section_breakdown']
-                if 'label' in section
-            }
+    # If there are any error rows (don't count the header), write them out as well
+    if len(err_rows) > 1:
+        upload_csv_to_report_store(err_rows, 'grade_report_err', course_id, start_date)
 
-            cohorts_group_name = []
-            if course_is_cohorted:
-                group = get_cohort(student, course_id, assign=False)
-                cohorts_group_name.append(group.name if group else '')
+    # One last update before we close out...
+    TASK_LOG.info(u'%s, Task type: %s, Finalizing grade task', task_info_string, action_name)
+    return task_progress.update_task_state(extra_meta=current_step)
 
-            group_configs_group_names = []
-            for partition in experiment_partitions:
-                group = LmsPartitionService(student, course_id).get_group(partition, assign=False)
-                group_configs_group_names.append(group.name if group else '')
 
-            team_name = []
-            if teams_enabled:
-                try:
-                    membership = CourseTeamMembership.objects.get(user=student, team__course_id=course_id)
-                    team_name.append(membership.team.name)
-                except CourseTeamMembership.DoesNotExist:
-                    team_name.append('')
-
-            enrollment_mode = CourseEnrollment.enrollment_mode_for_user(student, course_id)[0]
-            verification_status = SoftwareSecurePhotoVerification.verification_status_for_user(
-                student,
-                course_id,
-                enrollment_mode
-            )
-            certificate_info = certificate_info_for_user(
-                student,
-                course_id,
-                gradeset['grade'],
-                student.id in whitelisted_user_ids
+def _iterate_grades_for_report(report_name, course_id, students, report_gradeset_fcn, keep_raw_scores=False):
+    """
+    Like iterate_grades_for, yields a tuple of (student, gradeset, err_msg)
+    for each of `students` in the course.
+
+    When incremental grade reports are enabled, the gradeset of each student,
+    reduced by `report_gradeset_fcn` to the grades used by the report
+    `report_name`, is cached by the version of the course content and the
+    last time the student's scores changed, and students whose cached grades
+    are still valid aren't regraded.  Grades are cached as soon as they are
+    computed, so that a report which was interrupted only grades the students
+    it hadn't graded when it is run again.
+    """
+    course = get_course_by_id(course_id) if settings.FEATURES.get('ENABLE_INCREMENTAL_GRADE_REPORTS') else None
+    content_version = course.subtree_edited_on if course is not None else None
+    if content_version is None:
+        for student, gradeset, err_msg in iterate_grades_for(course_id, students, keep_raw_scores=keep_raw_scores):
+            yield student, gradeset, err_msg
+        return
+
+    course_grading_context = grading_context_for_course(course)
+    students = iter(students)
+    while True:
+        student_batch = list(islice(students, GRADING_BATCH_SIZE))
+        if not student_batch:
+            break
+
+        scores_modified = _get_scores_modified(course_id, student_batch)
+        cache_keys = {
+            student.id: REPORT_GRADES_CACHE_KEY.format(
+                version=REPORT_GRADES_CACHE_VERSION,
+                report_name=report_name,
+                course_id=course_id,
+                content_version=content_version.isoformat(),
+                user_id=student.id,
+                scores_modified=scores_modified[student.id].isoformat() if student.id in scores_modified else None,
             )
+            for student in student_batch
+        }
+        cached_gradesets = cache.get_many(cache_keys.values())
+        dog_stats_api.increment(
+            'instructor_tasks.report_grades.cache_hits', len(cached_gradesets), tags=[u'report:{}'.format(report_name)]
+        )
 
-            # Not everybody has the same gradable items. If the item is not
-            # found in the user's gradeset, just assume it's a 0. The aggregated
-            # grades for their sections and overall course will be calculated
-            # without regard for the item they didn't have access to, so it's
-            # possible for a student to have a 0.0 show up in their row but
-            # still have 100% for the course.
-            row_percents = [percents.get(label, 0.0) for label in header]
-            rows.append(
-                [student.id, student.email, student.username, gradeset['percent']] +
-                row_percents + cohorts_group_name + group_configs_group_names + team_name +
-                [enrollment_mode] + [verification_status] + certificate_info
-            )
-        else:
-            # An empty gradeset means we failed to grade a student.
-            task_progress.failed += 1
-            err_rows.append([student.id, student.username, err_msg])
+        results = {}
+        students_to_grade = [student for student in student_batch if cache_keys[student.id] not in cached_gradesets]
+        graded_students = iterate_grades_for(
+            course,
+            students_to_grade,
+            keep_raw_scores=keep_raw_scores,
+            course_grading_context=course_grading_context,
+        )
+        for student, gradeset, err_msg in graded_students:
+            if gradeset:
+                gradeset = report_gradeset_fcn(gradeset)
+                cache.set(cache_keys[student.id], gradeset, REPORT_GRADES_CACHE_TIMEOUT)
+            results[student.id] = (gradeset, err_msg)
+
+        for student in student_batch:
+            if student.id in results:
+                gradeset, err_msg = results[student.id]
+            else:
+                gradeset, err_msg = cached_gradesets[cache_keys[student.id]], ""
+            yield student, gradeset, err_msg
 
-    TASK_LOG.info(
-        u'%s, Task type: %s, Current step: %s, Grade calculation completed for students: %s/%s',
-        task_info_string,
-        action_name,
-        current_step,
-        student_counter,
-        total_enrolled_students
-    )
 
-    # By this point, we've got the rows we're going to stuff into our CSV files.
-    current_step = {'step': 'Uploading CSVs'}
-    task_progress.update_task_state(extra_meta=current_step)
-    TASK_LOG.info(u'%s, Task type: %s, Current step: %s', task_info_string, action_name, current_step)
+def _grade_report_gradeset(gradeset):
+    """
+    Returns the grades of `gradeset` used by the grade report.
+    """
+    return {
+        'percent': gradeset['percent'],
+        'grade': gradeset['grade'],
+        'section_breakdown': [
+            {key: section[key] for key in ('label', 'percent') if key in section}
+            for section in gradeset['section_breakdown']
+        ],
+    }
 
-    # Perform the actual upload
-    upload_csv_to_report_store(rows, 'grade_report', course_id, start_date)
 
-    # If there are any error rows (don't count the header), write them out as well
-    if len(err_rows) > 1:
-        upload_csv_to_report_store(err_rows, 'grade_report_err', course_id, start_date)
+def _problem_grade_report_gradeset(gradeset):
+    """
+    Returns the grades of `gradeset` used by the problem grade report.
+    """
+    reduced_gradeset = {'percent': gradeset['percent']}
+    if 'raw_scores' in gradeset:
+        reduced_gradeset['raw_scores'] = [score for score in gradeset['raw_scores'] if score.graded]
+    return reduced_gradeset
 
-    # One last update before we close out...
-    TASK_LOG.info(u'%s, Task type: %s, Finalizing grade task', task_info_string, action_name)
-    return task_progress.update_task_state(extra_meta=current_step)
+
+def _get_scores_modified(course_id, students):
+    """
+    Returns a dict of the last time the courseware or submissions scores of
+    each of `students` with scores in the course changed, by user id.
+    """
+    user_ids = [student.id for student in students]
+    scores_modified = dict(
+        StudentModule.objects.filter(
+            course_id=course_id, student_id__in=user_ids
+        ).values_list('student_id').order_by().annotate(Max('modified'))
+    )
+
+    user_ids_by_anonymous_id = dict(
+        AnonymousUserId.objects.filter(
+            course_id=course_id, user_id__in=user_ids
+        ).values_list('anonymous_user_id', 'user_id')
+    )
+    if user_ids_by_anonymous_id:
+        submissions_scores_modified = SubmissionScore.objects.filter(
+            student_item__course_id=course_id.to_deprecated_string(),
+            student_item__student_id__in=user_ids_by_anonymous_id.keys(),
+        ).values_list('student_item__student_id').order_by().annotate(Max('created_at'))
+        for anonymous_id, created_at in submissions_scores_modified:
+            user_id = user_ids_by_anonymous_id[anonymous_id]
+            scores_modified[user_id] = max(scores_modified.get(user_id, created_at), created_at)
+
+    return scores_modified
 
 
 def _order_problems(blocks):
@@ -928,48 +1211,56 @@ def upload_problem_grade_report(_xmodule_instance_args, _entry_id, course_id, _t
             extra_meta={'step': 'Generating course structure. Please refresh and try again.'}
         )
 
-    # Just generate the static fields for now.
-    rows = [list(header_row.values()) + ['Final Grade'] + list(chain.from_iterable(problems.values()))]
     error_rows = [list(header_row.values()) + ['error_msg']]
     current_step = {'step': 'Calculating Grades'}
 
-    for student, gradeset, err_msg in iterate_grades_for(course_id, enrolled_students, keep_raw_scores=True):
-        student_fields = [getattr(student, field_name) for field_name in header_row]
-        task_progress.attempted += 1
+    with report_rows_writer('problem_grade_report', course_id, start_date) as grades_writer:
+        # Just generate the static fields for now.
+        grades_writer.writerow(
+            list(header_row.values()) + ['Final Grade'] + list(chain.from_iterable(problems.values()))
+        )
 
-        if 'percent' not in gradeset or 'raw_scores' not in gradeset:
-            # There was an error grading this student.
-            # Generally there will be a non-empty err_msg, but that is not always the case.
-            if not err_msg:
-                err_msg = u"Unknown error"
-            error_rows.append(student_fields + [err_msg])
-            task_progress.failed += 1
-            continue
+        for student, gradeset, err_msg in _iterate_grades_for_report(
+                'problem_grade_report', course_id, enrolled_students, _problem_grade_report_gradeset,
+                keep_raw_scores=True,
+        ):
+            student_fields = [getattr(student, field_name) for field_name in header_row]
+            task_progress.attempted += 1
 
-        final_grade = gradeset['percent']
-        # Only consider graded problems
-        problem_scores = {unicode(score.module_id): score for score in gradeset['raw_scores'] if score.graded}
-        earned_possible_values = list()
-        for problem_id in problems:
-            try:
-                problem_score = problem_scores[problem_id]
-                earned_possible_values.append([problem_score.earned, problem_score.possible])
-            except KeyError:
-                # The student has not been graded on this problem.  For example,
-                # iterate_grades_for skips problems that students have never
-                # seen in order to speed up report generation.  It could also be
-                # the case that the student does not have access to it (e.g. A/B
-                # test or cohorted courseware).
-                earned_possible_values.append(['N/A', 'N/A'])
-        rows.append(student_fields + [final_grade] + list(chain.from_iterable(earned_possible_values)))
+            if 'percent' not in gradeset or 'raw_scores' not in gradeset:
+                # There was an error grading this student.
+                # Generally there will be a non-empty err_msg, but that is not always the case.
+                if not err_msg:
+                    err_msg = u"Unknown error"
+                error_rows.append(student_fields + [err_msg])
+                task_progress.failed += 1
+                continue
 
-        task_progress.succeeded += 1
-        if task_progress.attempted % status_interval == 0:
-            task_progress.update_task_state(extra_meta=current_step)
+            final_grade = gradeset['percent']
+            # Only consider graded problems
+            problem_scores = {unicode(score.module_id): score for score in gradeset['raw_scores'] if score.graded}
+            earned_possible_values = list()
+            for problem_id in problems:
+                try:
+                    problem_score = problem_scores[problem_id]
+                    earned_possible_values.append([problem_score.earned, problem_score.possible])
+                except KeyError:
+                    # The student has not been graded on this problem.  For example,
+                    # iterate_grades_for skips problems that students have never
+                    # seen in order to speed up report generation.  It could also be
+                    # the case that the student does not have access to it (e.g. A/B
+                    # test or cohorted courseware).
+                    earned_possible_values.append(['N/A', 'N/A'])
+            grades_writer.writerow(student_fields + [final_grade] + list(chain.from_iterable(earned_possible_values)))
+
+            task_progress.succeeded += 1
+            if task_progress.attempted % status_interval == 0:
+                task_progress.update_task_state(extra_meta=current_step)
+
+        # Perform the upload only if any students have been successfully graded
+        if grades_writer.num_rows <= 1:
+            grades_writer.discard()
 
-    # Perform the upload if any students have been successfully graded
-    if len(rows) > 1:
-        upload_csv_to_report_store(rows, 'problem_grade_report', course_id, start_date)
     # If there are any error rows, write them out as well
     if len(error_rows) > 1:
         upload_csv_to_report_store(error_rows, 'problem_grade_report_err', course_id, start_date)
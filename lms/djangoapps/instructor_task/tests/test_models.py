@@ -49,6 +49,29 @@ class ReportStoreTestMixin(object):
             ['new_file', 'middle_file', 'old_file']
         )
 
+    def test_store_rows(self):
+        """
+        Test that ReportStore.store_rows() stores the rows of any iterable.
+        """
+        report_store = self.create_report_store()
+        report_store.store_rows(self.course_id, 'rows_file', ([u'r\xe9w', index] for index in xrange(10)))
+        self.assertEqual([link[0] for link in report_store.links_for(self.course_id)], ['rows_file'])
+
+    def test_rows_writer_not_stored(self):
+        """
+        Test that the rows written to a ReportRowsWriter aren't stored if it
+        is discarded, or if an exception is raised while writing them.
+        """
+        report_store = self.create_report_store()
+        with report_store.rows_writer(self.course_id, 'discarded_file') as writer:
+            writer.writerow(['field'])
+            writer.discard()
+        with self.assertRaises(ValueError):
+            with report_store.rows_writer(self.course_id, 'failed_file') as writer:
+                writer.writerow(['field'])
+                raise ValueError
+        self.assertEqual(report_store.links_for(self.course_id), [])
+
 
 class LocalFSReportStoreTestCase(ReportStoreTestMixin, TestReportMixin, SimpleTestCase):
     """
@@ -61,6 +84,17 @@ class LocalFSReportStoreTestCase(ReportStoreTestMixin, TestReportMixin, SimpleTe
         """
         return ReportStore.from_config(config_name='GRADES_DOWNLOAD')
 
+    @patch('instructor_task.models.REPORT_SPOOL_MAX_SIZE', 16)
+    def test_store_rows_content(self):
+        """
+        Test that the rows are stored in csv format, when they don't fit in
+        memory.
+        """
+        report_store = self.create_report_store()
+        report_store.store_rows(self.course_id, 'rows_file', ([u'r\xe9w', index] for index in xrange(10)))
+        with report_store.storage.open(report_store.path_to(self.course_id, 'rows_file')) as report_file:
+            self.assertEqual(report_file.read(), ''.join('r\xc3\xa9w,{}\r\n'.format(index) for index in xrange(10)))
+
 
 @patch.dict(settings.GRADES_DOWNLOAD, {'STORAGE_TYPE': 's3'})
 class S3ReportStoreTestCase(MockS3Mixin, ReportStoreTestMixin, TestReportMixin, SimpleTestCase):
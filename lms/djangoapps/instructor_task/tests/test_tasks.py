@@ -12,6 +12,7 @@ from mock import Mock, MagicMock, patch
 from nose.plugins.attrib import attr
 
 from celery.states import SUCCESS, FAILURE
+from django.test.utils import override_settings
 from django.utils.translation import ugettext_noop
 from functools import partial
 
@@ -33,6 +34,7 @@ from instructor_task.tasks import (
     export_ora2_data,
 )
 from instructor_task.tasks_helper import (
+    UPDATE_STATUS_SUCCEEDED,
     UpdateProblemModuleStateError,
     upload_ora2_data,
 )
@@ -366,6 +368,45 @@ class TestResetAttemptsInstructorTask(TestInstructorTasks):
         # check that entries were reset
         self._assert_num_attempts(students, 0)
 
+    @override_settings(INSTRUCTOR_TASK_MODULE_STATE_SHARD_SIZE=3)
+    def test_reset_in_subtasks(self):
+        initial_attempts = 3
+        input_state = json.dumps({'attempts': initial_attempts})
+        num_students = 10
+        students = self._create_students_with_state(num_students, input_state)
+        task_entry = self._create_input_entry()
+        self._run_task_with_mock_celery(reset_problem_attempts, task_entry.id, task_entry.task_id)
+        # check that the subtasks' progress was aggregated
+        entry = InstructorTask.objects.get(id=task_entry.id)
+        output = json.loads(entry.task_output)
+        self.assertEquals(output.get('attempted'), num_students)
+        self.assertEquals(output.get('succeeded'), num_students)
+        self.assertEquals(output.get('total'), num_students)
+        self.assertEquals(output.get('action_name'), 'reset')
+        self.assertEquals(json.loads(entry.subtasks)['succeeded'], 4)
+        self.assertEquals(entry.task_state, SUCCESS)
+        # check that entries were reset
+        self._assert_num_attempts(students, 0)
+
+    @override_settings(INSTRUCTOR_TASK_MODULE_STATE_SHARD_SIZE=3)
+    def test_reset_in_subtasks_with_retry(self):
+        num_students = 10
+        self._create_students_with_state(num_students, json.dumps({'attempts': 3}))
+        task_entry = self._create_input_entry()
+        # The first update fails, and only its subtask's remaining modules are retried.
+        update_fcn = Mock(side_effect=[TestTaskFailure('retry me')] + [UPDATE_STATUS_SUCCEEDED] * num_students)
+        with patch.dict('instructor_task.tasks.MODULE_STATE_UPDATE_FUNCTIONS', {'reset_problem_attempts': update_fcn}):
+            self._run_task_with_mock_celery(reset_problem_attempts, task_entry.id, task_entry.task_id)
+        self.assertEquals(update_fcn.call_count, num_students + 1)
+        entry = InstructorTask.objects.get(id=task_entry.id)
+        output = json.loads(entry.task_output)
+        self.assertEquals(output.get('attempted'), num_students)
+        self.assertEquals(output.get('succeeded'), num_students)
+        self.assertEquals(output.get('failed'), 0)
+        subtask_statuses = json.loads(entry.subtasks)['status'].values()
+        self.assertEquals(sorted(status['retried_withmax'] for status in subtask_statuses), [0, 0, 0, 1])
+        self.assertEquals(entry.task_state, SUCCESS)
+
     def _test_reset_with_student(self, use_email):
         """Run a reset task for one student, with several StudentModules for the problem defined."""
         num_students = 10
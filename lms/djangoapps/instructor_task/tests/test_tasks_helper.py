@@ -46,6 +46,7 @@ from lms.djangoapps.verify_student.tests.factories import SoftwareSecurePhotoVer
 from xmodule.modulestore.tests.factories import CourseFactory, ItemFactory
 from xmodule.partitions.partitions import Group, UserPartition
 from instructor_task.models import ReportStore
+from lms.djangoapps.grades.course_grades import iterate_grades_for
 from survey.models import SurveyForm, SurveyAnswer
 from instructor_task.tasks_helper import (
     cohort_students_and_upload,
@@ -641,6 +642,40 @@ class TestProblemGradeReport(TestReportMixin, InstructorTaskModuleTestCase):
             ))
         ])
 
+    @patch.dict(settings.FEATURES, {'ENABLE_INCREMENTAL_GRADE_REPORTS': True})
+    @patch('instructor_task.tasks_helper._get_current_task')
+    def test_incremental_report(self, _get_current_task):
+        vertical = ItemFactory.create(
+            parent_location=self.problem_section.location,
+            category='vertical',
+            metadata={'graded': True},
+            display_name='Problem Vertical'
+        )
+        self.define_option_problem(u'Pröblem1', parent=vertical)
+        self.submit_student_answer(self.student_1.username, u'Pröblem1', ['Option 1'])
+        upload_problem_grade_report(None, None, self.course.id, None, 'graded')
+        shutil.rmtree(self.tmp_dir)
+
+        # Only the student whose scores changed since the last report is regraded.
+        self.submit_student_answer(self.student_2.username, u'Pröblem1', ['Option 1'])
+        with patch('instructor_task.tasks_helper.iterate_grades_for', wraps=iterate_grades_for) as mock_iterate:
+            with patch('lms.djangoapps.grades.course_grades.grading_context_for_course') as mock_grading_context:
+                result = upload_problem_grade_report(None, None, self.course.id, None, 'graded')
+        graded_students = [student for call in mock_iterate.call_args_list for student in call[0][1]]
+        self.assertEqual(graded_students, [self.student_2])
+        # The grading context of the course is computed once for all batches.
+        self.assertFalse(mock_grading_context.called)
+        self.assertDictContainsSubset({'action_name': 'graded', 'attempted': 2, 'succeeded': 2, 'failed': 0}, result)
+        problem_name = u'Homework 1: Problem - Pröblem1'
+        header_row = self.csv_header_row + [problem_name + ' (Earned)', problem_name + ' (Possible)']
+        self.verify_rows_in_csv([
+            dict(zip(
+                header_row,
+                [unicode(student.id), student.email, student.username, '0.01', '1.0', '2.0']
+            ))
+            for student in [self.student_1, self.student_2]
+        ])
+
     @patch('instructor_task.tasks_helper._get_current_task')
     @patch('instructor_task.tasks_helper.iterate_grades_for')
     @ddt.data(u'Cannöt grade student', '')
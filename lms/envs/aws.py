@@ -228,6 +228,10 @@ if 'loc_cache' not in CACHES:
         'LOCATION': 'edx_location_mem_cache',
     }
 
+COURSE_STRUCTURE_LOCAL_CACHE_SIZE = ENV_TOKENS.get(
+    'COURSE_STRUCTURE_LOCAL_CACHE_SIZE', COURSE_STRUCTURE_LOCAL_CACHE_SIZE
+)
+
 # Email overrides
 DEFAULT_FROM_EMAIL = ENV_TOKENS.get('DEFAULT_FROM_EMAIL', DEFAULT_FROM_EMAIL)
 DEFAULT_FEEDBACK_EMAIL = ENV_TOKENS.get('DEFAULT_FEEDBACK_EMAIL', DEFAULT_FEEDBACK_EMAIL)
@@ -258,6 +262,11 @@ BULK_EMAIL_MAX_RETRIES = ENV_TOKENS.get('BULK_EMAIL_MAX_RETRIES', BULK_EMAIL_MAX
 BULK_EMAIL_INFINITE_RETRY_CAP = ENV_TOKENS.get('BULK_EMAIL_INFINITE_RETRY_CAP', BULK_EMAIL_INFINITE_RETRY_CAP)
 BULK_EMAIL_LOG_SENT_EMAILS = ENV_TOKENS.get('BULK_EMAIL_LOG_SENT_EMAILS', BULK_EMAIL_LOG_SENT_EMAILS)
 BULK_EMAIL_RETRY_DELAY_BETWEEN_SENDS = ENV_TOKENS.get('BULK_EMAIL_RETRY_DELAY_BETWEEN_SENDS', BULK_EMAIL_RETRY_DELAY_BETWEEN_SENDS)
+BULK_EMAIL_SMTP_CONNECTIONS = ENV_TOKENS.get('BULK_EMAIL_SMTP_CONNECTIONS', BULK_EMAIL_SMTP_CONNECTIONS)
+BULK_EMAIL_MESSAGES_PER_CONNECTION_BATCH = ENV_TOKENS.get(
+    'BULK_EMAIL_MESSAGES_PER_CONNECTION_BATCH', BULK_EMAIL_MESSAGES_PER_CONNECTION_BATCH
+)
+BULK_EMAIL_MAX_SENDS_PER_SECOND = ENV_TOKENS.get('BULK_EMAIL_MAX_SENDS_PER_SECOND', BULK_EMAIL_MAX_SENDS_PER_SECOND)
 # We want Bulk Email running on the high-priority queue, so we define the
 # routing key that points to it. At the moment, the name is the same.
 # We have to reset the value here, since we have changed the value of the queue name.
@@ -277,6 +286,7 @@ if ENV_TOKENS.get('COMPREHENSIVE_THEME_DIR', None):
 COMPREHENSIVE_THEME_DIRS = ENV_TOKENS.get('COMPREHENSIVE_THEME_DIRS', COMPREHENSIVE_THEME_DIRS) or []
 DEFAULT_SITE_THEME = ENV_TOKENS.get('DEFAULT_SITE_THEME', DEFAULT_SITE_THEME)
 ENABLE_COMPREHENSIVE_THEMING = ENV_TOKENS.get('ENABLE_COMPREHENSIVE_THEMING', ENABLE_COMPREHENSIVE_THEMING)
+MAKO_PRELOAD_TEMPLATES = ENV_TOKENS.get('MAKO_PRELOAD_TEMPLATES', MAKO_PRELOAD_TEMPLATES)
 
 # Marketing link overrides
 MKTG_URL_LINK_MAP.update(ENV_TOKENS.get('MKTG_URL_LINK_MAP', {}))
@@ -313,6 +323,7 @@ VIRTUAL_UNIVERSITIES = ENV_TOKENS.get('VIRTUAL_UNIVERSITIES', [])
 META_UNIVERSITIES = ENV_TOKENS.get('META_UNIVERSITIES', {})
 COMMENTS_SERVICE_URL = ENV_TOKENS.get("COMMENTS_SERVICE_URL", '')
 COMMENTS_SERVICE_KEY = ENV_TOKENS.get("COMMENTS_SERVICE_KEY", '')
+COMMENTS_SERVICE_POOL_SIZE = ENV_TOKENS.get("COMMENTS_SERVICE_POOL_SIZE", 10)
 CERT_QUEUE = ENV_TOKENS.get("CERT_QUEUE", 'test-pull')
 ZENDESK_URL = ENV_TOKENS.get("ZENDESK_URL")
 FEEDBACK_SUBMISSION_EMAIL = ENV_TOKENS.get("FEEDBACK_SUBMISSION_EMAIL")
@@ -597,6 +608,24 @@ GRADES_DOWNLOAD_ROUTING_KEY = HIGH_MEM_QUEUE
 
 GRADES_DOWNLOAD = ENV_TOKENS.get("GRADES_DOWNLOAD", GRADES_DOWNLOAD)
 
+# Problem state updates
+INSTRUCTOR_TASK_MODULE_STATE_SHARD_SIZE = ENV_TOKENS.get(
+    'INSTRUCTOR_TASK_MODULE_STATE_SHARD_SIZE', INSTRUCTOR_TASK_MODULE_STATE_SHARD_SIZE
+)
+INSTRUCTOR_TASK_MODULE_STATE_RETRY_DELAY = ENV_TOKENS.get(
+    'INSTRUCTOR_TASK_MODULE_STATE_RETRY_DELAY', INSTRUCTOR_TASK_MODULE_STATE_RETRY_DELAY
+)
+INSTRUCTOR_TASK_MODULE_STATE_MAX_RETRIES = ENV_TOKENS.get(
+    'INSTRUCTOR_TASK_MODULE_STATE_MAX_RETRIES', INSTRUCTOR_TASK_MODULE_STATE_MAX_RETRIES
+)
+
+# Persistent grades
+PERSISTENT_GRADES_RECALCULATION_DELAY = ENV_TOKENS.get(
+    'PERSISTENT_GRADES_RECALCULATION_DELAY', PERSISTENT_GRADES_RECALCULATION_DELAY
+)
+PERSISTENT_GRADES_RETRY_DELAY = ENV_TOKENS.get('PERSISTENT_GRADES_RETRY_DELAY', PERSISTENT_GRADES_RETRY_DELAY)
+PERSISTENT_GRADES_MAX_RETRIES = ENV_TOKENS.get('PERSISTENT_GRADES_MAX_RETRIES', PERSISTENT_GRADES_MAX_RETRIES)
+
 # financial reports
 FINANCIAL_REPORTS = ENV_TOKENS.get("FINANCIAL_REPORTS", FINANCIAL_REPORTS)
 
@@ -864,3 +893,11 @@ API_ACCESS_FROM_EMAIL = ENV_TOKENS.get('API_ACCESS_FROM_EMAIL')
 APP_UPGRADE_CACHE_TIMEOUT = ENV_TOKENS.get('APP_UPGRADE_CACHE_TIMEOUT', APP_UPGRADE_CACHE_TIMEOUT)
 
 AFFILIATE_COOKIE_NAME = ENV_TOKENS.get('AFFILIATE_COOKIE_NAME', AFFILIATE_COOKIE_NAME)
+
+##### Course Overviews #####
+COURSE_OVERVIEW_PROCESS_CACHE_TIMEOUT = ENV_TOKENS.get(
+    'COURSE_OVERVIEW_PROCESS_CACHE_TIMEOUT', COURSE_OVERVIEW_PROCESS_CACHE_TIMEOUT
+)
+COURSE_OVERVIEW_MODULESTORE_LOAD_WORKERS = ENV_TOKENS.get(
+    'COURSE_OVERVIEW_MODULESTORE_LOAD_WORKERS', COURSE_OVERVIEW_MODULESTORE_LOAD_WORKERS
+)
@@ -201,6 +201,11 @@ FEATURES = {
     # CSV files to the configured storage backend and give links for downloads.
     'ENABLE_GRADE_DOWNLOADS': False,
 
+    # Cache the grades of each student used by the grade reports, so that
+    # only students whose scores, or the course content, changed since the
+    # last report are regraded.
+    'ENABLE_INCREMENTAL_GRADE_REPORTS': False,
+
     # whether to use password policy enforcement or not
     'ENFORCE_PASSWORD_POLICY': True,
 
@@ -462,6 +467,29 @@ MAKO_TEMPLATES['main'] = [PROJECT_ROOT / 'templates',
                           COMMON_ROOT / 'lib' / 'capa' / 'capa' / 'templates',
                           COMMON_ROOT / 'djangoapps' / 'pipeline_mako' / 'templates']
 
+# The most used templates, which are loaded by every worker at the end of the
+# startup instead of on its first requests.  Processes which don't render pages,
+# like celery workers, can set it to {} through the environment tokens.  Run the
+# compile_mako_templates management command on deployment to compile all the
+# templates ahead of time.
+MAKO_PRELOAD_TEMPLATES = {
+    'main': [
+        'static_content.html',
+        'main.html',
+        'navigation.html',
+        'footer.html',
+        'index.html',
+        'dashboard.html',
+        'courseware/courseware.html',
+        'courseware/accordion.html',
+        'courseware/course_navigation.html',
+        'seq_module.html',
+        'vert_module.html',
+        'problem.html',
+        'video.html',
+    ],
+}
+
 # Django templating
 TEMPLATES = [
     {
@@ -740,6 +768,11 @@ MODULESTORE = {
     }
 }
 
+# Size, in bytes of pickled structure data, of the in-process cache of split
+# modulestore course structures kept by each worker in front of the
+# 'course_structure_cache' Django cache. Set to 0 to disable it.
+COURSE_STRUCTURE_LOCAL_CACHE_SIZE = 64 * 1024 * 1024
+
 #################### Python sandbox ############################################
 
 CODE_JAIL = {
@@ -753,6 +786,16 @@ CODE_JAIL = {
         # How many CPU seconds can jailed code use?
         'CPU': 1,
     },
+
+    # Warm sandboxed workers that import the modules assumed by capa once,
+    # and fork a child for each execution.
+    'worker_pool': {
+        # Maximum number of workers per process.  0 starts a new sandboxed
+        # process for each execution.
+        'size': 0,
+        # Number of executions after which a worker is replaced.
+        'max_executions': 100,
+    },
 }
 
 # Some courses are allowed to run unsafe code. This is a list of regexes, one
@@ -1801,6 +1844,16 @@ BULK_EMAIL_LOG_SENT_EMAILS = False
 # parallel, and what the SES rate is.
 BULK_EMAIL_RETRY_DELAY_BETWEEN_SENDS = 0.02
 
+# Number of SMTP connections over which a bulk email task sends its messages
+# in parallel, and number of messages sent over each connection before the
+# task records its progress.
+BULK_EMAIL_SMTP_CONNECTIONS = 1
+BULK_EMAIL_MESSAGES_PER_CONNECTION_BATCH = 20
+
+# Maximum number of messages sent per second by a bulk email task, over all
+# its connections.  None means no limit.
+BULK_EMAIL_MAX_SENDS_PER_SECOND = None
+
 ############################# Email Opt In ####################################
 
 # Minimum age for organization-wide email opt in
@@ -1887,7 +1940,7 @@ INSTALLED_APPS = (
     'openedx.core.djangoapps.course_groups',
     'bulk_email',
     'branding',
-    'grades',
+    'lms.djangoapps.grades',
 
     # Student support tools
     'support',
@@ -2344,6 +2397,29 @@ FINANCIAL_REPORTS = {
     'ROOT_PATH': '/tmp/edx-s3/financial_reports',
 }
 
+###################### Problem State Updates ######################
+# Rescoring, resetting or deleting the state of a problem for more than this
+# number of student modules is split into subtasks, each updating at most this
+# number of modules in parallel.
+INSTRUCTOR_TASK_MODULE_STATE_SHARD_SIZE = 1000
+
+# Initial delay between retries of a failed subtask, in seconds, and the
+# maximum number of retries.
+INSTRUCTOR_TASK_MODULE_STATE_RETRY_DELAY = 30
+INSTRUCTOR_TASK_MODULE_STATE_MAX_RETRIES = 3
+
+###################### Persistent Grades ######################
+# When a score changes, the persisted grades of the learner are invalidated by
+# the view changing it and recalculated by a task, delayed by this number of
+# seconds so that the view's transaction is likely committed by the time it
+# runs.  Grades not recalculated by the task are recomputed on their next read.
+PERSISTENT_GRADES_RECALCULATION_DELAY = 10
+
+# Delay between retries of a failed recalculation, in seconds, and the maximum
+# number of retries, after which the persisted grades of the learner are deleted.
+PERSISTENT_GRADES_RETRY_DELAY = 30
+PERSISTENT_GRADES_MAX_RETRIES = 3
+
 #### PASSWORD POLICY SETTINGS #####
 PASSWORD_MIN_LENGTH = 8
 PASSWORD_MAX_LENGTH = None
@@ -2940,3 +3016,16 @@ AFFILIATE_COOKIE_NAME = 'affiliate_id'
 # The cache is cleared when Redirect models are saved/deleted
 REDIRECT_CACHE_TIMEOUT = None  # The length of time we cache Redirect model data
 REDIRECT_CACHE_KEY_PREFIX = 'redirects'
+
+############## Settings for Course Overviews ###############
+
+# Number of seconds each process keeps the course overviews loaded by
+# CourseOverview.get_from_ids in memory, or 0 to not keep them.  Publishing a
+# course only invalidates the overviews kept by the process handling the
+# course_published signal, usually Studio, so the LMS may serve a stale course
+# overview for up to this long after a course is published.
+COURSE_OVERVIEW_PROCESS_CACHE_TIMEOUT = 60
+
+# Maximum number of courses loaded from the modulestore at once by
+# CourseOverview.get_from_ids.
+COURSE_OVERVIEW_MODULESTORE_LOAD_WORKERS = 4
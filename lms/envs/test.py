@@ -227,6 +227,9 @@ CACHES = {
     },
 }
 
+# Structures cached in-process would outlive the test databases.
+COURSE_STRUCTURE_LOCAL_CACHE_SIZE = 0
+
 # Dummy secret key for dev
 SECRET_KEY = '85920908f28904ed733fe576320db18cabd7b6cd'
 
@@ -499,6 +502,9 @@ MAKO_TEMPLATES['main'].extend([
     REPO_ROOT / 'openedx' / 'core' / 'djangolib' / 'tests' / 'templates',
 ])
 
+# Don't preload mako templates on startup
+MAKO_PRELOAD_TEMPLATES = {}
+
 
 # Setting for the testing of Software Secure Result Callback
 VERIFY_STUDENT["SOFTWARE_SECURE"] = {
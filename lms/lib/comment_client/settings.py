@@ -6,3 +6,7 @@ else:
     SERVICE_HOST = 'http://localhost:4567'
 
 PREFIX = SERVICE_HOST + '/api/v1'
+
+# Maximum number of connections to the comments service kept alive by each
+# process, and of requests sent to it concurrently.
+POOL_SIZE = getattr(settings, 'COMMENTS_SERVICE_POOL_SIZE', 10)
@@ -2,14 +2,29 @@
 from contextlib import contextmanager
 import dogstats_wrapper as dog_stats_api
 import logging
+import os
+import threading
+from multiprocessing.dummy import Pool as ThreadPool
 import requests
+from requests.adapters import HTTPAdapter
 from django.conf import settings
 from time import time
 from uuid import uuid4
+from django.utils import translation
 from django.utils.translation import get_language
 
+import request_cache
+
+from .settings import POOL_SIZE
+
 log = logging.getLogger(__name__)
 
+FORUMS_CONFIG_CACHE = 'comment_client.forums_config'
+
+_session_lock = threading.Lock()
+_session = None
+_session_pid = None
+
 
 def strip_none(dic):
     return dict([(k, v) for k, v in dic.iteritems() if v is not None])
@@ -32,6 +47,75 @@ def merge_dict(dic1, dic2):
     return dict(dic1.items() + dic2.items())
 
 
+def get_session():
+    """
+    Returns the session sending the requests of this process to the comments
+    service, which keeps up to `POOL_SIZE` connections to it alive.
+    """
+    global _session, _session_pid  # pylint: disable=global-statement
+    if _session_pid != os.getpid():
+        with _session_lock:
+            if _session_pid != os.getpid():
+                # A session inherited from a parent process shares its
+                # sockets, and can't be used.
+                session = requests.Session()
+                adapter = HTTPAdapter(pool_connections=1, pool_maxsize=POOL_SIZE)
+                session.mount('http://', adapter)
+                session.mount('https://', adapter)
+                _session, _session_pid = session, os.getpid()
+    return _session
+
+
+def request(method, url, **kwargs):
+    """
+    Sends a request to the comments service, with the same arguments as
+    `requests.request`, over a pooled connection.
+    """
+    return get_session().request(method, url, **kwargs)
+
+
+def get_forums_config():
+    """
+    Returns the current ForumsConfig, which is looked up once per request.
+    """
+    # To avoid dependency conflict
+    from django_comment_common.models import ForumsConfig
+
+    config_cache = request_cache.get_cache(FORUMS_CONFIG_CACHE)
+    if 'config' not in config_cache:
+        config_cache['config'] = ForumsConfig.current()
+    return config_cache['config']
+
+
+def perform_concurrently(*functions):
+    """
+    Calls the given functions, which send independent requests to the comments
+    service, in up to `POOL_SIZE` threads, and returns their results in order.
+
+    The functions are called with the language of the current thread.  They
+    must not use the database, as the threads don't share its connection.
+    If a function raises an exception, it is raised here.
+    """
+    if len(functions) < 2 or POOL_SIZE < 2:
+        return [function() for function in functions]
+
+    # The threads don't share the request cache, so are given the config.
+    config = get_forums_config()
+    language = get_language()
+
+    def call(function):  # pylint: disable=missing-docstring
+        request_cache.get_cache(FORUMS_CONFIG_CACHE)['config'] = config
+        with translation.override(language):
+            return function()
+
+    pool = ThreadPool(min(POOL_SIZE, len(functions)))
+    try:
+        return pool.map(call, functions)
+    finally:
+        pool.close()
+        pool.join()
+
+
 @contextmanager
 def request_timer(request_id, method, url, tags=None):
     start = time()
@@ -53,9 +137,6 @@ def request_timer(request_id, method, url, tags=None):
 
 def perform_request(method, url, data_or_params=None, raw=False,
                     metric_action=None, metric_tags=None, paged_results=False):
-    # To avoid dependency conflict
-    from django_comment_common.models import ForumsConfig
-
     if metric_tags is None:
         metric_tags = []
 
@@ -79,8 +160,8 @@ def perform_request(method, url, data_or_params=None, raw=False,
         data = None
         params = merge_dict(data_or_params, request_id_dict)
     with request_timer(request_id, method, url, metric_tags):
-        config = ForumsConfig.current()
-        response = requests.request(
+        config = get_forums_config()
+        response = request(
             method,
             url,
             data=data,
@@ -10,6 +10,7 @@ settings.INSTALLED_APPS  # pylint: disable=pointless-statement
 
 from openedx.core.lib.django_startup import autostartup
 import edxmako
+import edxmako.startup
 import logging
 import analytics
 from monkey_patch import (
@@ -55,6 +56,8 @@ def run():
 
     add_mimetypes()
 
+    configure_sandbox_worker_pool()
+
     # Mako requires the directories to be added after the django setup.
     microsite.enable_microsites(log)
 
@@ -85,6 +88,22 @@ def run():
     xmodule.x_module.descriptor_global_handler_url = lms_xblock.runtime.handler_url
     xmodule.x_module.descriptor_global_local_resource_url = lms_xblock.runtime.local_resource_url
 
+    # Preload the templates last, as adding a lookup directory, e.g. for the
+    # custom theme, discards the loaded templates.
+    edxmako.startup.preload()
+
+
+def configure_sandbox_worker_pool():
+    """
+    Configure the pool of warm sandboxed workers running capa problem code.
+
+    If you change this, be sure to also change it in cms/startup.py.
+    """
+    from capa.safe_exec import configure_worker_pool
+
+    worker_pool = settings.CODE_JAIL.get('worker_pool', {})
+    configure_worker_pool(worker_pool.get('size', 0), worker_pool.get('max_executions', 100))
+
 
 def add_mimetypes():
     """
@@ -3,9 +3,12 @@ Declaration of CourseOverview model
 """
 import json
 import logging
+import time
+from multiprocessing.pool import ThreadPool
 from urlparse import urlparse, urlunparse
 
-from django.db import models, transaction
+from django.conf import settings
+from django.db import connection, models, transaction
 from django.db.models.fields import BooleanField, DateTimeField, DecimalField, TextField, FloatField, IntegerField
 from django.db.utils import IntegrityError
 from django.template import defaultfilters
@@ -29,6 +32,14 @@ from xmodule_django.models import CourseKeyField, UsageKeyField
 
 log = logging.getLogger(__name__)
 
+# Number of seconds the overviews returned by CourseOverview.get_from_ids are
+# kept in memory by each process, and maximum number of courses it loads from
+# the modulestore at once, unless configured otherwise by the
+# COURSE_OVERVIEW_PROCESS_CACHE_TIMEOUT and
+# COURSE_OVERVIEW_MODULESTORE_LOAD_WORKERS settings.
+DEFAULT_PROCESS_CACHE_TIMEOUT = 60
+DEFAULT_MODULESTORE_LOAD_WORKERS = 4
+
 
 class CourseOverview(TimeStampedModel):
     """
@@ -207,36 +218,54 @@ class CourseOverview(TimeStampedModel):
         store = modulestore()
         with store.bulk_operations(course_id):
             course = store.get_course(course_id)
-            if isinstance(course, CourseDescriptor):
-                course_overview = cls._create_from_course(course)
-                try:
-                    with transaction.atomic():
-                        course_overview.save()
-                        CourseOverviewTab.objects.bulk_create([
-                            CourseOverviewTab(tab_id=tab.tab_id, course_overview=course_overview)
-                            for tab in course.tabs
-                        ])
-                        CourseOverviewImageSet.create_for_course(course_overview, course)
-
-                except IntegrityError:
-                    # There is a rare race condition that will occur if
-                    # CourseOverview.get_from_id is called while a
-                    # another identical overview is already in the process
-                    # of being created.
-                    # One of the overviews will be saved normally, while the
-                    # other one will cause an IntegrityError because it tries
-                    # to save a duplicate.
-                    # (see: https://openedx.atlassian.net/browse/TNL-2854).
-                    pass
-                return course_overview
-            elif course is not None:
-                raise IOError(
-                    "Error while loading course {} from the module store: {}",
-                    unicode(course_id),
-                    course.error_msg if isinstance(course, ErrorDescriptor) else unicode(course)
-                )
-            else:
-                raise cls.DoesNotExist()
+            return cls._load_from_course(course_id, course)
+
+    @classmethod
+    def _load_from_course(cls, course_id, course):
+        """
+        Create a new CourseOverview from the course loaded from the module
+        store for course_id, and cache the overview.
+
+        Arguments:
+            course_id (CourseKey): the ID of the course overview to be loaded.
+            course: what the module store returned for course_id.
+
+        Returns:
+            CourseOverview: overview of the requested course.
+
+        Raises:
+            The same exceptions as load_from_module_store.
+        """
+        if isinstance(course, CourseDescriptor):
+            course_overview = cls._create_from_course(course)
+            try:
+                with transaction.atomic():
+                    course_overview.save()
+                    CourseOverviewTab.objects.bulk_create([
+                        CourseOverviewTab(tab_id=tab.tab_id, course_overview=course_overview)
+                        for tab in course.tabs
+                    ])
+                    CourseOverviewImageSet.create_for_course(course_overview, course)
+
+            except IntegrityError:
+                # There is a rare race condition that will occur if
+                # CourseOverview.get_from_id is called while a
+                # another identical overview is already in the process
+                # of being created.
+                # One of the overviews will be saved normally, while the
+                # other one will cause an IntegrityError because it tries
+                # to save a duplicate.
+                # (see: https://openedx.atlassian.net/browse/TNL-2854).
+                pass
+            return course_overview
+        elif course is not None:
+            raise IOError(
+                "Error while loading course {} from the module store: {}",
+                unicode(course_id),
+                course.error_msg if isinstance(course, ErrorDescriptor) else unicode(course)
+            )
+        else:
+            raise cls.DoesNotExist()
 
     @classmethod
     def get_from_id(cls, course_id):
@@ -277,6 +306,80 @@ class CourseOverview(TimeStampedModel):
 
         return course_overview or cls.load_from_module_store(course_id)
 
+    @classmethod
+    def get_from_ids(cls, course_ids):
+        """
+        Load CourseOverview objects for the given course IDs, in bulk.
+
+        Overviews recently returned by this method are served from a short
+        lived cache in the memory of the process.  The cache is invalidated
+        when the course is published or deleted in this process only, so the
+        other processes, e.g. the LMS workers when a course is published in
+        Studio, may return a stale overview for up to
+        COURSE_OVERVIEW_PROCESS_CACHE_TIMEOUT seconds.  The other overviews
+        are read from the database with their image sets and tabs in a
+        constant number of queries, and the courses missing from the database
+        are loaded from the modulestore in parallel.
+
+        An error while loading the overview of a course is logged, and the
+        overview of that course is None, so that the others are still loaded.
+
+        Arguments:
+            course_ids (iterable[CourseKey]): the IDs of the course overviews
+                to be loaded.
+
+        Returns:
+            dict[CourseKey, CourseOverview]: overview of each requested
+                course, or None if the course was not found or couldn't be
+                loaded.
+        """
+        course_ids = set(course_ids)
+        course_overviews = _get_cached_course_overviews(course_ids)
+
+        missing_ids = course_ids.difference(course_overviews)
+        if missing_ids:
+            loaded_overviews = {}
+            outdated_ids = []
+            query = cls.objects.select_related('image_set').prefetch_related('tabs').filter(id__in=missing_ids)
+            for course_overview in query:
+                if course_overview.version < cls.VERSION:
+                    # Throw away old versions of CourseOverview, as they might contain stale data.
+                    outdated_ids.append(course_overview.id)
+                    continue
+                # Regenerate the thumbnail images if they're missing.
+                if not hasattr(course_overview, 'image_set'):
+                    CourseOverviewImageSet.create_for_course(course_overview)
+                loaded_overviews[course_overview.id] = course_overview
+            if outdated_ids:
+                cls.objects.filter(id__in=outdated_ids).delete()
+
+            store = modulestore()
+            for course_id, course in _get_courses_from_module_store(missing_ids.difference(loaded_overviews)):
+                try:
+                    with store.bulk_operations(course_id):
+                        loaded_overviews[course_id] = cls._load_from_course(course_id, course)
+                except cls.DoesNotExist:
+                    log.warning('Course %s was not found in the module store', unicode(course_id))
+                except Exception:  # pylint: disable=broad-except
+                    # A broken course mustn't prevent loading the overviews of the others.
+                    log.exception('An error occurred while generating course overview for %s', unicode(course_id))
+
+            _cache_course_overviews(loaded_overviews)
+            course_overviews.update(loaded_overviews)
+
+        return {course_id: course_overviews.get(course_id) for course_id in course_ids}
+
+    @classmethod
+    def clear_process_cache(cls, course_id=None):
+        """
+        Removes the overview of the given course, or of all courses if
+        course_id is None, from the cache of get_from_ids in this process.
+        """
+        if course_id is None:
+            _PROCESS_CACHE.clear()
+        else:
+            _PROCESS_CACHE.pop(course_id, None)
+
     def clean_id(self, padding_char='='):
         """
         Returns a unique deterministic base32-encoded ID for the course.
@@ -456,24 +559,17 @@ class CourseOverview(TimeStampedModel):
         """
         Returns CourseOverview objects for the given course_keys.
         """
-        course_overviews = []
-
         log.info('Generating course overview for %d courses.', len(course_keys))
         log.debug('Generating course overview(s) for the following courses: %s', course_keys)
 
-        for course_key in course_keys:
-            try:
-                course_overviews.append(CourseOverview.get_from_id(course_key))
-            except Exception as ex:  # pylint: disable=broad-except
-                log.exception(
-                    'An error occurred while generating course overview for %s: %s',
-                    unicode(course_key),
-                    ex.message,
-                )
+        course_overviews = CourseOverview.get_from_ids(course_keys)
 
         log.info('Finished generating course overviews.')
 
-        return course_overviews
+        return [
+            course_overviews[course_key] for course_key in course_keys
+            if course_overviews[course_key] is not None
+        ]
 
     @classmethod
     def get_all_courses(cls, org=None, filter_=None):
@@ -615,6 +711,81 @@ class CourseOverview(TimeStampedModel):
         return unicode(self.id)
 
 
+# Overviews returned by CourseOverview.get_from_ids, as (expiration time,
+# overview) pairs by course ID.
+_PROCESS_CACHE = {}
+
+
+def _get_cached_course_overviews(course_ids):
+    """
+    Returns the unexpired overviews of the given courses in the cache of
+    this process, by course ID.
+    """
+    now = time.time()
+    course_overviews = {}
+    for course_id in course_ids:
+        expiration, course_overview = _PROCESS_CACHE.get(course_id, (0, None))
+        if expiration > now:
+            course_overviews[course_id] = course_overview
+    return course_overviews
+
+
+def _cache_course_overviews(course_overviews):
+    """
+    Adds the given overviews, by course ID, to the cache of this process.
+    """
+    timeout = getattr(settings, 'COURSE_OVERVIEW_PROCESS_CACHE_TIMEOUT', DEFAULT_PROCESS_CACHE_TIMEOUT)
+    if timeout:
+        expiration = time.time() + timeout
+        for course_id, course_overview in course_overviews.iteritems():
+            _PROCESS_CACHE[course_id] = (expiration, course_overview)
+
+
+def _get_courses_from_module_store(course_ids):
+    """
+    Returns (course ID, course) pairs for the given courses, loaded from the
+    modulestore by a pool of threads when there are several of them.  The
+    course is None if it couldn't be loaded.
+    """
+    course_ids = list(course_ids)
+    workers = min(
+        len(course_ids),
+        getattr(settings, 'COURSE_OVERVIEW_MODULESTORE_LOAD_WORKERS', DEFAULT_MODULESTORE_LOAD_WORKERS),
+    )
+    if workers <= 1:
+        return [(course_id, _get_course_from_module_store(course_id)) for course_id in course_ids]
+
+    pool = ThreadPool(workers)
+    try:
+        courses = pool.map(_get_course_from_module_store_in_thread, course_ids)
+    finally:
+        pool.close()
+        pool.join()
+    return zip(course_ids, courses)
+
+
+def _get_course_from_module_store(course_id):
+    """
+    Returns the course loaded from the modulestore, or None if it couldn't be.
+    """
+    try:
+        return modulestore().get_course(course_id)
+    except Exception:  # pylint: disable=broad-except
+        log.exception('An error occurred while loading course %s from the module store', unicode(course_id))
+        return None
+
+
+def _get_course_from_module_store_in_thread(course_id):
+    """
+    Loads a course from the modulestore in a thread of the pool, closing any
+    database connection the thread opened on the way.
+    """
+    try:
+        return _get_course_from_module_store(course_id)
+    finally:
+        connection.close()
+
+
 class CourseOverviewTab(models.Model):
     """
     Model for storing and caching tabs information of a course.
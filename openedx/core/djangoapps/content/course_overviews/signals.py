@@ -14,6 +14,7 @@ def _listen_for_course_publish(sender, course_key, **kwargs):  # pylint: disable
     updates the corresponding CourseOverview cache entry.
     """
     CourseOverview.objects.filter(id=course_key).delete()
+    CourseOverview.clear_process_cache(course_key)
     CourseOverview.load_from_module_store(course_key)
 
 
@@ -24,6 +25,7 @@ def _listen_for_course_delete(sender, course_key, **kwargs):  # pylint: disable=
     invalidates the corresponding CourseOverview cache entry if one exists.
     """
     CourseOverview.objects.filter(id=course_key).delete()
+    CourseOverview.clear_process_cache(course_key)
     # import CourseAboutSearchIndexer inline due to cyclic import
     from cms.djangoapps.contentstore.courseware_index import CourseAboutSearchIndexer
     # Delete course entry from Course About Search_index
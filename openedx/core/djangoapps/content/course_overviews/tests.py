@@ -459,6 +459,59 @@ class CourseOverviewTestCase(ModuleStoreTestCase):
             set(select_course_ids),
         )
 
+    def test_get_select_courses_with_broken_course(self):
+        courses = [CourseFactory.create() for __ in range(3)]
+        create_from_course = CourseOverview._create_from_course  # pylint: disable=protected-access
+
+        def create_or_fail(course):
+            """
+            Fails to create the overview of the first course.
+            """
+            if course.id == courses[0].id:
+                raise ValueError
+            return create_from_course(course)
+
+        with mock.patch.object(CourseOverview, '_create_from_course', side_effect=create_or_fail):
+            course_overviews = CourseOverview.get_select_courses([course.id for course in courses])
+        self.assertEqual(
+            [course_overview.id for course_overview in course_overviews],
+            [course.id for course in courses[1:]],
+        )
+
+    def test_get_from_ids(self):
+        course_ids = [CourseFactory.create(emit_signals=True).id for __ in range(3)]
+        non_existent_id = self.store.make_course_key('Non', 'Existent', 'Course')
+        CourseOverviewImageConfig.current()
+
+        # One query for the overviews and their image sets, and one for their tabs.
+        with self.assertNumQueries(2):
+            course_overviews = CourseOverview.get_from_ids(course_ids + [non_existent_id])
+            for course_id in course_ids:
+                self.assertEqual(course_overviews[course_id].id, course_id)
+                list(course_overviews[course_id].tabs.all())
+        self.assertIsNone(course_overviews[non_existent_id])
+
+        # The overviews are then cached by the process.
+        with self.assertNumQueries(0):
+            self.assertEqual(CourseOverview.get_from_ids(course_ids), course_overviews)
+
+    def test_get_from_ids_loads_missing_courses(self):
+        courses = [CourseFactory.create() for __ in range(3)]
+        course_overviews = CourseOverview.get_from_ids([course.id for course in courses])
+        for course in courses:
+            self.assertEqual(course_overviews[course.id].display_name, course.display_name)
+        self.assertEqual(CourseOverview.objects.filter(id__in=[course.id for course in courses]).count(), 3)
+
+    def test_get_from_ids_cache_invalidation(self):
+        course = CourseFactory.create(mobile_available=True, emit_signals=True)
+        self.assertTrue(CourseOverview.get_from_ids([course.id])[course.id].mobile_available)
+
+        # Publishing the course removes its overview from the process cache.
+        course.mobile_available = False
+        with self.store.branch_setting(ModuleStoreEnum.Branch.draft_preferred):
+            self.store.update_item(course, ModuleStoreEnum.UserID.test)
+        self.assertFalse(CourseOverview.get_from_ids([course.id])[course.id].mobile_available)
+
     def test_get_all_courses(self):
         course_ids = [CourseFactory.create(emit_signals=True).id for __ in range(3)]
         self.assertEqual(
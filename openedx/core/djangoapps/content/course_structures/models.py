@@ -3,16 +3,33 @@ Django ORM model specifications for the Course Structures sub-application
 """
 import json
 import logging
+from uuid import uuid4
 
 from collections import OrderedDict
+from django.core.cache import cache
+from django.db.models.signals import post_delete, post_save
+from django.dispatch import receiver
 from model_utils.models import TimeStampedModel
 
+import request_cache
 from util.models import CompressedTextField
 from xmodule_django.models import CourseKeyField, UsageKey
 
 
 logger = logging.getLogger(__name__)  # pylint: disable=invalid-name
 
+# The discussion id maps of courses are shared between processes in the cache.
+# The version is part of the key, and is to be bumped whenever the format of
+# the cached maps changes.  The key also includes a per-course revision, which
+# is changed whenever the course structure is saved, so that maps read before
+# the save are never used afterwards.  The timeout bounds the life of a map
+# read while the save wasn't committed yet.
+DISCUSSION_ID_MAP_CACHE_VERSION = 1
+DISCUSSION_ID_MAP_CACHE_KEY = u'course_structures.discussion_id_map.v{version}.{revision}.{course_id}'
+DISCUSSION_ID_MAP_CACHE_TIMEOUT = 60 * 5
+DISCUSSION_ID_MAP_REVISION_CACHE_KEY = u'course_structures.discussion_id_map.revision.{course_id}'
+DISCUSSION_ID_MAP_REQUEST_CACHE = 'course_structures.discussion_id_map'
+
 
 class CourseStructure(TimeStampedModel):
     """
@@ -66,6 +83,27 @@ class CourseStructure(TimeStampedModel):
             return result
         return None
 
+    @classmethod
+    def get_discussion_id_map(cls, course_id):
+        """
+        Return the discussion id map of the course with the given id, or None
+        if it isn't generated, without loading the course structure itself.
+
+        The map is loaded once per request, and shared with other requests
+        through the cache.
+        """
+        map_cache = request_cache.get_cache(DISCUSSION_ID_MAP_REQUEST_CACHE)
+        if course_id not in map_cache:
+            cache_key = _discussion_id_map_cache_key(course_id)
+            cached = cache.get(cache_key)
+            if cached is None:
+                course_structure = cls.objects.defer('structure_json').filter(course_id=course_id).first()
+                # Wrapped, so that missing maps are cached too.
+                cached = (course_structure.discussion_id_map if course_structure else None,)
+                cache.set(cache_key, cached, DISCUSSION_ID_MAP_CACHE_TIMEOUT)
+            map_cache[course_id] = cached[0]
+        return map_cache[course_id]
+
     def _traverse_tree(self, block, unordered_structure, ordered_blocks, parent=None):
         """
         Traverses the tree and fills in the ordered_blocks OrderedDict with the blocks in
@@ -81,3 +119,32 @@ class CourseStructure(TimeStampedModel):
 
         for child_node in cur_block['children']:
             self._traverse_tree(child_node, unordered_structure, ordered_blocks, parent=block)
+
+
+def _discussion_id_map_cache_key(course_id):
+    """
+    Return the key of the current revision of the discussion id map of the
+    course in the cache.
+    """
+    revision_key = DISCUSSION_ID_MAP_REVISION_CACHE_KEY.format(course_id=course_id)
+    revision = cache.get(revision_key)
+    if revision is None:
+        revision = uuid4().hex
+        if not cache.add(revision_key, revision, None):
+            revision = cache.get(revision_key, revision)
+    return DISCUSSION_ID_MAP_CACHE_KEY.format(
+        version=DISCUSSION_ID_MAP_CACHE_VERSION,
+        revision=revision,
+        course_id=course_id,
+    )
+
+
+@receiver(post_save, sender=CourseStructure)
+@receiver(post_delete, sender=CourseStructure)
+def _clear_cached_discussion_id_map(sender, instance, **kwargs):  # pylint: disable=unused-argument
+    """
+    Start a new revision of the discussion id map of a course in the cache,
+    and remove it from the request cache, when its course structure changes.
+    """
+    cache.set(DISCUSSION_ID_MAP_REVISION_CACHE_KEY.format(course_id=instance.course_id), uuid4().hex, None)
+    request_cache.get_cache(DISCUSSION_ID_MAP_REQUEST_CACHE).pop(instance.course_id, None)
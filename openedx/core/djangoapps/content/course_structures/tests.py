@@ -2,13 +2,18 @@
 Course Structure Content sub-application test cases
 """
 import json
+from django.core.cache import cache
 from nose.plugins.attrib import attr
 
 from xmodule_django.models import UsageKey
 from xmodule.modulestore.django import SignalHandler
 from xmodule.modulestore.tests.django_utils import ModuleStoreTestCase
 from xmodule.modulestore.tests.factories import CourseFactory, ItemFactory
-from openedx.core.djangoapps.content.course_structures.models import CourseStructure
+from openedx.core.djangoapps.content.course_structures.models import (
+    CourseStructure,
+    DISCUSSION_ID_MAP_CACHE_TIMEOUT,
+    _discussion_id_map_cache_key,
+)
 from openedx.core.djangoapps.content.course_structures.signals import listen_for_course_publish
 from openedx.core.djangoapps.content.course_structures.tasks import _generate_course_structure, update_course_structure
 
@@ -214,6 +219,22 @@ class CourseStructureTaskTests(ModuleStoreTestCase):
         }
         self.assertEqual(structure.discussion_id_map, expected_id_map)
 
+    def test_discussion_id_map_read_before_save_not_used(self):
+        usage_id = 'i4x://TestX/TS101/discussion/466f474fa4d045a8b7bde1b911e095ca'
+        structure = CourseStructure.objects.create(
+            course_id=self.course.id,
+            discussion_id_map_json=json.dumps({'discussion_id_1': usage_id}),
+        )
+        stale_cache_key = _discussion_id_map_cache_key(self.course.id)
+        stale_map = CourseStructure.get_discussion_id_map(self.course.id)
+
+        structure.discussion_id_map_json = json.dumps({'discussion_id_2': usage_id})
+        structure.save()
+        # Cached by a request which read the map before the save.
+        cache.set(stale_cache_key, (stale_map,), DISCUSSION_ID_MAP_CACHE_TIMEOUT)
+
+        self.assertEqual(CourseStructure.get_discussion_id_map(self.course.id).keys(), ['discussion_id_2'])
+
     def test_discussion_id_map_missing(self):
         structure = CourseStructure.objects.create(course_id=self.course.id)
         self.assertIsNone(structure.discussion_id_map)
@@ -117,6 +117,11 @@ class CacheIsolationMixin(object):
         # Clear that.
         sites.models.SITE_CACHE.clear()
 
+        # Course overviews are also cached in the memory of the process.
+        # Imported here, as the models can't be imported before the apps are loaded.
+        from openedx.core.djangoapps.content.course_overviews.models import CourseOverview
+        CourseOverview.clear_process_cache()
+
         RequestCache.clear_request_cache()
 
 
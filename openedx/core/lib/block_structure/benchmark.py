@@ -0,0 +1,226 @@
+"""
+Benchmarks for the block structure framework, run on synthetic courses.
+
+Usage:
+    python -m openedx.core.lib.block_structure.benchmark [--shape 20,10,5,4] [--repeat 10]
+
+The shape gives the number of children of each block at every level below
+the course (chapters per course, sequentials per chapter, and so on).
+"""
+# pylint: disable=protected-access
+import argparse
+from datetime import datetime
+from timeit import default_timer
+
+from opaque_keys.edx.locator import CourseLocator
+from openedx.core.lib.cache_utils import zpickle, zunpickle
+
+from .block_structure import BlockStructureBlockData
+from .serialization import deserialize_block_structure, serialize_block_structure
+
+
+# Block types used for each level of synthetic courses, below the course.
+SYNTHETIC_BLOCK_TYPES = ['chapter', 'sequential', 'vertical', 'problem']
+
+DEFAULT_SHAPE = (20, 10, 5, 4)
+
+
+def build_synthetic_block_structure(shape=DEFAULT_SHAPE, block_structure_cls=BlockStructureBlockData):
+    """
+    Returns a collected block structure of a synthetic course of the given
+    shape, with typical xBlock fields and transformer data on every block.
+
+    Arguments:
+        shape (sequence(int)) - The number of children of each block at
+            every level below the course.
+
+        block_structure_cls (class) - The class of block structure to
+            create.
+    """
+    course_key = CourseLocator('benchmark', 'course', 'run')
+    root_key = course_key.make_usage_key('course', 'course')
+    block_structure = block_structure_cls(root_key)
+    _set_synthetic_fields(block_structure, root_key, 'Course')
+
+    parents = [root_key]
+    for depth, num_children in enumerate(shape):
+        block_type = SYNTHETIC_BLOCK_TYPES[min(depth, len(SYNTHETIC_BLOCK_TYPES) - 1)]
+        children = []
+        for parent_key in parents:
+            for __ in xrange(num_children):
+                child_key = course_key.make_usage_key(block_type, '{}_{}'.format(block_type, len(children)))
+                block_structure._add_relation(parent_key, child_key)
+                _set_synthetic_fields(block_structure, child_key, block_type)
+                children.append(child_key)
+        parents = children
+    return block_structure
+
+
+def _set_synthetic_fields(block_structure, usage_key, block_type):
+    """
+    Sets a representative set of collected fields on the given block.
+    """
+    block_data = block_structure._get_or_create_block(usage_key)
+    block_data.display_name = u'{} {}'.format(block_type, usage_key.block_id)
+    block_data.graded = block_type == 'sequential'
+    block_data.format = u'Homework' if block_type == 'sequential' else None
+    block_data.due = datetime(2030, 1, 1)
+    block_data.has_score = block_type == 'problem'
+    block_data.weight = 1.0 if block_type == 'problem' else None
+    block_data.visible_to_staff_only = False
+    block_structure.set_transformer_block_field(usage_key, 'benchmark', 'merged_start_date', datetime(2020, 1, 1))
+    block_structure.set_transformer_block_field(usage_key, 'benchmark', 'merged_visible_to_staff_only', False)
+
+
+class _LegacyBlockRelations(object):
+    """
+    The relations of a block in the dict-based format block structures used
+    before their relations were stored as index arrays.
+    """
+    def __init__(self):
+        self.parents = []
+        self.children = []
+
+
+def build_legacy_block_relations(block_structure):
+    """
+    Returns the relations of the given block structure in the legacy format:
+    a dict mapping the usage key of every block to its _LegacyBlockRelations.
+    """
+    block_relations = {}
+    for usage_key in block_structure:
+        relations = block_relations[usage_key] = _LegacyBlockRelations()
+        relations.parents = list(block_structure.get_parents(usage_key))
+        relations.children = list(block_structure.get_children(usage_key))
+    return block_relations
+
+
+def _time(func, repeat):
+    """
+    Returns the best time, in seconds, of calling func repeat times.
+    """
+    best = None
+    for __ in xrange(repeat):
+        start = default_timer()
+        func()
+        elapsed = default_timer() - start
+        best = elapsed if best is None else min(best, elapsed)
+    return best
+
+
+def compare_serialization_formats(block_structure, repeat=10):
+    """
+    Compares the size and the best dump and load times of the given block
+    structure in the compact format used by BlockStructureCache with those
+    of the zlib compressed pickle of its legacy dict-based data structures
+    that BlockStructureCache used to store.
+
+    Returns a dict mapping each format name ('zpickle' or 'compact') to a
+    dict with the 'size' in bytes and the 'dump_time' and 'load_time' in
+    seconds.
+    """
+    root_key = block_structure.root_block_usage_key
+    block_relations = build_legacy_block_relations(block_structure)
+
+    def zpickle_dump():
+        """ Serialize with the legacy zpickle format. """
+        return zpickle((
+            block_relations,
+            block_structure.transformer_data,
+            block_structure._block_data_map,
+        ))
+
+    def zpickle_load():
+        """ Deserialize from the legacy zpickle format, which needed no further processing. """
+        return zunpickle(zpickled)
+
+    def compact_dump():
+        """ Serialize with the compact format. """
+        return serialize_block_structure(block_structure)
+
+    def compact_load():
+        """ Deserialize from the compact format. """
+        return deserialize_block_structure(BlockStructureBlockData(root_key), compacted)
+
+    zpickled = zpickle_dump()
+    compacted = compact_dump()
+    return {
+        'zpickle': {
+            'size': len(zpickled),
+            'dump_time': _time(zpickle_dump, repeat),
+            'load_time': _time(zpickle_load, repeat),
+        },
+        'compact': {
+            'size': len(compacted),
+            'dump_time': _time(compact_dump, repeat),
+            'load_time': _time(compact_load, repeat),
+        },
+    }
+
+
+def time_block_structure_operations(block_structure, repeat=10):
+    """
+    Returns a dict mapping the names of common operations of transformers
+    on the given block structure to their best time, in seconds.
+
+    Blocks are removed from copies of the given block structure, which
+    is left unchanged.
+    """
+    root_key = block_structure.root_block_usage_key
+    serialized = serialize_block_structure(block_structure)
+
+    def remove_blocks():
+        """ Remove every other problem, keeping their descendants, and prune. """
+        copy = deserialize_block_structure(BlockStructureBlockData(root_key), serialized)
+        start = default_timer()
+        copy.remove_block_traversal(
+            lambda block_key: block_key.block_type == 'problem' and block_key.block_id.endswith(('0', '2', '4')),
+            keep_descendants=True,
+        )
+        copy._prune_unreachable()
+        return default_timer() - start
+
+    return {
+        'topological_traversal': _time(lambda: list(block_structure.topological_traversal()), repeat),
+        'post_order_traversal': _time(lambda: list(block_structure.post_order_traversal()), repeat),
+        'remove_blocks': min(remove_blocks() for __ in xrange(repeat)),
+    }
+
+
+def parse_shape(value):
+    """
+    Parses a comma separated shape argument.
+    """
+    return tuple(int(num_children) for num_children in value.split(','))
+
+
+def main():
+    """
+    Runs the benchmarks and prints their results.
+    """
+    parser = argparse.ArgumentParser(description=__doc__.strip().splitlines()[0])
+    parser.add_argument('--shape', type=parse_shape, default=DEFAULT_SHAPE)
+    parser.add_argument('--repeat', type=int, default=10)
+    args = parser.parse_args()
+
+    block_structure = build_synthetic_block_structure(args.shape)
+    print 'Synthetic course with {} blocks'.format(len(block_structure))
+
+    results = compare_serialization_formats(block_structure, args.repeat)
+    print '{:<10}{:>12}{:>14}{:>14}'.format('format', 'size (KB)', 'dump (ms)', 'load (ms)')
+    for format_name in ('zpickle', 'compact'):
+        result = results[format_name]
+        print '{:<10}{:>12.1f}{:>14.2f}{:>14.2f}'.format(
+            format_name,
+            result['size'] / 1024.0,
+            result['dump_time'] * 1000,
+            result['load_time'] * 1000,
+        )
+
+    print '{:<24}{:>14}'.format('operation', 'time (ms)')
+    for operation, elapsed in sorted(time_block_structure_operations(block_structure, args.repeat).iteritems()):
+        print '{:<24}{:>14.2f}'.format(operation, elapsed * 1000)
+
+
+if __name__ == '__main__':
+    main()
@@ -5,9 +5,11 @@ Module with family of classes for block structures.
     BlockStructureModulestoreData - responsible for xBlock data.
 
 The following internal data structures are implemented:
-    _BlockRelations - Data structure for a single block's relations.
+    _BlockRelations - Data structure for one direction of the relations
+        (parents or children) of all blocks.
     _BlockData - Data structure for a single block's data.
 """
+from array import array
 from functools import partial
 from logging import getLogger
 
@@ -22,21 +24,120 @@ logger = getLogger(__name__)  # pylint: disable=invalid-name
 # A dictionary key value for storing a transformer's version number.
 TRANSFORMER_VERSION_KEY = '_version'
 
+# Type code of the integer arrays that hold block indexes.
+BLOCK_INDEX_TYPECODE = 'l'
+
 
 class _BlockRelations(object):
     """
-    Data structure to encapsulate relationships for a single block,
-    including its children and parents.
+    Data structure to encapsulate one direction of the relationships
+    (either the parents or the children) of all the blocks in a block
+    structure, where blocks are identified by their integer index.
+
+    The relations are stored as integer arrays in compressed sparse row
+    (CSR) form: the related blocks of the block at index i are
+    indexes[offsets[i]:offsets[i + 1]].  Since the arrays cannot be
+    updated in place cheaply, rows that are updated after the arrays
+    are built are kept as lists until the next call to compact.
     """
-    def __init__(self):
+    __slots__ = ('offsets', 'indexes', '_updated_rows')
 
-        # List of usage keys of this block's parents.
-        # list [UsageKey]
-        self.parents = []
+    def __init__(self, offsets=None, indexes=None):
 
-        # List of usage keys of this block's children.
-        # list [UsageKey]
-        self.children = []
+        # Start of each block's row in indexes, followed by the
+        # length of indexes.
+        # array [int]
+        self.offsets = array(BLOCK_INDEX_TYPECODE, [0]) if offsets is None else offsets
+
+        # Indexes of the related blocks of all blocks.
+        # array [int]
+        self.indexes = array(BLOCK_INDEX_TYPECODE) if indexes is None else indexes
+
+        # Map of a block's index to its updated list of related blocks.
+        # dict {int: [int]}
+        self._updated_rows = {}
+
+    def __len__(self):
+        return len(self.offsets) - 1
+
+    def get(self, index):
+        """
+        Returns the indexes of the related blocks of the block at the
+        given index.
+        """
+        try:
+            return self._updated_rows[index]
+        except KeyError:
+            return self.indexes[self.offsets[index]:self.offsets[index + 1]]
+
+    def add_row(self):
+        """
+        Adds an empty row for a newly added block.
+        """
+        self.offsets.append(self.offsets[-1])
+
+    def append(self, index, related_index):
+        """
+        Adds a relation from the block at index to the block at
+        related_index.
+        """
+        self._get_updated_row(index).append(related_index)
+
+    def remove(self, index, related_index):
+        """
+        Removes the relation from the block at index to the block at
+        related_index.
+        """
+        self._get_updated_row(index).remove(related_index)
+
+    def clear(self, index):
+        """
+        Removes all relations of the block at the given index.
+        """
+        self._updated_rows[index] = []
+
+    def compact(self, new_indexes=None):
+        """
+        Rebuilds the arrays to include all updated rows.
+
+        Arguments:
+            new_indexes (array [int]) - If given, blocks are renumbered
+                such that the block at index i moves to index
+                new_indexes[i], which must preserve the order of the
+                blocks. Blocks whose new index is -1 are dropped, along
+                with any relations to them.
+        """
+        if new_indexes is None and not self._updated_rows:
+            return
+
+        offsets = array(BLOCK_INDEX_TYPECODE, [0])
+        indexes = array(BLOCK_INDEX_TYPECODE)
+        for index in xrange(len(self)):
+            if new_indexes is None:
+                indexes.extend(self.get(index))
+            elif new_indexes[index] != -1:
+                indexes.extend(
+                    new_indexes[related_index]
+                    for related_index in self.get(index)
+                    if new_indexes[related_index] != -1
+                )
+            else:
+                continue
+            offsets.append(len(indexes))
+
+        self.offsets = offsets
+        self.indexes = indexes
+        self._updated_rows = {}
+
+    def _get_updated_row(self, index):
+        """
+        Returns the updatable list of related blocks of the block at
+        the given index.
+        """
+        row = self._updated_rows.get(index)
+        if row is None:
+            row = self._updated_rows[index] = list(self.get(index))
+        return row
 
 
 class BlockStructure(object):
@@ -48,6 +149,9 @@ class BlockStructure(object):
     This base class keeps track of the block structure's root_block_usage_key,
     the existence of the blocks, and their parents and children
     relationships (graph nodes and edges).
+
+    Internally, each block is numbered with an integer index, which is
+    used to store and traverse the relations.
     """
     def __init__(self, root_block_usage_key):
 
@@ -55,14 +159,26 @@ class BlockStructure(object):
         # UsageKey
         self.root_block_usage_key = root_block_usage_key
 
-        # Map of a block's usage key to its block relations. The
-        # existence of a block in the structure is determined by its
-        # presence in this map.
-        # dict {UsageKey: _BlockRelations}
-        self._block_relations = {}
+        # List of the usage keys of the blocks, in the order in which
+        # they were added.  A block's position in this list is its
+        # index.  Removed blocks keep their position until the
+        # structure is compacted.
+        # list [UsageKey]
+        self._block_keys = []
+
+        # Map of a block's usage key to its index. The existence of a
+        # block in the structure is determined by its presence in
+        # this map.
+        # dict {UsageKey: int}
+        self._block_indexes = {}
+
+        # Relations of the blocks, by index.
+        # _BlockRelations
+        self._parents = _BlockRelations()
+        self._children = _BlockRelations()
 
         # Add the root block.
-        self._add_block(self._block_relations, root_block_usage_key)
+        self._add_block(root_block_usage_key)
 
     def __iter__(self):
         """
@@ -73,7 +189,7 @@ class BlockStructure(object):
         return self.get_block_keys()
 
     def __len__(self):
-        return len(self._block_relations)
+        return len(self._block_indexes)
 
     #--- Block structure relation methods ---#
 
@@ -90,7 +206,7 @@ class BlockStructure(object):
         Returns:
             [UsageKey] - A list of usage keys of the block's parents.
         """
-        return self._block_relations[usage_key].parents if usage_key in self else []
+        return self._get_related_keys(self._parents, usage_key)
 
     def get_children(self, usage_key):
         """
@@ -104,7 +220,7 @@ class BlockStructure(object):
         Returns:
             [UsageKey] - A list of usage keys of the block's children.
         """
-        return self._block_relations[usage_key].children if usage_key in self else []
+        return self._get_related_keys(self._children, usage_key)
 
     def set_root_block(self, usage_key):
         """
@@ -119,7 +235,7 @@ class BlockStructure(object):
                 new root of the block structure.
         """
         self.root_block_usage_key = usage_key
-        self._block_relations[usage_key].parents = []
+        self._parents.clear(self._block_indexes[usage_key])
 
     def __contains__(self, usage_key):
         """
@@ -134,7 +250,7 @@ class BlockStructure(object):
             bool - Whether or not a block with the given usage_key
                 is present in this block structure.
         """
-        return usage_key in self._block_relations
+        return usage_key in self._block_indexes
 
     def get_block_keys(self):
         """
@@ -144,7 +260,7 @@ class BlockStructure(object):
             iterator(UsageKey) - An iterator of the usage
             keys of all the blocks in the block structure.
         """
-        return self._block_relations.iterkeys()
+        return self._block_indexes.iterkeys()
 
     #--- Block structure traversal methods ---#
 
@@ -166,13 +282,16 @@ class BlockStructure(object):
             generator - A generator object created from the
                 traverse_topologically method.
         """
-        return traverse_topologically(
-            start_node=start_node or self.root_block_usage_key,
-            get_parents=self.get_parents,
-            get_children=self.get_children,
-            filter_func=filter_func,
+        start_node = start_node or self.root_block_usage_key
+        if start_node not in self:
+            return self._traverse_missing_block(start_node, filter_func)
+        return self._get_keys(traverse_topologically(
+            start_node=self._block_indexes[start_node],
+            get_parents=self._parents.get,
+            get_children=self._children.get,
+            filter_func=self._get_index_filter(filter_func),
             yield_descendants_of_unyielded=yield_descendants_of_unyielded,
-        )
+        ))
 
     def post_order_traversal(
             self,
@@ -191,11 +310,14 @@ class BlockStructure(object):
             generator - A generator object created from the
                 traverse_post_order method.
         """
-        return traverse_post_order(
-            start_node=start_node or self.root_block_usage_key,
-            get_children=self.get_children,
-            filter_func=filter_func,
-        )
+        start_node = start_node or self.root_block_usage_key
+        if start_node not in self:
+            return self._traverse_missing_block(start_node, filter_func)
+        return self._get_keys(traverse_post_order(
+            start_node=self._block_indexes[start_node],
+            get_children=self._children.get,
+            filter_func=self._get_index_filter(filter_func),
+        ))
 
     #--- Internal methods ---#
     # To be used within the block_structure framework or by tests.
@@ -204,29 +326,41 @@ class BlockStructure(object):
         """
         Mutates this block structure by removing any unreachable blocks.
         """
+        reachable_indexes = set()
+        root_index = self._block_indexes.get(self.root_block_usage_key)
+        if root_index is not None:
+            reachable_indexes.update(
+                traverse_post_order(start_node=root_index, get_children=self._children.get)
+            )
+        self._compact(reachable_indexes)
 
-        # Create a new block relations map to store only those blocks
-        # that are still linked
-        pruned_block_relations = {}
-        old_block_relations = self._block_relations
-
-        # Build the structure from the leaves up by doing a post-order
-        # traversal of the old structure, thereby encountering only
-        # reachable blocks.
-        for block_key in self.post_order_traversal():
-            # If the block is in the old structure,
-            if block_key in old_block_relations:
-                # Add it to the new pruned structure
-                self._add_block(pruned_block_relations, block_key)
-
-                # Add a relationship to only those old children that
-                # were also added to the new pruned structure.
-                for child in old_block_relations[block_key].children:
-                    if child in pruned_block_relations:
-                        self._add_to_relations(pruned_block_relations, block_key, child)
+    def _compact(self, retained_indexes=None):
+        """
+        Mutates this block structure by renumbering its blocks without
+        gaps left by removed blocks and rebuilding the relations arrays.
 
-        # Replace this structure's relations with the newly pruned one.
-        self._block_relations = pruned_block_relations
+        Arguments:
+            retained_indexes (set(int)) - If given, only the blocks at
+                these indexes are retained.
+        """
+        new_indexes = array(BLOCK_INDEX_TYPECODE, [-1]) * len(self._block_keys)
+        block_keys = []
+        for index, usage_key in enumerate(self._block_keys):
+            if self._block_indexes.get(usage_key) != index:
+                # The block was removed.
+                continue
+            if retained_indexes is not None and index not in retained_indexes:
+                continue
+            new_indexes[index] = len(block_keys)
+            block_keys.append(usage_key)
+
+        if len(block_keys) == len(self._block_keys):
+            new_indexes = None
+        else:
+            self._block_keys = block_keys
+            self._block_indexes = {usage_key: index for index, usage_key in enumerate(block_keys)}
+        self._parents.compact(new_indexes)
+        self._children.compact(new_indexes)
 
     def _add_relation(self, parent_key, child_key):
         """
@@ -236,50 +370,79 @@ class BlockStructure(object):
             parent_key (UsageKey) - Usage key of the parent block.
             child_key (UsageKey) - Usage key of the child block.
         """
-        self._add_to_relations(self._block_relations, parent_key, child_key)
+        self._add_index_relation(self._add_block(parent_key), self._add_block(child_key))
 
-    @staticmethod
-    def _add_to_relations(block_relations, parent_key, child_key):
+    def _add_index_relation(self, parent_index, child_index):
+        """
+        Adds a parent to child relationship between the blocks at the
+        given indexes.
+        """
+        self._parents.append(child_index, parent_index)
+        self._children.append(parent_index, child_index)
+
+    def _add_block(self, usage_key):
         """
-        Adds a parent to child relationship in the given block
-        relations map.
+        Adds the given usage_key to this block structure, if not
+        already present, and returns its index.
 
         Arguments:
-            block_relations (dict({UsageKey: _BlockRelations})) -
-                Internal map of a block's usage key to its
-                parents/children relations.
+            usage_key (UsageKey) - Usage key of the block that is to
+                be added.
+        """
+        index = self._block_indexes.get(usage_key)
+        if index is None:
+            index = self._block_indexes[usage_key] = len(self._block_keys)
+            self._block_keys.append(usage_key)
+            self._parents.add_row()
+            self._children.add_row()
+        return index
 
-            parent_key (UsageKey) - Usage key of the parent block.
+    def _get_related_keys(self, block_relations, usage_key):
+        """
+        Returns the usage keys of the related blocks of the block
+        identified by the given usage_key, or an empty list if it is
+        not in this block structure.
+        """
+        index = self._block_indexes.get(usage_key)
+        if index is None:
+            return []
+        block_keys = self._block_keys
+        return [block_keys[related_index] for related_index in block_relations.get(index)]
 
-            child_key (UsageKey) - Usage key of the child block.
+    def _get_keys(self, indexes):
         """
-        BlockStructure._add_block(block_relations, parent_key)
-        BlockStructure._add_block(block_relations, child_key)
+        Returns a generator of the usage keys of the blocks at the
+        given indexes.
+        """
+        block_keys = self._block_keys
+        return (block_keys[index] for index in indexes)
 
-        block_relations[child_key].parents.append(parent_key)
-        block_relations[parent_key].children.append(child_key)
+    def _get_index_filter(self, filter_func):
+        """
+        Returns a version of the given filter_func (on usage keys) that
+        takes block indexes.
+        """
+        if filter_func is None:
+            return None
+        block_keys = self._block_keys
+        return lambda index: filter_func(block_keys[index])
 
     @staticmethod
-    def _add_block(block_relations, usage_key):
+    def _traverse_missing_block(usage_key, filter_func):
         """
-        Adds the given usage_key to the given block_relations map.
-
-        Arguments:
-            block_relations (dict({UsageKey: _BlockRelations})) -
-                Internal map of a block's usage key to its
-                parents/children relations.
-
-            usage_key (UsageKey) - Usage key of the block that is to
-                be added to the given block_relations.
+        Traverses a block that is not in this block structure, and
+        therefore has no relations.
         """
-        if usage_key not in block_relations:
-            block_relations[usage_key] = _BlockRelations()
+        if filter_func is None or filter_func(usage_key):
+            yield usage_key
 
 
 class FieldData(object):
     """
     Data structure to encapsulate collected fields.
     """
+    __slots__ = ('fields',)
+
     def class_field_names(self):
         """
         Returns list of names of fields that are defined directly
@@ -325,7 +488,7 @@ class TransformerData(FieldData):
     """
     Data structure to encapsulate collected data for a transformer.
     """
-    pass
+    __slots__ = ()
 
 
 class TransformerDataMap(dict):
@@ -378,6 +541,8 @@ class BlockData(FieldData):
     """
     Data structure to encapsulate collected data for a single block.
     """
+    __slots__ = ('location', 'transformer_data')
+
     def class_field_names(self):
         return super(BlockData, self).class_field_names() + ['location', 'transformer_data']
 
@@ -588,26 +753,28 @@ class BlockStructureBlockData(BlockStructure):
                 removed block's children become children of the
                 removed block's parents.
         """
-        children = self._block_relations[usage_key].children
-        parents = self._block_relations[usage_key].parents
+        index = self._block_indexes.pop(usage_key)
+        children = self._children.get(index)
+        parents = self._parents.get(index)
 
         # Remove block from its children.
         for child in children:
-            self._block_relations[child].parents.remove(usage_key)
+            self._parents.remove(child, index)
 
         # Remove block from its parents.
         for parent in parents:
-            self._block_relations[parent].children.remove(usage_key)
+            self._children.remove(parent, index)
 
         # Remove block.
-        self._block_relations.pop(usage_key, None)
+        self._children.clear(index)
+        self._parents.clear(index)
         self._block_data_map.pop(usage_key, None)
 
         # Recreate the graph connections if descendants are to be kept.
         if keep_descendants:
             for child in children:
                 for parent in parents:
-                    self._add_relation(parent, child)
+                    self._add_index_relation(parent, child)
 
     def create_universal_filter(self):
         """
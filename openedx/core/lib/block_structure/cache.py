@@ -4,9 +4,13 @@ Module for the Cache class for BlockStructure objects.
 # pylint: disable=protected-access
 from logging import getLogger
 
-from openedx.core.lib.cache_utils import zpickle, zunpickle
-
 from .block_structure import BlockStructureModulestoreData, BlockStructureBlockData
+from .serialization import (
+    SERIALIZATION_VERSION,
+    SerializationVersionMismatch,
+    deserialize_block_structure,
+    serialize_block_structure,
+)
 
 
 logger = getLogger(__name__)  # pylint: disable=C0103
@@ -27,8 +31,8 @@ class BlockStructureCache(object):
 
     def add(self, block_structure):
         """
-        Store a compressed and pickled serialization of the given
-        block structure into the given cache.
+        Store a compact serialization (see serialization.py) of the
+        given block structure into the given cache.
 
         The key in the cache is 'root.key.<root_block_usage_key>'.
         The data stored in the cache includes the structure's
@@ -38,12 +42,7 @@ class BlockStructureCache(object):
             block_structure (BlockStructure) - The block structure
                 that is to be serialized to the given cache.
         """
-        data_to_cache = (
-            block_structure._block_relations,
-            block_structure.transformer_data,
-            block_structure._block_data_map,
-        )
-        zp_data_to_cache = zpickle(data_to_cache)
+        zp_data_to_cache = serialize_block_structure(block_structure)
 
         # Set the timeout value for the cache to 1 day as a fail-safe
         # in case the signal to invalidate the cache doesn't come through.
@@ -96,13 +95,15 @@ class BlockStructureCache(object):
             )
 
         # Deserialize and construct the block structure.
-        block_relations, transformer_data, block_data_map = zunpickle(zp_data_from_cache)
         block_structure = BlockStructureModulestoreData(root_block_usage_key)
-        block_structure._block_relations = block_relations
-        block_structure.transformer_data = transformer_data
-        block_structure._block_data_map = block_data_map
-
-        return block_structure
+        try:
+            return deserialize_block_structure(block_structure, zp_data_from_cache)
+        except SerializationVersionMismatch:
+            logger.exception(
+                "Ignoring BlockStructure %r in the cache with an unexpected format.",
+                root_block_usage_key,
+            )
+            return None
 
     def delete(self, root_block_usage_key):
         """
@@ -126,7 +127,8 @@ class BlockStructureCache(object):
         Returns the cache key to use for storing the block structure
         for the given root_block_usage_key.
         """
-        return "v{version}.root.key.{root_usage_key}".format(
+        return "v{version}.s{serialization_version}.root.key.{root_usage_key}".format(
             version=unicode(BlockStructureBlockData.VERSION),
+            serialization_version=unicode(SERIALIZATION_VERSION),
             root_usage_key=unicode(root_block_usage_key),
         )
@@ -0,0 +1,156 @@
+"""
+Instrumentation of the phases of block structure transformers.
+
+The time spent by each transformer in its collect and transform phases
+is always reported as a metric.  In addition, the profile_transformers
+context manager gathers the time spent and, optionally, the objects
+allocated by each transformer while it is active, for use by benchmarks
+and profiling tools.
+"""
+from collections import defaultdict
+from contextlib import contextmanager
+import gc
+from timeit import default_timer
+
+import dogstats_wrapper as dog_stats_api
+
+
+# Name of the metric with the time spent in a phase of a transformer.
+TRANSFORMER_TIME_METRIC = 'block_structure.transformer.time'
+
+# Phases of transformers that are instrumented.  The filter phase, which
+# runs the filters of a filtering transformer on each block, is only
+# measured while a profile is active.
+COLLECT_PHASE = 'collect'
+TRANSFORM_PHASE = 'transform'
+FILTER_PHASE = 'filter'
+
+# Name used in place of a transformer name for the single traversal that
+# applies the combined filters of all filtering transformers, and for the
+# pruning of unreachable blocks after all transformers are applied.
+FILTER_TRAVERSAL_NAME = 'filter_traversal'
+PRUNE_NAME = 'prune_unreachable'
+
+# Profiles currently gathering statistics.
+_active_profiles = []
+
+
+class TransformerProfile(object):
+    """
+    Statistics on the transformer phases run while a profile is active.
+    """
+    def __init__(self, track_allocations=False):
+        # Whether to count the objects allocated by each phase.
+        self.track_allocations = track_allocations
+
+        # Map of (transformer name, phase) to the number of 'calls', the
+        # total 'time' in seconds and the net number of objects
+        # 'allocated' (or None if allocations are not tracked).
+        # dict {(string, string): dict}
+        self.stats = defaultdict(lambda: {'calls': 0, 'time': 0.0, 'allocated': 0 if track_allocations else None})
+
+    def record(self, name, phase, elapsed, allocated):
+        """
+        Records a single run of the given phase of the named transformer.
+        """
+        stats = self.stats[(name, phase)]
+        stats['calls'] += 1
+        stats['time'] += elapsed
+        if self.track_allocations and allocated is not None:
+            stats['allocated'] += allocated
+
+    def summary(self):
+        """
+        Returns a list of (name, phase, stats) tuples, sorted by
+        decreasing total time.
+        """
+        return sorted(
+            ((name, phase, stats) for (name, phase), stats in self.stats.iteritems()),
+            key=lambda item: item[2]['time'],
+            reverse=True,
+        )
+
+
+@contextmanager
+def profile_transformers(track_allocations=False):
+    """
+    Context manager yielding a TransformerProfile that gathers statistics
+    on all instrumented transformer phases run within its block.
+
+    Note: Allocations are counted as the change in the number of objects
+    tracked by the garbage collector, which is disabled while each phase
+    runs.  This is expensive and is meant for benchmarks only.
+
+    Arguments:
+        track_allocations (bool) - Whether to count the objects
+            allocated by each phase.
+    """
+    profile = TransformerProfile(track_allocations)
+    _active_profiles.append(profile)
+    try:
+        yield profile
+    finally:
+        _active_profiles.remove(profile)
+
+
+@contextmanager
+def instrument(name, phase):
+    """
+    Context manager that measures the given phase of the named
+    transformer, reports its time as a metric and records it in all
+    active profiles.
+    """
+    track_allocations = any(profile.track_allocations for profile in _active_profiles)
+    if track_allocations:
+        gc_was_enabled = gc.isenabled()
+        gc.disable()
+        objects_before = len(gc.get_objects())
+
+    start = default_timer()
+    try:
+        yield
+    finally:
+        elapsed = default_timer() - start
+        allocated = None
+        if track_allocations:
+            allocated = len(gc.get_objects()) - objects_before
+            if gc_was_enabled:
+                gc.enable()
+
+        dog_stats_api.histogram(
+            TRANSFORMER_TIME_METRIC,
+            elapsed,
+            tags=[u'transformer:{}'.format(name), u'phase:{}'.format(phase)],
+        )
+        for profile in _active_profiles:
+            profile.record(name, phase, elapsed, allocated)
+
+
+def instrument_filters(name, filters):
+    """
+    Returns the given filters of the named transformer, wrapped to record
+    the time spent in each of their calls in all active profiles.  The
+    filters are returned unchanged if no profile is active.
+    """
+    if not _active_profiles:
+        return filters
+    return [_instrument_filter(name, filter_func) for filter_func in filters]
+
+
+def _instrument_filter(name, filter_func):
+    """
+    Returns the given filter of the named transformer, wrapped to record
+    the time spent in its calls in all active profiles.
+    """
+    def instrumented_filter(block_key):
+        """
+        Calls filter_func and records the time spent.
+        """
+        start = default_timer()
+        try:
+            return filter_func(block_key)
+        finally:
+            elapsed = default_timer() - start
+            for profile in _active_profiles:
+                profile.record(name, FILTER_PHASE, elapsed, None)
+    return instrumented_filter
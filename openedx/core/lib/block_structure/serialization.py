@@ -0,0 +1,157 @@
+"""
+Compact serialization of collected block structures.
+
+Rather than pickling the structure's BlockData objects (each holding a
+full usage key), the compact format:
+
+    * interns every usage key into a single list, so that each key is
+      serialized exactly once and blocks are referred to by their integer
+      index in that list,
+    * stores parent and child relations as the integer arrays, in
+      compressed sparse row (CSR) form, that back the block structure
+      (see _BlockRelations), and
+    * stores xBlock field and transformer block field data column-wise:
+      one (block indexes, values) pair per field, rather than one dict per
+      block.
+
+The serialized data is a tuple whose first item is SERIALIZATION_VERSION;
+data with any other version is rejected on deserialization.
+"""
+from array import array
+import cPickle as pickle
+import zlib
+
+from .block_structure import BLOCK_INDEX_TYPECODE, BlockData, TransformerData, _BlockRelations
+
+
+# The version of the compact format. Increment whenever the format changes.
+SERIALIZATION_VERSION = 2
+
+
+class SerializationVersionMismatch(Exception):
+    """
+    Raised when deserializing data written with another format version.
+    """
+    pass
+
+
+def serialize_block_structure(block_structure):
+    """
+    Returns the compact serialization of the given block structure, as a
+    zlib compressed pickle.
+
+    Arguments:
+        block_structure (BlockStructureBlockData) - The collected block
+            structure to serialize.
+    """
+    # pylint: disable=protected-access
+    block_structure._compact()
+    keys = list(block_structure._block_keys)
+    index_of = dict(block_structure._block_indexes)
+
+    # Block data may exist for keys that no longer have relations; those
+    # keys are appended to the key list.
+    block_data_indexes = array(BLOCK_INDEX_TYPECODE)
+    xblock_field_columns = {}
+    transformer_columns = {}
+    for key, block_data in block_structure._block_data_map.iteritems():
+        index = index_of.get(key)
+        if index is None:
+            index = index_of[key] = len(keys)
+            keys.append(key)
+        block_data_indexes.append(index)
+        _add_to_columns(xblock_field_columns, index, block_data.fields)
+        for transformer_name, transformer_data in block_data.transformer_data.iteritems():
+            transformer_present, transformer_field_columns = transformer_columns.setdefault(
+                transformer_name, (array(BLOCK_INDEX_TYPECODE), {})
+            )
+            transformer_present.append(index)
+            _add_to_columns(transformer_field_columns, index, transformer_data.fields)
+
+    data = (
+        SERIALIZATION_VERSION,
+        keys,
+        len(block_structure._block_keys),
+        block_structure._children.offsets,
+        block_structure._children.indexes,
+        block_structure._parents.offsets,
+        block_structure._parents.indexes,
+        block_data_indexes,
+        xblock_field_columns,
+        transformer_columns,
+        block_structure.transformer_data,
+    )
+    return zlib.compress(pickle.dumps(data, pickle.HIGHEST_PROTOCOL))
+
+
+def deserialize_block_structure(block_structure, serialized_data):
+    """
+    Populates the given (empty) block structure from the given compact
+    serialization.
+
+    Raises SerializationVersionMismatch if the data was written with a
+    different version of the format.
+
+    Arguments:
+        block_structure (BlockStructureBlockData) - The block structure
+            to populate.
+
+        serialized_data (str) - Data returned by serialize_block_structure.
+    """
+    data = pickle.loads(zlib.decompress(serialized_data))
+    if data[0] != SERIALIZATION_VERSION:
+        raise SerializationVersionMismatch(
+            'Expected version {}, found {}.'.format(SERIALIZATION_VERSION, data[0])
+        )
+    (
+        __,
+        keys,
+        num_blocks,
+        child_offsets,
+        child_indexes,
+        parent_offsets,
+        parent_indexes,
+        block_data_indexes,
+        xblock_field_columns,
+        transformer_columns,
+        transformer_data,
+    ) = data
+
+    # pylint: disable=protected-access
+    block_keys = keys[:num_blocks]
+    block_structure._block_keys = block_keys
+    block_structure._block_indexes = {key: index for index, key in enumerate(block_keys)}
+    block_structure._children = _BlockRelations(child_offsets, child_indexes)
+    block_structure._parents = _BlockRelations(parent_offsets, parent_indexes)
+
+    block_data_by_index = {index: BlockData(keys[index]) for index in block_data_indexes}
+    for field_name, (indexes, values) in xblock_field_columns.iteritems():
+        for index, value in zip(indexes, values):
+            block_data_by_index[index].fields[field_name] = value
+    for transformer_name, (present_indexes, field_columns) in transformer_columns.iteritems():
+        transformer_data_by_index = {}
+        for index in present_indexes:
+            transformer_data_by_index[index] = block_data_by_index[index].transformer_data[transformer_name] = (
+                TransformerData()
+            )
+        for field_name, (indexes, values) in field_columns.iteritems():
+            for index, value in zip(indexes, values):
+                transformer_data_by_index[index].fields[field_name] = value
+
+    block_structure._block_data_map = {
+        keys[index]: block_data for index, block_data in block_data_by_index.iteritems()
+    }
+    block_structure.transformer_data = transformer_data
+    return block_structure
+
+
+def _add_to_columns(columns, index, fields):
+    """
+    Adds the values of the given fields dict, belonging to the block at the
+    given index, to the given dict of field name to (indexes, values)
+    columns.
+    """
+    for field_name, value in fields.iteritems():
+        indexes, values = columns.setdefault(field_name, (array(BLOCK_INDEX_TYPECODE), []))
+        indexes.append(index)
+        values.append(value)
@@ -221,3 +221,26 @@ class TestBlockStructureData(TestCase, ChildrenMapTestMixin):
         block_structure = self.create_block_structure(ChildrenMapTestMixin.LINEAR_CHILDREN_MAP)
         block_structure.remove_block_traversal(lambda block: block == 2)
         self.assert_block_structure(block_structure, [[1], [], [], []], missing_blocks=[2])
+
+    @ddt.data(
+        ChildrenMapTestMixin.SIMPLE_CHILDREN_MAP,
+        ChildrenMapTestMixin.DAG_CHILDREN_MAP,
+    )
+    def test_compact(self, children_map):
+        block_structure = self.create_block_structure(children_map)
+        block_structure.remove_block(1, keep_descendants=True)
+        block_structure._add_relation(0, 1)
+
+        ### compute expected children_map
+        expected_children_map = deepcopy(children_map)
+        for child in expected_children_map[1]:
+            if child not in expected_children_map[0]:
+                expected_children_map[0].append(child)
+        expected_children_map[0].remove(1)
+        expected_children_map[0].append(1)
+        expected_children_map[1] = []
+
+        block_structure._compact()
+        self.assertEquals(len(block_structure._block_keys), len(children_map))
+        self.assertEquals(len(block_structure._children), len(children_map))
+        self.assert_block_structure(block_structure, expected_children_map)
@@ -0,0 +1,97 @@
+"""
+Tests for block_structure/serialization.py
+"""
+# pylint: disable=protected-access
+import cPickle as pickle
+import zlib
+
+import ddt
+from nose.plugins.attrib import attr
+from unittest import TestCase
+
+from ..benchmark import build_synthetic_block_structure, compare_serialization_formats
+from ..block_structure import BlockStructureBlockData
+from ..serialization import (
+    SerializationVersionMismatch,
+    deserialize_block_structure,
+    serialize_block_structure,
+)
+from .helpers import ChildrenMapTestMixin, MockTransformer
+
+
+@attr('shard_2')
+@ddt.ddt
+class TestSerialization(ChildrenMapTestMixin, TestCase):
+    """
+    Tests for the compact serialization of block structures.
+    """
+    def round_trip(self, block_structure):
+        """
+        Serializes and deserializes the given block structure.
+        """
+        return deserialize_block_structure(
+            BlockStructureBlockData(block_structure.root_block_usage_key),
+            serialize_block_structure(block_structure),
+        )
+
+    @ddt.data(
+        ChildrenMapTestMixin.SIMPLE_CHILDREN_MAP,
+        ChildrenMapTestMixin.LINEAR_CHILDREN_MAP,
+        ChildrenMapTestMixin.DAG_CHILDREN_MAP,
+    )
+    def test_relations(self, children_map):
+        block_structure = self.create_block_structure(children_map)
+        self.assert_block_structure(self.round_trip(block_structure), children_map)
+
+    def test_block_data(self):
+        block_structure = self.create_block_structure(self.SIMPLE_CHILDREN_MAP)
+        block_structure._add_transformer(MockTransformer)
+        block_structure.set_transformer_data(MockTransformer, 'course_data', [1, 2])
+        for block_key in block_structure:
+            block_structure._get_or_create_block(block_key).display_name = 'block {}'.format(block_key)
+            block_structure.set_transformer_block_field(block_key, MockTransformer, 'test', block_key * 2)
+        block_structure._get_or_create_block(1).graded = None
+
+        loaded = self.round_trip(block_structure)
+        for block_key in block_structure:
+            self.assertEquals(loaded[block_key].location, block_key)
+            self.assertEquals(loaded[block_key].fields, block_structure[block_key].fields)
+            self.assertEquals(
+                loaded.get_transformer_block_field(block_key, MockTransformer, 'test'),
+                block_key * 2,
+            )
+        self.assertIsNone(loaded.get_xblock_field(1, 'graded', 'missing'))
+        self.assertEquals(loaded.get_xblock_field(2, 'graded', 'missing'), 'missing')
+        self.assertEquals(loaded.get_transformer_data(MockTransformer, 'course_data'), [1, 2])
+        self.assertEquals(loaded._get_transformer_data_version(MockTransformer), MockTransformer.VERSION)
+
+    def test_block_data_without_relations(self):
+        block_structure = self.create_block_structure(self.SIMPLE_CHILDREN_MAP)
+        block_structure._get_or_create_block(10).display_name = 'orphan'
+
+        loaded = self.round_trip(block_structure)
+        self.assertNotIn(10, loaded)
+        self.assertEquals(loaded[10].display_name, 'orphan')
+
+    def test_version_mismatch(self):
+        block_structure = self.create_block_structure(self.SIMPLE_CHILDREN_MAP)
+        data = list(pickle.loads(zlib.decompress(serialize_block_structure(block_structure))))
+        data[0] += 1
+        with self.assertRaises(SerializationVersionMismatch):
+            deserialize_block_structure(
+                BlockStructureBlockData(block_structure.root_block_usage_key),
+                zlib.compress(pickle.dumps(tuple(data))),
+            )
+
+    def test_synthetic_course(self):
+        block_structure = build_synthetic_block_structure((2, 2, 2, 2))
+        self.assertEquals(len(block_structure), 31)
+
+        loaded = self.round_trip(block_structure)
+        for block_key in block_structure:
+            self.assertEquals(loaded.get_children(block_key), block_structure.get_children(block_key))
+            self.assertEquals(loaded.get_parents(block_key), block_structure.get_parents(block_key))
+            self.assertEquals(loaded[block_key].fields, block_structure[block_key].fields)
+
+        results = compare_serialization_formats(block_structure, repeat=1)
+        self.assertLess(results['compact']['size'], results['zpickle']['size'])
@@ -7,6 +7,8 @@ from unittest import TestCase
 
 from ..block_structure import BlockStructureModulestoreData
 from ..exceptions import TransformerException
+from ..profiling import COLLECT_PHASE, FILTER_PHASE, FILTER_TRAVERSAL_NAME, PRUNE_NAME, TRANSFORM_PHASE
+from ..profiling import TRANSFORMER_TIME_METRIC, profile_transformers
 from ..transformers import BlockStructureTransformers
 from .helpers import (
     ChildrenMapTestMixin, MockTransformer, MockFilteringTransformer, mock_registered_transformers
@@ -81,3 +83,46 @@ class TestBlockStructureTransformers(ChildrenMapTestMixin, TestCase):
             self.assertTrue(self.transformers.is_collected_outdated(block_structure))
             self.transformers.collect(block_structure)
             self.assertFalse(self.transformers.is_collected_outdated(block_structure))
+
+    @patch('openedx.core.lib.block_structure.profiling.dog_stats_api.histogram')
+    def test_metrics(self, mock_histogram):
+        self.add_mock_transformer()
+        block_structure = self.create_block_structure(self.SIMPLE_CHILDREN_MAP, BlockStructureModulestoreData)
+        self.transformers.transform(block_structure)
+
+        metric_tags = [call_args[1]['tags'] for call_args in mock_histogram.call_args_list]
+        self.assertTrue(all(call_args[0][0] == TRANSFORMER_TIME_METRIC for call_args in mock_histogram.call_args_list))
+        self.assertItemsEqual(
+            metric_tags,
+            [
+                [u'transformer:MockFilteringTransformer', u'phase:transform'],
+                [u'transformer:{}'.format(FILTER_TRAVERSAL_NAME), u'phase:transform'],
+                [u'transformer:MockTransformer', u'phase:transform'],
+                [u'transformer:{}'.format(PRUNE_NAME), u'phase:transform'],
+            ],
+        )
+
+    def test_profile(self):
+        self.add_mock_transformer()
+        block_structure = self.create_block_structure(self.SIMPLE_CHILDREN_MAP, BlockStructureModulestoreData)
+
+        with profile_transformers(track_allocations=True) as profile:
+            with mock_registered_transformers(self.registered_transformers):
+                self.transformers.collect(block_structure)
+            self.transformers.transform(block_structure)
+
+        self.assertEquals(profile.stats[('MockTransformer', COLLECT_PHASE)]['calls'], 1)
+        self.assertEquals(profile.stats[('MockTransformer', TRANSFORM_PHASE)]['calls'], 1)
+        self.assertIsNotNone(profile.stats[('MockTransformer', TRANSFORM_PHASE)]['allocated'])
+        self.assertEquals(
+            profile.stats[('MockFilteringTransformer', FILTER_PHASE)]['calls'],
+            len(self.SIMPLE_CHILDREN_MAP),
+        )
+        self.assertEquals(
+            [(name, phase) for name, phase, __ in profile.summary()].count((PRUNE_NAME, TRANSFORM_PHASE)),
+            1,
+        )
+
+        # Nothing is recorded once the profile is no longer active.
+        self.transformers.transform(block_structure)
+        self.assertEquals(profile.stats[('MockTransformer', TRANSFORM_PHASE)]['calls'], 1)
@@ -5,6 +5,14 @@ import functools
 from logging import getLogger
 
 from .exceptions import TransformerException
+from .profiling import (
+    COLLECT_PHASE,
+    FILTER_TRAVERSAL_NAME,
+    PRUNE_NAME,
+    TRANSFORM_PHASE,
+    instrument,
+    instrument_filters,
+)
 from .transformer import FilteringTransformerMixin
 from .transformer_registry import TransformerRegistry
 
@@ -77,7 +85,8 @@ class BlockStructureTransformers(object):
         """
         for transformer in TransformerRegistry.get_registered_transformers():
             block_structure._add_transformer(transformer)  # pylint: disable=protected-access
-            transformer.collect(block_structure)
+            with instrument(transformer.name(), COLLECT_PHASE):
+                transformer.collect(block_structure)
 
         # Collect all fields that were requested by the transformers.
         block_structure._collect_requested_xblock_fields()  # pylint: disable=protected-access
@@ -107,12 +116,16 @@ class BlockStructureTransformers(object):
         collection. Tranformers with filters are combined and run first in a
         single course tree traversal, then remaining transformers are run in
         the order that they were added.
+
+        The time spent by each transformer is reported as a metric (see
+        profiling.py).
         """
         self._transform_with_filters(block_structure)
         self._transform_without_filters(block_structure)
 
         # Prune the block structure to remove any unreachable blocks.
-        block_structure._prune_unreachable()  # pylint: disable=protected-access
+        with instrument(PRUNE_NAME, TRANSFORM_PHASE):
+            block_structure._prune_unreachable()  # pylint: disable=protected-access
 
     def _transform_with_filters(self, block_structure):
         """
@@ -124,14 +137,17 @@ class BlockStructureTransformers(object):
 
         filters = []
         for transformer in self._transformers['supports_filter']:
-            filters.extend(transformer.transform_block_filters(self.usage_info, block_structure))
+            with instrument(transformer.name(), TRANSFORM_PHASE):
+                transformer_filters = transformer.transform_block_filters(self.usage_info, block_structure)
+            filters.extend(instrument_filters(transformer.name(), transformer_filters))
 
         combined_filters = functools.reduce(
             self._filter_chain,
             filters,
             block_structure.create_universal_filter()
         )
-        block_structure.filter_topological_traversal(combined_filters)
+        with instrument(FILTER_TRAVERSAL_NAME, TRANSFORM_PHASE):
+            block_structure.filter_topological_traversal(combined_filters)
 
     def _filter_chain(self, accumulated, additional):
         """
@@ -146,4 +162,5 @@ class BlockStructureTransformers(object):
         method from the given transformers.
         """
         for transformer in self._transformers['no_filter']:
-            transformer.transform(self.usage_info, block_structure)
+            with instrument(transformer.name(), TRANSFORM_PHASE):
+                transformer.transform(self.usage_info, block_structure)